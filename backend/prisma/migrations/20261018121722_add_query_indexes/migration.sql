@@ -0,0 +1,32 @@
+-- CreateIndex
+CREATE INDEX "CashMovement_cashSessionId_idx" ON "CashMovement"("cashSessionId");
+
+-- CreateIndex
+CREATE INDEX "CashMovement_restaurantId_createdAt_idx" ON "CashMovement"("restaurantId", "createdAt");
+
+-- CreateIndex
+CREATE INDEX "CashSession_restaurantId_status_openedAt_idx" ON "CashSession"("restaurantId", "status", "openedAt");
+
+-- CreateIndex
+CREATE INDEX "Expense_restaurantId_date_idx" ON "Expense"("restaurantId", "date");
+
+-- CreateIndex
+CREATE INDEX "Feedback_restaurantId_createdAt_idx" ON "Feedback"("restaurantId", "createdAt");
+
+-- CreateIndex
+CREATE INDEX "Order_restaurantId_status_createdAt_idx" ON "Order"("restaurantId", "status", "createdAt");
+
+-- CreateIndex
+CREATE INDEX "Order_tableId_status_createdAt_idx" ON "Order"("tableId", "status", "createdAt");
+
+-- CreateIndex
+CREATE INDEX "Order_updatedAt_idx" ON "Order"("updatedAt");
+
+-- CreateIndex
+CREATE INDEX "OrderItem_orderId_idx" ON "OrderItem"("orderId");
+
+-- CreateIndex
+CREATE INDEX "StockMovement_restaurantId_createdAt_idx" ON "StockMovement"("restaurantId", "createdAt");
+
+-- CreateIndex
+CREATE INDEX "StockMovement_restaurantId_type_createdAt_idx" ON "StockMovement"("restaurantId", "type", "createdAt");
@@ -0,0 +1,2 @@
+-- AlterTable
+ALTER TABLE "SyncLog" ADD COLUMN     "durationMs" INTEGER;
@@ -0,0 +1,19 @@
+-- CreateTable
+CREATE TABLE "SyncReceipt" (
+    "id" SERIAL NOT NULL,
+    "restaurantId" INTEGER NOT NULL,
+    "deviceId" TEXT NOT NULL,
+    "clientItemId" INTEGER NOT NULL,
+    "status" TEXT NOT NULL,
+    "orderId" INTEGER,
+    "message" TEXT,
+    "createdAt" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    CONSTRAINT "SyncReceipt_pkey" PRIMARY KEY ("id")
+);
+
+-- CreateIndex
+CREATE UNIQUE INDEX "SyncReceipt_restaurantId_deviceId_clientItemId_key" ON "SyncReceipt"("restaurantId", "deviceId", "clientItemId");
+
+-- AddForeignKey
+ALTER TABLE "SyncReceipt" ADD CONSTRAINT "SyncReceipt_restaurantId_fkey" FOREIGN KEY ("restaurantId") REFERENCES "Restaurant"("id") ON DELETE RESTRICT ON UPDATE CASCADE;
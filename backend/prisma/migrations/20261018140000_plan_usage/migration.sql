@@ -0,0 +1,18 @@
+-- CreateTable
+CREATE TABLE "PlanUsage" (
+    "restaurantId" INTEGER NOT NULL,
+    "tables" INTEGER NOT NULL DEFAULT 0,
+    "menuItems" INTEGER NOT NULL DEFAULT 0,
+    "users" INTEGER NOT NULL DEFAULT 0,
+    "devices" INTEGER NOT NULL DEFAULT 0,
+    "month" TEXT NOT NULL,
+    "monthOrders" INTEGER NOT NULL DEFAULT 0,
+    "lastTableId" INTEGER NOT NULL DEFAULT 0,
+    "lastMenuItemId" INTEGER NOT NULL DEFAULT 0,
+    "updatedAt" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    CONSTRAINT "PlanUsage_pkey" PRIMARY KEY ("restaurantId")
+);
+
+-- AddForeignKey
+ALTER TABLE "PlanUsage" ADD CONSTRAINT "PlanUsage_restaurantId_fkey" FOREIGN KEY ("restaurantId") REFERENCES "Restaurant"("id") ON DELETE RESTRICT ON UPDATE CASCADE;
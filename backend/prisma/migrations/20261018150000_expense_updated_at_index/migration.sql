@@ -0,0 +1,2 @@
+-- CreateIndex
+CREATE INDEX "Expense_updatedAt_idx" ON "Expense"("updatedAt");
@@ -0,0 +1,63 @@
+import json
+import sys
+import time
+
+import cafepoint_crypto
+
+# ==========================================
+# BENCHMARK DO NÚCLEO CRIPTOGRÁFICO
+# ==========================================
+# Uso: python bench_cafepoint_crypto.py [segundos_por_caso]
+# Mede registos/s para encrypt/decrypt (um a um e em lote) de 100 B a 1 MB.
+
+SIZES = [100, 1_000, 10_000, 100_000, 1_000_000]
+
+def _payload(size):
+    # Pedido em JSON (como os da fila offline) com itens repetidos; as notas
+    # acertam o tamanho exato
+    order = {"tableId": 7, "items": [], "notes": ""}
+    item = {"menuItemId": 12, "quantity": 2, "notes": "sem gelo", "course": "MAIN"}
+    count = (size - len(json.dumps(order))) // (len(json.dumps(item)) + 2)
+    order["items"] = [item] * max(0, count)
+    order["notes"] = "x" * max(0, size - len(json.dumps(order)))
+    return json.dumps(order)
+
+def measure(fn, min_seconds):
+    # Repete até acumular min_seconds; devolve (chamadas, segundos)
+    calls = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < min_seconds:
+        fn()
+        calls += 1
+        elapsed = time.perf_counter() - start
+    return calls, elapsed
+
+def run(min_seconds=0.5, batch_size=64):
+    rows = []
+    for size in SIZES:
+        text = _payload(size)
+        token = cafepoint_crypto.encrypt(text)
+        # Lotes menores para os payloads grandes, para não medir só a memória
+        n = max(1, min(batch_size, 4_000_000 // size))
+        texts = [text] * n
+        tokens = cafepoint_crypto.encrypt_many(texts)
+
+        cases = [
+            ("encrypt", lambda: cafepoint_crypto.encrypt(text), 1),
+            ("decrypt", lambda: cafepoint_crypto.decrypt(token), 1),
+            ("encrypt_many", lambda: cafepoint_crypto.encrypt_many(texts), n),
+            ("decrypt_many", lambda: cafepoint_crypto.decrypt_many(tokens), n),
+        ]
+        for name, fn, records_per_call in cases:
+            calls, elapsed = measure(fn, min_seconds)
+            records = calls * records_per_call
+            rows.append((name, size, records / elapsed, records * size / elapsed / 1e6))
+    return rows
+
+if __name__ == "__main__":
+    min_seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 0.5
+    print(f"{'operação':<14}{'payload':>10}{'registos/s':>14}{'MB/s':>10}")
+    print("-" * 48)
+    for name, size, rps, mbps in run(min_seconds):
+        print(f"{name:<14}{size:>10}{rps:>14.0f}{mbps:>10.1f}")
@@ -164,7 +164,7 @@ pause
     console.log('\n🛠️  [Tools] Configurando Ferramentas do Técnico...');
 
     // Copiar scripts Python Essenciais
-    const scriptsToCopy = ['gen_license_encrypted.py', 'read_secret.py'];
+    const scriptsToCopy = ['cafepoint_crypto.py', 'license_ledger.py', 'gen_license_encrypted.py', 'read_secret.py'];
     for (const s of scriptsToCopy) {
         fs.copyFileSync(path.join(BACKEND_DIR, 'scripts', s), path.join(OUTPUT_TOOLS, s));
     }
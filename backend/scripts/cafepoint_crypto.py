@@ -0,0 +1,79 @@
+import base64
+import hashlib
+import os
+
+# ==========================================
+# NÚCLEO CRIPTOGRÁFICO PARTILHADO
+# ==========================================
+# Formato compatível com backend/src/utils/cryptoBox.ts:
+#   AES-256-CBC, chave = SHA-256('cafe-point-ultra-secure-key-2026'),
+#   texto = "<iv em hex>:<cifra em hex>", padding PKCS#7.
+
+# MESMA CHAVE USADA PELO BACKEND (Ultra Secure) - derivada uma única vez
+KEY = hashlib.sha256(b'cafe-point-ultra-secure-key-2026').digest()
+IV_LENGTH = 16
+
+HEX_CHARS = frozenset("0123456789abcdefABCDEF")
+BLOCK_SIZE = 16
+
+_aes = None
+
+def _cipher(iv):
+    # O pycryptodome só é carregado na primeira cifra/decifra (arranque rápido da CLI)
+    global _aes
+    if _aes is None:
+        from Crypto.Cipher import AES
+        _aes = AES
+    return _aes.new(KEY, _aes.MODE_CBC, iv)
+
+def _encrypt_bytes(data, iv):
+    from Crypto.Util.Padding import pad
+    return f"{iv.hex()}:{_cipher(iv).encrypt(pad(data, BLOCK_SIZE)).hex()}"
+
+def encrypt(text):
+    return _encrypt_bytes(text.encode('utf-8'), os.urandom(IV_LENGTH))
+
+def encrypt_many(texts):
+    # Um único pedido de aleatoriedade para todos os IVs do lote
+    texts = list(texts)
+    ivs = os.urandom(IV_LENGTH * len(texts))
+    return [
+        _encrypt_bytes(text.encode('utf-8'), ivs[i * IV_LENGTH:(i + 1) * IV_LENGTH])
+        for i, text in enumerate(texts)
+    ]
+
+def detect_encoding(token):
+    # Os escritores atuais usam hex; ficheiros antigos podem estar em base64
+    iv_part = token.strip().split(':', 1)[0]
+    if len(iv_part) == IV_LENGTH * 2 and set(iv_part) <= HEX_CHARS:
+        return "hex"
+    return "base64"
+
+def _decode_part(value, encoding):
+    if encoding == "hex":
+        return bytes.fromhex(value)
+    return base64.b64decode(value)
+
+def decrypt(token):
+    # Levanta ValueError se o texto estiver corrompido ou a chave não corresponder
+    token = token.strip()
+    if ':' not in token:
+        raise ValueError("Formato inválido (esperado iv:cifra)")
+    encoding = detect_encoding(token)
+    iv_part, ct_part = token.split(':', 1)
+    iv = _decode_part(iv_part, encoding)
+    ct = _decode_part(ct_part, encoding)
+    from Crypto.Util.Padding import unpad
+    return unpad(_cipher(iv).decrypt(ct), BLOCK_SIZE).decode('utf-8')
+
+def decrypt_many(tokens, errors="raise"):
+    # errors="raise" propaga o primeiro erro; errors="none" devolve None nos itens inválidos
+    results = []
+    for token in tokens:
+        try:
+            results.append(decrypt(token))
+        except (ValueError, UnicodeDecodeError):
+            if errors == "raise":
+                raise
+            results.append(None)
+    return results
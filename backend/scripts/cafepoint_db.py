@@ -0,0 +1,150 @@
+import os
+import sqlite3
+from datetime import date, datetime, timedelta, timezone
+from urllib.parse import quote
+
+# ==========================================
+# ACESSO DIRETO À BASE DE DADOS DO BACKEND
+# ==========================================
+# A base SQLite do Prisma (backend/prisma/dev.db) guarda os campos DateTime
+# como milissegundos desde 1970 (INTEGER). Estas funções tratam da ligação e
+# das conversões de datas para os scripts de relatórios e manutenção.
+#
+# Caminho: CAFEPOINT_DB, ou DATABASE_URL="file:..." (relativo a prisma/), ou
+# backend/prisma/dev.db.
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PRISMA_DIR = os.path.join(BACKEND_DIR, "prisma")
+DEFAULT_DB = os.path.join(PRISMA_DIR, "dev.db")
+MIGRATIONS_DIR = os.path.join(PRISMA_DIR, "migrations")
+
+def default_db_path():
+    if os.environ.get("CAFEPOINT_DB"):
+        return os.environ["CAFEPOINT_DB"]
+    url = os.environ.get("DATABASE_URL", "")
+    if url.startswith("file:"):
+        path = url[len("file:"):]
+        return path if os.path.isabs(path) else os.path.normpath(os.path.join(PRISMA_DIR, path))
+    return DEFAULT_DB
+
+def connect(path=None, readonly=False):
+    path = path or default_db_path()
+    if readonly:
+        # Só leitura: nunca cria um ficheiro vazio por engano
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Base de dados não encontrada: {path}")
+        conn = sqlite3.connect(f"file:{quote(os.path.abspath(path))}?mode=ro", uri=True)
+    else:
+        conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    # O backend pode estar a escrever ao mesmo tempo
+    conn.execute("PRAGMA busy_timeout = 5000")
+    return conn
+
+def database_file(conn):
+    # Caminho do ficheiro da base "main" (vazio para :memory:)
+    return conn.execute("PRAGMA database_list").fetchone()[2]
+
+def table_exists(conn, name):
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)).fetchone() is not None
+
+def side_file(conn, alias):
+    # dev.db -> dev.<alias>.db (vazio para :memory:, uma base temporária)
+    main = database_file(conn)
+    return os.path.splitext(main)[0] + f".{alias}.db" if main else ""
+
+def attach_side_file(conn, alias, schema, tables):
+    # Tabelas dos scripts que não estão no schema.prisma vivem num ficheiro ao
+    # lado da base, ligado por ATTACH como <alias>: o "prisma db push
+    # --accept-data-loss" do arranque do backend apaga as que encontrar na base.
+    # O schema cria "<alias>.tabela"; as consultas usam só o nome. Tabelas de
+    # versões anteriores, ainda na base principal, passam para o ficheiro.
+    if any(row[1] == alias for row in conn.execute("PRAGMA database_list")):
+        return
+    conn.execute(f"ATTACH DATABASE ? AS {alias}", (side_file(conn, alias),))
+    conn.executescript(schema)
+    legacy = [table for table in tables if table_exists(conn, table)]
+    if legacy:
+        try:
+            with conn:
+                for table in legacy:
+                    conn.execute(f"INSERT OR IGNORE INTO {alias}.{table} SELECT * FROM main.{table}")
+                    conn.execute(f"DROP TABLE main.{table}")
+        except sqlite3.OperationalError:
+            # Ligação só de leitura: as da base principal continuam à frente
+            # (mesmo nome) até à próxima execução com escrita
+            pass
+
+def log_sync(conn, restaurant_ids, sync_type, status, records, duration_ms=None, error=None):
+    # Uma linha do SyncLog por restaurante, dentro da transação em curso
+    # (durationMs só se a migração sync_log_duration já foi aplicada)
+    if not table_exists(conn, "SyncLog"):
+        return 0
+    has_duration = any(r[1] == "durationMs" for r in conn.execute('PRAGMA table_info("SyncLog")'))
+    columns = "restaurantId, type, status, recordsCount, errorMessage, createdAt" + (", durationMs" if has_duration else "")
+    for restaurant_id in restaurant_ids:
+        values = [restaurant_id, sync_type, status, records, error, now_ms()] + ([duration_ms] if has_duration else [])
+        conn.execute(f'INSERT INTO "SyncLog" ({columns}) VALUES ({", ".join("?" * len(values))})', values)
+    return len(restaurant_ids)
+
+# ==========================================
+# DATAS (mesma convenção do Prisma)
+# ==========================================
+
+def to_ms(value):
+    # datetime/date sem fuso = hora local (como new Date(...) no backend)
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str):
+        value = parse_date(value)
+    if not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day)
+    return int(value.timestamp() * 1000)
+
+def from_ms(ms):
+    return None if ms is None else datetime.fromtimestamp(ms / 1000)
+
+def to_iso(ms):
+    # Igual a Date.toISOString() (é assim que o backend devolve datas em JSON)
+    if ms is None:
+        return None
+    return datetime.fromtimestamp(ms / 1000, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.") + f"{int(ms) % 1000:03d}Z"
+
+def now_ms():
+    return to_ms(datetime.now())
+
+def parse_date(text):
+    # "AAAA-MM-DD" ou ISO completo
+    text = text.strip()
+    if text.endswith("Z"):
+        return datetime.fromisoformat(text[:-1]).replace(tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+    return datetime.fromisoformat(text)
+
+def day_range(start_day, end_day):
+    # [início do primeiro dia, último ms do último dia] em ms
+    start = datetime.combine(start_day, datetime.min.time())
+    end = datetime.combine(end_day, datetime.min.time()) + timedelta(days=1)
+    return to_ms(start), to_ms(end) - 1
+
+def period_range(period, now=None):
+    # Mesmos limites do date-fns no reportController (semana começa ao domingo)
+    today = (now or datetime.now()).date()
+    if period == "week":
+        start = today - timedelta(days=(today.weekday() + 1) % 7)
+        return day_range(start, start + timedelta(days=6))
+    if period == "month":
+        start = today.replace(day=1)
+        next_month = (start + timedelta(days=32)).replace(day=1)
+        return day_range(start, next_month - timedelta(days=1))
+    if period == "year":
+        return day_range(date(today.year, 1, 1), date(today.year, 12, 31))
+    return day_range(today, today)
+
+def local_hour_sql(column):
+    # Hora local (0-23) de uma coluna em ms, como Date.getHours()
+    return f"CAST(strftime('%H', {column} / 1000, 'unixepoch', 'localtime') AS INTEGER)"
+
+def local_day_sql(column):
+    return f"strftime('%Y-%m-%d', {column} / 1000, 'unixepoch', 'localtime')"
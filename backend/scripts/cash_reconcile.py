@@ -0,0 +1,506 @@
+import json
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+import cafepoint_db
+import cold_archive
+
+# ==========================================
+# RECONCILIAÇÃO DE CAIXA EM LOTE
+# ==========================================
+# Confere, de uma vez e para todos os restaurantes, as sessões de caixa de
+# um período contra os movimentos e os pedidos pagos (o cashController só
+# trata uma sessão de cada vez):
+#
+#   saldo esperado = openingBalance + soma dos movimentos da sessão
+#                    (a mesma conta do calculateCashSessionBalance; as
+#                    transferências internas entram com o valor positivo,
+#                    como no backend)
+#   diferença      = closingBalance declarado - saldo esperado
+#
+# Sinais por sessão: diferença acima de --threshold, sessão aberta há mais de
+# STALE_OPEN_HOURS, sessão fechada sem closingBalance e movimentos fora da
+# janela openedAt..closedAt.
+#
+# Pedidos: cada pedido PAID deve ter uma entrada "Pagamento Pedido #id" (o
+# updateOrderStatus cria-a), com o valor do pedido e só uma; uma entrada de
+# um pedido que já não está PAID (ex.: cancelado depois) também é sinalizada.
+#
+# Cofres/gavetas (CashBox): saldo antes do período, entradas (destino),
+# saídas (origem) e saldo esperado no fim, a partir de todos os movimentos
+# com origem/destino; movimentos numa caixa desativada são sinalizados.
+# As gavetas (DRAWER/REGISTER) ficam sem saldo esperado: as entradas das
+# sessões não têm caixa de destino (CashSession não tem cashBoxId), por isso
+# só as transferências apareceriam e o saldo seria sempre negativo; o
+# dinheiro delas confere-se pelas sessões.
+#
+# Com --archive os movimentos arquivados (db archive) também contam: cada
+# ficheiro do arquivo é lido diretamente (UNION ALL com a base), incluindo os
+# anos anteriores ao período, de que depende o saldo inicial das caixas. Sem
+# --archive, havendo caixa arquivado, o relatório avisa que os saldos das
+# caixas não incluem esses movimentos.
+#
+# Tudo é lido em poucas consultas e somado com numpy (np.bincount por
+# sessão/caixa, np.unique por pedido): um mês de centenas de sessões demora
+# segundos, e o resultado é o mesmo em cada execução (lote noturno: o código
+# de saída é 2 quando há sinais).
+#
+# API:
+#   cash_reconcile.reconcile(conn, start_day, end_day, restaurant_id=None, threshold=1.0, archive=False)
+#
+# Uso: python cash_reconcile.py [AAAA-MM-DD AAAA-MM-DD] [--restaurant ID] [--threshold 1]
+#        [--report F.md] [--all] [--archive] [--json] [--db F]
+
+THRESHOLD = 1.0
+DEFAULT_DAYS = 31
+STALE_OPEN_HOURS = 24
+WINDOW_GRACE_MS = 60 * 1000
+AMOUNT_TOLERANCE = 0.01
+PAYMENT_PREFIX = "Pagamento Pedido #"
+SESSION_BOX_TYPES = ("DRAWER", "REGISTER")
+
+SESSION_FLAGS = ("difference", "staleOpen", "missingClosingBalance", "movementsOutsideSession")
+ORDER_FLAGS = ("missingPayment", "amountMismatch", "duplicatePayment", "paymentForUnpaidOrder")
+
+def _columns(rows, count):
+    # Lista de tuplos -> lista de arrays numpy (None vira nan nas colunas float)
+    return [np.array(col) for col in zip(*rows)] if rows else [np.array([]) for _ in range(count)]
+
+def _restaurant_filter(column, restaurant_id):
+    return (f" AND {column} = ?", [restaurant_id]) if restaurant_id else ("", [])
+
+def _union(sources, sql, params):
+    # A mesma consulta em cada base ("main" e ficheiros do arquivo), com {db} no lugar do esquema
+    return " UNION ALL ".join(sql.replace("{db}", db) for db in sources), list(params) * len(sources)
+
+def _archived_cash_rows(conn):
+    manifest = cold_archive.archive_manifest(conn)
+    return sum(entry["tables"].get("CashMovement", {}).get("rows") or 0 for entry in manifest["files"].values())
+
+# ==========================================
+# LEITURA
+# ==========================================
+
+def _load_sessions(conn, sources, start, end, restaurant_id):
+    extra, params = _restaurant_filter("restaurantId", restaurant_id)
+    sql, params = _union(sources, f"""
+        SELECT id, restaurantId, openingBalance, closingBalance, status, openedAt, closedAt
+        FROM {{db}}."CashSession" WHERE openedAt BETWEEN ? AND ?{extra}
+    """, [start, end] + params)
+    rows = conn.execute(f"SELECT * FROM ({sql}) ORDER BY id", params).fetchall()
+    ids, restaurants, opening, closing, status, opened, closed = _columns(rows, 7)
+    return {
+        "id": ids.astype(np.int64), "restaurantId": restaurants.astype(np.int64),
+        "opening": opening.astype(np.float64), "closing": closing.astype(np.float64),
+        "status": status.astype(str), "openedAt": opened.astype(np.int64), "closedAt": closed.astype(np.float64),
+    }
+
+def _load_movements(conn, sources, start, end, restaurant_id):
+    # Movimentos das sessões abertas no período (índice CashMovement(cashSessionId));
+    # no arquivo os movimentos estão sempre no mesmo ficheiro que a sessão
+    extra, params = _restaurant_filter("s.restaurantId", restaurant_id)
+    sql, params = _union(sources, f"""
+        SELECT m.cashSessionId, m.type, m.amount, m.originCashBoxId, m.destinationCashBoxId, m.createdAt,
+               CASE WHEN m.type = 'ENTRY' AND m.description LIKE '{PAYMENT_PREFIX}%'
+                    THEN CAST(substr(m.description, {len(PAYMENT_PREFIX) + 1}) AS INTEGER) END
+        FROM {{db}}."CashSession" s JOIN {{db}}."CashMovement" m ON m.cashSessionId = s.id
+        WHERE s.openedAt BETWEEN ? AND ?{extra}
+    """, [start, end] + params)
+    rows = conn.execute(sql, params).fetchall()
+    sessions, types, amounts, origins, destinations, created, orders = _columns(rows, 7)
+    return {
+        "session": sessions.astype(np.int64), "type": types.astype(str), "amount": amounts.astype(np.float64),
+        "origin": origins.astype(np.float64), "destination": destinations.astype(np.float64),
+        "createdAt": created.astype(np.int64), "orderId": orders.astype(np.float64),
+    }
+
+def _load_orders(conn, sources, order_ids, start, end, restaurant_id):
+    # Pedidos com pagamento no período + pedidos pagos (updatedAt) no período
+    extra, params = _restaurant_filter("restaurantId", restaurant_id)
+    rows = conn.execute(*_union(sources, f"""
+        SELECT id, restaurantId, status, totalAmount FROM {{db}}."Order"
+        WHERE status = 'PAID' AND updatedAt BETWEEN ? AND ?{extra}
+    """, [start, end] + params)).fetchall()
+    known = {r[0] for r in rows}
+    missing = [int(i) for i in np.unique(order_ids) if int(i) not in known]
+    for chunk_start in range(0, len(missing), 500):
+        chunk = missing[chunk_start:chunk_start + 500]
+        rows += conn.execute(*_union(sources, f"""
+            SELECT id, restaurantId, status, totalAmount FROM {{db}}."Order" WHERE id IN ({", ".join("?" * len(chunk))})
+        """, chunk)).fetchall()
+    ids, restaurants, status, totals = _columns(sorted(tuple(r) for r in rows), 4)
+    return {"id": ids.astype(np.int64), "restaurantId": restaurants.astype(np.int64),
+            "status": status.astype(str), "total": totals.astype(np.float64)}
+
+def _earlier_payments(conn, sources, orders):
+    # Pagamentos de pedidos pagos no período mas registados antes dele (raro:
+    # o pedido foi alterado depois de pago); procurados pela descrição
+    found = {}
+    for rid in np.unique(orders["restaurantId"]).tolist():
+        ids = orders["id"][orders["restaurantId"] == rid].tolist()
+        for chunk_start in range(0, len(ids), 500):
+            chunk = [f"{PAYMENT_PREFIX}{i}" for i in ids[chunk_start:chunk_start + 500]]
+            sql, params = _union(sources, f"""
+                SELECT description, amount FROM {{db}}."CashMovement"
+                WHERE restaurantId = ? AND type = 'ENTRY' AND description IN ({", ".join("?" * len(chunk))})
+            """, [rid] + chunk)
+            for description, total, count in conn.execute(f"""
+                SELECT description, SUM(amount), COUNT(*) FROM ({sql}) GROUP BY description
+            """, params):
+                found[int(description[len(PAYMENT_PREFIX):])] = (total, count)
+    return found
+
+def _load_boxes(conn, restaurant_id):
+    extra, params = _restaurant_filter("restaurantId", restaurant_id)
+    rows = conn.execute(f"""
+        SELECT id, restaurantId, name, type, isActive FROM "CashBox" WHERE 1 = 1{extra} ORDER BY id
+    """, params).fetchall()
+    ids, restaurants, names, types, active = _columns(rows, 5)
+    return {"id": ids.astype(np.int64), "restaurantId": restaurants.astype(np.int64), "name": names.astype(str),
+            "type": types.astype(str), "isActive": active.astype(bool)}
+
+def _box_flows(conn, sources, boxes, start, end):
+    # Uma só leitura dos movimentos com origem/destino até ao fim do período
+    # (origem/destino não têm índice): o que é anterior ao período dá o saldo
+    # inicial de cada caixa, o resto as entradas/saídas do período
+    rows = conn.execute(*_union(sources, """
+        SELECT originCashBoxId, destinationCashBoxId, ABS(amount), createdAt >= ? FROM {db}."CashMovement"
+        WHERE createdAt <= ? AND (originCashBoxId IS NOT NULL OR destinationCashBoxId IS NOT NULL)
+    """, (start, end))).fetchall()
+    origins, destinations, amounts, in_period = _columns(rows, 4)
+    amounts = amounts.astype(np.float64)
+    in_period = in_period.astype(bool)
+    n = len(boxes["id"])
+    flows = {"before": np.zeros(n)}
+    for name, sign, column in (("outflow", -1, origins), ("inflow", 1, destinations)):
+        column = column.astype(np.float64)
+        ids = np.nan_to_num(column, nan=-1).astype(np.int64)
+        pos = np.minimum(np.searchsorted(boxes["id"], ids), max(n - 1, 0))
+        keep = (boxes["id"][pos] == ids) if n else np.zeros(len(ids), bool)
+        before, current = keep & ~in_period, keep & in_period
+        flows["before"] += sign * np.bincount(pos[before], weights=amounts[before], minlength=n)
+        flows[name] = np.bincount(pos[current], weights=amounts[current], minlength=n)
+        flows[name + "Count"] = np.bincount(pos[current], minlength=n)
+    return flows
+
+# ==========================================
+# RECONCILIAÇÃO
+# ==========================================
+
+def reconcile(conn, start_day=None, end_day=None, restaurant_id=None, threshold=THRESHOLD, now=None,
+              archive=False, archive_directory=None):
+    end_day = end_day or date.today()
+    start_day = start_day or end_day - timedelta(days=DEFAULT_DAYS - 1)
+    start, end = cafepoint_db.day_range(start_day, end_day)
+    if not archive:
+        report = _reconcile(conn, ["main"], start_day, end_day, start, end, restaurant_id, threshold, now)
+        archived = _archived_cash_rows(conn)
+        if archived:
+            report["warnings"].append(f"{archived} movimentos de caixa arquivados não foram lidos: os saldos das "
+                                      f"caixas não os incluem (use --archive)")
+        return report
+    # Todos os anos até ao fim do período: o saldo inicial das caixas precisa dos anteriores
+    aliases = cold_archive.attach_files(conn, None, end, archive_directory)
+    try:
+        return _reconcile(conn, ["main"] + aliases, start_day, end_day, start, end, restaurant_id, threshold, now)
+    finally:
+        cold_archive.detach_archives(conn, aliases)
+
+def _reconcile(conn, sources, start_day, end_day, start, end, restaurant_id, threshold, now):
+    start_time = time.perf_counter()
+    now = now or cafepoint_db.now_ms()
+
+    # 1. Sessões: somas por sessão com bincount
+    sessions = _load_sessions(conn, sources, start, end, restaurant_id)
+    moves = _load_movements(conn, sources, start, end, restaurant_id)
+    n = len(sessions["id"])
+    pos = np.searchsorted(sessions["id"], moves["session"])
+    sums = {}
+    for name, kind in (("entries", "ENTRY"), ("withdrawals", "WITHDRAWAL"), ("transfers", "INTERNAL_TRANSFER")):
+        mask = moves["type"] == kind
+        sums[name] = np.bincount(pos[mask], weights=moves["amount"][mask], minlength=n)
+    movement_sum = np.bincount(pos, weights=moves["amount"], minlength=n)
+    movement_count = np.bincount(pos, minlength=n)
+    expected = sessions["opening"] + movement_sum
+    closed = sessions["status"] == "CLOSED"
+    difference = np.where(closed, sessions["closing"] - expected, np.nan)
+
+    window_end = np.where(np.isnan(sessions["closedAt"]), np.inf, sessions["closedAt"])
+    outside = (moves["createdAt"] < sessions["openedAt"][pos] - WINDOW_GRACE_MS) | \
+              (moves["createdAt"] > window_end[pos] + WINDOW_GRACE_MS) if n else np.zeros(0, bool)
+    outside_count = np.bincount(pos[outside], minlength=n)
+
+    flags = {
+        "difference": closed & (np.abs(np.nan_to_num(difference)) > threshold),
+        "staleOpen": (sessions["status"] == "OPEN") & (now - sessions["openedAt"] > STALE_OPEN_HOURS * 3600000),
+        "missingClosingBalance": closed & np.isnan(sessions["closing"]),
+        "movementsOutsideSession": outside_count > 0,
+    }
+
+    # 2. Pedidos: pagamentos agrupados por pedido (np.unique) contra o pedido
+    paid_mask = ~np.isnan(moves["orderId"])
+    payment_orders = moves["orderId"][paid_mask].astype(np.int64)
+    payment_ids, payment_inverse, payment_count = np.unique(payment_orders, return_inverse=True, return_counts=True)
+    payment_sum = np.bincount(payment_inverse, weights=moves["amount"][paid_mask], minlength=len(payment_ids))
+    payment_session = np.zeros(len(payment_ids), dtype=np.int64)
+    payment_session[payment_inverse] = moves["session"][paid_mask]
+
+    orders = _load_orders(conn, sources, payment_ids, start, end, restaurant_id)
+    # Posição do pedido nos pagamentos; a posição len(payment_ids) (sem
+    # pagamento) cai numa sentinela
+    at = np.searchsorted(payment_ids, orders["id"])
+    has_payment = np.append(payment_ids, -1)[at] == orders["id"]
+    order_paid = np.where(has_payment, np.append(payment_sum, 0.0)[at], 0.0)
+    order_payments = np.where(has_payment, np.append(payment_count, 0)[at], 0)
+    order_session = np.where(has_payment, np.append(payment_session, 0)[at], 0)
+
+    is_paid = orders["status"] == "PAID"
+    if (is_paid & ~has_payment).any():
+        earlier = _earlier_payments(conn, sources, {k: v[is_paid & ~has_payment] for k, v in orders.items()})
+        for i in np.flatnonzero(is_paid & ~has_payment).tolist():
+            total, count = earlier.get(int(orders["id"][i]), (0.0, 0))
+            order_paid[i], order_payments[i] = total, count
+        has_payment = order_payments > 0
+    order_flags = {
+        "missingPayment": is_paid & ~has_payment,
+        "amountMismatch": has_payment & (np.abs(order_paid - orders["total"]) > AMOUNT_TOLERANCE),
+        "duplicatePayment": order_payments > 1,
+        "paymentForUnpaidOrder": has_payment & ~is_paid,
+    }
+
+    # 3. Caixas (CashBox)
+    boxes = _load_boxes(conn, restaurant_id)
+    flows = _box_flows(conn, sources, boxes, start, end)
+    # Gavetas: sem saldo esperado (ver cabeçalho)
+    tracked = ~np.isin(boxes["type"], SESSION_BOX_TYPES)
+    flows["before"] = np.where(tracked, flows["before"], np.nan)
+    box_expected = flows["before"] + flows["inflow"] - flows["outflow"]
+    box_used = (flows["inflowCount"] + flows["outflowCount"]) > 0
+    box_flags = {"inactiveBoxUsed": ~boxes["isActive"] & box_used}
+
+    return _build_report(conn, start_day, end_day, threshold, sessions, sums, movement_count, expected, difference,
+                         outside_count, flags, orders, order_paid, order_payments, order_session, order_flags,
+                         boxes, flows, box_expected, box_flags, time.perf_counter() - start_time)
+
+def _money(value):
+    return None if value is None or np.isnan(value) else round(float(value), 2)
+
+def _build_report(conn, start_day, end_day, threshold, sessions, sums, movement_count, expected, difference,
+                  outside_count, flags, orders, order_paid, order_payments, order_session, order_flags,
+                  boxes, flows, box_expected, box_flags, seconds):
+    names = {r[0]: r[1] for r in conn.execute('SELECT id, name FROM "Restaurant"')}
+    session_rows = []
+    for i in range(len(sessions["id"])):
+        session_flags = [f for f in SESSION_FLAGS if flags[f][i]]
+        session_rows.append({
+            "sessionId": int(sessions["id"][i]),
+            "restaurantId": int(sessions["restaurantId"][i]),
+            "status": sessions["status"][i],
+            "openedAt": cafepoint_db.to_iso(int(sessions["openedAt"][i])),
+            "closedAt": None if np.isnan(sessions["closedAt"][i]) else cafepoint_db.to_iso(int(sessions["closedAt"][i])),
+            "openingBalance": _money(sessions["opening"][i]),
+            "entries": _money(sums["entries"][i]),
+            "withdrawals": _money(sums["withdrawals"][i]),
+            "transfers": _money(sums["transfers"][i]),
+            "movements": int(movement_count[i]),
+            "expectedBalance": _money(expected[i]),
+            "closingBalance": _money(sessions["closing"][i]),
+            "difference": _money(difference[i]),
+            "movementsOutsideSession": int(outside_count[i]),
+            "flags": session_flags,
+        })
+
+    order_rows = []
+    for i in np.flatnonzero(np.any([order_flags[f] for f in ORDER_FLAGS], axis=0)).tolist() if len(orders["id"]) else []:
+        order_rows.append({
+            "orderId": int(orders["id"][i]),
+            "restaurantId": int(orders["restaurantId"][i]),
+            "status": orders["status"][i],
+            "totalAmount": _money(orders["total"][i]),
+            "paid": _money(order_paid[i]),
+            "payments": int(order_payments[i]),
+            "sessionId": int(order_session[i]) or None,
+            "flags": [f for f in ORDER_FLAGS if order_flags[f][i]],
+        })
+
+    box_rows = []
+    for i in range(len(boxes["id"])):
+        box_rows.append({
+            "cashBoxId": int(boxes["id"][i]),
+            "restaurantId": int(boxes["restaurantId"][i]),
+            "name": boxes["name"][i],
+            "type": boxes["type"][i],
+            "openingBalance": _money(flows["before"][i]),
+            "inflow": _money(flows["inflow"][i]),
+            "outflow": _money(flows["outflow"][i]),
+            "expectedBalance": _money(box_expected[i]),
+            "movements": int(flows["inflowCount"][i] + flows["outflowCount"][i]),
+            "flags": [f for f in box_flags if box_flags[f][i]],
+        })
+
+    restaurants = {}
+    for row in session_rows:
+        r = restaurants.setdefault(row["restaurantId"], {
+            "restaurantId": row["restaurantId"], "name": names.get(row["restaurantId"]), "sessions": 0, "closed": 0,
+            "expected": 0.0, "declared": 0.0, "difference": 0.0, "flaggedSessions": 0, "flaggedOrders": 0})
+        r["sessions"] += 1
+        if row["status"] == "CLOSED" and row["closingBalance"] is not None:
+            r["closed"] += 1
+            r["expected"] += row["expectedBalance"]
+            r["declared"] += row["closingBalance"]
+            r["difference"] += row["difference"]
+        r["flaggedSessions"] += bool(row["flags"])
+    for row in order_rows:
+        if row["restaurantId"] in restaurants:
+            restaurants[row["restaurantId"]]["flaggedOrders"] += 1
+    for r in restaurants.values():
+        for key in ("expected", "declared", "difference"):
+            r[key] = round(r[key], 2)
+
+    flagged_sessions = [r for r in session_rows if r["flags"]]
+    return {
+        "period": {"from": str(start_day), "to": str(end_day)},
+        "threshold": threshold,
+        "totals": {
+            "restaurants": len(restaurants),
+            "sessions": len(session_rows),
+            "closedSessions": sum(r["status"] == "CLOSED" for r in session_rows),
+            "flaggedSessions": len(flagged_sessions),
+            "movements": int(movement_count.sum()),
+            "ordersChecked": len(orders["id"]),
+            "flaggedOrders": len(order_rows),
+            "flaggedCashBoxes": sum(bool(b["flags"]) for b in box_rows),
+            "difference": round(sum(r["difference"] for r in restaurants.values()), 2),
+            "seconds": round(seconds, 3),
+        },
+        "restaurants": sorted(restaurants.values(), key=lambda r: r["restaurantId"]),
+        "sessions": session_rows,
+        "orders": order_rows,
+        "cashBoxes": box_rows,
+        "warnings": [],
+    }
+
+def has_flags(report):
+    totals = report["totals"]
+    return bool(totals["flaggedSessions"] or totals["flaggedOrders"] or totals["flaggedCashBoxes"])
+
+# ==========================================
+# SAÍDA
+# ==========================================
+
+def print_report(report, show_all=False):
+    totals = report["totals"]
+    period = report["period"]
+    print(f"💰 Caixa de {period['from']} a {period['to']}: {totals['sessions']} sessões ({totals['closedSessions']} fechadas), "
+          f"{totals['movements']} movimentos, {totals['ordersChecked']} pedidos em {totals['seconds']:.2f}s")
+    print(f"\n{'Restaurante':<28}{'Sessões':>8}{'Esperado':>14}{'Declarado':>14}{'Diferença':>12}{'Sinais':>8}")
+    for r in report["restaurants"]:
+        print(f"{(r['name'] or '#' + str(r['restaurantId']))[:27]:<28}{r['sessions']:>8}{r['expected']:>14.2f}"
+              f"{r['declared']:>14.2f}{r['difference']:>+12.2f}{r['flaggedSessions'] + r['flaggedOrders']:>8}")
+
+    rows = report["sessions"] if show_all else [s for s in report["sessions"] if s["flags"]]
+    if rows:
+        print(f"\n{'Sessão':>8} {'Rest.':>5}  {'Aberta':<16} {'Esperado':>11} {'Declarado':>11} {'Diferença':>10}  Sinais")
+        for s in rows:
+            declared = "-" if s["closingBalance"] is None else f"{s['closingBalance']:.2f}"
+            diff = "-" if s["difference"] is None else f"{s['difference']:+.2f}"
+            print(f"{s['sessionId']:>8} {s['restaurantId']:>5}  {s['openedAt'][:16].replace('T', ' '):<16} "
+                  f"{s['expectedBalance']:>11.2f} {declared:>11} {diff:>10}  {', '.join(s['flags']) or '-'}")
+    for o in report["orders"][:20]:
+        print(f"⚠️  Pedido #{o['orderId']} (rest. {o['restaurantId']}, {o['status']}, {o['totalAmount']:.2f}): "
+              f"pago {o['paid']:.2f} em {o['payments']} entrada(s) — {', '.join(o['flags'])}")
+    if len(report["orders"]) > 20:
+        print(f"   ... e mais {len(report['orders']) - 20} pedidos")
+    for b in report["cashBoxes"]:
+        if b["flags"] or b["movements"]:
+            mark = "⚠️ " if b["flags"] else "🏦"
+            if b["expectedBalance"] is None:
+                balance = f"+{b['inflow']:.2f} -{b['outflow']:.2f} (saldo nas sessões)"
+            else:
+                balance = f"{b['openingBalance']:.2f} +{b['inflow']:.2f} -{b['outflow']:.2f} = {b['expectedBalance']:.2f}"
+            print(f"{mark} {b['name']} (rest. {b['restaurantId']}, {b['type']}): {balance}"
+                  + (f"  [{', '.join(b['flags'])}]" if b["flags"] else ""))
+    for warning in report["warnings"]:
+        print(f"⚠️  {warning}")
+    print("\n" + ("⚠️  Há diferenças acima do limite." if has_flags(report) else "✅ Tudo conferido."))
+
+def render_markdown(report):
+    totals = report["totals"]
+    lines = [
+        "# Reconciliação de caixa",
+        "",
+        f"Período {report['period']['from']} a {report['period']['to']} | limite {report['threshold']:.2f} | "
+        f"gerado em {datetime.now().strftime('%Y-%m-%d %H:%M')}",
+        "",
+        f"{totals['sessions']} sessões, {totals['movements']} movimentos, {totals['ordersChecked']} pedidos; "
+        f"{totals['flaggedSessions']} sessões e {totals['flaggedOrders']} pedidos com sinais.",
+        "",
+        "| Restaurante | Sessões | Esperado | Declarado | Diferença | Sinais |",
+        "|---|---:|---:|---:|---:|---:|",
+    ]
+    for r in report["restaurants"]:
+        lines.append(f"| {r['name'] or r['restaurantId']} | {r['sessions']} | {r['expected']:.2f} | {r['declared']:.2f} | "
+                     f"{r['difference']:+.2f} | {r['flaggedSessions'] + r['flaggedOrders']} |")
+    flagged = [s for s in report["sessions"] if s["flags"]]
+    if flagged:
+        lines += ["", "## Sessões", "", "| Sessão | Restaurante | Aberta | Esperado | Declarado | Diferença | Sinais |",
+                  "|---:|---:|---|---:|---:|---:|---|"]
+        for s in flagged:
+            lines.append(f"| {s['sessionId']} | {s['restaurantId']} | {s['openedAt'][:16]} | {s['expectedBalance']:.2f} | "
+                         f"{'-' if s['closingBalance'] is None else format(s['closingBalance'], '.2f')} | "
+                         f"{'-' if s['difference'] is None else format(s['difference'], '+.2f')} | {', '.join(s['flags'])} |")
+    if report["orders"]:
+        lines += ["", "## Pedidos", "", "| Pedido | Restaurante | Estado | Total | Pago | Entradas | Sinais |",
+                  "|---:|---:|---|---:|---:|---:|---|"]
+        for o in report["orders"]:
+            lines.append(f"| {o['orderId']} | {o['restaurantId']} | {o['status']} | {o['totalAmount']:.2f} | "
+                         f"{o['paid']:.2f} | {o['payments']} | {', '.join(o['flags'])} |")
+    lines += ["", "## Caixas", "", "| Caixa | Restaurante | Tipo | Antes | Entradas | Saídas | Esperado | Sinais |",
+              "|---|---:|---|---:|---:|---:|---:|---|"]
+    for b in report["cashBoxes"]:
+        before = "-" if b["openingBalance"] is None else f"{b['openingBalance']:.2f}"
+        expected = "-" if b["expectedBalance"] is None else f"{b['expectedBalance']:.2f}"
+        lines.append(f"| {b['name']} | {b['restaurantId']} | {b['type']} | {before} | {b['inflow']:.2f} | "
+                     f"{b['outflow']:.2f} | {expected} | {', '.join(b['flags']) or '-'} |")
+    if report["warnings"]:
+        lines += [""] + [f"> ⚠️ {w}" for w in report["warnings"]]
+    return "\n".join(lines) + "\n"
+
+def _pop_option(args, name):
+    if name in args:
+        i = args.index(name)
+        value = args[i + 1]
+        del args[i:i + 2]
+        return value
+    return None
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    db_path = _pop_option(args, "--db")
+    restaurant = _pop_option(args, "--restaurant")
+    threshold = _pop_option(args, "--threshold")
+    report_path = _pop_option(args, "--report")
+    flags = {a for a in args if a in ("--json", "--all", "--archive")}
+    args = [a for a in args if a not in flags]
+
+    if len(args) not in (0, 2):
+        print("Usage: python cash_reconcile.py [AAAA-MM-DD AAAA-MM-DD] [--restaurant ID] [--threshold 1]")
+        print("       [--report FILE.md] [--all] [--archive] [--json] [--db FILE]")
+        sys.exit(1)
+
+    conn = cafepoint_db.connect(db_path, readonly=True)
+    start_day, end_day = [cafepoint_db.parse_date(a).date() for a in args] if args else (None, None)
+    report = reconcile(conn, start_day, end_day, int(restaurant) if restaurant else None,
+                       float(threshold) if threshold else THRESHOLD, archive="--archive" in flags)
+    if "--json" in flags:
+        print(json.dumps({"success": True, "data": report}, indent=2, ensure_ascii=False))
+    else:
+        print_report(report, "--all" in flags)
+    if report_path:
+        with open(report_path, "w", encoding="utf-8") as f:
+            f.write(render_markdown(report))
+        print(f"📝 Relatório: {report_path}", file=sys.stderr)
+    sys.exit(2 if has_flags(report) else 0)
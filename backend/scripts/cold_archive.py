@@ -0,0 +1,418 @@
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+from datetime import date, datetime
+
+import cafepoint_db
+
+# ==========================================
+# ARQUIVO DE DADOS FRIOS (UM FICHEIRO SQLITE POR ANO)
+# ==========================================
+# Move para archive/cafepoint-AAAA.db (ao lado da base) os períodos fechados:
+#   - pedidos PAID/CANCELLED (com os OrderItem) mais antigos que N meses
+#     (os que têm Feedback ficam, porque o Feedback aponta para o pedido);
+#   - sessões de caixa CLOSED (com os CashMovement), pelo closedAt;
+#   - movimentos de stock, pelo createdAt.
+# O ano de cada linha é o da data local da linha "raiz": os filhos vão sempre
+# para o mesmo ficheiro que o pai, por isso as referências internas (OrderItem
+# -> Order, CashMovement -> CashSession) continuam válidas dentro do arquivo.
+#
+# Cada lote copia, confere as contagens e apaga na mesma transação
+# (BEGIN IMMEDIATE, lotes pequenos para não bloquear o backend). Se o
+# processo cair a meio, voltar a correr acaba o trabalho: a cópia usa
+# INSERT OR IGNORE e o apagar repete-se.
+#
+# No fim fica archive/manifest.json com o que está em cada ficheiro (linhas,
+# ids, período coberto) e a base de onde vieram. Uma cópia ou backup da base
+# na mesma pasta não usa esse arquivo: um manifesto que aponta para outra base
+# que ainda existe é ignorado na leitura (com aviso) e recusado no arquivo.
+# Se a base mudou de sítio (o ficheiro antigo já não existe) continua a ser o
+# arquivo dela. Os relatórios leem o arquivo com attach_archives():
+# faz ATTACH dos ficheiros do período e cria tabelas TEMP com o mesmo nome
+# ("Order", "OrderItem", ...) só com as linhas desse período, da base e do
+# arquivo. Como o SQLite procura primeiro no esquema temp, as consultas do
+# report_engine e do recipe_engine funcionam sem alterações.
+#
+# API:
+#   cold_archive.archive(conn, months=12)
+#   cold_archive.attach_archives(conn, start_ms, end_ms, restaurant_id)
+#   cold_archive.attach_files(conn, start_ms, end_ms)   (só ATTACH, sem tabelas TEMP)
+#   cold_archive.archive_manifest(conn)                 (manifesto, só se for desta base)
+#
+# CLI:
+#   python cold_archive.py [--months N] [--dir D] [--dry-run] [--vacuum] [--db F]
+
+DEFAULT_MONTHS = 12
+BATCH_ROWS = 20000
+ARCHIVE_DIR = "archive"
+MANIFEST = "manifest.json"
+
+# Tabela raiz, coluna de data, condição de "fechado" e tabelas filhas
+ARCHIVE_SETS = [
+    {"name": "orders", "table": "Order", "time": "createdAt",
+     "where": "r.status IN ('PAID', 'CANCELLED')",
+     "children": [("OrderItem", "orderId")]},
+    {"name": "cash", "table": "CashSession", "time": "closedAt",
+     "where": "r.status = 'CLOSED' AND r.closedAt IS NOT NULL",
+     "children": [("CashMovement", "cashSessionId")]},
+    {"name": "stock", "table": "StockMovement", "time": "createdAt",
+     "where": "1",
+     "children": []},
+]
+ARCHIVED_TABLES = [t for s in ARCHIVE_SETS for t in [s["table"]] + [c for c, _ in s["children"]]]
+
+def archive_dir(conn, directory=None):
+    return directory or os.path.join(os.path.dirname(os.path.abspath(cafepoint_db.database_file(conn))), ARCHIVE_DIR)
+
+def archive_file(directory, year):
+    return os.path.join(directory, f"cafepoint-{year}.db")
+
+def cutoff_day(months, today=None):
+    # Primeiro dia do mês, N meses antes do mês atual
+    today = today or date.today()
+    index = today.year * 12 + today.month - 1 - months
+    return date(index // 12, index % 12 + 1, 1)
+
+def load_manifest(directory):
+    path = os.path.join(directory, MANIFEST)
+    if not os.path.exists(path):
+        return {"version": 1, "files": {}}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def owns_archive(conn, manifest):
+    owner = manifest.get("database")
+    if not owner or not os.path.exists(owner):
+        return True
+    current = cafepoint_db.database_file(conn)
+    return bool(current) and os.path.samefile(owner, current)
+
+def archive_manifest(conn, directory=None):
+    # Manifesto do arquivo desta base; vazio (com aviso) se é de outra
+    directory = archive_dir(conn, directory)
+    manifest = load_manifest(directory)
+    if not owns_archive(conn, manifest):
+        print(f"⚠️  {directory} é o arquivo de {manifest['database']}, não desta base: ignorado", file=sys.stderr)
+        return {"version": 1, "files": {}}
+    return manifest
+
+def _save_manifest(directory, manifest):
+    path = os.path.join(directory, MANIFEST)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    os.replace(path + ".tmp", path)
+
+def _columns(conn, table, schema="main"):
+    return [(r["name"], r["type"]) for r in conn.execute(f'PRAGMA {schema}.table_info("{table}")')]
+
+def _column_list(columns):
+    return ", ".join(f'"{name}"' for name, _ in columns)
+
+# ==========================================
+# ESQUEMA DO FICHEIRO DE ARQUIVO
+# ==========================================
+
+def _archive_ddl(conn, table, schema):
+    # Mesmo CREATE TABLE da base, sem as FOREIGN KEY para tabelas que não são
+    # arquivadas (Restaurant, User, MenuItem... ficam só na base principal)
+    sql = conn.execute("SELECT sql FROM main.sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone()[0]
+    def keep(match):
+        return match.group(0) if match.group(1) in ARCHIVED_TABLES else ""
+    sql = re.sub(r',\s*CONSTRAINT "[^"]+" FOREIGN KEY \([^)]*\) REFERENCES "([^"]+)"[^,\n]*', keep, sql)
+    return sql.replace(f'CREATE TABLE "{table}"', f'CREATE TABLE IF NOT EXISTS {schema}."{table}"', 1)
+
+def _copy_indexes(conn, table, schema):
+    for (index_sql,) in conn.execute("SELECT sql FROM main.sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL", (table,)).fetchall():
+        conn.execute(re.sub(r'^CREATE (UNIQUE )?INDEX "', rf'CREATE \1INDEX IF NOT EXISTS {schema}."', index_sql))
+
+def _prepare_archive(conn, tables):
+    for table in tables:
+        conn.execute(_archive_ddl(conn, table, "arch"))
+        # Colunas novas na base (migrações posteriores) entram no fim
+        existing = {name for name, _ in _columns(conn, table, "arch")}
+        for name, column_type in _columns(conn, table):
+            if name not in existing:
+                conn.execute(f'ALTER TABLE arch."{table}" ADD COLUMN "{name}" {column_type}')
+        _copy_indexes(conn, table, "arch")
+
+# ==========================================
+# MOVER LINHAS
+# ==========================================
+
+def _candidates(conn, spec, cutoff_ms):
+    where = spec["where"]
+    if spec["table"] == "Order" and cafepoint_db.table_exists(conn, "Feedback"):
+        where += ' AND r.id NOT IN (SELECT orderId FROM main."Feedback" WHERE orderId IS NOT NULL)'
+    conn.execute("DROP TABLE IF EXISTS temp.archive_ids")
+    conn.execute("CREATE TEMP TABLE archive_ids (year INTEGER, id INTEGER, PRIMARY KEY (year, id)) WITHOUT ROWID")
+    conn.execute(f"""
+        INSERT INTO temp.archive_ids
+        SELECT CAST(strftime('%Y', r.{spec['time']} / 1000, 'unixepoch', 'localtime') AS INTEGER), r.id
+        FROM main."{spec['table']}" r
+        WHERE r.{spec['time']} < ? AND {where}
+    """, (cutoff_ms,))
+    return where
+
+def _move_batch(conn, spec, where, year, after_id, batch):
+    table = spec["table"]
+    chunk = conn.execute("SELECT MAX(id), COUNT(*) FROM (SELECT id FROM temp.archive_ids WHERE year = ? AND id > ? ORDER BY id LIMIT ?)",
+                         (year, after_id, batch)).fetchone()
+    if not chunk[1]:
+        return None, {}
+
+    moved = {}
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Volta a confirmar a condição dentro da transação (o backend pode ter mudado algo)
+        conn.execute("DELETE FROM temp.archive_batch")
+        conn.execute(f"""
+            INSERT INTO temp.archive_batch
+            SELECT r.id FROM main."{table}" r
+            WHERE r.id IN (SELECT id FROM temp.archive_ids WHERE year = ? AND id > ? AND id <= ?) AND {where}
+        """, (year, after_id, chunk[0]))
+
+        groups = [(table, "id")] + spec["children"]
+        for name, key in groups:
+            columns = _column_list(_columns(conn, name))
+            conn.execute(f"""
+                INSERT OR IGNORE INTO arch."{name}" ({columns})
+                SELECT {columns} FROM main."{name}" WHERE "{key}" IN (SELECT id FROM temp.archive_batch)
+            """)
+            hot = conn.execute(f'SELECT COUNT(*) FROM main."{name}" WHERE "{key}" IN (SELECT id FROM temp.archive_batch)').fetchone()[0]
+            copied = conn.execute(f'SELECT COUNT(*) FROM arch."{name}" WHERE "{key}" IN (SELECT id FROM temp.archive_batch)').fetchone()[0]
+            if copied < hot:
+                raise RuntimeError(f"{name}: {hot} linhas na base, só {copied} no arquivo de {year}")
+            moved[name] = hot
+
+        # Filhos primeiro, depois a raiz
+        for name, key in reversed(groups):
+            conn.execute(f'DELETE FROM main."{name}" WHERE "{key}" IN (SELECT id FROM temp.archive_batch)')
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return chunk[0], moved
+
+def _verify_archive(conn, tables):
+    # Integridade dentro do ficheiro: todos os filhos têm o pai no mesmo ano
+    problems = []
+    for spec in ARCHIVE_SETS:
+        if spec["table"] not in tables:
+            continue
+        for child, key in spec["children"]:
+            if child in tables:
+                orphans = conn.execute(f"""
+                    SELECT COUNT(*) FROM arch."{child}" c
+                    WHERE NOT EXISTS (SELECT 1 FROM arch."{spec['table']}" p WHERE p.id = c."{key}")
+                """).fetchone()[0]
+                if orphans:
+                    problems.append(f"{child}: {orphans} linhas sem {spec['table']}")
+    return problems
+
+def _describe_archive(conn, path, year, tables, cutoff):
+    last_day = min(date(year, 12, 31), date.fromordinal(cutoff.toordinal() - 1))
+    start_ms, end_ms = cafepoint_db.day_range(date(year, 1, 1), last_day)
+    entry = {
+        "year": year,
+        "from": f"{year}-01-01",
+        "to": last_day.isoformat(),
+        "startMs": start_ms,
+        "endMs": end_ms,
+        "tables": {},
+        "archivedAt": datetime.now().isoformat(timespec="seconds"),
+    }
+    for table in tables:
+        rows, min_id, max_id = conn.execute(f'SELECT COUNT(*), MIN(id), MAX(id) FROM arch."{table}"').fetchone()
+        entry["tables"][table] = {"rows": rows, "minId": min_id, "maxId": max_id}
+    entry["bytes"] = os.path.getsize(path)
+    return entry
+
+def archive(conn, months=DEFAULT_MONTHS, directory=None, batch=BATCH_ROWS, dry_run=False, vacuum=False, verbose=True):
+    start_time = time.perf_counter()
+    directory = archive_dir(conn, directory)
+    cutoff = cutoff_day(months)
+    cutoff_ms = cafepoint_db.day_range(cutoff, cutoff)[0]
+    conn.isolation_level = None
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS archive_batch (id INTEGER PRIMARY KEY)")
+    tables = [t for t in ARCHIVED_TABLES if cafepoint_db.table_exists(conn, t)]
+    result = {"cutoff": cutoff.isoformat(), "directory": directory, "plan": {}, "moved": {}, "problems": []}
+    manifest = load_manifest(directory)
+    if not owns_archive(conn, manifest):
+        result["problems"].append(f"{directory} é o arquivo de {manifest['database']}: use --dir para esta base")
+        result["seconds"] = time.perf_counter() - start_time
+        return result
+
+    for spec in ARCHIVE_SETS:
+        if spec["table"] not in tables:
+            continue
+        where = _candidates(conn, spec, cutoff_ms)
+        years = conn.execute("SELECT year, COUNT(*) FROM temp.archive_ids GROUP BY year").fetchall()
+        for year, count in years:
+            result["plan"].setdefault(year, {})[spec["table"]] = count
+        if dry_run:
+            continue
+
+        os.makedirs(directory, exist_ok=True)
+        for year, _ in years:
+            conn.execute("ATTACH DATABASE ? AS arch", (archive_file(directory, year),))
+            try:
+                _prepare_archive(conn, tables)
+                moved = result["moved"].setdefault(year, {})
+                after_id = -1
+                while True:
+                    after_id, counts = _move_batch(conn, spec, where, year, after_id, batch)
+                    if after_id is None:
+                        break
+                    for name, count in counts.items():
+                        moved[name] = moved.get(name, 0) + count
+            finally:
+                conn.execute("DETACH DATABASE arch")
+            if verbose:
+                print(f"   {year} {spec['name']}: {moved.get(spec['table'], 0)} linhas", file=sys.stderr)
+
+    if result["moved"]:
+        # Confere cada ficheiro e atualiza o manifesto
+        manifest = load_manifest(directory)
+        for year in sorted(result["moved"]):
+            path = archive_file(directory, year)
+            conn.execute("ATTACH DATABASE ? AS arch", (path,))
+            try:
+                result["problems"] += [f"{year} {p}" for p in _verify_archive(conn, tables)]
+                manifest["files"][os.path.basename(path)] = _describe_archive(conn, path, year, tables, cutoff)
+            finally:
+                conn.execute("DETACH DATABASE arch")
+        manifest["database"] = os.path.abspath(cafepoint_db.database_file(conn))
+        manifest["cutoff"] = cutoff.isoformat()
+        manifest["updatedAt"] = datetime.now().isoformat(timespec="seconds")
+        _save_manifest(directory, manifest)
+
+        if vacuum:
+            # Devolve ao sistema as páginas libertadas (precisa de acesso exclusivo)
+            conn.execute("VACUUM")
+    result["seconds"] = time.perf_counter() - start_time
+    return result
+
+# ==========================================
+# LEITURA (ATTACH + TABELAS TEMP)
+# ==========================================
+
+def _arm(conn, table, alias, columns):
+    # Ficheiros antigos podem não ter colunas acrescentadas depois
+    present = {name for name, _ in _columns(conn, table, alias)}
+    if not present:
+        return None
+    return ", ".join(f'"{name}"' if name in present else f'NULL AS "{name}"' for name, _ in columns)
+
+def attach_files(conn, start=None, end=None, directory=None):
+    # ATTACH (archive_AAAA) dos ficheiros do arquivo que tocam [start, end] (ms),
+    # sem tabelas TEMP: para quem lê cada ficheiro diretamente
+    directory = archive_dir(conn, directory)
+    manifest = archive_manifest(conn, directory)
+    files = [(name, entry) for name, entry in sorted(manifest["files"].items())
+             if (start is None or entry["endMs"] >= start) and (end is None or entry["startMs"] <= end)
+             and os.path.exists(os.path.join(directory, name))]
+
+    limit = conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED) if hasattr(conn, "getlimit") else 10
+    if len(files) > limit:
+        print(f"⚠️  {len(files)} ficheiros de arquivo no período; só os {limit} mais recentes são lidos", file=sys.stderr)
+        files = files[-limit:]
+
+    aliases = []
+    for name, entry in files:
+        alias = f"archive_{entry['year']}"
+        conn.execute("ATTACH DATABASE ? AS " + alias, (os.path.join(directory, name),))
+        aliases.append(alias)
+    return aliases
+
+def attach_archives(conn, start=None, end=None, restaurant_id=None, directory=None):
+    # Junta os anos arquivados que tocam [start, end] (ms). Depois disto,
+    # "Order", "OrderItem", ... nesta ligação são tabelas TEMP com as linhas do
+    # período (base + arquivo) e os mesmos índices; fora do período não há
+    # linhas, exceto as que não têm data (sessões de caixa abertas).
+    # Uma vista UNION ALL seria mais simples, mas o SQLite não leva os JOIN
+    # (Order -> OrderItem) para dentro de cada ficheiro e acaba em ciclos
+    # aninhados sobre tudo.
+    aliases = attach_files(conn, start, end, directory)
+
+    bounds = (-1 if start is None else start, sys.maxsize if end is None else end)
+    for spec in ARCHIVE_SETS:
+        table = spec["table"]
+        if not cafepoint_db.table_exists(conn, table):
+            continue
+        where = f'"{spec["time"]}" IS NULL OR "{spec["time"]}" BETWEEN ? AND ?'
+        params = bounds
+        if restaurant_id is not None:
+            where = f"({where}) AND restaurantId = ?"
+            params = bounds + (restaurant_id,)
+
+        groups = [(table, None)] + [c for c in spec["children"] if cafepoint_db.table_exists(conn, c[0])]
+        for name, key in groups:
+            columns = _columns(conn, name)
+            conn.execute(f'DROP TABLE IF EXISTS temp."{name}"')
+            conn.execute(_archive_ddl(conn, name, "temp"))
+            for alias in ["main"] + aliases:
+                select = _arm(conn, name, alias, columns)
+                if select is None:
+                    continue
+                if key is None:
+                    conn.execute(f'INSERT OR IGNORE INTO temp."{name}" SELECT {select} FROM {alias}."{name}" WHERE {where}', params)
+                else:
+                    # Filhos pelo índice de cada ficheiro (orderId, cashSessionId)
+                    conn.execute(f'INSERT OR IGNORE INTO temp."{name}" SELECT {select} FROM {alias}."{name}" '
+                                 f'WHERE "{key}" IN (SELECT id FROM temp."{table}")')
+            _copy_indexes(conn, name, "temp")
+    conn.commit()
+    return aliases
+
+def detach_archives(conn, aliases):
+    conn.commit()
+    for table in ARCHIVED_TABLES:
+        conn.execute(f'DROP TABLE IF EXISTS temp."{table}"')
+    for alias in aliases:
+        conn.execute(f"DETACH DATABASE {alias}")
+
+def _pop_option(args, name):
+    if name in args:
+        i = args.index(name)
+        value = args[i + 1]
+        del args[i:i + 2]
+        return value
+    return None
+
+def print_result(result):
+    if not result["plan"]:
+        for problem in result["problems"]:
+            print(f"❌ {problem}")
+        if not result["problems"]:
+            print(f"✅ Nada para arquivar antes de {result['cutoff']}")
+        return
+    moved = result["moved"]
+    for year, tables in sorted(result["plan"].items()):
+        counts = moved.get(year) or tables
+        label = "arquivado" if moved else "a arquivar"
+        print(f"   {year}: " + ", ".join(f"{t} {n}" for t, n in counts.items()) + f" ({label})")
+    for problem in result["problems"]:
+        print(f"❌ {problem}")
+    if moved:
+        print(f"✅ Arquivo em {result['directory']} (antes de {result['cutoff']}) em {result['seconds']:.1f}s")
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    db_path = _pop_option(args, "--db")
+    months = _pop_option(args, "--months")
+    directory = _pop_option(args, "--dir")
+    flags = {a for a in args if a in ("--dry-run", "--vacuum")}
+    args = [a for a in args if a not in flags]
+
+    if args:
+        print("Usage: python cold_archive.py [--months N] [--dir DIR] [--dry-run] [--vacuum] [--db FILE]")
+        sys.exit(1)
+
+    conn = cafepoint_db.connect(db_path)
+    result = archive(conn, int(months) if months else DEFAULT_MONTHS, directory,
+                     dry_run="--dry-run" in flags, vacuum="--vacuum" in flags)
+    print_result(result)
+    sys.exit(1 if result["problems"] else 0)
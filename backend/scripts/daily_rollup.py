@@ -0,0 +1,545 @@
+import json
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+import cafepoint_db
+import report_engine
+from cafepoint_db import local_day_sql, local_hour_sql
+
+# ==========================================
+# RESUMOS DIÁRIOS INCREMENTAIS (ROLLUPS)
+# ==========================================
+# Mantém, num ficheiro SQLite à parte ligado por ATTACH (dev.rollup.db, ver
+# abaixo), tabelas de resumo por restaurante e por dia: receita por estado,
+# quantidades/receita por produto (a categoria e o custo saem do MenuItem na
+# leitura, como no backend), pedidos por hora, por empregado e por mesa,
+# despesas por categoria e compras por fornecedor.
+#
+# Cada execução só lê os pedidos novos (Order.id acima da marca) ou alterados
+# (updatedAt acima da marca, menos uma margem de segurança). Para cada pedido
+# guardamos o que ele contribuiu (rollup_order_state): uma mudança tardia de
+# estado (SERVED -> PAID, CANCELLED) tira a contribuição antiga e soma a nova.
+# Os itens de um pedido são lidos pelo intervalo de ids de OrderItem guardado
+# no estado (o backend só cria OrderItem junto com o pedido).
+#
+# As tabelas rollup_* não fazem parte do schema.prisma: ficam num ficheiro à
+# parte ao lado da base (dev.db -> dev.rollup.db), ligado por ATTACH como
+# "rollup", para as migrações do prisma nunca as verem (resumos de versões
+# anteriores, ainda na base, passam para lá). Apagar esse ficheiro só obriga
+# a reconstruir tudo na execução seguinte. Os índices que a leitura
+# incremental usa (Order.updatedAt, Expense.updatedAt) vêm das migrações.
+#
+# API:
+#   conn = cafepoint_db.connect()
+#   daily_rollup.refresh(conn)                (faz o ATTACH do ficheiro dos resumos)
+#   daily_rollup.billing_stats(conn, restaurant_id, "month")
+#   daily_rollup.advanced_analytics(conn, restaurant_id, start_day, end_day)
+#
+# CLI:
+#   python daily_rollup.py [--rebuild] [--db F]
+#   python daily_rollup.py billing <restaurantId> [day|week|month|year] [--db F]
+#   python daily_rollup.py analytics <restaurantId> [AAAA-MM-DD AAAA-MM-DD] [--db F]
+
+OVERLAP_MS = 10 * 60 * 1000     # relê 10 min antes da marca (relógios e escritas concorrentes)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rollup.rollup_state (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS rollup.rollup_order_state (
+    orderId INTEGER PRIMARY KEY,
+    restaurantId INTEGER NOT NULL,
+    day TEXT NOT NULL,
+    hour INTEGER NOT NULL,
+    tableId INTEGER NOT NULL,
+    userId INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    total REAL NOT NULL,
+    prepMs INTEGER,
+    firstItemId INTEGER,
+    lastItemId INTEGER
+);
+CREATE TABLE IF NOT EXISTS rollup.rollup_orders_daily (
+    restaurantId INTEGER NOT NULL,
+    day TEXT NOT NULL,
+    status TEXT NOT NULL,
+    orders INTEGER NOT NULL,
+    revenue REAL NOT NULL,
+    prepCount INTEGER NOT NULL,
+    prepMs INTEGER NOT NULL,
+    PRIMARY KEY (restaurantId, day, status)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rollup.rollup_items_daily (
+    restaurantId INTEGER NOT NULL,
+    day TEXT NOT NULL,
+    status TEXT NOT NULL,
+    menuItemId INTEGER NOT NULL,
+    quantity INTEGER NOT NULL,
+    revenue REAL NOT NULL,
+    PRIMARY KEY (restaurantId, day, status, menuItemId)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rollup.rollup_hours_daily (
+    restaurantId INTEGER NOT NULL,
+    day TEXT NOT NULL,
+    hour INTEGER NOT NULL,
+    orders INTEGER NOT NULL,
+    revenue REAL NOT NULL,
+    PRIMARY KEY (restaurantId, day, hour)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rollup.rollup_waiters_daily (
+    restaurantId INTEGER NOT NULL,
+    day TEXT NOT NULL,
+    userId INTEGER NOT NULL,
+    orders INTEGER NOT NULL,
+    revenue REAL NOT NULL,
+    PRIMARY KEY (restaurantId, day, userId)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rollup.rollup_tables_daily (
+    restaurantId INTEGER NOT NULL,
+    day TEXT NOT NULL,
+    tableId INTEGER NOT NULL,
+    orders INTEGER NOT NULL,
+    revenue REAL NOT NULL,
+    PRIMARY KEY (restaurantId, day, tableId)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rollup.rollup_expense_state (
+    expenseId INTEGER PRIMARY KEY,
+    restaurantId INTEGER NOT NULL,
+    day TEXT NOT NULL,
+    category TEXT NOT NULL,
+    amount REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS rollup.rollup_expenses_daily (
+    restaurantId INTEGER NOT NULL,
+    day TEXT NOT NULL,
+    category TEXT NOT NULL,
+    expenses INTEGER NOT NULL,
+    amount REAL NOT NULL,
+    PRIMARY KEY (restaurantId, day, category)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rollup.rollup_purchases_daily (
+    restaurantId INTEGER NOT NULL,
+    day TEXT NOT NULL,
+    supplierId INTEGER NOT NULL,
+    quantity INTEGER NOT NULL,
+    amount REAL NOT NULL,
+    PRIMARY KEY (restaurantId, day, supplierId)
+) WITHOUT ROWID;
+"""
+
+ROLLUP_TABLES = [
+    "rollup_state", "rollup_order_state", "rollup_orders_daily", "rollup_items_daily",
+    "rollup_hours_daily", "rollup_waiters_daily", "rollup_tables_daily",
+    "rollup_expense_state", "rollup_expenses_daily", "rollup_purchases_daily"
+]
+
+ORDER_STATE_COLUMNS = ["orderId", "restaurantId", "day", "hour", "tableId", "userId",
+                       "status", "total", "prepMs", "firstItemId", "lastItemId"]
+
+# (tabela, chaves, medidas) alimentadas pelas contribuições dos pedidos
+ORDER_ROLLUPS = [
+    ("rollup_orders_daily", ["restaurantId", "day", "status"], {
+        "orders": "sign",
+        "revenue": "sign * total",
+        "prepCount": "sign * (prepMs IS NOT NULL)",
+        "prepMs": "sign * COALESCE(prepMs, 0)"
+    }),
+    ("rollup_hours_daily", ["restaurantId", "day", "hour"], {"orders": "sign", "revenue": "sign * total"}),
+    ("rollup_waiters_daily", ["restaurantId", "day", "userId"], {"orders": "sign", "revenue": "sign * total"}),
+    ("rollup_tables_daily", ["restaurantId", "day", "tableId"], {"orders": "sign", "revenue": "sign * total"}),
+]
+
+def attach(conn):
+    cafepoint_db.attach_side_file(conn, "rollup", SCHEMA, ROLLUP_TABLES)
+
+def create_tables(conn):
+    attach(conn)
+    conn.executescript(SCHEMA)
+
+def drop_tables(conn):
+    attach(conn)
+    conn.executescript("".join(f"DROP TABLE IF EXISTS rollup.{table};\n" for table in ROLLUP_TABLES))
+
+def _max(conn, table, column):
+    # Um agregado por consulta: assim o SQLite lê o máximo diretamente do índice
+    return conn.execute(f'SELECT MAX("{column}") FROM "{table}"').fetchone()[0]
+
+def _get_state(conn):
+    return {name: value for name, value in conn.execute("SELECT name, value FROM rollup_state")}
+
+def _apply(conn, table, keys, measures, source, prune=True):
+    # Soma (ou subtrai, com sign = -1) as contribuições e apaga as linhas que ficaram a zero
+    key_list = ", ".join(keys)
+    names = list(measures)
+    conn.execute(f"""
+        INSERT INTO {table} ({key_list}, {", ".join(names)})
+        SELECT {key_list}, {", ".join(f"SUM({measures[m]})" for m in names)}
+        FROM {source} WHERE true
+        GROUP BY {key_list}
+        ON CONFLICT ({key_list}) DO UPDATE SET {", ".join(f"{m} = {m} + excluded.{m}" for m in names)}
+    """)
+    if not prune:
+        return
+    conn.execute(f"""
+        DELETE FROM {table}
+        WHERE {names[0]} = 0 AND ({key_list}) IN (SELECT DISTINCT {key_list} FROM {source})
+    """)
+
+# ==========================================
+# PEDIDOS
+# ==========================================
+
+def _fold_orders(conn, state, since):
+    last_order = state.get("order_id", 0)
+    last_item = state.get("order_item_id", 0)
+
+    # Intervalo de ids dos itens dos pedidos novos
+    conn.execute("CREATE TEMP TABLE rollup_new_items (orderId INTEGER PRIMARY KEY, firstItemId INTEGER, lastItemId INTEGER)")
+    conn.execute("""
+        INSERT INTO temp.rollup_new_items
+        SELECT orderId, MIN(id), MAX(id) FROM "OrderItem" WHERE id > ? GROUP BY orderId
+    """, (last_item,))
+
+    # Estado atual dos pedidos novos ou alterados desde a última execução
+    conn.execute(f"""
+        CREATE TEMP TABLE rollup_new AS
+        SELECT o.id AS orderId, o.restaurantId,
+               {local_day_sql("o.createdAt")} AS day, {local_hour_sql("o.createdAt")} AS hour,
+               o.tableId, o.userId, o.status, COALESCE(o.totalAmount, 0) AS total,
+               CASE WHEN o.prepStartTime IS NOT NULL AND o.prepEndTime IS NOT NULL
+                    THEN o.prepEndTime - o.prepStartTime END AS prepMs,
+               COALESCE(s.firstItemId, i.firstItemId) AS firstItemId,
+               MAX(COALESCE(s.lastItemId, i.lastItemId), COALESCE(i.lastItemId, s.lastItemId)) AS lastItemId
+        FROM "Order" o
+        LEFT JOIN rollup_order_state s ON s.orderId = o.id
+        LEFT JOIN temp.rollup_new_items i ON i.orderId = o.id
+        WHERE o.id > ? OR o.updatedAt >= ?
+    """, (last_order, since))
+
+    # Contribuição nova (+1) e antiga (-1) dos pedidos que mudaram mesmo
+    columns = ", ".join(ORDER_STATE_COLUMNS)
+    changed = " OR ".join(f"s.{c} IS NOT n.{c}" for c in ORDER_STATE_COLUMNS[1:])
+    conn.execute(f"""
+        CREATE TEMP TABLE rollup_delta AS
+        SELECT 1 AS sign, n.* FROM temp.rollup_new n
+        LEFT JOIN rollup_order_state s ON s.orderId = n.orderId
+        WHERE s.orderId IS NULL OR {changed}
+        UNION ALL
+        SELECT -1 AS sign, {", ".join(f"s.{c}" for c in ORDER_STATE_COLUMNS)} FROM temp.rollup_new n
+        JOIN rollup_order_state s ON s.orderId = n.orderId
+        WHERE {changed}
+    """)
+
+    folded = conn.execute("SELECT COUNT(*) FROM temp.rollup_delta WHERE sign = 1").fetchone()[0]
+    late = conn.execute("SELECT COUNT(*) FROM temp.rollup_delta WHERE sign = -1").fetchone()[0]
+
+    # Sem subtrações nenhuma linha pode ter ficado a zero
+    for table, keys, measures in ORDER_ROLLUPS:
+        _apply(conn, table, keys, measures, "temp.rollup_delta", prune=late > 0)
+
+    # Itens: lidos pelo intervalo de ids guardado (o "+" impede o SQLite de
+    # preferir um índice automático sobre orderId, que percorre OrderItem inteiro)
+    _apply(conn, "rollup_items_daily", ["restaurantId", "day", "status", "menuItemId"],
+           {"quantity": "sign * quantity", "revenue": "sign * quantity * price"}, """(
+        SELECT d.sign, d.restaurantId, d.day, d.status, oi.menuItemId, oi.quantity, oi.price
+        FROM temp.rollup_delta d CROSS JOIN "OrderItem" oi
+        WHERE oi.id BETWEEN d.firstItemId AND d.lastItemId AND +oi.orderId = d.orderId
+    )""", prune=late > 0)
+
+    conn.execute(f"""
+        INSERT OR REPLACE INTO rollup_order_state ({columns})
+        SELECT {columns} FROM temp.rollup_delta WHERE sign = 1
+    """)
+
+    state["order_id"] = _max(conn, "Order", "id") or last_order
+    state["order_updated_at"] = _max(conn, "Order", "updatedAt") or state.get("order_updated_at", 0)
+    state["order_item_id"] = _max(conn, "OrderItem", "id") or last_item
+    conn.execute("DROP TABLE temp.rollup_new_items")
+    conn.execute("DROP TABLE temp.rollup_new")
+    conn.execute("DROP TABLE temp.rollup_delta")
+    return folded, late
+
+# ==========================================
+# DESPESAS E COMPRAS
+# ==========================================
+
+def _fold_expenses(conn, state, since):
+    # As despesas podem ser editadas ou apagadas: mesma técnica de +1/-1 com estado
+    last_expense = state.get("expense_id", 0)
+    conn.execute(f"""
+        CREATE TEMP TABLE rollup_expense_new AS
+        SELECT e.id AS expenseId, e.restaurantId, {local_day_sql("e.date")} AS day, e.category, e.amount
+        FROM "Expense" e WHERE e.id > ? OR e.updatedAt >= ?
+    """, (last_expense, since))
+    changed = "s.restaurantId IS NOT n.restaurantId OR s.day IS NOT n.day OR s.category IS NOT n.category OR s.amount IS NOT n.amount"
+    conn.execute(f"""
+        CREATE TEMP TABLE rollup_expense_delta AS
+        SELECT 1 AS sign, n.* FROM temp.rollup_expense_new n
+        LEFT JOIN rollup_expense_state s ON s.expenseId = n.expenseId
+        WHERE s.expenseId IS NULL OR {changed}
+        UNION ALL
+        SELECT -1, s.* FROM temp.rollup_expense_new n
+        JOIN rollup_expense_state s ON s.expenseId = n.expenseId
+        WHERE {changed}
+        UNION ALL
+        SELECT -1, s.* FROM rollup_expense_state s
+        WHERE NOT EXISTS (SELECT 1 FROM "Expense" e WHERE e.id = s.expenseId)
+    """)
+    _apply(conn, "rollup_expenses_daily", ["restaurantId", "day", "category"],
+           {"expenses": "sign", "amount": "sign * amount"}, "temp.rollup_expense_delta")
+
+    conn.execute("""
+        DELETE FROM rollup_expense_state
+        WHERE expenseId IN (SELECT expenseId FROM temp.rollup_expense_delta WHERE sign = -1)
+    """)
+    conn.execute("""
+        INSERT OR REPLACE INTO rollup_expense_state
+        SELECT expenseId, restaurantId, day, category, amount FROM temp.rollup_expense_delta WHERE sign = 1
+    """)
+    folded = conn.execute("SELECT COUNT(*) FROM temp.rollup_expense_delta").fetchone()[0]
+
+    state["expense_id"] = _max(conn, "Expense", "id") or last_expense
+    state["expense_updated_at"] = _max(conn, "Expense", "updatedAt") or state.get("expense_updated_at", 0)
+    conn.execute("DROP TABLE temp.rollup_expense_new")
+    conn.execute("DROP TABLE temp.rollup_expense_delta")
+    return folded
+
+def _fold_purchases(conn, state):
+    # StockMovement só recebe inserções: basta a marca de id
+    last_movement = state.get("stock_movement_id", 0)
+    source = f"""(
+        SELECT restaurantId, {local_day_sql("createdAt")} AS day, COALESCE(supplierId, 0) AS supplierId,
+               ABS(quantity) AS quantity, ABS(quantity) * COALESCE(purchasePrice, 0) AS amount
+        FROM "StockMovement" WHERE id > {int(last_movement)} AND type = 'ENTRY'
+    )"""
+    _apply(conn, "rollup_purchases_daily", ["restaurantId", "day", "supplierId"],
+           {"quantity": "quantity", "amount": "amount"}, source, prune=False)
+    state["stock_movement_id"] = _max(conn, "StockMovement", "id") or last_movement
+
+# ==========================================
+# EXECUÇÃO
+# ==========================================
+
+def refresh(conn, rebuild=False):
+    start = time.perf_counter()
+    if rebuild:
+        drop_tables(conn)
+    create_tables(conn)
+
+    # Escrita exclusiva durante a execução: as marcas e os dados lidos são do mesmo instante
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        state = _get_state(conn)
+        orders, late = _fold_orders(conn, state, state.get("order_updated_at", 0) - OVERLAP_MS)
+        expenses = _fold_expenses(conn, state, state.get("expense_updated_at", 0) - OVERLAP_MS)
+        _fold_purchases(conn, state)
+        state["last_run_at"] = cafepoint_db.now_ms()
+        conn.executemany("INSERT OR REPLACE INTO rollup_state (name, value) VALUES (?, ?)", state.items())
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return {"orders": orders, "lateChanges": late, "expenses": expenses,
+            "seconds": round(time.perf_counter() - start, 3)}
+
+# ==========================================
+# LEITURA (mesmo formato do report_engine)
+# ==========================================
+
+def _days(start_ms, end_ms):
+    return cafepoint_db.from_ms(start_ms).date().isoformat(), cafepoint_db.from_ms(end_ms).date().isoformat()
+
+def _in(values):
+    return ",".join("?" * len(values))
+
+def _sold_items(conn, restaurant_id, first_day, last_day):
+    rows = conn.execute(f"""
+        SELECT m.name, m.category, COALESCE(m.itemType, 'PRODUCT') AS itemType,
+               COALESCE(m.costPrice, 0) AS costPrice,
+               SUM(r.quantity) AS qty, SUM(r.revenue) AS revenue
+        FROM rollup_items_daily r
+        JOIN "MenuItem" m ON m.id = r.menuItemId
+        WHERE r.restaurantId = ? AND r.day BETWEEN ? AND ? AND r.status IN ({_in(report_engine.SOLD_STATUSES)})
+        GROUP BY r.menuItemId
+    """, (restaurant_id, first_day, last_day, *report_engine.SOLD_STATUSES)).fetchall()
+    return {
+        "name": [r["name"] for r in rows],
+        "category": [r["category"] for r in rows],
+        "is_dish": np.array([r["itemType"] == "DISH" for r in rows], dtype=bool),
+        "qty": np.array([r["qty"] for r in rows], dtype=np.float64),
+        "revenue": np.array([r["revenue"] for r in rows], dtype=np.float64),
+        "cost": np.array([r["costPrice"] * r["qty"] for r in rows], dtype=np.float64),
+    }
+
+def billing_stats(conn, restaurant_id, period="day", now=None):
+    attach(conn)
+    first_day, last_day = _days(*cafepoint_db.period_range(period, now))
+
+    by_status = {r["status"]: (r["n"], r["total"]) for r in conn.execute("""
+        SELECT status, SUM(orders) AS n, SUM(revenue) AS total FROM rollup_orders_daily
+        WHERE restaurantId = ? AND day BETWEEN ? AND ? GROUP BY status
+    """, (restaurant_id, first_day, last_day))}
+    paid = [by_status[s] for s in by_status if s in report_engine.REVENUE_STATUSES]
+    pending = [by_status[s] for s in by_status if s not in report_engine.REVENUE_STATUSES and s != "CANCELLED"]
+    total_revenue = float(sum(total for _, total in paid))
+    order_count = sum(by_status[s][0] for s in by_status if s in report_engine.SOLD_STATUSES)
+
+    items = _sold_items(conn, restaurant_id, first_day, last_day)
+    total_cost = float(items["cost"].sum())
+    gross_profit = total_revenue - total_cost
+    purchases = {r["supplier"]: float(r["total"]) for r in conn.execute("""
+        SELECT COALESCE(s.name, 'Sem Fornecedor') AS supplier, SUM(p.amount) AS total
+        FROM rollup_purchases_daily p
+        LEFT JOIN "Supplier" s ON s.id = p.supplierId
+        WHERE p.restaurantId = ? AND p.day BETWEEN ? AND ?
+        GROUP BY 1
+    """, (restaurant_id, first_day, last_day))}
+
+    return {
+        "totalRevenue": total_revenue,
+        "totalCost": total_cost,
+        "totalPurchases": float(sum(purchases.values())),
+        "grossProfit": float(gross_profit),
+        "profitMargin": (gross_profit / total_revenue) * 100 if total_revenue > 0 else 0,
+        "orderCount": order_count,
+        "pendingRevenue": float(sum(total for _, total in pending)),
+        "pendingCount": sum(n for n, _ in pending),
+        "period": period,
+        "salesByCategory": report_engine._group_sum(items["category"], items["revenue"]),
+        "costByCategory": report_engine._group_sum(items["category"], items["cost"]),
+        "purchasesBySupplier": purchases,
+        "topConsumedDish": report_engine._top_dish(items),
+        "cashSummary": report_engine._cash_summary(conn, restaurant_id)
+    }
+
+def _labelled(conn, table, key, restaurant_id, first_day, last_day):
+    rows = conn.execute(f"""
+        SELECT {key} AS id, SUM(orders) AS n, SUM(revenue) AS total FROM {table}
+        WHERE restaurantId = ? AND day BETWEEN ? AND ? GROUP BY {key}
+    """, (restaurant_id, first_day, last_day)).fetchall()
+    return {
+        "id": [r["id"] for r in rows],
+        "count": np.array([r["n"] for r in rows], dtype=np.float64),
+        "total": np.array([r["total"] for r in rows], dtype=np.float64),
+    }
+
+def advanced_analytics(conn, restaurant_id, start_day=None, end_day=None):
+    attach(conn)
+    # Dias inteiros: por omissão do mesmo dia do mês anterior até hoje
+    today = datetime.now().date()
+    end_day = end_day or today
+    start_day = start_day or report_engine._month_before(today)
+    first_day, last_day = start_day.isoformat(), end_day.isoformat()
+    start, end = cafepoint_db.day_range(start_day, end_day)
+    params = (restaurant_id, first_day, last_day)
+
+    tables = dict(conn.execute('SELECT id, number FROM "Table" WHERE restaurantId = ?', (restaurant_id,)).fetchall())
+    waiters = dict(conn.execute('SELECT id, name FROM "User" WHERE restaurantId = ? OR restaurantId IS NULL', (restaurant_id,)).fetchall())
+    by_table = _labelled(conn, "rollup_tables_daily", "tableId", *params)
+    by_waiter = _labelled(conn, "rollup_waiters_daily", "userId", *params)
+    table_labels = [str(tables.get(t, "Balcão/Outro")) for t in by_table["id"]]
+    waiter_labels = [waiters.get(u) or "Desconhecido" for u in by_waiter["id"]]
+
+    hourly = [0] * 24
+    for hour, n in conn.execute("""
+        SELECT hour, SUM(orders) FROM rollup_hours_daily
+        WHERE restaurantId = ? AND day BETWEEN ? AND ? GROUP BY hour
+    """, params):
+        hourly[hour] = int(n)
+
+    orders = conn.execute("""
+        SELECT COALESCE(SUM(orders), 0) AS n, COALESCE(SUM(revenue), 0) AS total,
+               SUM(prepCount) AS prepCount, SUM(prepMs) AS prepMs
+        FROM rollup_orders_daily WHERE restaurantId = ? AND day BETWEEN ? AND ?
+    """, params).fetchone()
+    order_count = int(orders["n"])
+    total_revenue = float(orders["total"])
+    avg_prep = orders["prepMs"] / orders["prepCount"] / 60000.0 if orders["prepCount"] else None
+
+    top_products = [
+        {"name": r["name"], "qty": r["qty"], "revenue": r["revenue"]}
+        for r in conn.execute("""
+            SELECT COALESCE(m.name, 'Item Removido') AS name, SUM(r.quantity) AS qty, SUM(r.revenue) AS revenue
+            FROM rollup_items_daily r
+            LEFT JOIN "MenuItem" m ON m.id = r.menuItemId
+            WHERE r.restaurantId = ? AND r.day BETWEEN ? AND ?
+            GROUP BY 1 ORDER BY revenue DESC LIMIT ?
+        """, (*params, report_engine.TOP_PRODUCTS))
+    ]
+
+    total_expenses = conn.execute("""
+        SELECT COALESCE(SUM(amount), 0) FROM rollup_expenses_daily WHERE restaurantId = ? AND day BETWEEN ? AND ?
+    """, params).fetchone()[0]
+    # Tabelas pequenas: lidas diretamente
+    reservations = conn.execute("""
+        SELECT COUNT(*) AS total, COALESCE(SUM(status = 'NO_SHOW'), 0) AS noShow FROM "Reservation"
+        WHERE restaurantId = ? AND date BETWEEN ? AND ?
+    """, (restaurant_id, start, end)).fetchone()
+    maintenance = conn.execute('SELECT COALESCE(SUM(cost), 0) FROM "MaintenanceRecord" WHERE restaurantId = ? AND date BETWEEN ? AND ?', (restaurant_id, start, end)).fetchone()[0]
+    avg_rating = conn.execute('SELECT COALESCE(AVG(rating), 0) FROM "Feedback" WHERE restaurantId = ? AND createdAt BETWEEN ? AND ?', (restaurant_id, start, end)).fetchone()[0]
+
+    return {
+        "operational": {
+            "tableOccupancy": report_engine._by_label(table_labels, by_table, "count", "revenue"),
+            "waiterPerformance": report_engine._by_label(waiter_labels, by_waiter, "count", "total"),
+            "hourlyTraffic": hourly,
+            "avgPrepTime": round(avg_prep, 1) if avg_prep is not None else report_engine.AVG_PREP_PLACEHOLDER
+        },
+        "financial": {
+            "totalRevenue": total_revenue,
+            "totalExpenses": float(total_expenses),
+            "netProfit": total_revenue - total_expenses,
+            "paymentMethods": {"Dinheiro": total_revenue * 0.7, "M-Pesa": total_revenue * 0.3},
+            "averageTicket": total_revenue / order_count if order_count > 0 else 0
+        },
+        "products": {"topProducts": top_products},
+        "reservations": {"total": reservations["total"], "noShow": reservations["noShow"]},
+        "maintenance": {"totalCost": float(maintenance)},
+        "satisfaction": {"avgRating": float(avg_rating), "nps": 100}
+    }
+
+# ==========================================
+# CLI
+# ==========================================
+
+def _pop_option(args, name):
+    if name in args:
+        i = args.index(name)
+        value = args[i + 1]
+        del args[i:i + 2]
+        return value
+    return None
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    db_path = _pop_option(args, "--db")
+    rebuild = "--rebuild" in args
+    args = [a for a in args if a != "--rebuild"]
+
+    if args and (args[0] not in ("billing", "analytics") or len(args) < 2):
+        print("Usage: python daily_rollup.py [--rebuild] [--db FILE]")
+        print("       python daily_rollup.py billing <restaurantId> [day|week|month|year] [--db FILE]")
+        print("       python daily_rollup.py analytics <restaurantId> [AAAA-MM-DD AAAA-MM-DD] [--db FILE]")
+        sys.exit(1)
+
+    conn = cafepoint_db.connect(db_path)
+    result = refresh(conn, rebuild)
+    if not args:
+        print(f"✅ Resumos atualizados: {result['orders']} pedidos ({result['lateChanges']} alterações tardias), "
+              f"{result['expenses']} despesas em {result['seconds'] * 1000:.1f} ms")
+        sys.exit(0)
+
+    start_time = time.perf_counter()
+    if args[0] == "billing":
+        data = billing_stats(conn, int(args[1]), args[2] if len(args) > 2 else "day")
+    else:
+        days = [cafepoint_db.parse_date(a).date() for a in args[2:4]] if len(args) > 3 else [None, None]
+        data = advanced_analytics(conn, int(args[1]), *days)
+    elapsed_ms = (time.perf_counter() - start_time) * 1000
+
+    print(json.dumps({"success": True, "data": data}, indent=2, ensure_ascii=False))
+    print(f"⏱️  atualização {result['seconds'] * 1000:.1f} ms | leitura {elapsed_ms:.1f} ms", file=sys.stderr)
@@ -0,0 +1,334 @@
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import time
+import zlib
+from datetime import datetime
+
+import cafepoint_db
+
+# ==========================================
+# BACKUP ONLINE DA BASE SQLITE (DEDUPLICADO E COMPRIMIDO)
+# ==========================================
+# Copiar o dev.db com o backend a escrever pode dar um ficheiro corrompido.
+# Aqui usamos a API de backup do SQLite, poucas páginas de cada vez (o
+# backend só espera entre passos), para um ficheiro temporário consistente.
+#
+# Esse ficheiro é cortado em blocos alinhados às páginas (as páginas do
+# SQLite são reescritas no sítio, por isso uma base pouco alterada repete
+# quase todos os blocos). Cada bloco é guardado uma vez, comprimido, com o
+# nome do seu SHA-256:
+#   backups/chunks/ab/ab12....z
+#   backups/snapshots/20261018-120000.json   (lista de blocos + contagens)
+#
+# Cada execução fica registada na tabela SyncLog (type BACKUP), com o número
+# de registos copiados e a duração. O modo verify remonta um snapshot,
+# confere os hashes e corre PRAGMA integrity_check.
+#
+# Uso:
+#   python db_backup.py [--dir D] [--step N] [--no-log] [--db F]
+#   python db_backup.py list [--dir D]
+#   python db_backup.py verify [SNAPSHOT] [--dir D]
+#   python db_backup.py restore SNAPSHOT OUT.db [--dir D]
+#   python db_backup.py prune --keep N [--dir D]
+
+BACKUP_DIR = "backups"
+STEP_PAGES = 256          # páginas por passo da API de backup
+STEP_SLEEP = 0.005        # pausa entre passos (deixa o backend escrever)
+MAX_RESTARTS = 3          # escritas do backend recomeçam a cópia; depois disto muda de estratégia
+CHUNK_PAGES = 16          # 64 KB com páginas de 4 KB
+COMPRESS_LEVEL = 6
+
+def backup_dir(db_path, directory=None):
+    return directory or os.path.join(os.path.dirname(os.path.abspath(db_path)), BACKUP_DIR)
+
+def _chunk_path(directory, digest):
+    return os.path.join(directory, "chunks", digest[:2], digest + ".z")
+
+def _snapshot_path(directory, name):
+    name = name if name.endswith(".json") else name + ".json"
+    return os.path.join(directory, "snapshots", os.path.basename(name))
+
+def list_snapshots(directory):
+    folder = os.path.join(directory, "snapshots")
+    if not os.path.isdir(folder):
+        return []
+    return sorted(n[:-5] for n in os.listdir(folder) if n.endswith(".json"))
+
+def load_snapshot(directory, name):
+    with open(_snapshot_path(directory, name), encoding="utf-8") as f:
+        return json.load(f)
+
+def _record_counts(conn):
+    counts = {}
+    for (table,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name").fetchall():
+        counts[table] = conn.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
+    return counts
+
+class BackupRestarted(Exception):
+    pass
+
+def _progress_watcher(verbose):
+    # Cada commit de outra ligação faz a API de backup recomeçar do início:
+    # ao fim de MAX_RESTARTS desistimos desta tentativa
+    state = {"done": -1, "percent": -1, "restarts": 0}
+    def progress(status, remaining, total):
+        done = total - remaining
+        if done < state["done"]:
+            state["restarts"] += 1
+            if state["restarts"] >= MAX_RESTARTS:
+                raise BackupRestarted()
+        state["done"] = done
+        percent = done * 100 // max(total, 1)
+        if verbose and percent != state["percent"]:
+            state["percent"] = percent
+            print(f"\r⏳ {percent:3d}% ({done}/{total} páginas)", end="", file=sys.stderr, flush=True)
+    return progress
+
+def _online_copy(source, temp_path, step, verbose):
+    # Em WAL um leitor não bloqueia quem escreve: se a cópia aos bocados não
+    # acaba, copia-se tudo de uma vez dentro do mesmo snapshot de leitura.
+    # Sem WAL aumenta-se o passo (o backend espera no máximo um passo).
+    wal = source.execute("PRAGMA journal_mode").fetchone()[0].lower() == "wal"
+    while True:
+        target = sqlite3.connect(temp_path)
+        try:
+            source.backup(target, pages=step, progress=_progress_watcher(verbose), sleep=STEP_SLEEP)
+            return target
+        except BackupRestarted:
+            target.close()
+            step = -1 if wal else step * 4
+            if verbose:
+                print(f"\n⚠️  A base mudou durante a cópia; nova tentativa com passo {'único' if step < 0 else step}", file=sys.stderr)
+
+# ==========================================
+# SNAPSHOT
+# ==========================================
+
+def _store_chunks(path, directory, chunk_size):
+    # Devolve a lista de hashes e quantos blocos/bytes foram mesmo escritos
+    digests = []
+    new_chunks = stored_bytes = 0
+    whole = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            data = f.read(chunk_size)
+            if not data:
+                break
+            whole.update(data)
+            digest = hashlib.sha256(data).hexdigest()
+            digests.append(digest)
+            target = _chunk_path(directory, digest)
+            if os.path.exists(target):
+                continue
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            packed = zlib.compress(data, COMPRESS_LEVEL)
+            with open(target + ".tmp", "wb") as out:
+                out.write(packed)
+            os.replace(target + ".tmp", target)
+            new_chunks += 1
+            stored_bytes += len(packed)
+    return digests, whole.hexdigest(), new_chunks, stored_bytes
+
+def log_sync(conn, status, records, duration_ms, error=None):
+    # Uma linha por restaurante (o backup é da base inteira)
+    restaurants = [r[0] for r in conn.execute('SELECT id FROM "Restaurant"')]
+    with conn:
+        return cafepoint_db.log_sync(conn, restaurants, "BACKUP", status, records, duration_ms, error)
+
+def backup(db_path=None, directory=None, step=STEP_PAGES, log=True, verbose=True):
+    db_path = db_path or cafepoint_db.default_db_path()
+    directory = backup_dir(db_path, directory)
+    os.makedirs(os.path.join(directory, "snapshots"), exist_ok=True)
+    name = datetime.now().strftime("%Y%m%d-%H%M%S")
+    temp_path = os.path.join(directory, f".{name}.db")
+    start_time = time.perf_counter()
+
+    source = cafepoint_db.connect(db_path)
+    try:
+        # 1. Cópia consistente, STEP_PAGES de cada vez
+        target = _online_copy(source, temp_path, step, verbose)
+        if verbose:
+            print(file=sys.stderr)
+        page_size = target.execute("PRAGMA page_size").fetchone()[0]
+        page_count = target.execute("PRAGMA page_count").fetchone()[0]
+        target.row_factory = sqlite3.Row
+        counts = _record_counts(target)
+        target.close()
+
+        # 2. Blocos novos para o repositório
+        digests, file_hash, new_chunks, stored_bytes = _store_chunks(temp_path, directory, page_size * CHUNK_PAGES)
+        duration_ms = int((time.perf_counter() - start_time) * 1000)
+        snapshot = {
+            "version": 1,
+            "name": name,
+            "createdAt": datetime.now().isoformat(timespec="seconds"),
+            "database": os.path.abspath(db_path),
+            "pageSize": page_size,
+            "pageCount": page_count,
+            "chunkSize": page_size * CHUNK_PAGES,
+            "bytes": os.path.getsize(temp_path),
+            "sha256": file_hash,
+            "chunks": digests,
+            "newChunks": new_chunks,
+            "storedBytes": stored_bytes,
+            "records": counts,
+            "recordsCount": sum(counts.values()),
+            "durationMs": duration_ms,
+        }
+        path = _snapshot_path(directory, name)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, indent=1)
+        os.replace(path + ".tmp", path)
+
+        if log:
+            log_sync(source, "SUCCESS", snapshot["recordsCount"], duration_ms)
+        return snapshot
+    except Exception as e:
+        if log:
+            try:
+                log_sync(source, "ERROR", 0, int((time.perf_counter() - start_time) * 1000), str(e))
+            except sqlite3.Error:
+                pass
+        raise
+    finally:
+        source.close()
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+# ==========================================
+# RESTAURO E VERIFICAÇÃO
+# ==========================================
+
+def restore(directory, name, out_path):
+    # Remonta o ficheiro; falha se algum bloco faltar ou não bater com o hash
+    snapshot = load_snapshot(directory, name)
+    whole = hashlib.sha256()
+    with open(out_path + ".tmp", "wb") as out:
+        for index, digest in enumerate(snapshot["chunks"]):
+            path = _chunk_path(directory, digest)
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"Bloco {index} em falta: {digest}")
+            with open(path, "rb") as f:
+                data = zlib.decompress(f.read())
+            if hashlib.sha256(data).hexdigest() != digest:
+                raise ValueError(f"Bloco {index} corrompido: {digest}")
+            whole.update(data)
+            out.write(data)
+    if whole.hexdigest() != snapshot["sha256"]:
+        os.remove(out_path + ".tmp")
+        raise ValueError("O ficheiro remontado não bate com o SHA-256 do snapshot")
+    os.replace(out_path + ".tmp", out_path)
+    return snapshot
+
+def verify(directory, name=None):
+    name = name or (list_snapshots(directory) or [None])[-1]
+    if name is None:
+        raise FileNotFoundError(f"Nenhum snapshot em {directory}")
+    temp_path = os.path.join(directory, f".verify-{os.getpid()}.db")
+    start_time = time.perf_counter()
+    try:
+        snapshot = restore(directory, name, temp_path)
+        conn = cafepoint_db.connect(temp_path, readonly=True)
+        integrity = [r[0] for r in conn.execute("PRAGMA integrity_check")]
+        counts = _record_counts(conn)
+        conn.close()
+    except (OSError, ValueError, zlib.error, sqlite3.DatabaseError) as e:
+        return {"name": name, "ok": False, "integrity": [str(e)], "mismatchedCounts": {},
+                "recordsCount": 0, "seconds": time.perf_counter() - start_time}
+    finally:
+        for path in (temp_path, temp_path + ".tmp"):
+            if os.path.exists(path):
+                os.remove(path)
+    mismatched = {t: (n, counts.get(t)) for t, n in snapshot["records"].items() if counts.get(t) != n}
+    return {
+        "name": name,
+        "ok": integrity == ["ok"] and not mismatched,
+        "integrity": integrity,
+        "mismatchedCounts": mismatched,
+        "recordsCount": sum(counts.values()),
+        "seconds": time.perf_counter() - start_time,
+    }
+
+def prune(directory, keep):
+    # Apaga os snapshots mais antigos e os blocos que deixaram de ser usados
+    names = list_snapshots(directory)
+    for name in names[:-keep] if keep > 0 else names:
+        os.remove(_snapshot_path(directory, name))
+    used = set()
+    for name in list_snapshots(directory):
+        used.update(load_snapshot(directory, name)["chunks"])
+    removed = 0
+    chunks_dir = os.path.join(directory, "chunks")
+    for root, _, files in os.walk(chunks_dir):
+        for file_name in files:
+            if file_name.endswith(".z") and file_name[:-2] not in used:
+                os.remove(os.path.join(root, file_name))
+                removed += 1
+    return removed
+
+def _size_mb(n):
+    return n / (1024 * 1024)
+
+def print_snapshot(snapshot):
+    print(f"✅ Snapshot {snapshot['name']}: {snapshot['recordsCount']} registos, "
+          f"{_size_mb(snapshot['bytes']):.1f} MB em {snapshot['durationMs'] / 1000:.1f}s")
+    print(f"   {snapshot['newChunks']}/{len(snapshot['chunks'])} blocos novos, "
+          f"{_size_mb(snapshot['storedBytes']):.2f} MB gravados (comprimidos)")
+
+def print_verify(result):
+    if result["ok"]:
+        print(f"✅ Snapshot {result['name']} íntegro: {result['recordsCount']} registos ({result['seconds']:.1f}s)")
+        return
+    print(f"❌ Snapshot {result['name']} com problemas")
+    for line in result["integrity"][:10]:
+        if line != "ok":
+            print(f"   {line}")
+    for table, (expected, found) in result["mismatchedCounts"].items():
+        print(f"   {table}: esperado {expected}, encontrado {found}")
+
+def _pop_option(args, name):
+    if name in args:
+        i = args.index(name)
+        value = args[i + 1]
+        del args[i:i + 2]
+        return value
+    return None
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    db_path = _pop_option(args, "--db") or cafepoint_db.default_db_path()
+    directory = backup_dir(db_path, _pop_option(args, "--dir"))
+    step = _pop_option(args, "--step")
+    keep = _pop_option(args, "--keep")
+    no_log = "--no-log" in args
+    args = [a for a in args if a != "--no-log"]
+    command = args[0] if args else "backup"
+
+    if command == "backup" and len(args) <= 1:
+        print_snapshot(backup(db_path, directory, int(step) if step else STEP_PAGES, log=not no_log))
+    elif command == "list" and len(args) == 1:
+        for name in list_snapshots(directory):
+            s = load_snapshot(directory, name)
+            print(f"{name}  {s['recordsCount']:>10} registos  {_size_mb(s['bytes']):8.1f} MB  +{_size_mb(s['storedBytes']):.2f} MB")
+    elif command == "verify" and len(args) <= 2:
+        result = verify(directory, args[1] if len(args) > 1 else None)
+        print_verify(result)
+        sys.exit(0 if result["ok"] else 1)
+    elif command == "restore" and len(args) == 3:
+        if os.path.exists(args[2]):
+            print(f"❌ {args[2]} já existe")
+            sys.exit(1)
+        restore(directory, args[1], args[2])
+        print(f"✅ Restaurado para {args[2]}")
+    elif command == "prune" and keep and len(args) == 1:
+        print(f"✅ {prune(directory, int(keep))} blocos apagados")
+    else:
+        print("Usage: python db_backup.py [--dir DIR] [--step PAGES] [--no-log] [--db FILE]")
+        print("       python db_backup.py list [--dir DIR]")
+        print("       python db_backup.py verify [SNAPSHOT] [--dir DIR]")
+        print("       python db_backup.py restore SNAPSHOT OUT.db [--dir DIR]")
+        print("       python db_backup.py prune --keep N [--dir DIR]")
+        sys.exit(1)
@@ -1,24 +1,20 @@
-import hashlib
-from Crypto.Cipher import AES
-from Crypto.Util.Padding import pad
 import base64
 import os
 import json
 import sys
+import csv
+import time
 
-# MESMA CHAVE USADA PELO BACKEND (Ultra Secure)
-KEY = hashlib.sha256(b'cafe-point-ultra-secure-key-2026').digest()
+# MESMA CHAVE E FORMATO USADOS PELO BACKEND (ver cafepoint_crypto.py)
+import cafepoint_crypto
+import license_ledger
 
 def encrypt_data_hex(data_str):
-    cipher = AES.new(KEY, AES.MODE_CBC)
-    ct_bytes = cipher.encrypt(pad(data_str.encode(), AES.block_size))
-    iv_hex = cipher.iv.hex()
-    ct_hex = ct_bytes.hex()
-    return f"{iv_hex}:{ct_hex}"
+    return cafepoint_crypto.encrypt(data_str)
 
 from datetime import datetime, timedelta
 
-def create_license_params(days, client_name, output_path):
+def create_license_params(days, client_name, output_path, verbose=True):
     # Data de validade do INSTALADOR (USB) = Hoje + 5 Dias
     installer_limit = datetime.now() + timedelta(days=5)
     
@@ -35,10 +31,12 @@ def create_license_params(days, client_name, output_path):
     with open(file_path, "w") as f:
         f.write(encrypted)
     
-    print(f"✅ [LICENÇA] Validade Cliente: {days} dias")
-    print(f"⏳ [SEGURANÇA] Este instalador USB vai expirar em: {installer_limit.strftime('%Y-%m-%d')}")
+    if verbose:
+        print(f"✅ [LICENÇA] Validade Cliente: {days} dias")
+        print(f"⏳ [SEGURANÇA] Este instalador USB vai expirar em: {installer_limit.strftime('%Y-%m-%d')}")
+    return data
 
-def create_tracking_files(output_path, slots):
+def create_tracking_files(output_path, slots, verbose=True):
     current_data = {
         "limit": slots,
         "used": 0,
@@ -59,9 +57,136 @@ def create_tracking_files(output_path, slots):
         pass
         count += 1
             
-    print(f"✅ [PROTEÇÃO] Limite de {slots} instalações definido (4 ficheiros criados).")
+    if verbose:
+        print(f"✅ [PROTEÇÃO] Limite de {slots} instalações definido (4 ficheiros criados).")
+    return current_data["id"]
+
+def normalize_target(output_path):
+    # "E" ou "E:" -> "E:\\" (letra de Pen Drive no Windows)
+    output_path = output_path.strip()
+    if len(output_path) == 1 and output_path.isalpha():
+        return f"{output_path}:\\"
+    if len(output_path) == 2 and output_path[1] == ":":
+        return f"{output_path}\\"
+    return output_path
+
+def issue_single(days, install_limit, output_path, client_name="Cliente Final"):
+    # Grava uma Pen Drive e regista-a no livro de emissões; devolve o tracking id (None em erro)
+    print(f"\n📝 A configurar Pen Drive em: {output_path}")
+    print("------------------------------------------")
+
+    try:
+        params = create_license_params(days, client_name, output_path)
+        tracking_id = create_tracking_files(output_path, install_limit)
+        license_ledger.safe_record([{
+            "tracking_id": tracking_id,
+            "client": params["client"],
+            "days": days,
+            "slots": install_limit,
+            "installer_expires": params["installer_expires"],
+            "path": output_path
+        }], "single")
+        print("\n🎉 PEN DRIVE PRONTA PARA VENDA!")
+        return tracking_id
+    except Exception as e:
+        print(f"❌ Erro ao gravar: {e}")
+        return None
+
+# ==========================================
+# MODO LOTE (Stock para revendedores)
+# ==========================================
+
+def load_manifest(manifest_path):
+    # Aceita CSV (cabeçalho: client,days,slots,path) ou JSON (lista de objetos)
+    with open(manifest_path, "r", encoding="utf-8-sig", newline="") as f:
+        if manifest_path.lower().endswith(".json"):
+            rows = json.load(f)
+        else:
+            rows = list(csv.DictReader(f))
+
+    entries = []
+    for i, row in enumerate(rows, start=1):
+        try:
+            entries.append({
+                "client": (row.get("client") or "Cliente Final").strip(),
+                "days": int(row["days"]),
+                "slots": int(row["slots"]),
+                "path": normalize_target(str(row.get("path") or row["target"]))
+            })
+        except (KeyError, ValueError, TypeError) as e:
+            raise ValueError(f"Linha {i} do manifesto inválida: {e}")
+    return entries
+
+def issue_usb(entry):
+    # Corre num processo do pool: grava uma Pen Drive completa e devolve o resultado
+    start = time.perf_counter()
+    result = dict(entry)
+    try:
+        os.makedirs(entry["path"], exist_ok=True)
+        params = create_license_params(entry["days"], entry["client"], entry["path"], verbose=False)
+        result["tracking_id"] = create_tracking_files(entry["path"], entry["slots"], verbose=False)
+        result["installer_expires"] = params["installer_expires"]
+        result["status"] = "OK"
+    except Exception as e:
+        result["status"] = "ERRO"
+        result["error"] = str(e)
+    result["seconds"] = round(time.perf_counter() - start, 4)
+    return result
+
+def write_result_manifest(results, result_path):
+    if result_path.lower().endswith(".csv"):
+        fields = ["client", "days", "slots", "path", "tracking_id", "installer_expires", "status", "error", "seconds"]
+        with open(result_path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fields, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(results)
+    else:
+        with open(result_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+
+def run_batch(manifest_path, result_path=None, workers=None):
+    from concurrent.futures import ProcessPoolExecutor
+
+    entries = load_manifest(manifest_path)
+    if result_path is None:
+        result_path = os.path.splitext(manifest_path)[0] + "_resultado.json"
+
+    start = time.perf_counter()
+    results = []
+    # As Pen Drives são independentes: cada processo grava uma imagem completa
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for result in pool.map(issue_usb, entries):
+            results.append(result)
+            mark = "✅" if result["status"] == "OK" else "❌"
+            print(f"{mark} {result['path']} ({result['client']}) -> {result.get('tracking_id') or result.get('error')}")
+
+    write_result_manifest(results, result_path)
+    license_ledger.safe_record([r for r in results if r["status"] == "OK"], "batch")
+
+    ok = sum(1 for r in results if r["status"] == "OK")
+    elapsed = time.perf_counter() - start
+    print("------------------------------------------")
+    print(f"🎉 {ok}/{len(results)} Pen Drives configuradas em {elapsed:.2f}s")
+    print(f"📄 Manifesto de resultado: {result_path}")
+    return results
+
+def parse_batch_args(argv):
+    manifest_path = argv[argv.index("--batch") + 1]
+    result_path = argv[argv.index("--out") + 1] if "--out" in argv else None
+    workers = int(argv[argv.index("--workers") + 1]) if "--workers" in argv else None
+    return manifest_path, result_path, workers
 
 if __name__ == "__main__":
+    # Modo lote: python gen_license_encrypted.py --batch manifesto.csv [--out resultado.json] [--workers N]
+    if "--batch" in sys.argv:
+        try:
+            manifest_path, result_path, workers = parse_batch_args(sys.argv)
+            results = run_batch(manifest_path, result_path, workers)
+        except (IndexError, ValueError, OSError) as e:
+            print(f"❌ Erro no modo lote: {e}")
+            sys.exit(1)
+        sys.exit(0 if all(r["status"] == "OK" for r in results) else 2)
+
     days = 0
     install_limit = 0
     output_path = ""
@@ -87,12 +212,7 @@ if __name__ == "__main__":
             install_limit = int(limit_input)
             
             print("\nPASSO 3: DESTINO")
-            output_path = input(">> Letra da Pen Drive? (Ex: E): ").strip()
-            
-            if len(output_path) == 1 and output_path.isalpha():
-                output_path = f"{output_path}:\\"
-            elif len(output_path) == 2 and output_path[1] == ":":
-                output_path = f"{output_path}\\"
+            output_path = normalize_target(input(">> Letra da Pen Drive? (Ex: E): "))
                 
         except ValueError:
             print("❌ Erro: Por favor insira números válidos.")
@@ -108,15 +228,7 @@ if __name__ == "__main__":
         except:
             pass
         
-    print(f"\n📝 A configurar Pen Drive em: {output_path}")
-    print("------------------------------------------")
-    
-    try:
-        create_license_params(days, "Cliente Final", output_path)
-        create_tracking_files(output_path, install_limit)
-        print("\n🎉 PEN DRIVE PRONTA PARA VENDA!")
-    except Exception as e:
-        print(f"❌ Erro ao gravar: {e}")
+    issue_single(days, install_limit, output_path)
         
     if len(sys.argv) < 4:
         input("\nPressione ENTER para sair...")
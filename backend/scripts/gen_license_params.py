@@ -6,13 +6,9 @@ import sys
 from datetime import datetime, timedelta
 
 def get_hwid():
-    # Simplificado para o exemplo, mas usa o mesmo princípio do JS
-    import subprocess
-    try:
-        cpu = subprocess.check_output('wmic cpu get processorid', shell=True).decode().split('\n')[1].strip()
-        return hashlib.sha256(cpu.encode()).hexdigest()[:16].upper()
-    except:
-        return "GENERIC-HWID"
+    # Mesmo id que licenseManager.getMachineId, com cache por boot (ver hwid.py)
+    import hwid
+    return hwid.get_hwid()
 
 def create_license_config(days, restaurant_name="Cliente"):
     hwid = get_hwid()
@@ -0,0 +1,190 @@
+import hashlib
+import json
+import os
+import platform
+import shutil
+import socket
+import subprocess
+import sys
+import time
+from functools import lru_cache
+
+# ==========================================
+# IMPRESSÃO DIGITAL DE HARDWARE (sem processos)
+# ==========================================
+# Mesma definição que licenseManager.getMachineId (backend/src/utils/licenseManager.ts);
+# as duas mudam juntas. Lê fontes nativas em vez de lançar processos:
+#   Linux:   /etc/machine-id + /sys/class/dmi/id (sys_vendor, product_name,
+#            board_vendor, board_name: os que qualquer utilizador pode ler; os
+#            números de série só o root lê e o backend não corre como root)
+#   Windows: registo (MachineGuid + fabricante/modelo da board); wmic só como
+#            último recurso (o id antigo, ver legacy_hwid)
+#   Sem nada disto: hostname em maiúsculas
+# Formato: primeiros 16 caracteres do SHA-256 de "a-b-c..." em maiúsculas.
+# O resultado fica em cache no disco, associado ao boot atual.
+#
+# legacy_hwid() é o id de antes (wmic cpu/baseboard ou hostname): só para
+# aceitar licenças já emitidas com ele, e só é calculado se o novo não bate.
+
+# Sobe quando a forma de calcular o id muda (invalida caches antigas)
+CACHE_VERSION = 3
+
+LINUX_DMI_DIR = "/sys/class/dmi/id"
+LINUX_DMI_FILES = ["sys_vendor", "product_name", "board_vendor", "board_name"]
+LINUX_MACHINE_ID_FILES = ["/etc/machine-id", "/var/lib/dbus/machine-id"]
+
+# Valores de fábrica que não identificam nada
+PLACEHOLDERS = {"", "none", "default string", "to be filled by o.e.m.", "not specified", "0", "system serial number"}
+
+def fingerprint(*parts):
+    return hashlib.sha256("-".join(parts).encode()).hexdigest()[:16].upper()
+
+def _clean(value):
+    value = (value or "").strip()
+    return "" if value.lower() in PLACEHOLDERS else value
+
+def _read(path):
+    try:
+        with open(path, "r") as f:
+            return f.read().strip()
+    except (OSError, UnicodeDecodeError):
+        return ""
+
+def _linux_sources():
+    # Sem machine-id, a board sozinha é igual em todas as máquinas do mesmo modelo
+    machine_id = next((v for v in (_clean(_read(p)) for p in LINUX_MACHINE_ID_FILES) if v), "")
+    if not machine_id:
+        return None
+    return "linux", [machine_id] + [_clean(_read(os.path.join(LINUX_DMI_DIR, name))) for name in LINUX_DMI_FILES]
+
+def _windows_registry_sources():
+    try:
+        import winreg
+    except ImportError:
+        return None
+
+    def value(key_path, name):
+        try:
+            with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, key_path, 0, winreg.KEY_READ | winreg.KEY_WOW64_64KEY) as key:
+                return _clean(str(winreg.QueryValueEx(key, name)[0]))
+        except OSError:
+            return ""
+
+    machine_guid = value(r"SOFTWARE\Microsoft\Cryptography", "MachineGuid")
+    if not machine_guid:
+        return None
+    bios = r"HARDWARE\DESCRIPTION\System\BIOS"
+    return "windows-registry", [machine_guid, value(bios, "BaseBoardManufacturer"), value(bios, "BaseBoardProduct")]
+
+def _wmic(*args):
+    # execFileSync('wmic', args).toString().split('\n')[1]?.trim() || ''
+    output = subprocess.check_output(["wmic", *args], stdin=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    lines = output.decode("utf-8", errors="replace").split("\n")
+    return lines[1].strip() if len(lines) > 1 else ""
+
+def _legacy_probe():
+    # O getMachineId de antes: wmic cpu/baseboard; se o wmic falhar, o hostname
+    # em maiúsculas; se os dois ids vierem vazios, o hostname tal como está
+    if sys.platform != "win32" and not shutil.which("wmic"):
+        return socket.gethostname().upper(), "hostname"
+    try:
+        cpu = _wmic("cpu", "get", "processorid")
+        board = _wmic("baseboard", "get", "serialnumber")
+    except (OSError, subprocess.CalledProcessError):
+        return socket.gethostname().upper(), "hostname"
+    if not cpu and not board:
+        return socket.gethostname(), "hostname"
+    return fingerprint(cpu, board), "wmic"
+
+def probe():
+    # Devolve (hwid, fonte) sem usar a cache
+    if sys.platform.startswith("linux"):
+        found = _linux_sources()
+    elif sys.platform == "win32":
+        found = _windows_registry_sources()
+        if not found:
+            return _legacy_probe()
+    else:
+        found = None
+    if found:
+        source, parts = found
+        return fingerprint(*parts), source
+    return socket.gethostname().upper(), "hostname"
+
+@lru_cache(maxsize=1)
+def legacy_hwid():
+    return _legacy_probe()[0]
+
+def boot_id():
+    # Identificador do boot atual: a cache é invalidada a cada reinício
+    if sys.platform.startswith("linux"):
+        value = _read("/proc/sys/kernel/random/boot_id")
+        if value:
+            return value
+    if sys.platform == "win32":
+        try:
+            import ctypes
+            uptime = ctypes.windll.kernel32.GetTickCount64() / 1000
+            # Arredondado ao minuto para absorver o desvio entre leituras
+            return f"win-{int((time.time() - uptime) // 60)}"
+        except (AttributeError, OSError):
+            pass
+    return None
+
+def cache_path():
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+        return os.path.join(base, "CafePoint", "hwid.json")
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "cafepoint", "hwid.json")
+
+def _load_cache(path, current_boot):
+    try:
+        with open(path, "r") as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if cached.get("version") != CACHE_VERSION or cached.get("boot_id") != current_boot \
+            or cached.get("node") != platform.node():
+        return None
+    return cached.get("hwid")
+
+def _save_cache(path, current_boot, hwid, source):
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"version": CACHE_VERSION, "boot_id": current_boot, "node": platform.node(), "hwid": hwid, "source": source}, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+@lru_cache(maxsize=1)
+def get_hwid(use_cache=True):
+    current_boot = boot_id() if use_cache else None
+    path = cache_path()
+    if current_boot:
+        cached = _load_cache(path, current_boot)
+        if cached:
+            return cached
+
+    hwid, source = probe()
+    if current_boot:
+        _save_cache(path, current_boot, hwid, source)
+    return hwid
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    hwid, source = probe()
+    probe_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    cached = get_hwid()
+    cached_ms = (time.perf_counter() - start) * 1000
+
+    print(f"HWID: {hwid}")
+    print(f"Fonte: {source}")
+    print(f"Boot: {boot_id()}")
+    print(f"Leitura direta: {probe_ms:.2f} ms | Com cache: {cached_ms:.2f} ms")
+    if cached != hwid:
+        print(f"⚠️ Cache desatualizada ({cached}); apague {cache_path()}")
@@ -0,0 +1,469 @@
+import os
+import re
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import cafepoint_db
+
+# ==========================================
+# CONSULTOR DE ÍNDICES (EXPLAIN QUERY PLAN + BENCHMARK)
+# ==========================================
+# Repete, numa cópia da base SQLite, as consultas que o backend faz com mais
+# frequência (mesmos filtros que o Prisma gera a partir dos controllers),
+# regista o EXPLAIN QUERY PLAN, assinala leituras completas de tabelas e
+# ordenações em árvore temporária, propõe índices compostos e mede cada
+# candidato antes/depois. No fim escreve um relatório e uma migração no
+# formato de prisma/migrations, com as linhas @@index para o schema.prisma.
+#
+# Nota: o "npm start" faz "prisma db push", que apaga índices que não estão
+# no schema.prisma. Os índices só ficam se forem declarados lá (@@index).
+#
+# Com todos os índices presentes o planeador pode escolher outro para uma
+# consulta (ex.: (restaurantId, createdAt) para evitar a ordenação, em vez de
+# filtrar por status). Um conjunto que deixa uma consulta medida mais lenta do
+# que com o seu índice sozinho (ou do que antes) é recusado: sai o índice que
+# o planeador usou no lugar do dela e o conjunto é medido de novo. Os índices
+# medem-se sem ANALYZE, como ficam na base depois das migrações do Prisma.
+#
+# Uso: python index_advisor.py <base.db> [--runs N] [--report F] [--migration-name NOME] [--no-migration]
+
+DEFAULT_RUNS = 5
+MIN_GAIN = 0.25          # um candidato só serve uma consulta se a acelerar pelo menos 25%...
+MIN_GAIN_MS = 0.2        # ... e pelo menos 0,2 ms
+PREFIX_SLACK = 1.25      # um índice mais largo substitui o prefixo se ficar até 25% mais lento
+WRITE_ROWS = 2000
+ACTIVE_STATUSES = "'PENDING', 'PREPARING', 'READY'"
+TABLE_STATUSES = "'PENDING', 'PREPARING', 'READY', 'SERVED'"
+
+# Formas de consulta do backend: tabela, SQL (parâmetros :nome ou {lista}) e
+# o padrão de acesso (igualdades, intervalo, ordenação) usado para propor índices
+QUERY_SHAPES = [
+    {"name": "orders.active", "source": "orderController.getOrders (Cozinha/Bar)", "table": "Order",
+     "sql": f'SELECT * FROM "Order" WHERE restaurantId = :rid AND status IN ({ACTIVE_STATUSES}) ORDER BY createdAt DESC',
+     "eq": ["restaurantId", "status"], "order": "createdAt"},
+    {"name": "orders.items", "source": "include orderItems (todos os pedidos)", "table": "OrderItem",
+     "sql": 'SELECT * FROM "OrderItem" WHERE orderId IN ({order_ids})',
+     "eq": ["orderId"]},
+    {"name": "tables.currentOrder", "source": "tableController.getTables (include orders)", "table": "Order",
+     "sql": f'SELECT * FROM "Order" WHERE tableId IN ({{table_ids}}) AND status IN ({TABLE_STATUSES}) ORDER BY createdAt DESC',
+     "eq": ["tableId", "status"], "order": "createdAt"},
+    {"name": "orders.history", "source": "reportController.getOrderHistory", "table": "Order",
+     "sql": 'SELECT * FROM "Order" WHERE restaurantId = :rid AND createdAt BETWEEN :start AND :end ORDER BY createdAt DESC LIMIT 500',
+     "eq": ["restaurantId"], "range": "createdAt"},
+    {"name": "billing.orders", "source": "reportController.getBillingStats", "table": "Order",
+     "sql": 'SELECT * FROM "Order" WHERE restaurantId = :rid AND status != \'CANCELLED\' AND createdAt BETWEEN :start AND :end',
+     "eq": ["restaurantId"], "range": "createdAt"},
+    {"name": "billing.sold", "source": "reportController.getBillingStats", "table": "Order",
+     "sql": 'SELECT * FROM "Order" WHERE restaurantId = :rid AND status IN (\'PAID\', \'SERVED\') AND createdAt BETWEEN :start AND :end',
+     "eq": ["restaurantId", "status"], "range": "createdAt"},
+    {"name": "advanced.paid", "source": "advancedReportsController", "table": "Order",
+     "sql": 'SELECT * FROM "Order" WHERE restaurantId = :rid AND status = \'PAID\' AND createdAt BETWEEN :start AND :end',
+     "eq": ["restaurantId", "status"], "range": "createdAt"},
+    {"name": "analytics.orders", "source": "analyticsController.getAdvancedAnalytics", "table": "Order",
+     "sql": 'SELECT * FROM "Order" WHERE restaurantId = :rid AND createdAt BETWEEN :start AND :end',
+     "eq": ["restaurantId"], "range": "createdAt"},
+    {"name": "billing.purchases", "source": "reportController.getBillingStats", "table": "StockMovement",
+     "sql": 'SELECT * FROM "StockMovement" WHERE restaurantId = :rid AND type = \'ENTRY\' AND createdAt BETWEEN :start AND :end',
+     "eq": ["restaurantId", "type"], "range": "createdAt"},
+    {"name": "stock.movements", "source": "stockController.getStockMovements", "table": "StockMovement",
+     "sql": 'SELECT * FROM "StockMovement" WHERE restaurantId = :rid ORDER BY createdAt DESC LIMIT 100',
+     "eq": ["restaurantId"], "order": "createdAt"},
+    {"name": "analytics.expenses", "source": "analyticsController / advancedReports", "table": "Expense",
+     "sql": 'SELECT * FROM "Expense" WHERE restaurantId = :rid AND date BETWEEN :start AND :end',
+     "eq": ["restaurantId"], "range": "date"},
+    {"name": "expenses.list", "source": "expenseController.getExpenses", "table": "Expense",
+     "sql": 'SELECT * FROM "Expense" WHERE restaurantId = :rid ORDER BY date DESC',
+     "eq": ["restaurantId"], "order": "date"},
+    {"name": "analytics.reservations", "source": "analyticsController", "table": "Reservation",
+     "sql": 'SELECT * FROM "Reservation" WHERE restaurantId = :rid AND date BETWEEN :start AND :end',
+     "eq": ["restaurantId"], "range": "date"},
+    {"name": "analytics.feedback", "source": "analyticsController", "table": "Feedback",
+     "sql": 'SELECT * FROM "Feedback" WHERE restaurantId = :rid AND createdAt BETWEEN :start AND :end',
+     "eq": ["restaurantId"], "range": "createdAt"},
+    {"name": "analytics.maintenance", "source": "analyticsController", "table": "MaintenanceRecord",
+     "sql": 'SELECT * FROM "MaintenanceRecord" WHERE restaurantId = :rid AND date BETWEEN :start AND :end',
+     "eq": ["restaurantId"], "range": "date"},
+    {"name": "cash.openSession", "source": "utils/cashSession.getOpenCashSession", "table": "CashSession",
+     "sql": 'SELECT * FROM "CashSession" WHERE restaurantId = :rid AND status = \'OPEN\' AND closedAt IS NULL ORDER BY openedAt DESC LIMIT 1',
+     "eq": ["restaurantId", "status"], "order": "openedAt"},
+    {"name": "cash.sessionBalance", "source": "utils/cashSession.calculateCashSessionBalance", "table": "CashMovement",
+     "sql": 'SELECT amount FROM "CashMovement" WHERE cashSessionId = :session',
+     "eq": ["cashSessionId"]},
+    {"name": "cash.movements", "source": "cashController.getCashMovements", "table": "CashMovement",
+     "sql": 'SELECT * FROM "CashMovement" WHERE restaurantId = :rid ORDER BY createdAt DESC LIMIT 50',
+     "eq": ["restaurantId"], "order": "createdAt"},
+    {"name": "trial.menuItems", "source": "utils/trialLimits.checkTrialLimit", "table": "MenuItem",
+     "sql": 'SELECT COUNT(*) FROM "MenuItem" WHERE restaurantId = :rid',
+     "eq": ["restaurantId"]},
+    {"name": "trial.tables", "source": "utils/trialLimits + tableController", "table": "Table",
+     "sql": 'SELECT COUNT(*) FROM "Table" WHERE restaurantId = :rid',
+     "eq": ["restaurantId"]},
+    {"name": "menu.recipes", "source": "orderController.createOrder (include recipeIngredients)", "table": "RecipeItem",
+     "sql": 'SELECT * FROM "RecipeItem" WHERE parentItemId IN ({menu_ids})',
+     "eq": ["parentItemId"]},
+    {"name": "team.members", "source": "teamController / subscriptionController", "table": "User",
+     "sql": 'SELECT id, name, username, role FROM "User" WHERE restaurantId = :rid',
+     "eq": ["restaurantId"]},
+    {"name": "jobs.changedOrders", "source": "scripts daily_rollup / service_latency", "table": "Order",
+     "sql": 'SELECT id FROM "Order" WHERE id > :last_id OR updatedAt >= :since',
+     "eq": [], "range": "updatedAt"},
+]
+
+# ==========================================
+# PARÂMETROS DE EXEMPLO
+# ==========================================
+
+def sample_params(conn):
+    # O restaurante com mais pedidos e o último mês com dados
+    row = conn.execute('SELECT restaurantId, COUNT(*) AS n FROM "Order" GROUP BY 1 ORDER BY 2 DESC LIMIT 1').fetchone()
+    rid = row["restaurantId"] if row else 1
+    end = conn.execute('SELECT MAX(createdAt) FROM "Order" WHERE restaurantId = ?', (rid,)).fetchone()[0] or cafepoint_db.now_ms()
+    recent = [r[0] for r in conn.execute('SELECT id FROM "Order" WHERE restaurantId = ? ORDER BY id DESC LIMIT 50', (rid,))]
+    tables = [r[0] for r in conn.execute('SELECT id FROM "Table" WHERE restaurantId = ?', (rid,))]
+    menu = [r[0] for r in conn.execute('SELECT id FROM "MenuItem" WHERE restaurantId = ?', (rid,))]
+    session = conn.execute('SELECT MAX(id) FROM "CashSession" WHERE restaurantId = ?', (rid,)).fetchone()[0]
+    last_id = conn.execute('SELECT MAX(id) FROM "Order"').fetchone()[0] or 0
+    updated = conn.execute('SELECT MAX(updatedAt) FROM "Order"').fetchone()[0] or 0
+    return {
+        "rid": rid,
+        "start": end - 30 * 86400000,
+        "end": end,
+        "session": session or 0,
+        "last_id": last_id - 100,
+        "since": updated - 10 * 60 * 1000,
+        "lists": {
+            "order_ids": ",".join(str(i) for i in recent) or "0",
+            "table_ids": ",".join(str(i) for i in tables) or "0",
+            "menu_ids": ",".join(str(i) for i in menu) or "0",
+        }
+    }
+
+def _shape_sql(shape, params):
+    return shape["sql"].format(**params["lists"])
+
+def _bind(sql, params):
+    return {k: v for k, v in params.items() if f":{k}" in sql}
+
+# ==========================================
+# PLANOS E TEMPOS
+# ==========================================
+
+def query_plan(conn, shape, params):
+    sql = _shape_sql(shape, params)
+    return [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, _bind(sql, params))]
+
+def plan_flags(plan):
+    flags = []
+    for detail in plan:
+        match = re.match(r"SCAN (\S+)", detail)
+        if match and "COVERING INDEX" not in detail and "USING INDEX" not in detail:
+            flags.append(f"leitura completa de {match.group(1)}")
+        if "TEMP B-TREE" in detail:
+            flags.append("ordenação em árvore temporária")
+        if "AUTOMATIC" in detail:
+            flags.append("índice automático (criado a cada consulta)")
+    return flags
+
+def time_shape(conn, shape, params, runs):
+    sql = _shape_sql(shape, params)
+    bound = _bind(sql, params)
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        conn.execute(sql, bound).fetchall()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+# ==========================================
+# CANDIDATOS
+# ==========================================
+
+def index_name(table, columns):
+    # Mesmo nome que o Prisma dá a @@index([...])
+    return f"{table}_{'_'.join(columns)}_idx"
+
+def existing_indexes(conn, table):
+    # Colunas de cada índice existente (para não propor o que já existe)
+    result = {}
+    for row in conn.execute(f'PRAGMA index_list("{table}")'):
+        result[row["name"]] = [r["name"] for r in conn.execute(f'PRAGMA index_info("{row["name"]}")')]
+    return result
+
+def candidates_for(shape):
+    tail = [shape["range"]] if shape.get("range") else [shape["order"]] if shape.get("order") else []
+    options = [shape["eq"] + tail]
+    if len(shape["eq"]) > 1:
+        options.append(shape["eq"][:1] + tail)
+    return [tuple(cols) for cols in options if cols and cols != ["id"]]
+
+def _covered(columns, indexes):
+    return any(list(cols[:len(columns)]) == list(columns) for cols in indexes.values())
+
+def _create(conn, table, columns):
+    name = index_name(table, columns)
+    column_list = ", ".join(f'"{c}"' for c in columns)
+    conn.execute(f'CREATE INDEX "{name}" ON "{table}"({column_list})')
+    return name
+
+def _used_index(plan):
+    for detail in plan:
+        match = re.search(r"USING (?:COVERING )?INDEX (\S+)", detail)
+        if match:
+            return match.group(1)
+    return None
+
+def _regressions(shapes, selected, candidates, before, after):
+    # (consulta, índice dela, ms esperados, ms com o conjunto, índice usado)
+    served = {name: key for key, names in selected.items() for name in names}
+    result = []
+    for shape in shapes:
+        name = shape["name"]
+        key = served.get(name)
+        expected = candidates[key][name] if key else before[name]["ms"]
+        final = after[name]["ms"]
+        if final > expected * PREFIX_SLACK and final - expected >= MIN_GAIN_MS:
+            result.append((name, key, expected, final, _used_index(after[name]["plan"])))
+    return result
+
+def _write_cost(conn, table, rid, rows=WRITE_ROWS):
+    # µs por linha a inserir (cópias das últimas linhas), desfeito no fim
+    columns = [r["name"] for r in conn.execute(f'PRAGMA table_info("{table}")') if r["name"] != "id"]
+    column_list = ", ".join(f'"{c}"' for c in columns)
+    conn.execute("SAVEPOINT write_cost")
+    start = time.perf_counter()
+    inserted = conn.execute(f"""
+        INSERT INTO "{table}" ({column_list})
+        SELECT {column_list} FROM "{table}" WHERE restaurantId = ? ORDER BY id DESC LIMIT ?
+    """, (rid, rows)).rowcount
+    elapsed = time.perf_counter() - start
+    conn.execute("ROLLBACK TO write_cost")
+    conn.execute("RELEASE write_cost")
+    return elapsed * 1e6 / inserted if inserted > 0 else None
+
+# ==========================================
+# ANÁLISE COMPLETA
+# ==========================================
+
+def advise(db_path, runs=DEFAULT_RUNS, verbose=True):
+    # Trabalha sempre numa cópia: cria e apaga índices e faz inserções de teste
+    workdir = tempfile.mkdtemp(prefix="cafepoint_index_")
+    work_path = os.path.join(workdir, "advisor.db")
+    try:
+        source = cafepoint_db.connect(db_path, readonly=True)
+        target = sqlite3.connect(work_path)
+        source.backup(target)
+        source.close()
+        target.close()
+
+        conn = cafepoint_db.connect(work_path)
+        conn.isolation_level = None
+        shapes = [s for s in QUERY_SHAPES if cafepoint_db.table_exists(conn, s["table"])]
+        params = sample_params(conn)
+
+        def log(message):
+            if verbose:
+                print(message, file=sys.stderr)
+
+        # 1. Situação atual
+        before = {}
+        for shape in shapes:
+            plan = query_plan(conn, shape, params)
+            before[shape["name"]] = {"plan": plan, "flags": plan_flags(plan), "ms": time_shape(conn, shape, params, runs)}
+        log(f"📋 {len(shapes)} consultas medidas (restaurante #{params['rid']})")
+
+        # 2. Cada candidato sozinho, só nas consultas da mesma tabela
+        candidates = {}
+        for shape in shapes:
+            indexes = existing_indexes(conn, shape["table"])
+            for columns in candidates_for(shape):
+                if not _covered(columns, indexes):
+                    candidates.setdefault((shape["table"], columns), {})
+        for (table, columns), timings in candidates.items():
+            start = time.perf_counter()
+            name = _create(conn, table, columns)
+            for shape in shapes:
+                if shape["table"] == table:
+                    timings[shape["name"]] = time_shape(conn, shape, params, runs)
+            conn.execute(f'DROP INDEX "{name}"')
+            log(f"   {name}: medido em {time.perf_counter() - start:.1f}s")
+
+        # 3. Melhor candidato de cada consulta (se valer a pena)
+        wanted = {}
+        for shape in shapes:
+            base = before[shape["name"]]["ms"]
+            options = [(timings[shape["name"]], key) for key, timings in candidates.items() if shape["name"] in timings]
+            if not options:
+                continue
+            best_ms, key = min(options)
+            if base - best_ms >= max(MIN_GAIN * base, MIN_GAIN_MS):
+                wanted.setdefault(key, []).append(shape["name"])
+
+        # 4. Um índice que é prefixo de outro escolhido na mesma tabela sai, se o mais largo servir
+        selected = dict(wanted)
+        for key in sorted(wanted, key=lambda k: len(k[1])):
+            table, columns = key
+            for other in selected:
+                if other != key and other[0] == table and other[1][:len(columns)] == columns:
+                    if all(candidates[other][s] <= candidates[key][s] * PREFIX_SLACK for s in wanted[key]):
+                        selected[other] = selected[other] + selected.pop(key)
+                        break
+
+        # 5. Todos juntos; se o planeador troca o índice de uma consulta por
+        # outro do conjunto e ela fica mais lenta, esse outro sai e mede-se de novo
+        write_tables = sorted({table for table, _ in selected} & {"Order", "OrderItem", "StockMovement", "CashMovement"})
+        write_before = {t: _write_cost(conn, t, params["rid"]) for t in write_tables if t != "OrderItem"}
+        rejected = []
+        while True:
+            created = [_create(conn, table, columns) for table, columns in selected]
+            after = {}
+            for shape in shapes:
+                plan = query_plan(conn, shape, params)
+                after[shape["name"]] = {"plan": plan, "flags": plan_flags(plan), "ms": time_shape(conn, shape, params, runs)}
+            regressions = _regressions(shapes, selected, candidates, before, after)
+            by_name = {index_name(t, c): (t, c) for t, c in selected}
+            culprit = next((r for r in regressions if r[4] in by_name and by_name[r[4]] != r[1]), None)
+            if culprit is None:
+                break
+            name, _, expected, final, used = culprit
+            rejected.append({"name": used, "serves": selected.pop(by_name[used]),
+                             "reason": f"{name}: {expected:.2f} ms sem ele, {final:.2f} ms com ele"})
+            log(f"   {used}: recusado ({name} {expected:.2f} -> {final:.2f} ms)")
+            for index in created:
+                conn.execute(f'DROP INDEX "{index}"')
+        write_after = {t: _write_cost(conn, t, params["rid"]) for t in write_before}
+        conn.close()
+
+        # O que fica mais lento sem um culpado no conjunto (outro plano, ruído) fica registado
+        warnings = [f"{name}: esperado {expected:.2f} ms, com todos os índices {final:.2f} ms ({used or 'SCAN'})"
+                    for name, _, expected, final, used in regressions]
+
+        return {
+            "database": db_path,
+            "params": {k: v for k, v in params.items() if k != "lists"},
+            "shapes": shapes,
+            "before": before,
+            "after": after,
+            "candidates": {index_name(t, c): {"table": t, "columns": list(c), "timings": timings}
+                           for (t, c), timings in candidates.items()},
+            "selected": [{"table": t, "columns": list(c), "name": index_name(t, c), "serves": names}
+                         for (t, c), names in sorted(selected.items())],
+            "writeCost": {t: (write_before[t], write_after[t]) for t in write_before},
+            "rejected": rejected,
+            "warnings": warnings,
+        }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+# ==========================================
+# RELATÓRIO E MIGRAÇÃO
+# ==========================================
+
+def render_report(result):
+    lines = [
+        "# Relatório de índices",
+        "",
+        f"Base: `{result['database']}` | restaurante #{result['params']['rid']} | "
+        f"gerado em {datetime.now().strftime('%Y-%m-%d %H:%M')}",
+        "",
+        "| Consulta | Origem | Antes (ms) | Depois (ms) | Ganho | Problemas antes |",
+        "|---|---|---:|---:|---:|---|",
+    ]
+    for shape in result["shapes"]:
+        b, a = result["before"][shape["name"]], result["after"][shape["name"]]
+        gain = b["ms"] / a["ms"] if a["ms"] > 0 else float("inf")
+        lines.append(f"| {shape['name']} | {shape['source']} | {b['ms']:.2f} | {a['ms']:.2f} | {gain:.1f}x | "
+                     f"{'; '.join(sorted(set(b['flags']))) or '-'} |")
+
+    lines += ["", "## Índices propostos", ""]
+    if not result["selected"]:
+        lines.append("Nenhum: as consultas já usam índices adequados.")
+    for index in result["selected"]:
+        lines.append(f"- `{index['name']}` em {index['table']}({', '.join(index['columns'])}) — serve: {', '.join(index['serves'])}")
+
+    if result["rejected"]:
+        lines += ["", "## Índices recusados (com o conjunto, o planeador usava-os no lugar de um melhor)", ""]
+        lines += [f"- `{r['name']}` (servia: {', '.join(r['serves'])}) — {r['reason']}" for r in result["rejected"]]
+
+    if result["warnings"]:
+        lines += ["", "## Avisos (mais lentas com o conjunto, sem índice a recusar)", ""]
+        lines += [f"- {w}" for w in result["warnings"]]
+
+    if result["writeCost"]:
+        lines += ["", "## Custo de escrita (µs por linha inserida)", ""]
+        for table, (old, new) in result["writeCost"].items():
+            if old and new:
+                lines.append(f"- {table}: {old:.1f} -> {new:.1f}")
+
+    lines += ["", "## Planos", ""]
+    for shape in result["shapes"]:
+        lines.append(f"### {shape['name']}")
+        lines.append("```")
+        lines += [f"antes:  {d}" for d in result["before"][shape["name"]]["plan"]]
+        lines += [f"depois: {d}" for d in result["after"][shape["name"]]["plan"]]
+        lines.append("```")
+
+    lines += ["", "## Candidatos medidos (ms por consulta)", ""]
+    for name, candidate in result["candidates"].items():
+        timings = ", ".join(f"{s} {ms:.2f}" for s, ms in candidate["timings"].items())
+        lines.append(f"- `{name}`: {timings}")
+    return "\n".join(lines) + "\n"
+
+def render_migration(selected):
+    # Mesmo formato das migrações geradas pelo Prisma
+    blocks = []
+    for index in selected:
+        columns = ", ".join(f'"{c}"' for c in index["columns"])
+        blocks.append(f'-- CreateIndex\nCREATE INDEX "{index["name"]}" ON "{index["table"]}"({columns});')
+    return "\n\n".join(blocks) + "\n"
+
+def schema_lines(selected):
+    return [f"model {i['table']}: @@index([{', '.join(i['columns'])}])" for i in selected]
+
+def write_migration(selected, name, migrations_dir=cafepoint_db.MIGRATIONS_DIR):
+    folder = os.path.join(migrations_dir, f"{datetime.now().strftime('%Y%m%d%H%M%S')}_{name}")
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, "migration.sql")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(render_migration(selected))
+    return path
+
+def _pop_option(args, name):
+    if name in args:
+        i = args.index(name)
+        value = args[i + 1]
+        del args[i:i + 2]
+        return value
+    return None
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    runs = _pop_option(args, "--runs")
+    report_path = _pop_option(args, "--report")
+    migration_name = _pop_option(args, "--migration-name") or "add_query_indexes"
+    no_migration = "--no-migration" in args
+    args = [a for a in args if a != "--no-migration"]
+
+    if len(args) > 1:
+        print("Usage: python index_advisor.py [base.db] [--runs N] [--report FILE] [--migration-name NAME] [--no-migration]")
+        sys.exit(1)
+
+    result = advise(args[0] if args else cafepoint_db.default_db_path(), int(runs) if runs else DEFAULT_RUNS)
+    report = render_report(result)
+    if report_path:
+        with open(report_path, "w", encoding="utf-8") as f:
+            f.write(report)
+        print(f"📝 Relatório: {report_path}")
+    else:
+        print(report)
+
+    if result["selected"] and not no_migration:
+        path = write_migration(result["selected"], migration_name)
+        print(f"✅ Migração: {path}")
+        print("   Acrescente ao schema.prisma (o db push apaga índices que lá não estejam):")
+        for line in schema_lines(result["selected"]):
+            print(f"   {line}")
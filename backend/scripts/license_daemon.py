@@ -0,0 +1,256 @@
+import base64
+import hashlib
+import hmac
+import json
+import math
+import os
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+import hwid
+
+# ==========================================
+# SERVIÇO DE VERIFICAÇÃO DE LICENÇA
+# ==========================================
+# Mesmas regras de backend/src/utils/licenseManager.ts (verifyLicense), mas
+# num processo de longa duração: os ficheiros são lidos uma vez e só voltam a
+# ser verificados quando o mtime/tamanho muda ou quando passa a fronteira do
+# dia de expiração. Responde por um socket Unix, uma linha JSON por pedido.
+# O machineId é o mesmo de licenseManager.getMachineId: vem de hwid.py, a
+# única implementação do lado Python (também usada pelo gen_license_params).
+# Tal como no backend, licenças emitidas com o id antigo (wmic/hostname)
+# continuam aceites; esse id só é calculado quando o atual não bate.
+#
+# Uso: python license_daemon.py serve [--socket CAMINHO]
+#      python license_daemon.py check [--socket CAMINHO]
+
+SECRET_KEY = b'cafe-point-secure-v1'
+DAY_SECONDS = 24 * 60 * 60
+
+# O .system_trace só é regravado de minuto a minuto (antes: a cada verificação)
+TRACE_INTERVAL = 60
+
+def get_license_paths(base_dir=None):
+    app_dir = os.path.join(base_dir or os.getcwd(), '.license.key')
+    app_data = os.path.join(os.environ.get('APPDATA', ''), 'CafePoint', 'license.key')
+    program_data = os.path.join(os.environ.get('ALLUSERSPROFILE', 'C:\\ProgramData'), 'CafePoint', 'license.key')
+    return [app_dir, app_data, program_data]
+
+def get_trace_path():
+    return os.path.join(os.environ.get('ALLUSERSPROFILE', 'C:\\ProgramData'), 'CafePoint', '.system_trace')
+
+def default_socket_path():
+    return os.environ.get('CAFEPOINT_LICENSE_SOCKET') or os.path.join(tempfile.gettempdir(), 'cafepoint-license.sock')
+
+def get_machine_id():
+    # Igual a getMachineId() no backend (machine-id/DMI ou registo do Windows)
+    return hwid.get_hwid()
+
+def get_legacy_machine_id():
+    # Igual a getLegacyMachineId() no backend (wmic cpu/baseboard ou hostname)
+    return hwid.legacy_hwid()
+
+def calculate_checksum(machine_id, expiry_date, restaurant_name):
+    message = f"{machine_id}|{expiry_date}|{restaurant_name}".encode('utf-8')
+    return hmac.new(SECRET_KEY, message, hashlib.sha256).hexdigest()
+
+def parse_expiry(expiry_date):
+    # new Date('2026-12-31') no JS = meia-noite UTC
+    value = datetime.fromisoformat(expiry_date.replace('Z', '+00:00'))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+def read_licenses(paths):
+    # Devolve (conteúdos encontrados, licença válida, erro)
+    found = []
+    valid = None
+    for p in paths:
+        if not os.path.exists(p):
+            continue
+        try:
+            with open(p, 'r', encoding='utf-8') as f:
+                content = f.read()
+            found.append(content)
+            data = json.loads(base64.b64decode(content).decode('utf-8'))
+            expected = calculate_checksum(data['machineId'], data['expiryDate'], data['restaurantName'])
+            if not hmac.compare_digest(str(data.get('checksum', '')), expected):
+                return found, None, 'Licença adulterada.'
+            if valid is None:
+                valid = data
+        except (OSError, ValueError, KeyError, TypeError):
+            # Ignorar erros individuais se os outros ficheiros funcionarem
+            pass
+    return found, valid, None
+
+def evaluate(license_data, machine_id, now, legacy_id=None):
+    # Parte dependente do relógio: hardware, expiração e dias restantes
+    if license_data['machineId'] not in (machine_id, legacy_id):
+        return {'valid': False, 'error': 'Hardware ID não corresponde.', 'machineId': machine_id}, None
+
+    expiry = parse_expiry(license_data['expiryDate'])
+    if now > expiry:
+        shown = datetime.fromtimestamp(expiry).strftime('%d/%m/%Y')
+        return {'valid': False, 'error': f'Licença expirada em {shown}.', 'machineId': machine_id}, None
+
+    days_remaining = math.ceil((expiry - now) / DAY_SECONDS)
+    # daysRemaining só muda quando passa expiry - (dias - 1) dias
+    recheck_at = expiry - (days_remaining - 1) * DAY_SECONDS
+    result = {
+        'valid': True,
+        'data': {
+            'machineId': license_data['machineId'],
+            'expiryDate': license_data['expiryDate'],
+            'restaurantName': license_data['restaurantName'],
+        },
+        'daysRemaining': days_remaining,
+        'machineId': machine_id,
+    }
+    return result, recheck_at
+
+class LicenseVerifier:
+    def __init__(self, paths=None, trace_path=None, machine_id=None):
+        self.paths = paths or get_license_paths()
+        self.trace_path = trace_path or get_trace_path()
+        self.machine_id = machine_id or get_machine_id()
+        # Com um machine_id explícito não há id antigo a aceitar
+        self.accept_legacy = machine_id is None
+        self.lock = threading.Lock()
+        self._signature = None
+        self._result = None
+        self._recheck_at = None
+        self._last_seen = self._read_trace()
+        self._trace_written_at = 0.0
+        self.verifications = 0
+
+    def _file_signature(self):
+        signature = []
+        for p in self.paths:
+            try:
+                st = os.stat(p)
+                signature.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+
+    def _read_trace(self):
+        try:
+            with open(self.trace_path, 'r') as f:
+                return int(f.read().strip()) / 1000
+        except (OSError, ValueError):
+            return 0.0
+
+    def _check_clock(self, now):
+        # Anti-Clock Rollback: comparação em memória, escrita em disco espaçada
+        if now < self._last_seen:
+            return False
+        self._last_seen = now
+        if now - self._trace_written_at >= TRACE_INTERVAL:
+            try:
+                os.makedirs(os.path.dirname(self.trace_path), exist_ok=True)
+                with open(self.trace_path, 'w') as f:
+                    f.write(str(int(now * 1000)))
+                self._trace_written_at = now
+            except OSError:
+                pass
+        return True
+
+    def _verify(self, now):
+        self.verifications += 1
+        found, license_data, error = read_licenses(self.paths)
+        if error:
+            return {'valid': False, 'error': error, 'machineId': self.machine_id}, None
+        if not found:
+            return {'valid': False, 'error': 'Licença não encontrada.', 'machineId': self.machine_id}, None
+        if len(set(found)) > 1:
+            return {'valid': False, 'error': 'Inconsistência entre os arquivos de licença.', 'machineId': self.machine_id}, None
+        if license_data is None:
+            return {'valid': False, 'error': 'Erro ao processar licença.', 'machineId': self.machine_id}, None
+        legacy_id = None
+        if self.accept_legacy and license_data['machineId'] != self.machine_id:
+            legacy_id = get_legacy_machine_id()
+        return evaluate(license_data, self.machine_id, now, legacy_id)
+
+    def check(self, now=None):
+        now = time.time() if now is None else now
+        with self.lock:
+            if not self._check_clock(now):
+                return {'valid': False, 'error': 'Violação de data detectada (Relógio atrasado).', 'machineId': self.machine_id}
+
+            signature = self._file_signature()
+            stale = (
+                self._result is None
+                or signature != self._signature
+                or (self._recheck_at is not None and now >= self._recheck_at)
+            )
+            if stale:
+                self._result, self._recheck_at = self._verify(now)
+                self._signature = signature
+            return self._result
+
+class LicenseRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        # Cada linha recebida ("status", "stats") devolve uma linha JSON
+        for line in self.rfile:
+            command = line.strip().decode('utf-8', 'replace') or 'status'
+            if command == 'stats':
+                response = {'verifications': self.server.verifier.verifications, 'paths': self.server.verifier.paths}
+            else:
+                response = self.server.verifier.check()
+            self.wfile.write((json.dumps(response, ensure_ascii=False) + '\n').encode('utf-8'))
+
+def serve(socket_path, verifier):
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    server = socketserver.ThreadingUnixStreamServer(socket_path, LicenseRequestHandler)
+    server.daemon_threads = True
+    server.verifier = verifier
+    first = verifier.check()
+    print(f"🛡️  Serviço de licença ativo em {socket_path}")
+    print(f"   Estado inicial: {'VÁLIDA' if first['valid'] else first['error']}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+
+def query(socket_path, command='status'):
+    import socket
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(socket_path)
+        client.sendall((command + '\n').encode('utf-8'))
+        with client.makefile('rb') as reader:
+            return json.loads(reader.readline())
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    socket_path = default_socket_path()
+    if "--socket" in args:
+        i = args.index("--socket")
+        socket_path = args[i + 1]
+        args = args[:i] + args[i + 2:]
+    command = args[0] if args else "check"
+
+    if command == "serve":
+        if not hasattr(socketserver, "ThreadingUnixStreamServer"):
+            print("❌ Este sistema não suporta sockets Unix.")
+            sys.exit(1)
+        serve(socket_path, LicenseVerifier())
+    elif command in ("check", "stats"):
+        try:
+            result = query(socket_path, "status" if command == "check" else command)
+        except OSError:
+            # Sem serviço a correr: verificação direta neste processo
+            result = LicenseVerifier().check()
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+        if command == "check":
+            sys.exit(0 if result.get('valid') else 1)
+    else:
+        print("Usage: python license_daemon.py [serve|check|stats] [--socket PATH]")
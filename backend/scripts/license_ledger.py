@@ -0,0 +1,156 @@
+import csv
+import json
+import os
+import sqlite3
+import sys
+from datetime import datetime, timedelta
+
+# ==========================================
+# REGISTO LOCAL DE LICENÇAS EMITIDAS
+# ==========================================
+# Cada Pen Drive configurada (gen_license_encrypted.py / prepare_usb.py) fica
+# registada aqui, com índices por tracking id, cliente e datas de expiração.
+#
+# Uso: python license_ledger.py find <tracking_id>
+#      python license_ledger.py client <nome>
+#      python license_ledger.py expiring <AAAA-MM-DD> <AAAA-MM-DD> [--installer]
+#      python license_ledger.py export <ficheiro.csv|ficheiro.json>
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS issuance (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    tracking_id TEXT,
+    client TEXT,
+    days INTEGER,
+    slots INTEGER,
+    installer_expires TEXT,
+    license_expires TEXT,
+    target TEXT,
+    source TEXT NOT NULL,
+    issued_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS issuance_tracking_id_idx ON issuance(tracking_id);
+CREATE INDEX IF NOT EXISTS issuance_client_idx ON issuance(client, issued_at);
+CREATE INDEX IF NOT EXISTS issuance_license_expires_idx ON issuance(license_expires);
+CREATE INDEX IF NOT EXISTS issuance_installer_expires_idx ON issuance(installer_expires);
+"""
+
+COLUMNS = ["id", "tracking_id", "client", "days", "slots", "installer_expires",
+           "license_expires", "target", "source", "issued_at"]
+
+def default_ledger_path():
+    return os.environ.get("CAFEPOINT_LEDGER") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "license_ledger.db")
+
+def open_ledger(path=None):
+    conn = sqlite3.connect(path or default_ledger_path())
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SCHEMA)
+    return conn
+
+def _row(entry, source, now):
+    days = entry.get("days")
+    # A licença só começa a contar na ativação: estimativa pelo dia da emissão
+    license_expires = (now + timedelta(days=days)).strftime("%Y-%m-%d") if days else None
+    return (
+        entry.get("tracking_id"),
+        entry.get("client"),
+        days,
+        entry.get("slots"),
+        entry.get("installer_expires"),
+        license_expires,
+        entry.get("path") or entry.get("target"),
+        source,
+        now.strftime("%Y-%m-%dT%H:%M:%S"),
+    )
+
+def record_many(entries, source, path=None):
+    now = datetime.now()
+    rows = [_row(e, source, now) for e in entries]
+    conn = open_ledger(path)
+    try:
+        with conn:
+            conn.executemany(
+                "INSERT INTO issuance (tracking_id, client, days, slots, installer_expires, "
+                "license_expires, target, source, issued_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+    finally:
+        conn.close()
+    return len(rows)
+
+def record_issuance(entry, source, path=None):
+    return record_many([entry], source, path)
+
+def safe_record(entries, source, path=None):
+    # A emissão já foi gravada na Pen: uma falha no registo só gera aviso
+    try:
+        return record_many(entries, source, path)
+    except sqlite3.Error as e:
+        print(f"⚠️ Aviso: não foi possível atualizar o registo de licenças: {e}")
+        return 0
+
+def _query(sql, params, path=None):
+    conn = open_ledger(path)
+    try:
+        return [dict(r) for r in conn.execute(sql, params)]
+    finally:
+        conn.close()
+
+def find_by_tracking_id(tracking_id, path=None):
+    return _query("SELECT * FROM issuance WHERE tracking_id = ?", (tracking_id,), path)
+
+def find_by_client(client, path=None):
+    return _query("SELECT * FROM issuance WHERE client = ? ORDER BY issued_at", (client,), path)
+
+def expiring_between(start, end, installer=False, path=None):
+    # Intervalo inclusivo de datas AAAA-MM-DD
+    column = "installer_expires" if installer else "license_expires"
+    return _query(
+        f"SELECT * FROM issuance WHERE {column} BETWEEN ? AND ? ORDER BY {column}",
+        (start, end), path
+    )
+
+def export(out_path, path=None):
+    conn = open_ledger(path)
+    try:
+        cursor = conn.execute("SELECT * FROM issuance ORDER BY id")
+        count = 0
+        with open(out_path, "w", encoding="utf-8", newline="") as f:
+            if out_path.lower().endswith(".json"):
+                rows = [dict(r) for r in cursor]
+                json.dump(rows, f, indent=2, ensure_ascii=False)
+                count = len(rows)
+            else:
+                writer = csv.writer(f)
+                writer.writerow(COLUMNS)
+                for r in cursor:
+                    writer.writerow([r[c] for c in COLUMNS])
+                    count += 1
+    finally:
+        conn.close()
+    return count
+
+def _print_rows(rows):
+    if not rows:
+        print("Nenhum registo encontrado.")
+        return
+    for r in rows:
+        print(f"{r['tracking_id'] or '-':<10} {r['client'] or '-':<28} {r['days'] or '-':>5}d "
+              f"{r['slots'] or '-':>3} slots  licença até {r['license_expires'] or '-'}  "
+              f"instalador até {r['installer_expires'] or '-'}  ({r['issued_at']})")
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if len(args) >= 2 and args[0] == "find":
+        _print_rows(find_by_tracking_id(args[1]))
+    elif len(args) >= 2 and args[0] == "client":
+        _print_rows(find_by_client(args[1]))
+    elif len(args) >= 3 and args[0] == "expiring":
+        _print_rows(expiring_between(args[1], args[2], installer="--installer" in args))
+    elif len(args) >= 2 and args[0] == "export":
+        print(f"✅ {export(args[1])} registos exportados para {args[1]}")
+    else:
+        print("Usage: python license_ledger.py find <tracking_id>")
+        print("       python license_ledger.py client <nome>")
+        print("       python license_ledger.py expiring <AAAA-MM-DD> <AAAA-MM-DD> [--installer]")
+        print("       python license_ledger.py export <ficheiro.csv|ficheiro.json>")
@@ -0,0 +1,554 @@
+import asyncio
+import json
+import random
+import sys
+import time
+from datetime import date
+
+import numpy as np
+
+import cafepoint_db
+
+# ==========================================
+# TESTE DE CARGA DO BACKEND (REST + SOCKET.IO)
+# ==========================================
+# Simula empregados de mesa contra um backend já arrancado (npm run dev /
+# npm start) sobre uma base sintética (synth_data.py: palavra-passe
+# "admin123", códigos synth-001, synth-002, ...).
+#
+# Cada utilizador virtual faz login uma vez e depois repete, com pausas
+# aleatórias (exponenciais, média --think), uma mistura de ações:
+#
+#   createOrder     POST  /api/orders                 (checkTrialLimit, stock, emit newOrder)
+#   updateStatus    PATCH /api/orders/:id/status      (PENDING -> ... -> PAID, emit orderUpdated)
+#   tableStatus     PATCH /api/tables/:id/status      (emit tableUpdated)
+#   listOrders      GET   /api/orders?status=PENDING,PREPARING
+#   reportStats     GET   /api/reports/stats?period=day
+#   reportHistory   GET   /api/reports/history
+#   reportAdvanced  GET   /api/reports/advanced       (com o admin do restaurante)
+#
+# A concorrência sobe por patamares (--ramp 5,10,25,50, --stage segundos
+# cada). Ao mesmo tempo, --listeners clientes Socket.IO (como os ecrãs da
+# cozinha/bar) recebem newOrder/orderUpdated/tableUpdated: o atraso de
+# entrega é medido desde o envio do pedido HTTP que gerou o evento, para
+# cada ouvinte; eventos que não chegam em EVENT_TIMEOUT contam como perdidos.
+#
+# Resultado por patamar: pedidos/s, erros, p50/p95/p99 por ação, atraso dos
+# eventos e histograma de latências; --out grava tudo em JSON, com a curva
+# segundo a segundo (concorrência, pedidos, erros, p95).
+#
+# Precisa do aiohttp e do python-socketio[asyncio_client] (só importados
+# aqui, ao arrancar o teste).
+#
+# Uso: python load_test.py [--url http://localhost:5000] [--ramp 5,10,25,50] [--stage 30]
+#        [--think 2] [--listeners 3] [--tenants N] [--mix createOrder=35,updateStatus=30,...]
+#        [--seed S] [--out resultados.json] [--db F]
+
+DEFAULT_URL = "http://localhost:5000"
+PASSWORD = "admin123"
+DEFAULT_RAMP = [5, 10, 25, 50]
+STAGE_SECONDS = 30
+THINK_SECONDS = 2.0
+LISTENERS = 3
+REQUEST_TIMEOUT = 30
+EVENT_TIMEOUT = 5.0
+
+MIX = {
+    "createOrder": 35,
+    "updateStatus": 30,
+    "tableStatus": 10,
+    "listOrders": 10,
+    "reportStats": 8,
+    "reportHistory": 5,
+    "reportAdvanced": 2,
+}
+STATUS_FLOW = ["PENDING", "PREPARING", "READY", "SERVED", "PAID"]
+TABLE_STATUSES = ["AVAILABLE", "OCCUPIED"]
+EVENTS = ("newOrder", "orderUpdated", "tableUpdated")
+QUANTILES = {"p50": 50, "p95": 95, "p99": 99}
+HISTOGRAM_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+def _import_clients(listeners):
+    try:
+        import aiohttp
+    except ImportError:
+        raise RuntimeError("O teste de carga precisa do aiohttp (pip install aiohttp)")
+    socketio = None
+    if listeners:
+        try:
+            import socketio
+        except ImportError:
+            raise RuntimeError("Os ouvintes Socket.IO precisam do python-socketio "
+                               "(pip install \"python-socketio[asyncio_client]\") ou use --listeners 0")
+    return aiohttp, socketio
+
+def synthetic_accounts(conn, tenants=None):
+    # Empregados e admin de cada restaurante sintético (o backend testado
+    # tem de estar a usar a mesma base)
+    rows = conn.execute("""
+        SELECT r.id, r.slug, u.username, u.role
+        FROM "User" u JOIN "Restaurant" r ON r.id = u.restaurantId
+        WHERE r.slug LIKE 'synth-%' AND u.role IN ('WAITER', 'ADMIN')
+        ORDER BY r.id, u.id
+    """).fetchall()
+    restaurants = {}
+    for rid, slug, username, role in rows:
+        tenant = restaurants.setdefault(rid, {"slug": slug, "waiters": [], "admin": None})
+        if role == "ADMIN":
+            tenant["admin"] = tenant["admin"] or username
+        else:
+            tenant["waiters"].append(username)
+    result = [t for t in restaurants.values() if t["waiters"]]
+    return result[:tenants] if tenants else result
+
+def parse_mix(text):
+    mix = dict(MIX)
+    for part in filter(None, (text or "").split(",")):
+        name, _, weight = part.partition("=")
+        if name not in MIX:
+            raise ValueError(f"Ação desconhecida na mistura: {name}")
+        mix[name] = float(weight)
+    return mix
+
+# ==========================================
+# REGISTO DAS MEDIDAS
+# ==========================================
+
+class Recorder:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.stage = 0
+        self.concurrency = 0
+        self.samples = []           # (patamar, ação, segundo, latência ms, ok)
+        self.errors = {}            # (ação, estado, mensagem) -> contagem
+        self.expected = {}          # chave do evento -> envio, patamar, ouvintes que já receberam, ok
+        self.deliveries = []        # (patamar, evento, atraso ms)
+        self.lost = {}              # (patamar, evento) -> entregas em falta
+        self.timeline = {}          # segundo -> concorrência
+        self.listeners = 0
+
+    def now(self):
+        return time.perf_counter() - self.start
+
+    def record(self, op, started, status, data):
+        ended = time.perf_counter()
+        ok = isinstance(status, int) and 200 <= status < 300
+        self.samples.append((self.stage, op, int(ended - self.start), (ended - started) * 1000, ok))
+        if not ok:
+            message = (data or {}).get("message") if isinstance(data, dict) else None
+            key = (op, str(status), (message or "")[:80])
+            self.errors[key] = self.errors.get(key, 0) + 1
+
+    def expect(self, key, sent):
+        self.expected[key] = {"sent": sent, "stage": self.stage, "seen": set(), "ok": None}
+
+    def confirm(self, key, ok):
+        entry = self.expected.get(key)
+        if entry is None:
+            return
+        if ok:
+            entry["ok"] = True
+        else:
+            del self.expected[key]
+
+    def delivered(self, key, listener):
+        entry = self.expected.get(key)
+        if entry is None or listener in entry["seen"]:
+            return
+        entry["seen"].add(listener)
+        self.deliveries.append((entry["stage"], key[0], (time.perf_counter() - entry["sent"]) * 1000))
+        if len(entry["seen"]) >= self.listeners and entry["ok"]:
+            del self.expected[key]
+
+    def sweep(self, force=False):
+        # Eventos de pedidos bem-sucedidos que não chegaram a todos os ouvintes
+        limit = time.perf_counter() - EVENT_TIMEOUT
+        for key, entry in list(self.expected.items()):
+            if force or entry["sent"] < limit:
+                if entry["ok"]:
+                    missing = self.listeners - len(entry["seen"])
+                    if missing > 0:
+                        lost_key = (entry["stage"], key[0])
+                        self.lost[lost_key] = self.lost.get(lost_key, 0) + missing
+                del self.expected[key]
+
+# ==========================================
+# CLIENTES
+# ==========================================
+
+class Tenant:
+    def __init__(self, account):
+        self.slug = account["slug"]
+        self.admin = account["admin"]
+        self.admin_token = None
+        self.tables = None
+        self.menu = None
+        self.lock = asyncio.Lock()
+
+class VirtualWaiter:
+    def __init__(self, client, tenant, username, rng):
+        self.client = client
+        self.tenant = tenant
+        self.username = username
+        self.rng = rng
+        self.token = None
+        self.user_id = None
+        self.open_orders = []       # [id, índice em STATUS_FLOW]
+
+    async def run(self, stop):
+        client = self.client
+        if not await self.login():
+            return
+        if not await client.load_tenant(self.tenant, self.token):
+            return
+        actions, weights = zip(*[(a, w) for a, w in client.mix.items() if w > 0])
+        while not stop.is_set():
+            action = self.rng.choices(actions, weights)[0]
+            await getattr(self, "do_" + action)()
+            try:
+                await asyncio.wait_for(stop.wait(), self.rng.expovariate(1 / client.think) if client.think else 0)
+            except asyncio.TimeoutError:
+                pass
+
+    async def login(self):
+        status, data = await self.client.request("login", "POST", "/api/auth/login", {
+            "username": self.username, "password": PASSWORD, "restaurantSlug": self.tenant.slug})
+        if status != 200:
+            return False
+        self.token = data["data"]["token"]
+        self.user_id = data["data"]["user"]["id"]
+        return True
+
+    async def do_createOrder(self):
+        table = self.rng.choice(self.tenant.tables)
+        items = self.rng.sample(self.tenant.menu, min(len(self.tenant.menu), self.rng.randint(1, 4)))
+        body = {"tableId": table, "items": [{"menuItemId": m, "quantity": self.rng.randint(1, 2)} for m in items]}
+        status, data = await self.client.request("createOrder", "POST", "/api/orders", body, self.token,
+                                                 ("newOrder", self.user_id, table))
+        if status == 201:
+            self.open_orders.append([data["data"]["id"], 0])
+
+    async def do_updateStatus(self):
+        if not self.open_orders:
+            return await self.do_createOrder()
+        order = self.open_orders[0]
+        order[1] += 1
+        status_name = STATUS_FLOW[order[1]]
+        status, _ = await self.client.request("updateStatus", "PATCH", f"/api/orders/{order[0]}/status",
+                                              {"status": status_name}, self.token,
+                                              ("orderUpdated", order[0], status_name))
+        if status_name == "PAID" or status != 200:
+            self.open_orders.pop(0)
+
+    async def do_tableStatus(self):
+        table = self.rng.choice(self.tenant.tables)
+        status_name = self.rng.choice(TABLE_STATUSES)
+        await self.client.request("tableStatus", "PATCH", f"/api/tables/{table}/status", {"status": status_name},
+                                  self.token, ("tableUpdated", table, status_name))
+
+    async def do_listOrders(self):
+        await self.client.request("listOrders", "GET", "/api/orders?status=PENDING,PREPARING", token=self.token)
+
+    async def do_reportStats(self):
+        await self.client.request("reportStats", "GET", "/api/reports/stats?period=day", token=self.token)
+
+    async def do_reportHistory(self):
+        await self.client.request("reportHistory", "GET", f"/api/reports/history?startDate={date.today()}",
+                                  token=self.token)
+
+    async def do_reportAdvanced(self):
+        tenant = self.tenant
+        if tenant.admin is None:
+            return await self.do_reportStats()
+        async with tenant.lock:
+            if tenant.admin_token is None:
+                status, data = await self.client.request("login", "POST", "/api/auth/login", {
+                    "username": tenant.admin, "password": PASSWORD, "restaurantSlug": tenant.slug})
+                if status != 200:
+                    tenant.admin = None
+                    return
+                tenant.admin_token = data["data"]["token"]
+        await self.client.request("reportAdvanced", "GET", "/api/reports/advanced", token=tenant.admin_token)
+
+class LoadClient:
+    def __init__(self, aiohttp, session, url, recorder, mix, think):
+        self.aiohttp = aiohttp
+        self.session = session
+        self.url = url.rstrip("/")
+        self.recorder = recorder
+        self.mix = mix
+        self.think = think
+
+    async def request(self, op, method, path, body=None, token=None, event=None):
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        started = time.perf_counter()
+        if event:
+            self.recorder.expect(event, started)
+        data = None
+        try:
+            async with self.session.request(method, self.url + path, json=body, headers=headers) as resp:
+                status = resp.status
+                try:
+                    data = await resp.json(content_type=None)
+                except ValueError:
+                    pass
+        except asyncio.TimeoutError:
+            status = "timeout"
+        except self.aiohttp.ClientError as e:
+            status, data = "connection", {"message": str(e)}
+        self.recorder.record(op, started, status, data)
+        if event:
+            self.recorder.confirm(event, isinstance(status, int) and 200 <= status < 300)
+        return status, data
+
+    async def load_tenant(self, tenant, token):
+        # Mesas e itens vendáveis, lidos uma vez por restaurante
+        async with tenant.lock:
+            if tenant.tables is None:
+                status, tables = await self.request("listTables", "GET", "/api/tables", token=token)
+                status_menu, menu = await self.request("menu", "GET", "/api/menu", token=token)
+                if status != 200 or status_menu != 200:
+                    return False
+                tenant.tables = [t["id"] for t in tables["data"]]
+                tenant.menu = [m["id"] for m in menu["data"]
+                               if m.get("itemType") != "INGREDIENT"
+                               and (m.get("stockQuantity") is None or m["stockQuantity"] > 10)]
+        return bool(tenant.tables and tenant.menu)
+
+async def _listen(socketio, url, recorder, index, connected):
+    sio = socketio.AsyncClient(reconnection=False)
+    keys = {
+        "newOrder": lambda p: ("newOrder", p.get("userId"), p.get("tableId")),
+        "orderUpdated": lambda p: ("orderUpdated", p.get("id"), p.get("status")),
+        "tableUpdated": lambda p: ("tableUpdated", p.get("id"), p.get("status")),
+    }
+    for event, key in keys.items():
+        sio.on(event, lambda payload, key=key: recorder.delivered(key(payload or {}), index))
+    await sio.connect(url, transports=["websocket"])
+    await sio.emit("joinKitchen")
+    connected.append(sio)
+
+async def _monitor(recorder, stop):
+    while not stop.is_set():
+        recorder.timeline[int(recorder.now())] = recorder.concurrency
+        recorder.sweep()
+        try:
+            await asyncio.wait_for(stop.wait(), 1)
+        except asyncio.TimeoutError:
+            pass
+
+async def run_load(accounts, url=DEFAULT_URL, ramp=DEFAULT_RAMP, stage_seconds=STAGE_SECONDS, think=THINK_SECONDS,
+                   listeners=LISTENERS, mix=MIX, seed=None, verbose=True):
+    aiohttp, socketio = _import_clients(listeners)
+    recorder = Recorder()
+    rng = random.Random(seed)
+    tenants = [Tenant(a) for a in accounts]
+    # Utilizadores virtuais distribuídos pelos restaurantes (um empregado pode
+    # aparecer em vários dispositivos se a rampa passar o número de contas)
+    slots = []
+    for i in range(max(len(t["waiters"]) for t in accounts)):
+        slots += [(tenant, a["waiters"][i]) for tenant, a in zip(tenants, accounts) if i < len(a["waiters"])]
+
+    connector = aiohttp.TCPConnector(limit=0)
+    timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        client = LoadClient(aiohttp, session, url, recorder, mix, think)
+        sockets = []
+        for i in range(listeners):
+            await _listen(socketio, client.url, recorder, i, sockets)
+        recorder.listeners = len(sockets)
+
+        done = asyncio.Event()
+        monitor = asyncio.create_task(_monitor(recorder, done))
+        running, stopped = [], []
+        try:
+            for stage, users in enumerate(ramp):
+                recorder.stage = stage
+                while len(running) < users:
+                    tenant, username = slots[len(running) % len(slots)]
+                    stop = asyncio.Event()
+                    waiter = VirtualWaiter(client, tenant, username, random.Random(rng.random()))
+                    running.append((stop, asyncio.create_task(waiter.run(stop))))
+                while len(running) > users:
+                    stop, task = running.pop()
+                    stop.set()
+                    stopped.append(task)
+                recorder.concurrency = users
+                if verbose:
+                    print(f"⏳ Patamar {stage + 1}/{len(ramp)}: {users} utilizadores durante {stage_seconds}s", file=sys.stderr)
+                await asyncio.sleep(stage_seconds)
+        finally:
+            for stop, _ in running:
+                stop.set()
+            await asyncio.gather(*stopped, *[task for _, task in running], return_exceptions=True)
+            done.set()
+            await monitor
+            # Última oportunidade para os eventos em trânsito
+            await asyncio.sleep(min(EVENT_TIMEOUT, 1.0) if sockets else 0)
+            recorder.sweep(force=True)
+            for sio in sockets:
+                await sio.disconnect()
+    return summarize(recorder, ramp, stage_seconds)
+
+# ==========================================
+# RESUMO
+# ==========================================
+
+def _percentiles(values):
+    if len(values) == 0:
+        return {name: None for name in QUANTILES}
+    points = np.percentile(values, list(QUANTILES.values()))
+    return {name: round(float(p), 1) for name, p in zip(QUANTILES, points)}
+
+def _histogram(values):
+    counts = np.bincount(np.searchsorted(HISTOGRAM_MS, values), minlength=len(HISTOGRAM_MS) + 1)
+    labels = [f"<={b}" for b in HISTOGRAM_MS] + [f">{HISTOGRAM_MS[-1]}"]
+    return dict(zip(labels, counts.tolist()))
+
+def summarize(recorder, ramp, stage_seconds):
+    samples = recorder.samples
+    stages_idx = np.array([s[0] for s in samples], dtype=np.int64)
+    ops = np.array([s[1] for s in samples], dtype=object)
+    seconds = np.array([s[2] for s in samples], dtype=np.int64)
+    latency = np.array([s[3] for s in samples], dtype=np.float64)
+    ok = np.array([s[4] for s in samples], dtype=bool)
+
+    stages = []
+    for stage, users in enumerate(ramp):
+        in_stage = stages_idx == stage
+        operations = {}
+        for op in sorted(set(ops[in_stage])):
+            mask = in_stage & (ops == op)
+            values = latency[mask & ok]
+            operations[op] = {"count": int(mask.sum()), "errors": int((mask & ~ok).sum()),
+                              **_percentiles(values), "max": round(float(values.max()), 1) if len(values) else None,
+                              "histogram": _histogram(values)}
+        fanout = {}
+        for event in EVENTS:
+            delays = [d for s, e, d in recorder.deliveries if s == stage and e == event]
+            lost = recorder.lost.get((stage, event), 0)
+            if delays or lost:
+                fanout[event] = {"deliveries": len(delays), "lost": lost, **_percentiles(delays)}
+        requests = int(in_stage.sum())
+        stages.append({
+            "concurrency": users,
+            "seconds": stage_seconds,
+            "requests": requests,
+            "requestsPerSecond": round(requests / stage_seconds, 1),
+            "errors": int((in_stage & ~ok).sum()),
+            "operations": operations,
+            "fanout": fanout,
+        })
+
+    timeline = []
+    for second in sorted(recorder.timeline):
+        mask = seconds == second
+        values = latency[mask & ok]
+        timeline.append({"second": second, "concurrency": recorder.timeline[second], "requests": int(mask.sum()),
+                         "errors": int((mask & ~ok).sum()), "p95": _percentiles(values)["p95"]})
+
+    errors = [{"operation": op, "status": status, "message": message, "count": count}
+              for (op, status, message), count in sorted(recorder.errors.items(), key=lambda e: -e[1])]
+    return {"listeners": recorder.listeners, "stages": stages, "timeline": timeline, "errors": errors,
+            "saturation": _saturation(stages)}
+
+def _saturation(stages):
+    # Primeiro patamar em que o p95 de createOrder passa o dobro do primeiro
+    # patamar ou os erros passam 1%
+    base = None
+    for stage in stages:
+        p95 = stage["operations"].get("createOrder", {}).get("p95")
+        if base is None:
+            base = p95
+        failed = stage["requests"] and stage["errors"] / stage["requests"] > 0.01
+        if failed or (base and p95 and p95 > 2 * base):
+            return stage["concurrency"]
+    return None
+
+def _fmt(value):
+    return "-" if value is None else f"{value:.0f}" if value >= 100 else f"{value:.1f}"
+
+def print_report(result):
+    for stage in result["stages"]:
+        error_pct = stage["errors"] / stage["requests"] * 100 if stage["requests"] else 0
+        print(f"\n👥 {stage['concurrency']} utilizadores: {stage['requestsPerSecond']} pedidos/s, "
+              f"{stage['errors']} erros ({error_pct:.1f}%)")
+        print(f"   {'ação':<15} {'n':>6} {'erros':>6} {'p50':>7} {'p95':>7} {'p99':>7} {'máx':>7}  (ms)")
+        for op, s in stage["operations"].items():
+            print(f"   {op:<15} {s['count']:>6} {s['errors']:>6} {_fmt(s['p50']):>7} {_fmt(s['p95']):>7} "
+                  f"{_fmt(s['p99']):>7} {_fmt(s['max']):>7}")
+        for event, s in stage["fanout"].items():
+            print(f"   📡 {event:<13} {s['deliveries']:>6} entregas, {s['lost']} perdidas, "
+                  f"atraso p50 {_fmt(s['p50'])} / p95 {_fmt(s['p95'])} / p99 {_fmt(s['p99'])} ms")
+
+    print("\n📈 Débito e p95 de createOrder por patamar:")
+    peak = max([s["requestsPerSecond"] for s in result["stages"]] + [1])
+    for stage in result["stages"]:
+        bar = "█" * int(round(stage["requestsPerSecond"] / peak * 40))
+        p95 = stage["operations"].get("createOrder", {}).get("p95")
+        print(f"   {stage['concurrency']:>5} {bar:<40} {stage['requestsPerSecond']:>7} /s  p95 {_fmt(p95)} ms")
+
+    if result["stages"]:
+        last = result["stages"][-1]
+        print(f"\n📊 Histograma de latências no último patamar ({last['concurrency']} utilizadores):")
+        totals = {}
+        for s in last["operations"].values():
+            for label, count in s["histogram"].items():
+                totals[label] = totals.get(label, 0) + count
+        top = max(list(totals.values()) + [1])
+        for label, count in totals.items():
+            print(f"   {label:>8} ms {'█' * int(round(count / top * 40)):<40} {count}")
+
+    for error in result["errors"][:10]:
+        print(f"❌ {error['operation']} [{error['status']}] x{error['count']}: {error['message']}")
+    if result["saturation"]:
+        print(f"⚠️  Saturação a partir de {result['saturation']} utilizadores (p95 de createOrder a dobrar ou >1% de erros)")
+
+def _pop_option(args, name):
+    if name in args:
+        i = args.index(name)
+        value = args[i + 1]
+        del args[i:i + 2]
+        return value
+    return None
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    db_path = _pop_option(args, "--db")
+    url = _pop_option(args, "--url") or DEFAULT_URL
+    ramp = _pop_option(args, "--ramp")
+    stage = _pop_option(args, "--stage")
+    think = _pop_option(args, "--think")
+    listeners = _pop_option(args, "--listeners")
+    tenants = _pop_option(args, "--tenants")
+    mix_text = _pop_option(args, "--mix")
+    seed = _pop_option(args, "--seed")
+    out_path = _pop_option(args, "--out")
+
+    if args:
+        print("Usage: python load_test.py [--url URL] [--ramp 5,10,25,50] [--stage SECONDS] [--think SECONDS]")
+        print("       [--listeners N] [--tenants N] [--mix createOrder=35,updateStatus=30,...] [--seed S] [--out FILE.json] [--db FILE]")
+        sys.exit(1)
+
+    accounts = synthetic_accounts(cafepoint_db.connect(db_path, readonly=True), int(tenants) if tenants else None)
+    if not accounts:
+        print("❌ Nenhum restaurante sintético (synth-NNN) com empregados nesta base (ver: synth_data.py)")
+        sys.exit(1)
+    try:
+        result = asyncio.run(run_load(
+            accounts, url,
+            [int(n) for n in ramp.split(",")] if ramp else DEFAULT_RAMP,
+            int(stage) if stage else STAGE_SECONDS,
+            float(think) if think is not None else THINK_SECONDS,
+            int(listeners) if listeners is not None else LISTENERS,
+            parse_mix(mix_text),
+            int(seed) if seed else None
+        ))
+    except (RuntimeError, ValueError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    print_report(result)
+    if out_path:
+        with open(out_path, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+        print(f"📝 Resultados gravados em {out_path}")
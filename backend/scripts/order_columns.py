@@ -0,0 +1,402 @@
+import json
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+import cafepoint_db
+
+# ==========================================
+# SNAPSHOT COLUNAR DOS PEDIDOS (NUMPY + MEMMAP)
+# ==========================================
+# Guarda Order/OrderItem em colunas binárias de largura fixa (uma por ficheiro)
+# que se abrem com np.memmap, sem cópia: perguntas como "receita por hora e
+# por mesa nos últimos 90 dias" fazem-se com máscaras e np.bincount sobre anos
+# de pedidos em milissegundos, sem SQL nem objetos.
+#
+#   columns/meta.json          tamanhos, tipos, marcas e dicionários
+#   columns/orders/<col>.bin   id, restaurantId, tableId, userId, status,
+#                              total, createdAt, day (dia local), hour
+#   columns/items/<col>.bin    id, order (linha em orders), menuItemId,
+#                              product, category, quantity, price
+#
+# Estado, produto e categoria são códigos em dicionários (meta.json); mesas
+# e empregados são ids com o rótulo atual no meta. O dia e a hora são os
+# locais (como o backend os mostra), calculados na construção.
+#
+# Atualização incremental: pedidos e itens com id acima da marca são
+# acrescentados no fim dos ficheiros; pedidos antigos com updatedAt recente
+# (mudança de estado/total) são corrigidos no sítio. O meta.json é gravado no
+# fim: um processo que caia a meio deixa bytes a mais que a próxima execução
+# corta. Pedidos que saiam da base (ex.: cold_archive) continuam no snapshot.
+#
+# API:
+#   order_columns.update(conn)
+#   snapshot = order_columns.load()
+#   order_columns.query(snapshot, restaurant_id, ["hour", "table"], "revenue", days=90)
+#
+# CLI:
+#   python order_columns.py update [--rebuild] [--db F] [--dir D]
+#   python order_columns.py query <restaurantId> [--by hour,table] [--metric revenue|orders|quantity]
+#          [--days N | --from AAAA-MM-DD --to AAAA-MM-DD] [--status PAID,SERVED] [--top N] [--json]
+
+COLUMNS_DIR = "columns"
+FETCH_ROWS = 100000
+OVERLAP_MS = 10 * 60 * 1000
+
+ORDER_COLUMNS = {
+    "id": "<i8", "restaurantId": "<i4", "tableId": "<i4", "userId": "<i4", "status": "u1",
+    "total": "<f8", "createdAt": "<i8", "day": "<i4", "hour": "u1",
+}
+ITEM_COLUMNS = {
+    "id": "<i8", "order": "<i4", "menuItemId": "<i4", "product": "<i4", "category": "<i2",
+    "quantity": "<i4", "price": "<f8",
+}
+WEEKDAYS = ["Seg", "Ter", "Qua", "Qui", "Sex", "Sáb", "Dom"]
+ORDER_KEYS = ("hour", "weekday", "day", "month", "table", "waiter", "status")
+ITEM_KEYS = ("product", "category")
+METRICS = ("revenue", "orders", "quantity")
+
+# Segundos "locais" desde 1970: dia e hora locais saem por divisão
+LOCAL_SECONDS_SQL = "CAST(strftime('%s', {} / 1000, 'unixepoch', 'localtime') AS INTEGER)"
+
+def columns_dir(conn_or_path=None, directory=None):
+    if directory:
+        return directory
+    path = conn_or_path if isinstance(conn_or_path, str) or conn_or_path is None else cafepoint_db.database_file(conn_or_path)
+    path = path or cafepoint_db.default_db_path()
+    return os.path.join(os.path.dirname(os.path.abspath(path)), COLUMNS_DIR)
+
+def _column_path(directory, group, name):
+    return os.path.join(directory, group, name + ".bin")
+
+def _empty_meta():
+    return {
+        "version": 1,
+        "orders": 0, "items": 0,
+        "lastOrderId": 0, "lastItemId": 0, "lastUpdatedAt": 0,
+        "statuses": [], "products": [], "categories": [],
+        "tables": {}, "waiters": {},
+    }
+
+def _load_meta(directory):
+    path = os.path.join(directory, "meta.json")
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def _save_meta(directory, meta):
+    path = os.path.join(directory, "meta.json")
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+    os.replace(path + ".tmp", path)
+
+def _open_column(directory, group, name, dtype, length, mode="r"):
+    if length == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(_column_path(directory, group, name), dtype=dtype, mode=mode, shape=(length,))
+
+# ==========================================
+# CONSTRUÇÃO / ATUALIZAÇÃO
+# ==========================================
+
+def _codes(dictionary, values):
+    # Dicionário que só cresce: os códigos antigos nunca mudam
+    index = {v: i for i, v in enumerate(dictionary)}
+    codes = np.empty(len(values), dtype=np.int64)
+    for i, value in enumerate(values):
+        code = index.get(value)
+        if code is None:
+            code = index[value] = len(dictionary)
+            dictionary.append(value)
+        codes[i] = code
+    return codes
+
+def _append(directory, group, columns, arrays, length):
+    # Corta bytes de uma execução interrompida e acrescenta no fim
+    for name, dtype in columns.items():
+        path = _column_path(directory, group, name)
+        size = length * np.dtype(dtype).itemsize
+        with open(path, "ab") as f:
+            if f.tell() != size:
+                f.truncate(size)
+            f.write(np.ascontiguousarray(arrays[name], dtype=dtype).tobytes())
+
+def _fetch_orders(conn, meta):
+    local = LOCAL_SECONDS_SQL.format("createdAt")
+    cursor = conn.execute(f"""
+        SELECT id, restaurantId, tableId, userId, status, totalAmount, createdAt, {local}
+        FROM "Order" WHERE id > ? ORDER BY id
+    """, (meta["lastOrderId"],))
+    while True:
+        rows = cursor.fetchmany(FETCH_ROWS)
+        if not rows:
+            break
+        ids, restaurants, tables, users, statuses, totals, created, local_s = zip(*rows)
+        local_s = np.array(local_s, dtype=np.int64)
+        yield {
+            "id": np.array(ids, dtype=np.int64),
+            "restaurantId": np.array(restaurants, dtype=np.int32),
+            "tableId": np.array(tables, dtype=np.int32),
+            "userId": np.array(users, dtype=np.int32),
+            "status": _codes(meta["statuses"], statuses),
+            "total": np.array(totals, dtype=np.float64),
+            "createdAt": np.array(created, dtype=np.int64),
+            "day": local_s // 86400,
+            "hour": (local_s % 86400) // 3600,
+        }
+
+def _fetch_items(conn, meta, order_ids):
+    cursor = conn.execute("""
+        SELECT oi.id, oi.orderId, oi.menuItemId, COALESCE(m.name, 'Item Removido'), COALESCE(m.category, ''),
+               oi.quantity, oi.price
+        FROM "OrderItem" oi LEFT JOIN "MenuItem" m ON m.id = oi.menuItemId
+        WHERE oi.id > ? ORDER BY oi.id
+    """, (meta["lastItemId"],))
+    while True:
+        rows = cursor.fetchmany(FETCH_ROWS)
+        if not rows:
+            break
+        ids, orders, menu_ids, names, categories, quantities, prices = zip(*rows)
+        orders = np.array(orders, dtype=np.int64)
+        positions = np.searchsorted(order_ids, orders)
+        found = (positions < len(order_ids)) & (order_ids[np.minimum(positions, len(order_ids) - 1)] == orders)
+        yield found, {
+            "id": np.array(ids, dtype=np.int64),
+            "order": positions,
+            "menuItemId": np.array(menu_ids, dtype=np.int32),
+            "product": _codes(meta["products"], names),
+            "category": _codes(meta["categories"], categories),
+            "quantity": np.array(quantities, dtype=np.int32),
+            "price": np.array(prices, dtype=np.float64),
+        }
+
+def _refresh_changed(conn, directory, meta):
+    # Mudanças de estado/total em pedidos já no snapshot
+    if meta["orders"] == 0:
+        return 0
+    rows = conn.execute("""
+        SELECT id, status, totalAmount FROM "Order"
+        WHERE updatedAt >= ? AND id <= ?
+    """, (meta["lastUpdatedAt"] - OVERLAP_MS, meta["lastOrderId"])).fetchall()
+    if not rows:
+        return 0
+    ids, statuses, totals = zip(*rows)
+    order_ids = _open_column(directory, "orders", "id", ORDER_COLUMNS["id"], meta["orders"])
+    positions = np.searchsorted(order_ids, np.array(ids, dtype=np.int64))
+    status_col = _open_column(directory, "orders", "status", ORDER_COLUMNS["status"], meta["orders"], "r+")
+    total_col = _open_column(directory, "orders", "total", ORDER_COLUMNS["total"], meta["orders"], "r+")
+    status_col[positions] = _codes(meta["statuses"], statuses)
+    total_col[positions] = np.array(totals, dtype=np.float64)
+    status_col.flush()
+    total_col.flush()
+    return len(rows)
+
+def update(conn, directory=None, rebuild=False):
+    start_time = time.perf_counter()
+    directory = columns_dir(conn, directory)
+    meta = None if rebuild else _load_meta(directory)
+    if meta is None:
+        meta = _empty_meta()
+        for group, columns in (("orders", ORDER_COLUMNS), ("items", ITEM_COLUMNS)):
+            os.makedirs(os.path.join(directory, group), exist_ok=True)
+            for name in columns:
+                open(_column_path(directory, group, name), "wb").close()
+
+    # Tudo dentro da mesma transação de leitura (pedidos e itens coerentes)
+    conn.execute("BEGIN")
+    try:
+        max_updated = conn.execute('SELECT MAX(updatedAt) FROM "Order"').fetchone()[0] or 0
+        changed = _refresh_changed(conn, directory, meta)
+
+        new_orders = 0
+        for chunk in _fetch_orders(conn, meta):
+            _append(directory, "orders", ORDER_COLUMNS, chunk, meta["orders"])
+            meta["orders"] += len(chunk["id"])
+            meta["lastOrderId"] = int(chunk["id"][-1])
+            new_orders += len(chunk["id"])
+
+        order_ids = _open_column(directory, "orders", "id", ORDER_COLUMNS["id"], meta["orders"])
+        new_items = 0
+        for found, chunk in _fetch_items(conn, meta, order_ids):
+            meta["lastItemId"] = int(chunk["id"][-1])
+            chunk = {name: values[found] for name, values in chunk.items()}
+            _append(directory, "items", ITEM_COLUMNS, chunk, meta["items"])
+            meta["items"] += len(chunk["id"])
+            new_items += len(chunk["id"])
+
+        meta["tables"] = {str(i): n for i, n in conn.execute('SELECT id, number FROM "Table"')}
+        meta["waiters"] = {str(i): n for i, n in conn.execute('SELECT id, name FROM "User"')}
+    finally:
+        conn.execute("COMMIT")
+    meta["lastUpdatedAt"] = max(meta["lastUpdatedAt"], max_updated)
+    _save_meta(directory, meta)
+    return {
+        "orders": new_orders,
+        "items": new_items,
+        "changed": changed,
+        "totalOrders": meta["orders"],
+        "totalItems": meta["items"],
+        "seconds": time.perf_counter() - start_time,
+    }
+
+# ==========================================
+# LEITURA E CONSULTAS
+# ==========================================
+
+def load(directory=None):
+    directory = columns_dir(None, directory)
+    meta = _load_meta(directory)
+    if meta is None:
+        raise FileNotFoundError(f"Snapshot colunar não encontrado em {directory} (correr: order_columns.py update)")
+    return {
+        "meta": meta,
+        "orders": {n: _open_column(directory, "orders", n, d, meta["orders"]) for n, d in ORDER_COLUMNS.items()},
+        "items": {n: _open_column(directory, "items", n, d, meta["items"]) for n, d in ITEM_COLUMNS.items()},
+    }
+
+def _day_number(day):
+    return (day - date(1970, 1, 1)).days
+
+def _key_codes(snapshot, key, rows, days):
+    # (códigos 0..n-1, rótulos) de uma chave para as linhas de pedido escolhidas
+    orders, meta = snapshot["orders"], snapshot["meta"]
+    if key == "hour":
+        return orders["hour"][rows].astype(np.int64), [f"{h:02d}h" for h in range(24)]
+    if key == "weekday":
+        return (days + 3) % 7, WEEKDAYS                    # 1970-01-01 foi quinta-feira
+    if key in ("day", "month"):
+        values = days if key == "day" else days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+        first = int(values.min()) if len(values) else 0
+        size = int(values.max()) - first + 1 if len(values) else 0
+        unit = "D" if key == "day" else "M"
+        labels = [str(np.datetime64(first + i, unit)) for i in range(size)]
+        return values - first, labels
+    if key in ("table", "waiter"):
+        column = orders["tableId" if key == "table" else "userId"][rows]
+        unique, codes = np.unique(column, return_inverse=True)
+        names = meta["tables" if key == "table" else "waiters"]
+        labels = [f"Mesa {names.get(str(i), i)}" if key == "table" else names.get(str(i), f"#{i}") for i in unique]
+        return codes, labels
+    if key == "status":
+        return orders["status"][rows].astype(np.int64), meta["statuses"]
+    raise ValueError(f"Chave desconhecida: {key}")
+
+def query(snapshot, restaurant_id, by=("hour",), metric="revenue", start_day=None, end_day=None,
+          days=None, statuses=("PAID",), top=None):
+    if metric not in METRICS:
+        raise ValueError(f"Métrica desconhecida: {metric}")
+    meta, orders, items = snapshot["meta"], snapshot["orders"], snapshot["items"]
+    if days:
+        end_day = end_day or date.today()
+        start_day = end_day - timedelta(days=days - 1)
+
+    # 1. Pedidos do restaurante, período e estados pedidos
+    mask = orders["restaurantId"] == restaurant_id
+    if start_day:
+        mask &= orders["day"] >= _day_number(start_day)
+    if end_day:
+        mask &= orders["day"] <= _day_number(end_day)
+    if statuses:
+        codes = [meta["statuses"].index(s) for s in statuses if s in meta["statuses"]]
+        mask &= np.isin(orders["status"], codes)
+    rows = np.flatnonzero(mask)
+
+    # 2. Com chaves de produto/categoria, a unidade passa a ser o item
+    item_level = any(k in ITEM_KEYS for k in by) or metric == "quantity"
+    if item_level:
+        selected = np.zeros(len(mask), dtype=bool)
+        selected[rows] = True
+        item_rows = np.flatnonzero(selected[items["order"]])
+        order_rows = items["order"][item_rows]
+    else:
+        order_rows = rows
+
+    keys, labels, sizes = [], [], []
+    for key in by:
+        if key in ITEM_KEYS:
+            codes = items[key][item_rows].astype(np.int64)
+            names = meta["products" if key == "product" else "categories"]
+        else:
+            codes, names = _key_codes(snapshot, key, order_rows, orders["day"][order_rows].astype(np.int64))
+        keys.append(codes)
+        labels.append(names)
+        sizes.append(max(len(names), 1))
+
+    # 3. Agregação: chave composta -> np.bincount
+    flat = np.ravel_multi_index(keys, sizes) if keys else np.zeros(len(order_rows), dtype=np.int64)
+    if metric == "revenue":
+        weights = (items["quantity"][item_rows] * items["price"][item_rows]) if item_level else orders["total"][order_rows]
+    elif metric == "quantity":
+        weights = items["quantity"][item_rows].astype(np.float64)
+    else:
+        if item_level:
+            # Pedidos distintos por grupo (um pedido com 3 linhas do mesmo produto conta 1)
+            flat = np.unique(flat * len(orders["id"]) + order_rows) // len(orders["id"])
+        weights = None
+    uniq, inverse = np.unique(flat, return_inverse=True)
+    values = np.bincount(inverse, weights=weights, minlength=len(uniq))
+
+    result = []
+    for code, value in zip(np.array(np.unravel_index(uniq, sizes)).T if keys else [[]] * len(uniq), values):
+        result.append({"key": [labels[i][c] for i, c in enumerate(code)],
+                       metric: float(value) if metric == "revenue" else int(value)})
+    if any(k in ("product", "category", "table", "waiter") for k in by):
+        result.sort(key=lambda r: -r[metric])
+    return result[:top] if top else result
+
+def _pop_option(args, name):
+    if name in args:
+        i = args.index(name)
+        value = args[i + 1]
+        del args[i:i + 2]
+        return value
+    return None
+
+def print_rows(rows, by, metric):
+    width = max([len(" / ".join(map(str, r["key"]))) for r in rows] + [len(" / ".join(by))])
+    print(f"{' / '.join(by):<{width}}  {metric:>14}")
+    for r in rows:
+        value = f"{r[metric]:,.2f}" if metric == "revenue" else f"{r[metric]:,}"
+        print(f"{' / '.join(map(str, r['key'])):<{width}}  {value:>14}")
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    db_path = _pop_option(args, "--db")
+    directory = _pop_option(args, "--dir")
+    by = (_pop_option(args, "--by") or "hour").split(",")
+    metric = _pop_option(args, "--metric") or "revenue"
+    days = _pop_option(args, "--days")
+    start_text = _pop_option(args, "--from")
+    end_text = _pop_option(args, "--to")
+    statuses = (_pop_option(args, "--status") or "PAID").split(",")
+    top = _pop_option(args, "--top")
+    flags = {a for a in args if a in ("--rebuild", "--json")}
+    args = [a for a in args if a not in flags]
+
+    if args == ["update"]:
+        conn = cafepoint_db.connect(db_path, readonly=True)
+        result = update(conn, columns_dir(db_path, directory), "--rebuild" in flags)
+        print(f"✅ Snapshot colunar: +{result['orders']} pedidos, +{result['items']} itens, "
+              f"{result['changed']} alterados ({result['totalOrders']} pedidos no total) em {result['seconds'] * 1000:.0f} ms")
+    elif len(args) == 2 and args[0] == "query" and metric in METRICS:
+        snapshot = load(columns_dir(db_path, directory))
+        start_time = time.perf_counter()
+        rows = query(snapshot, int(args[1]), by, metric,
+                     cafepoint_db.parse_date(start_text).date() if start_text else None,
+                     cafepoint_db.parse_date(end_text).date() if end_text else None,
+                     int(days) if days else None, statuses, int(top) if top else None)
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        if "--json" in flags:
+            print(json.dumps({"success": True, "data": rows}, indent=2, ensure_ascii=False))
+        else:
+            print_rows(rows, by, metric)
+        print(f"⏱️  {elapsed_ms:.1f} ms ({snapshot['meta']['orders']} pedidos no snapshot)", file=sys.stderr)
+    else:
+        print("Usage: python order_columns.py update [--rebuild] [--db FILE] [--dir DIR]")
+        print("       python order_columns.py query <restaurantId> [--by hour,table] [--metric revenue|orders|quantity]")
+        print("              [--days N | --from AAAA-MM-DD --to AAAA-MM-DD] [--status PAID,SERVED] [--top N] [--json]")
+        sys.exit(1)
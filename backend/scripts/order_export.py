@@ -0,0 +1,246 @@
+import csv
+import json
+import os
+import sys
+import time
+
+import cafepoint_db
+
+# ==========================================
+# EXPORTAÇÃO DO HISTÓRICO DE PEDIDOS EM STREAMING
+# ==========================================
+# Uma linha por item de pedido (Order + OrderItem + MenuItem + Table/Location
+# + User), lida com um cursor e escrita em lotes de tamanho fixo. Nada é
+# acumulado: a memória fica igual para um dia ou para um ano inteiro (o
+# reportController.getOrderHistory carrega tudo e corta em 500 pedidos).
+#
+# Formatos: csv, ndjson (uma linha JSON por item) e parquet (só se o pyarrow
+# estiver instalado; cada lote é um row group). As datas saem como no JSON do
+# backend (toISOString) em csv/ndjson e como timestamp UTC em parquet.
+# Pedidos sem itens saem numa linha com os campos do item vazios.
+#
+# API:
+#   order_export.export(conn, restaurant_id, "out.csv", "csv", start_ms, end_ms)
+#
+# Uso: python order_export.py <restaurantId> <saida|-> [--format csv|ndjson|parquet]
+#        [--from AAAA-MM-DD] [--to AAAA-MM-DD] [--status S] [--batch N] [--delimiter ;] [--archive] [--db F]
+
+BATCH_ROWS = 5000
+FORMATS = ("csv", "ndjson", "parquet")
+ISO_SQL = "strftime('%Y-%m-%dT%H:%M:%fZ', {} / 1000.0, 'unixepoch')"
+
+# Nome da coluna, expressão SQL e tipo em parquet
+COLUMNS = [
+    ("orderId", "o.id", "int64"),
+    ("createdAt", "o.createdAt", "timestamp"),
+    ("status", "o.status", "string"),
+    ("tableNumber", "t.number", "int64"),
+    ("location", "l.name", "string"),
+    ("waiter", "u.name", "string"),
+    ("orderTotal", "o.totalAmount", "float64"),
+    ("itemId", "oi.id", "int64"),
+    ("menuItemId", "oi.menuItemId", "int64"),
+    ("product", "m.name", "string"),
+    ("category", "m.category", "string"),
+    ("course", "oi.course", "string"),
+    ("quantity", "oi.quantity", "int64"),
+    ("unitPrice", "oi.price", "float64"),
+    ("lineTotal", "oi.quantity * oi.price", "float64"),
+    ("notes", "oi.notes", "string"),
+]
+
+def _select(raw_dates):
+    parts = []
+    for name, expression, kind in COLUMNS:
+        if kind == "timestamp" and not raw_dates:
+            expression = ISO_SQL.format(expression)
+        parts.append(f'{expression} AS "{name}"')
+    return ",\n               ".join(parts)
+
+def order_rows(conn, restaurant_id, start=None, end=None, status=None, raw_dates=False, batch=BATCH_ROWS):
+    # Gera listas de tuplos (no máximo `batch` de cada vez), por ordem de data
+    where = ["o.restaurantId = ?"]
+    params = [restaurant_id]
+    if start is not None:
+        where.append("o.createdAt >= ?")
+        params.append(start)
+    if end is not None:
+        where.append("o.createdAt <= ?")
+        params.append(end)
+    if status:
+        where.append("o.status = ?")
+        params.append(status)
+
+    cursor = conn.execute(f"""
+        SELECT {_select(raw_dates)}
+        FROM "Order" o
+        LEFT JOIN "OrderItem" oi ON oi.orderId = o.id
+        LEFT JOIN "MenuItem" m ON m.id = oi.menuItemId
+        LEFT JOIN "Table" t ON t.id = o.tableId
+        LEFT JOIN "Location" l ON l.id = t.locationId
+        LEFT JOIN "User" u ON u.id = o.userId
+        WHERE {" AND ".join(where)}
+        ORDER BY o.createdAt, o.id, oi.id
+    """, params)
+    cursor.arraysize = batch
+    while True:
+        rows = cursor.fetchmany()
+        if not rows:
+            break
+        yield rows
+
+# ==========================================
+# ESCRITORES (um lote de cada vez)
+# ==========================================
+
+class CsvWriter:
+    def __init__(self, out, delimiter=","):
+        self.writer = csv.writer(out, delimiter=delimiter, lineterminator="\n")
+        self.writer.writerow([name for name, _, _ in COLUMNS])
+
+    def write(self, rows):
+        self.writer.writerows(rows)
+
+    def close(self):
+        pass
+
+class NdjsonWriter:
+    def __init__(self, out):
+        self.out = out
+        self.names = [name for name, _, _ in COLUMNS]
+
+    def write(self, rows):
+        self.out.write("".join(json.dumps(dict(zip(self.names, row)), ensure_ascii=False) + "\n" for row in rows))
+
+    def close(self):
+        pass
+
+class ParquetWriter:
+    def __init__(self, path):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("O formato parquet precisa do pyarrow (pip install pyarrow)")
+        types = {"int64": pa.int64(), "float64": pa.float64(), "string": pa.string(),
+                 "timestamp": pa.timestamp("ms", tz="UTC")}
+        self.pa = pa
+        self.schema = pa.schema([(name, types[kind]) for name, _, kind in COLUMNS])
+        self.writer = pq.ParquetWriter(path, self.schema, compression="snappy")
+
+    def write(self, rows):
+        columns = list(zip(*rows))
+        arrays = [self.pa.array(values, type=field.type) for values, field in zip(columns, self.schema)]
+        self.writer.write_table(self.pa.Table.from_arrays(arrays, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def export(conn, restaurant_id, out_path, fmt="csv", start=None, end=None, status=None,
+           batch=BATCH_ROWS, delimiter=",", verbose=True):
+    if fmt not in FORMATS:
+        raise ValueError(f"Formato desconhecido: {fmt}")
+    if fmt == "parquet" and out_path == "-":
+        raise ValueError("O formato parquet precisa de um ficheiro de saída")
+
+    start_time = time.perf_counter()
+    out = None
+    if fmt == "parquet":
+        writer = ParquetWriter(out_path + ".tmp")
+    else:
+        out = sys.stdout if out_path == "-" else open(out_path + ".tmp", "w", encoding="utf-8", newline="")
+        writer = CsvWriter(out, delimiter) if fmt == "csv" else NdjsonWriter(out)
+
+    rows = orders = 0
+    last_order = None
+    try:
+        for chunk in order_rows(conn, restaurant_id, start, end, status, raw_dates=fmt == "parquet", batch=batch):
+            writer.write(chunk)
+            rows += len(chunk)
+            for row in chunk:
+                if row[0] != last_order:
+                    orders += 1
+                    last_order = row[0]
+            if verbose:
+                elapsed = time.perf_counter() - start_time
+                print(f"\r⏳ {rows} linhas ({rows / elapsed:,.0f}/s)", end="", file=sys.stderr, flush=True)
+        writer.close()
+    except BaseException:
+        if out_path != "-" and os.path.exists(out_path + ".tmp"):
+            if out is not None:
+                out.close()
+            os.remove(out_path + ".tmp")
+        raise
+    finally:
+        if out is not None and out is not sys.stdout:
+            out.close()
+    if out_path != "-":
+        # Só substitui o ficheiro final quando a exportação acabou bem
+        os.replace(out_path + ".tmp", out_path)
+    if verbose and rows:
+        print(file=sys.stderr)
+
+    elapsed = time.perf_counter() - start_time
+    return {
+        "rows": rows,
+        "orders": orders,
+        "seconds": elapsed,
+        "rowsPerSecond": rows / elapsed if elapsed > 0 else 0,
+        "peakMemoryMb": _peak_rss_mb(),
+        "bytes": os.path.getsize(out_path) if out_path != "-" else None,
+    }
+
+def print_result(result, out_path):
+    target = "stdout" if out_path == "-" else f"{out_path} ({result['bytes'] / (1024 * 1024):.1f} MB)"
+    peak = result["peakMemoryMb"]
+    print(f"✅ {result['rows']} linhas de {result['orders']} pedidos -> {target} em {result['seconds']:.1f}s "
+          f"({result['rowsPerSecond']:,.0f} linhas/s" + (f", pico de memória {peak:.1f} MB)" if peak else ")"),
+          file=sys.stderr)
+
+def _pop_option(args, name):
+    if name in args:
+        i = args.index(name)
+        value = args[i + 1]
+        del args[i:i + 2]
+        return value
+    return None
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    db_path = _pop_option(args, "--db")
+    fmt = _pop_option(args, "--format") or "csv"
+    start_text = _pop_option(args, "--from")
+    end_text = _pop_option(args, "--to")
+    status = _pop_option(args, "--status")
+    batch = _pop_option(args, "--batch")
+    delimiter = _pop_option(args, "--delimiter") or ","
+    use_archive = "--archive" in args
+    args = [a for a in args if a != "--archive"]
+
+    if len(args) != 2 or fmt not in FORMATS:
+        print("Usage: python order_export.py <restaurantId> <out|-> [--format csv|ndjson|parquet] [--from AAAA-MM-DD] [--to AAAA-MM-DD]")
+        print("       [--status S] [--batch N] [--delimiter ;] [--archive] [--db FILE]")
+        sys.exit(1)
+
+    restaurant_id = int(args[0])
+    start = cafepoint_db.to_ms(start_text) if start_text else None
+    end = cafepoint_db.day_range(*[cafepoint_db.parse_date(end_text).date()] * 2)[1] if end_text else None
+    conn = cafepoint_db.connect(db_path, readonly=True)
+    if use_archive:
+        import cold_archive
+        cold_archive.attach_archives(conn, start, end, restaurant_id)
+
+    try:
+        result = export(conn, restaurant_id, args[1], fmt, start, end, status, int(batch) if batch else BATCH_ROWS, delimiter)
+    except (RuntimeError, ValueError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    print_result(result, args[1])
@@ -0,0 +1,289 @@
+import json
+import sys
+import time
+from datetime import date, datetime
+
+import cafepoint_db
+
+# ==========================================
+# USO DO PLANO POR RESTAURANTE (CONTADORES)
+# ==========================================
+# Mantém a tabela PlanUsage (uma linha por restaurante) com o que conta para
+# os limites do Plano: mesas (maxTables), itens do menu (maxItems),
+# utilizadores (maxUsers), dispositivos autorizados e pedidos do mês
+# corrente. Cada contagem é uma só consulta agrupada por restaurante, para
+# todos os restaurantes de uma vez.
+#
+# Execuções incrementais (marcas em plan_usage_state, fora do schema.prisma,
+# num ficheiro à parte ao lado da base: dev.db -> dev.usage.db, ligado por
+# ATTACH como "usage", onde o "prisma db push" do arranque não a apaga; sem
+# esse ficheiro a execução seguinte reconta tudo):
+#   - Table, MenuItem, User: somam-se só as linhas com id acima da marca; se
+#     o total da tabela não bate com total anterior + novas houve remoções e
+#     essa entidade é recontada.
+#   - Order: os pedidos novos do mês somam-se a monthOrders; na viragem do
+#     mês (ou sem marcas) o mês é recontado.
+#   - Device: sempre recontado (o estado muda por UPDATE e a tabela é pequena).
+#
+# Cada linha guarda também lastTableId/lastMenuItemId (o maior id na altura
+# da contagem): o checkTrialLimit usa o valor guardado + as linhas criadas
+# depois (id > marca, só a ponta da chave primária) em vez de contar tudo, e
+# só perto do limite confirma com a contagem completa.
+#
+# API:
+#   plan_usage.refresh(conn, rebuild=False)
+#   plan_usage.near_limits(conn, ratio=0.8, restaurant_id=None)
+#
+# CLI:
+#   python plan_usage.py [--rebuild] [--db F]
+#   python plan_usage.py near [--ratio 0.8] [--all] [--json] [--db F]
+
+NEAR_RATIO = 0.8
+
+# Igual ao que o "prisma db push" cria a partir do model PlanUsage
+USAGE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS "PlanUsage" (
+    "restaurantId" INTEGER NOT NULL PRIMARY KEY,
+    "tables" INTEGER NOT NULL DEFAULT 0,
+    "menuItems" INTEGER NOT NULL DEFAULT 0,
+    "users" INTEGER NOT NULL DEFAULT 0,
+    "devices" INTEGER NOT NULL DEFAULT 0,
+    "month" TEXT NOT NULL,
+    "monthOrders" INTEGER NOT NULL DEFAULT 0,
+    "lastTableId" INTEGER NOT NULL DEFAULT 0,
+    "lastMenuItemId" INTEGER NOT NULL DEFAULT 0,
+    "updatedAt" DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT "PlanUsage_restaurantId_fkey" FOREIGN KEY ("restaurantId") REFERENCES "Restaurant" ("id") ON DELETE RESTRICT ON UPDATE CASCADE
+);
+"""
+
+STATE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS usage.plan_usage_state (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+# (coluna em PlanUsage, tabela, coluna da marca em PlanUsage)
+ENTITIES = [
+    ("tables", "Table", "lastTableId"),
+    ("menuItems", "MenuItem", "lastMenuItemId"),
+    ("users", "User", None),
+]
+
+USAGE_COLUMNS = ["tables", "menuItems", "users", "devices", "monthOrders"]
+
+# (coluna em PlanUsage, limite no Plan)
+LIMITS = [("tables", "maxTables"), ("menuItems", "maxItems"), ("users", "maxUsers")]
+
+def ensure_schema(conn):
+    if not cafepoint_db.table_exists(conn, "PlanUsage"):
+        conn.executescript(USAGE_SCHEMA)
+    cafepoint_db.attach_side_file(conn, "usage", STATE_SCHEMA, ["plan_usage_state"])
+
+def _grouped(conn, sql, params=()):
+    return {r[0]: r[1] for r in conn.execute(sql, params) if r[0] is not None}
+
+def _month(now):
+    return now.strftime("%Y-%m"), cafepoint_db.to_ms(date(now.year, now.month, 1))
+
+# ==========================================
+# ATUALIZAÇÃO
+# ==========================================
+
+def _count_entity(conn, usage, state, column, table, rebuild):
+    # Devolve o que mudou: "full" (recontado), "incremental" ou None
+    last_id = state.get(f"{table}.id", 0)
+    total, max_id = conn.execute(f'SELECT COUNT(*), COALESCE(MAX(id), 0) FROM "{table}"').fetchone()
+    # Linhas novas por restaurante (User sem restaurante conta no total mas não em nenhuma linha)
+    new_rows = [] if rebuild else conn.execute(
+        f'SELECT restaurantId, COUNT(*) FROM "{table}" WHERE id > ? GROUP BY restaurantId', (last_id,)).fetchall()
+    added = sum(n for _, n in new_rows)
+
+    mode = None
+    if rebuild or state.get(f"{table}.count", -1) + added != total:
+        counts = _grouped(conn, f'SELECT restaurantId, COUNT(*) FROM "{table}" GROUP BY restaurantId')
+        for rid, row in usage.items():
+            row[column] = counts.get(rid, 0)
+        mode = "full"
+    elif new_rows:
+        for rid, n in new_rows:
+            if rid in usage:
+                usage[rid][column] += n
+        mode = "incremental"
+    state[f"{table}.id"] = max_id
+    state[f"{table}.count"] = total
+    return mode, max_id
+
+def _count_orders(conn, usage, state, month, month_start, rebuild):
+    last_id = state.get("Order.id", 0)
+    max_id = conn.execute('SELECT COALESCE(MAX(id), 0) FROM "Order"').fetchone()[0]
+    if rebuild or state.get("month") != int(month.replace("-", "")):
+        counts = _grouped(conn, 'SELECT restaurantId, COUNT(*) FROM "Order" WHERE createdAt >= ? GROUP BY restaurantId',
+                          (month_start,))
+        for rid, row in usage.items():
+            row["monthOrders"] = counts.get(rid, 0)
+        mode = "full"
+    else:
+        # Um pedido novo com createdAt antigo (fila offline do mês anterior) não conta
+        counts = _grouped(conn, """
+            SELECT restaurantId, COUNT(*) FROM "Order" WHERE id > ? AND createdAt >= ? GROUP BY restaurantId
+        """, (last_id, month_start))
+        for rid, n in counts.items():
+            if rid in usage:
+                usage[rid]["monthOrders"] += n
+        mode = "incremental" if counts else None
+    state["Order.id"] = max_id
+    state["month"] = int(month.replace("-", ""))
+    return mode
+
+def refresh(conn, rebuild=False, now=None):
+    start = time.perf_counter()
+    now = now or datetime.now()
+    month, month_start = _month(now)
+    ensure_schema(conn)
+
+    # Escrita exclusiva: as contagens e as marcas são do mesmo instante
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        state = {} if rebuild else {r[0]: r[1] for r in conn.execute("SELECT name, value FROM plan_usage_state")}
+        rebuild = rebuild or not state
+        stored = {r["restaurantId"]: dict(r) for r in conn.execute('SELECT * FROM "PlanUsage"')}
+        usage = {}
+        for (rid,) in conn.execute('SELECT id FROM "Restaurant"'):
+            row = stored.get(rid) or {"restaurantId": rid, "month": month, "lastTableId": 0, "lastMenuItemId": 0,
+                                      **{c: 0 for c in USAGE_COLUMNS}}
+            usage[rid] = dict(row)
+        # Um restaurante sem linha (novo, ou tabela recriada) obriga a recontar tudo
+        rebuild = rebuild or any(rid not in stored for rid in usage)
+
+        modes = {}
+        for column, table, mark_column in ENTITIES:
+            modes[column], max_id = _count_entity(conn, usage, state, column, table, rebuild)
+            if mark_column:
+                for row in usage.values():
+                    row[mark_column] = max_id
+        modes["monthOrders"] = _count_orders(conn, usage, state, month, month_start, rebuild)
+        devices = _grouped(conn, """
+            SELECT restaurantId, COUNT(*) FROM "Device" WHERE status = 'AUTHORIZED' GROUP BY restaurantId
+        """)
+        for rid, row in usage.items():
+            row["devices"] = devices.get(rid, 0)
+            row["month"] = month
+
+        # Só se escrevem as linhas que mudaram
+        columns = USAGE_COLUMNS + ["month", "lastTableId", "lastMenuItemId"]
+        changed = [row for rid, row in usage.items()
+                   if rid not in stored or any(stored[rid][c] != row[c] for c in columns)]
+        now_ms = cafepoint_db.to_ms(now)
+        conn.executemany(f"""
+            INSERT INTO "PlanUsage" (restaurantId, {", ".join(columns)}, updatedAt)
+            VALUES (?, {", ".join("?" * len(columns))}, ?)
+            ON CONFLICT (restaurantId) DO UPDATE SET {", ".join(f"{c} = excluded.{c}" for c in columns)},
+                updatedAt = excluded.updatedAt
+        """, [[row["restaurantId"]] + [row[c] for c in columns] + [now_ms] for row in changed])
+        conn.execute('DELETE FROM "PlanUsage" WHERE restaurantId NOT IN (SELECT id FROM "Restaurant")')
+
+        state["last_run_at"] = now_ms
+        conn.executemany("INSERT OR REPLACE INTO plan_usage_state (name, value) VALUES (?, ?)", state.items())
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return {"restaurants": len(usage), "changed": len(changed), "rebuild": rebuild,
+            "modes": {k: v for k, v in modes.items() if v}, "seconds": round(time.perf_counter() - start, 3)}
+
+# ==========================================
+# LEITURA (painel de administração)
+# ==========================================
+
+def near_limits(conn, ratio=NEAR_RATIO, restaurant_id=None):
+    # Restaurantes com alguma contagem >= ratio do limite do plano (ratio 0 = todos)
+    extra, params = (" AND r.id = ?", [restaurant_id]) if restaurant_id else ("", [])
+    rows = conn.execute(f"""
+        SELECT r.id, r.name, l.status AS licenseStatus, p.name AS plan, p.maxTables, p.maxItems, p.maxUsers,
+               u.tables, u.menuItems, u.users, u.devices, u.month, u.monthOrders, u.updatedAt
+        FROM "PlanUsage" u
+        JOIN "Restaurant" r ON r.id = u.restaurantId
+        LEFT JOIN "License" l ON l.restaurantId = r.id
+        LEFT JOIN "Plan" p ON p.id = l.planId
+        WHERE 1 = 1{extra}
+    """, params).fetchall()
+
+    result = []
+    for r in rows:
+        usage = {}
+        for column, limit in LIMITS:
+            used, maximum = r[column], r[limit]
+            usage[column] = {
+                "used": used,
+                "limit": maximum,
+                "ratio": round(used / maximum, 3) if maximum else None,
+            }
+        worst = max((u["ratio"] for u in usage.values() if u["ratio"] is not None), default=None)
+        if ratio and (worst is None or worst < ratio):
+            continue
+        result.append({
+            "restaurantId": r["id"],
+            "name": r["name"],
+            "plan": r["plan"],
+            "licenseStatus": r["licenseStatus"],
+            "usage": usage,
+            "maxRatio": worst,
+            "devices": r["devices"],
+            "month": r["month"],
+            "monthOrders": r["monthOrders"],
+            "updatedAt": cafepoint_db.to_iso(r["updatedAt"]),
+        })
+    result.sort(key=lambda r: (-(r["maxRatio"] or 0), r["restaurantId"]))
+    return result
+
+def print_refresh(result):
+    modes = ", ".join(f"{k}: {v}" for k, v in result["modes"].items()) or "sem alterações"
+    print(f"✅ Uso do plano: {result['restaurants']} restaurantes, {result['changed']} linhas atualizadas "
+          f"({modes}) em {result['seconds']:.3f}s")
+
+def print_near(rows, ratio):
+    if not rows:
+        print(f"✅ Nenhum restaurante acima de {ratio:.0%} de um limite do plano.")
+        return
+    print(f"{'Restaurante':<28}{'Plano':<14}{'Mesas':>11}{'Itens':>11}{'Utiliz.':>11}{'Disp.':>7}{'Pedidos/mês':>13}")
+    for r in rows:
+        cells = []
+        for column, _ in LIMITS:
+            u = r["usage"][column]
+            mark = "⚠️" if u["ratio"] is not None and u["ratio"] >= 1 else ""
+            cells.append(f"{mark}{u['used']}/{u['limit'] if u['limit'] is not None else '-'}")
+        print(f"{r['name'][:27]:<28}{(r['plan'] or '-')[:13]:<14}{cells[0]:>11}{cells[1]:>11}{cells[2]:>11}"
+              f"{r['devices']:>7}{r['monthOrders']:>13}")
+
+def _pop_option(args, name):
+    if name in args:
+        i = args.index(name)
+        value = args[i + 1]
+        del args[i:i + 2]
+        return value
+    return None
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    db_path = _pop_option(args, "--db")
+    ratio = _pop_option(args, "--ratio")
+    flags = {a for a in args if a in ("--rebuild", "--json", "--all")}
+    args = [a for a in args if a not in flags]
+
+    if args == ["near"]:
+        conn = cafepoint_db.connect(db_path, readonly=True)
+        ratio = 0 if "--all" in flags else float(ratio) if ratio else NEAR_RATIO
+        rows = near_limits(conn, ratio)
+        if "--json" in flags:
+            print(json.dumps({"success": True, "data": rows}, indent=2, ensure_ascii=False))
+        else:
+            print_near(rows, ratio)
+    elif not args:
+        conn = cafepoint_db.connect(db_path)
+        print_refresh(refresh(conn, "--rebuild" in flags))
+    else:
+        print("Usage: python plan_usage.py [--rebuild] [--db FILE]")
+        print("       python plan_usage.py near [--ratio 0.8] [--all] [--json] [--db FILE]")
+        sys.exit(1)
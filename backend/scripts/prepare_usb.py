@@ -1,54 +1,154 @@
-import hashlib
-from Crypto.Cipher import AES
-from Crypto.Util.Padding import pad, unpad
 import base64
 import os
+import sys
+import glob
 import json
+import time
 
-KEY = hashlib.sha256(b'cafe-point-ultra-secure-key-2026').digest()
+# MESMA CHAVE E FORMATO USADOS PELO BACKEND (ver cafepoint_crypto.py)
+import cafepoint_crypto
+import license_ledger
 
 def encrypt_data(data_str):
-    cipher = AES.new(KEY, AES.MODE_CBC)
-    ct_bytes = cipher.encrypt(pad(data_str.encode(), AES.block_size))
-    iv_hex = cipher.iv.hex()
-    ct_hex = ct_bytes.hex()
-    return f"{iv_hex}:{ct_hex}"
+    return cafepoint_crypto.encrypt(data_str)
 
 def decrypt_data(encrypted_str):
     try:
-        iv_b64, ct_b64 = encrypted_str.split(':')
-        iv = base64.b64decode(iv_b64)
-        ct = base64.b64decode(ct_b64)
-        cipher = AES.new(KEY, AES.MODE_CBC, iv)
-        pt = unpad(cipher.decrypt(ct), AES.block_size)
-        return pt.decode('utf-8')
+        return cafepoint_crypto.decrypt(encrypted_str)
     except Exception as e:
         return f"Error: {str(e)}"
 
-def create_usb_master_files(drive_path, installations_allowed=5):
+TRACKING_FILES = [".sys_vol", ".device_map", "kernel.dat", ".tracker_v1"]
+
+def _sync_drive(drive_path, file_paths):
+    # One flush per drive: syncfs() on Linux covers every file on that filesystem.
+    # Elsewhere fall back to fsync on each file.
+    if sys.platform.startswith("linux"):
+        try:
+            import ctypes
+            libc = ctypes.CDLL(None, use_errno=True)
+            fd = os.open(drive_path, os.O_RDONLY)
+            try:
+                if libc.syncfs(fd) == 0:
+                    return
+            finally:
+                os.close(fd)
+        except (OSError, AttributeError):
+            pass
+    for path in file_paths:
+        with open(path, "rb+") as f:
+            os.fsync(f.fileno())
+
+def create_usb_master_files(drive_path, installations_allowed=5, verbose=True, record=True):
+    start = time.perf_counter()
+    report = {"drive": drive_path, "slots": installations_allowed}
+
     if not os.path.exists(drive_path):
-        print(f"❌ Error: Drive {drive_path} not found")
-        return
+        if verbose:
+            print(f"❌ Error: Drive {drive_path} not found")
+        report.update(status="ERROR", error="drive not found")
+        return report
 
     # Data to protect
     data = {
         "limit": installations_allowed,
-        "created_at": str(os.times())
+        "created_at": str(os.times()),
+        "id": base64.b64encode(os.urandom(6)).decode('utf-8')
     }
     
     encrypted = encrypt_data(json.dumps(data))
     
-    # Create the 4 tracking files
-    filenames = [".sys_vol", ".device_map", "kernel.dat", ".tracker_v1"]
-    for f in filenames:
-        with open(os.path.join(drive_path, f), "w") as file:
-            file.write(encrypted)
-            
-    print(f"✅ Successfully created 4 tracking files on {drive_path} with {installations_allowed} slots.")
+    # Create the 4 tracking files: write to temp files, flush the drive once,
+    # then rename so a pulled drive never holds a half-written tracker
+    try:
+        tmp_paths = []
+        for f in TRACKING_FILES:
+            tmp_path = os.path.join(drive_path, f + ".tmp")
+            with open(tmp_path, "w") as file:
+                file.write(encrypted)
+            tmp_paths.append(tmp_path)
+        written = time.perf_counter()
+
+        _sync_drive(drive_path, tmp_paths)
+        synced = time.perf_counter()
+
+        for f, tmp_path in zip(TRACKING_FILES, tmp_paths):
+            os.replace(tmp_path, os.path.join(drive_path, f))
+    except OSError as e:
+        if verbose:
+            print(f"❌ Error: Could not write to {drive_path}: {e}")
+        report.update(status="ERROR", error=str(e), total_s=round(time.perf_counter() - start, 4))
+        return report
+
+    report.update(
+        status="OK",
+        tracking_id=data["id"],
+        write_s=round(written - start, 4),
+        sync_s=round(synced - written, 4),
+        total_s=round(time.perf_counter() - start, 4)
+    )
+    # record=False only when the caller writes the ledger itself (provision_drives batches it)
+    if record:
+        license_ledger.safe_record([{"tracking_id": data["id"], "slots": installations_allowed, "path": drive_path}], "prepare_usb")
+    if verbose:
+        print(f"✅ Successfully created 4 tracking files on {drive_path} with {installations_allowed} slots.")
+    return report
+
+def expand_drives(targets):
+    # Accepts mount points, drive letters or globs such as /media/*/CAFEPOINT*
+    drives = []
+    for target in targets:
+        if any(ch in target for ch in "*?["):
+            drives.extend(sorted(p for p in glob.glob(target) if os.path.isdir(p)))
+        elif len(target) == 1 and target.isalpha():
+            drives.append(f"{target}:\\")
+        elif len(target) == 2 and target[1] == ":":
+            drives.append(f"{target}\\")
+        else:
+            drives.append(target)
+    # Same drive listed twice would race on its own files
+    return list(dict.fromkeys(drives))
+
+def provision_drives(targets, installations_allowed=5, workers=None):
+    from concurrent.futures import ThreadPoolExecutor
+
+    drives = expand_drives(targets)
+    if not drives:
+        print("❌ Error: No drives matched")
+        return []
+
+    start = time.perf_counter()
+    # Each drive is its own device: threads overlap the slow flash writes
+    with ThreadPoolExecutor(max_workers=workers or len(drives)) as pool:
+        reports = list(pool.map(lambda d: create_usb_master_files(d, installations_allowed, verbose=False, record=False), drives))
+
+    license_ledger.safe_record(
+        [{"tracking_id": r["tracking_id"], "slots": r["slots"], "path": r["drive"]} for r in reports if r["status"] == "OK"],
+        "prepare_usb"
+    )
+
+    print(f"{'drive':<40}{'status':>8}{'write_s':>10}{'sync_s':>10}{'total_s':>10}")
+    for r in reports:
+        print(f"{r['drive']:<40}{r['status']:>8}{r.get('write_s', 0):>10.3f}{r.get('sync_s', 0):>10.3f}{r.get('total_s', 0):>10.3f}")
+        if r["status"] != "OK":
+            print(f"    ↳ {r['error']}")
+    ok = sum(1 for r in reports if r["status"] == "OK")
+    print(f"✅ {ok}/{len(reports)} drives provisioned with {installations_allowed} slots in {time.perf_counter() - start:.2f}s")
+    return reports
 
 if __name__ == "__main__":
-    import sys
-    if len(sys.argv) < 3:
+    args = sys.argv[1:]
+    workers = None
+    if "--workers" in args:
+        i = args.index("--workers")
+        workers = int(args[i + 1])
+        args = args[:i] + args[i + 2:]
+
+    if len(args) < 2:
         print("Usage: python prepare_usb.py <drive_letter> <limit>")
+        print("       python prepare_usb.py <drive|mount|glob> [...] <limit> [--workers N]")
+    elif len(args) == 2 and not any(ch in args[0] for ch in "*?["):
+        create_usb_master_files(args[0], int(args[1]))
     else:
-        create_usb_master_files(sys.argv[1], int(sys.argv[2]))
+        reports = provision_drives(args[:-1], int(args[-1]), workers)
+        sys.exit(0 if reports and all(r["status"] == "OK" for r in reports) else 2)
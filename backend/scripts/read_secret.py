@@ -1,27 +1,93 @@
-import hashlib
-from Crypto.Cipher import AES
-from Crypto.Util.Padding import pad, unpad
-import base64
+import binascii
+import json
 import os
 import sys
 
-# MESMA CHAVE USADA PELOS OUTROS SCRIPTS
-KEY = hashlib.sha256(b'cafe-point-ultra-secure-key-2026').digest()
+# MESMA CHAVE E FORMATO USADOS PELOS OUTROS SCRIPTS (ver cafepoint_crypto.py)
+import cafepoint_crypto
+from cafepoint_crypto import detect_encoding
+
+# Ficheiros gravados nas Pen Drives (licença + 4 contadores de instalação)
+SECRET_FILES = ["license_params.dat", ".sys_vol", ".device_map", "kernel.dat", ".tracker_v1"]
 
 def decrypt_data(encrypted_str):
     try:
-        iv_b64, ct_b64 = encrypted_str.split(':')
-        iv = base64.b64decode(iv_b64)
-        ct = base64.b64decode(ct_b64)
-        cipher = AES.new(KEY, AES.MODE_CBC, iv)
-        pt = unpad(cipher.decrypt(ct), AES.block_size)
-        return pt.decode('utf-8')
+        return cafepoint_crypto.decrypt(encrypted_str)
     except Exception as e:
         return f"Error: {str(e)}"
 
+# ==========================================
+# MODO AUDITORIA (Várias Pen Drives de uma vez)
+# ==========================================
+
+def find_secret_files(roots):
+    for root in roots:
+        if os.path.isfile(root):
+            yield root
+            continue
+        for dirpath, dirnames, filenames in os.walk(root):
+            for name in filenames:
+                if name in SECRET_FILES:
+                    yield os.path.join(dirpath, name)
+
+def inspect_file(file_path):
+    result = {"path": file_path, "file": os.path.basename(file_path)}
+    try:
+        with open(file_path, "r") as f:
+            content = f.read()
+        result["encoding"] = detect_encoding(content)
+        plain = decrypt_data(content)
+        if plain.startswith("Error: "):
+            result["ok"] = False
+            result["error"] = plain[len("Error: "):]
+        else:
+            result["ok"] = True
+            try:
+                result["data"] = json.loads(plain)
+            except ValueError:
+                result["data"] = plain
+    except (OSError, UnicodeDecodeError, binascii.Error) as e:
+        result["ok"] = False
+        result["error"] = str(e)
+    return result
+
+def scan(roots, workers=None, out=sys.stdout):
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    # Leitura é dominada por I/O das Pen Drives: threads chegam para as sobrepor
+    count = 0
+    with ThreadPoolExecutor(max_workers=workers or 16) as pool:
+        futures = [pool.submit(inspect_file, p) for p in find_secret_files(roots)]
+        for future in as_completed(futures):
+            out.write(json.dumps(future.result(), ensure_ascii=False) + "\n")
+            out.flush()
+            count += 1
+    return count
+
+def normalize_root(root):
+    # "E" ou "E:" -> "E:\\" (letra de Pen Drive no Windows)
+    if len(root) == 1 and root.isalpha():
+        return f"{root}:\\"
+    if len(root) == 2 and root[1] == ":":
+        return f"{root}\\"
+    return root
+
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
+    # Modo auditoria: python read_secret.py --scan <pasta|letra> [<pasta|letra> ...] [--workers N]
+    if "--scan" in sys.argv:
+        args = sys.argv[sys.argv.index("--scan") + 1:]
+        workers = None
+        if "--workers" in args:
+            i = args.index("--workers")
+            workers = int(args[i + 1])
+            args = args[:i] + args[i + 2:]
+        if not args:
+            print("Usage: python read_secret.py --scan <dir_or_drive> [...] [--workers N]")
+            sys.exit(1)
+        scan([normalize_root(a) for a in args], workers)
+    elif len(sys.argv) < 2:
         print("Usage: python read_secret.py <file_path>")
+        print("       python read_secret.py --scan <dir_or_drive> [...] [--workers N]")
     else:
         file_path = sys.argv[1]
         if os.path.exists(file_path):
@@ -0,0 +1,326 @@
+import hashlib
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+import cafepoint_db
+import report_engine
+from cafepoint_db import local_day_sql
+
+# ==========================================
+# EXPLOSÃO DE RECEITAS E CONSUMO DE INGREDIENTES
+# ==========================================
+# Cada restaurante tem uma lista de materiais recursiva (RecipeItem: prato ->
+# preparado -> ingrediente). Em vez de percorrer a árvore para cada OrderItem
+# vendido, compilamos o grafo numa matriz esparsa (item vendido x item de
+# stock) já fechada transitivamente, e o consumo de um período é uma só
+# multiplicação: vendas por dia (dias x itens) @ matriz.
+#
+# Itens de stock = itens sem receita que não são DISH (ingredientes e
+# produtos como bebidas, que se descontam a si próprios). Um preparado com
+# receita é sempre explodido até aos seus ingredientes.
+#
+# A matriz fica em cache (por base e restaurante) até as receitas mudarem:
+# a assinatura é um hash das linhas de RecipeItem e dos tipos dos itens.
+#
+# O relatório compara o consumo teórico com os movimentos registados
+# (EXIT_SALE + ADJUSTMENT) e sugere encomendas pelo minStock/maxStock.
+#
+# API:
+#   conn = cafepoint_db.connect(readonly=True)
+#   recipe_engine.stock_report(conn, restaurant_id, start_day, end_day)
+#
+# CLI:
+#   python recipe_engine.py <restaurantId> [AAAA-MM-DD AAAA-MM-DD] [--lead-days N] [--json] [--db F]
+
+CONSUMED_STATUSES_EXCLUDED = ("CANCELLED",)
+DEFAULT_MIN_STOCK = 5           # como o backend: (minStock || 5)
+DEFAULT_LEAD_DAYS = 2           # dias até a encomenda chegar
+DEFAULT_COVER_DAYS = 14         # sem maxStock: encomendar para duas semanas
+
+_compiled_cache = {}
+
+# ==========================================
+# MATRIZES ESPARSAS (COO/CSR em NumPy)
+# ==========================================
+
+def _coalesce(rows, cols, vals, n):
+    # Soma entradas repetidas e ordena por (linha, coluna)
+    if len(rows) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0)
+    keys, inverse = np.unique(rows * n + cols, return_inverse=True)
+    sums = np.bincount(inverse, weights=vals, minlength=len(keys))
+    keep = sums != 0
+    return keys[keep] // n, keys[keep] % n, sums[keep]
+
+def _csr_indptr(rows, n):
+    return np.concatenate([[0], np.cumsum(np.bincount(rows, minlength=n))])
+
+def _sparse_product(a, b, n):
+    # (linhas, colunas, valores) de A @ B, com B em CSR (ordenada por linha)
+    a_rows, a_cols, a_vals = a
+    b_rows, b_cols, b_vals = b
+    indptr = _csr_indptr(b_rows, n)
+    counts = indptr[a_cols + 1] - indptr[a_cols]
+    total = int(counts.sum())
+    if total == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0)
+    # Para cada entrada (i, k) de A, todas as entradas (k, j) de B
+    owner = np.repeat(np.arange(len(a_rows)), counts)
+    offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    positions = np.repeat(indptr[a_cols], counts) + offsets
+    return _coalesce(a_rows[owner], b_cols[positions], a_vals[owner] * b_vals[positions], n)
+
+def _transitive_closure(edges, n):
+    # E + E² + E³ + ... (cada caminho multiplica as quantidades)
+    if n == 0 or len(edges[0]) == 0:
+        # Sem itens ou sem receitas (restaurante novo): nada a fechar
+        return edges
+    closure = [edges]
+    power = edges
+    for _ in range(n):
+        power = _sparse_product(power, edges, n)
+        if len(power[0]) == 0:
+            rows, cols, vals = (np.concatenate(parts) for parts in zip(*closure))
+            return _coalesce(rows, cols, vals, n)
+        closure.append(power)
+    raise ValueError("Receita circular: um item entra (direta ou indiretamente) na sua própria receita")
+
+# ==========================================
+# COMPILAÇÃO DAS RECEITAS
+# ==========================================
+
+def _recipe_rows(conn, restaurant_id):
+    return conn.execute("""
+        SELECT r.id, r.parentItemId, r.ingredientId, r.quantity
+        FROM "RecipeItem" r
+        JOIN "MenuItem" m ON m.id = r.parentItemId
+        WHERE m.restaurantId = ?
+        ORDER BY r.id
+    """, (restaurant_id,)).fetchall()
+
+def _signature(items, recipes):
+    digest = hashlib.sha256()
+    for row in items:
+        digest.update(f"{row['id']}:{row['itemType']};".encode())
+    for row in recipes:
+        digest.update(f"{row[0]}:{row[1]}:{row[2]}:{row[3]!r};".encode())
+    return digest.hexdigest()
+
+def compile_recipes(conn, restaurant_id):
+    items = conn.execute("""
+        SELECT id, COALESCE(itemType, 'PRODUCT') AS itemType FROM "MenuItem" WHERE restaurantId = ? ORDER BY id
+    """, (restaurant_id,)).fetchall()
+    recipes = _recipe_rows(conn, restaurant_id)
+    signature = _signature(items, recipes)
+
+    key = (cafepoint_db.database_file(conn), restaurant_id)
+    cached = _compiled_cache.get(key)
+    if cached and cached["signature"] == signature:
+        return cached
+
+    ids = np.array([row["id"] for row in items], dtype=np.int64)
+    n = len(ids)
+    index = {int(item_id): i for i, item_id in enumerate(ids)}
+    # Componentes de outro restaurante ou apagados ficam de fora
+    edges = [(index[p], index[c], float(q or 0)) for _, p, c, q in recipes if p in index and c in index]
+    rows = np.array([e[0] for e in edges], dtype=np.int64)
+    cols = np.array([e[1] for e in edges], dtype=np.int64)
+    vals = np.array([e[2] for e in edges], dtype=np.float64)
+    closure = _transitive_closure(_coalesce(rows, cols, vals, n), n)
+
+    # Itens de stock: sem receita e não DISH. A matriz final liga cada item
+    # vendido aos itens de stock que consome (a identidade para os próprios).
+    has_recipe = np.zeros(n, dtype=bool)
+    has_recipe[rows] = True
+    is_dish = np.array([row["itemType"] == "DISH" for row in items], dtype=bool)
+    stock_item = ~has_recipe & ~is_dish
+    own = np.flatnonzero(stock_item)
+    keep = stock_item[closure[1]]
+    matrix = _coalesce(np.concatenate([closure[0][keep], own]), np.concatenate([closure[1][keep], own]),
+                       np.concatenate([closure[2][keep], np.ones(len(own))]), n)
+
+    compiled = {"signature": signature, "ids": ids, "index": index, "stock_item": stock_item, "matrix": matrix}
+    _compiled_cache[key] = compiled
+    return compiled
+
+def explode(compiled, sold):
+    # sold: vetor (itens) ou matriz (dias x itens) de quantidades vendidas
+    rows, cols, vals = compiled["matrix"]
+    sold = np.asarray(sold, dtype=np.float64)
+    if sold.ndim == 1:
+        return np.bincount(cols, weights=sold[rows] * vals, minlength=len(compiled["ids"]))
+    used = np.zeros(sold.shape)
+    np.add.at(used.T, cols, (sold[:, rows] * vals).T)
+    return used
+
+# ==========================================
+# RELATÓRIO DE STOCK
+# ==========================================
+
+def _sold_by_day(conn, compiled, restaurant_id, start, end, days):
+    # Uma passagem pelos pedidos do período: quantidade por (dia, item)
+    sold = np.zeros((len(days), len(compiled["ids"])))
+    day_index = {day: i for i, day in enumerate(days)}
+    for row in conn.execute(f"""
+        SELECT {local_day_sql("o.createdAt")} AS day, oi.menuItemId, SUM(oi.quantity) AS qty
+        FROM "Order" o
+        JOIN "OrderItem" oi ON oi.orderId = o.id
+        WHERE o.restaurantId = ? AND o.createdAt BETWEEN ? AND ?
+          AND o.status NOT IN ({",".join("?" * len(CONSUMED_STATUSES_EXCLUDED))})
+        GROUP BY 1, 2
+    """, (restaurant_id, start, end, *CONSUMED_STATUSES_EXCLUDED)):
+        i = compiled["index"].get(row["menuItemId"])
+        if i is not None and row["day"] in day_index:
+            sold[day_index[row["day"]], i] += row["qty"]
+    return sold
+
+def _recorded_movements(conn, compiled, restaurant_id, start, end):
+    n = len(compiled["ids"])
+    recorded = {kind: np.zeros(n) for kind in ("ENTRY", "EXIT_SALE", "ADJUSTMENT")}
+    for row in conn.execute("""
+        SELECT menuItemId, type, SUM(quantity) AS qty FROM "StockMovement"
+        WHERE restaurantId = ? AND createdAt BETWEEN ? AND ?
+        GROUP BY 1, 2
+    """, (restaurant_id, start, end)):
+        i = compiled["index"].get(row["menuItemId"])
+        if i is not None and row["type"] in recorded:
+            recorded[row["type"]][i] += row["qty"]
+    return recorded
+
+def stock_report(conn, restaurant_id, start_day=None, end_day=None, lead_days=DEFAULT_LEAD_DAYS):
+    today = datetime.now().date()
+    end_day = end_day or today
+    start_day = start_day or report_engine._month_before(end_day)
+    start, end = cafepoint_db.day_range(start_day, end_day)
+    days = [(start_day + timedelta(days=k)).isoformat() for k in range((end_day - start_day).days + 1)]
+
+    compiled = compile_recipes(conn, restaurant_id)
+    sold = _sold_by_day(conn, compiled, restaurant_id, start, end, days)
+    daily_use = explode(compiled, sold)
+    theoretical = daily_use.sum(axis=0)
+    recorded = _recorded_movements(conn, compiled, restaurant_id, start, end)
+    # Saídas registadas (positivas): vendas descontadas pelo backend + quebras/ajustes
+    actual = -(recorded["EXIT_SALE"] + recorded["ADJUSTMENT"])
+
+    meta = {row["id"]: row for row in conn.execute("""
+        SELECT id, name, unit, stockQuantity, minStock, maxStock, COALESCE(costPrice, 0) AS costPrice
+        FROM "MenuItem" WHERE restaurantId = ?
+    """, (restaurant_id,))}
+    ids = compiled["ids"]
+    stock = np.array([meta[i]["stockQuantity"] or 0 for i in ids.tolist()], dtype=np.float64)
+    min_stock = np.array([DEFAULT_MIN_STOCK if meta[i]["minStock"] is None else meta[i]["minStock"] for i in ids.tolist()], dtype=np.float64)
+    max_stock = np.array([np.nan if meta[i]["maxStock"] is None else meta[i]["maxStock"] for i in ids.tolist()], dtype=np.float64)
+    cost = np.array([meta[i]["costPrice"] for i in ids.tolist()], dtype=np.float64)
+
+    avg_use = theoretical / len(days)
+    variance = actual - theoretical
+    with np.errstate(divide="ignore", invalid="ignore"):
+        days_left = np.where(avg_use > 0, stock / avg_use, np.inf)
+        variance_pct = np.where(theoretical > 0, variance / theoretical * 100, 0)
+
+    # Mín/máx: encomendar se o stock previsto à chegada fica no mínimo ou abaixo
+    # (se esgotar antes, as vendas perdidas não se repõem: nunca abaixo de zero)
+    projected = np.maximum(stock - avg_use * lead_days, 0)
+    target = np.where(np.isnan(max_stock), min_stock + avg_use * DEFAULT_COVER_DAYS, max_stock)
+    reorder = compiled["stock_item"] & (projected <= min_stock)
+    suggested = np.ceil(np.maximum(target - projected, 0))
+
+    # Itens de stock com movimento, e também itens com receita que o backend descontou
+    involved = (compiled["stock_item"] & ((theoretical != 0) | reorder)) | (actual != 0)
+    ingredients = []
+    for i in np.flatnonzero(involved)[np.argsort(-np.abs(variance[involved] * cost[involved]), kind="stable")].tolist():
+        row = meta[int(ids[i])]
+        ingredients.append({
+            "id": int(ids[i]),
+            "name": row["name"],
+            "unit": row["unit"],
+            "theoretical": round(float(theoretical[i]), 3),
+            "recordedSales": round(float(-recorded["EXIT_SALE"][i]), 3),
+            "adjustments": round(float(-recorded["ADJUSTMENT"][i]), 3),
+            "purchased": round(float(recorded["ENTRY"][i]), 3),
+            "variance": round(float(variance[i]), 3),
+            "variancePct": round(float(variance_pct[i]), 1),
+            "varianceValue": round(float(variance[i] * cost[i]), 2),
+            "avgDailyUse": round(float(avg_use[i]), 3),
+            "stock": float(stock[i]),
+            "daysLeft": None if np.isinf(days_left[i]) else round(float(days_left[i]), 1)
+        })
+
+    suggestions = [
+        {
+            "id": int(ids[i]),
+            "name": meta[int(ids[i])]["name"],
+            "unit": meta[int(ids[i])]["unit"],
+            "stock": float(stock[i]),
+            "minStock": float(min_stock[i]),
+            "maxStock": None if np.isnan(max_stock[i]) else float(max_stock[i]),
+            "projectedAtArrival": round(float(projected[i]), 3),
+            "suggestedQuantity": int(suggested[i]),
+            "estimatedCost": round(float(suggested[i] * cost[i]), 2)
+        }
+        for i in np.flatnonzero(reorder)[np.argsort(days_left[reorder], kind="stable")].tolist()
+    ]
+
+    return {
+        "period": {"from": days[0], "to": days[-1], "days": len(days)},
+        "soldUnits": int(sold.sum()),
+        "theoreticalCost": round(float(theoretical @ cost), 2),
+        "varianceValue": round(float((variance * cost)[compiled["stock_item"]].sum()), 2),
+        "ingredients": ingredients,
+        "reorder": suggestions
+    }
+
+# ==========================================
+# CLI
+# ==========================================
+
+def _pop_option(args, name):
+    if name in args:
+        i = args.index(name)
+        value = args[i + 1]
+        del args[i:i + 2]
+        return value
+    return None
+
+def print_report(report):
+    period = report["period"]
+    print(f"📦 Consumo de {period['from']} a {period['to']} ({period['days']} dias): {report['soldUnits']} unidades vendidas")
+    print(f"   Custo teórico {report['theoreticalCost']:.2f} | variação {report['varianceValue']:+.2f}")
+    print(f"\n{'Item':<26}{'Teórico':>12}{'Registado':>12}{'Variação':>11}{'%':>8}")
+    for row in report["ingredients"][:15]:
+        actual = row["recordedSales"] + row["adjustments"]
+        print(f"{row['name'][:25]:<26}{row['theoretical']:>12.2f}{actual:>12.2f}{row['variance']:>11.2f}{row['variancePct']:>8.1f}")
+    if not report["reorder"]:
+        print("\n✅ Nenhum item abaixo do mínimo.")
+        return
+    print(f"\n⚠️  Encomendar ({len(report['reorder'])} itens):")
+    for row in report["reorder"]:
+        print(f"   {row['name'][:25]:<26} stock {row['stock']:>8.1f}  mín {row['minStock']:>6.0f}  -> {row['suggestedQuantity']:>6} {row['unit'] or ''}")
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    db_path = _pop_option(args, "--db")
+    lead_days = _pop_option(args, "--lead-days")
+    as_json = "--json" in args
+    args = [a for a in args if a != "--json"]
+
+    if len(args) not in (1, 3):
+        print("Usage: python recipe_engine.py <restaurantId> [AAAA-MM-DD AAAA-MM-DD] [--lead-days N] [--json] [--db FILE]")
+        sys.exit(1)
+
+    conn = cafepoint_db.connect(db_path, readonly=True)
+    start_day, end_day = [cafepoint_db.parse_date(a).date() for a in args[1:3]] if len(args) == 3 else (None, None)
+    start_time = time.perf_counter()
+    report = stock_report(conn, int(args[0]), start_day, end_day,
+                          DEFAULT_LEAD_DAYS if lead_days is None else float(lead_days))
+    elapsed_ms = (time.perf_counter() - start_time) * 1000
+
+    if as_json:
+        print(json.dumps({"success": True, "data": report}, indent=2, ensure_ascii=False))
+    else:
+        print_report(report)
+    print(f"⏱️  {elapsed_ms:.1f} ms", file=sys.stderr)
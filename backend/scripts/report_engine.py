@@ -0,0 +1,284 @@
+import json
+import sys
+import time
+from datetime import date, datetime
+
+import numpy as np
+
+import cafepoint_db
+from cafepoint_db import local_hour_sql, to_iso
+
+# ==========================================
+# MOTOR DE RELATÓRIOS (SQL + NumPy)
+# ==========================================
+# Calcula os mesmos dados que reportController.getBillingStats e
+# analyticsController.getAdvancedAnalytics, mas agregando dentro do SQLite:
+# cada consulta devolve uma linha por categoria/produto/mesa/hora e nunca uma
+# linha por pedido. A memória usada depende do tamanho do menu e da sala, não
+# do número de pedidos do período.
+#
+# API:
+#   conn = cafepoint_db.connect(readonly=True)
+#   report_engine.billing_stats(conn, restaurant_id, "month")
+#   report_engine.advanced_analytics(conn, restaurant_id, start_ms, end_ms)
+#
+# CLI:
+#   python report_engine.py billing <restaurantId> [day|week|month|year] [--db F]
+#   python report_engine.py analytics <restaurantId> [AAAA-MM-DD AAAA-MM-DD] [--db F]
+
+REVENUE_STATUSES = ("PAID",)            # SERVED ainda é pendente de pagamento
+SOLD_STATUSES = ("PAID", "SERVED")
+TOP_PRODUCTS = 10
+AVG_PREP_PLACEHOLDER = 15               # valor devolvido pelo backend quando não há tempos
+
+def _group_sum(keys, values):
+    # Soma "values" por chave (np.unique + bincount); chaves ordenadas
+    labels, inverse = np.unique(np.asarray(keys, dtype=object), return_inverse=True)
+    sums = np.bincount(inverse, weights=values, minlength=len(labels))
+    return {str(label): float(total) for label, total in zip(labels, sums)}
+
+# ==========================================
+# FATURAÇÃO (reportController.getBillingStats)
+# ==========================================
+
+def _order_totals(conn, restaurant_id, start, end):
+    rows = conn.execute(f"""
+        SELECT status IN ({",".join("?" * len(REVENUE_STATUSES))}) AS paid,
+               COUNT(*) AS n, COALESCE(SUM(totalAmount), 0) AS total
+        FROM "Order"
+        WHERE restaurantId = ? AND status != 'CANCELLED' AND createdAt BETWEEN ? AND ?
+        GROUP BY 1
+    """, (*REVENUE_STATUSES, restaurant_id, start, end)).fetchall()
+    totals = {bool(r["paid"]): (r["n"], r["total"]) for r in rows}
+    return totals.get(True, (0, 0.0)), totals.get(False, (0, 0.0))
+
+def _sold_items(conn, restaurant_id, start, end):
+    # Uma linha por produto vendido: quantidade, receita e custo unitário
+    rows = conn.execute(f"""
+        SELECT m.name, m.category, COALESCE(m.itemType, 'PRODUCT') AS itemType,
+               COALESCE(m.costPrice, 0) AS costPrice,
+               SUM(oi.quantity) AS qty, SUM(oi.quantity * oi.price) AS revenue
+        FROM "Order" o
+        JOIN "OrderItem" oi ON oi.orderId = o.id
+        JOIN "MenuItem" m ON m.id = oi.menuItemId
+        WHERE o.restaurantId = ? AND o.status IN ({",".join("?" * len(SOLD_STATUSES))})
+          AND o.createdAt BETWEEN ? AND ?
+        GROUP BY m.id
+    """, (restaurant_id, *SOLD_STATUSES, start, end)).fetchall()
+    return {
+        "name": [r["name"] for r in rows],
+        "category": [r["category"] for r in rows],
+        "is_dish": np.array([r["itemType"] == "DISH" for r in rows], dtype=bool),
+        "qty": np.array([r["qty"] for r in rows], dtype=np.float64),
+        "revenue": np.array([r["revenue"] for r in rows], dtype=np.float64),
+        "cost": np.array([r["costPrice"] * r["qty"] for r in rows], dtype=np.float64),
+    }
+
+def _top_dish(items):
+    if not items["is_dish"].any():
+        return None
+    names = [n for n, d in zip(items["name"], items["is_dish"]) if d]
+    qty = _group_sum(names, items["qty"][items["is_dish"]])
+    revenue = _group_sum(names, items["revenue"][items["is_dish"]])
+    name = max(qty, key=qty.get)
+    return {"name": name, "quantity": int(qty[name]), "revenue": revenue[name]}
+
+def _purchases_by_supplier(conn, restaurant_id, start, end):
+    rows = conn.execute("""
+        SELECT COALESCE(s.name, 'Sem Fornecedor') AS supplier,
+               SUM(ABS(sm.quantity) * COALESCE(sm.purchasePrice, 0)) AS total
+        FROM "StockMovement" sm
+        LEFT JOIN "Supplier" s ON s.id = sm.supplierId
+        WHERE sm.restaurantId = ? AND sm.type = 'ENTRY' AND sm.createdAt BETWEEN ? AND ?
+        GROUP BY 1
+    """, (restaurant_id, start, end)).fetchall()
+    return {r["supplier"]: float(r["total"]) for r in rows}
+
+def _cash_summary(conn, restaurant_id):
+    session = conn.execute("""
+        SELECT id, openingBalance, openedAt FROM "CashSession"
+        WHERE restaurantId = ? AND status = 'OPEN' AND closedAt IS NULL
+        ORDER BY openedAt DESC LIMIT 1
+    """, (restaurant_id,)).fetchone()
+    if not session:
+        return {"isOpen": False, "currentBalance": 0, "openingBalance": 0, "openedAt": None}
+    movements = conn.execute('SELECT COALESCE(SUM(amount), 0) FROM "CashMovement" WHERE cashSessionId = ?', (session["id"],)).fetchone()[0]
+    return {
+        "isOpen": True,
+        "currentBalance": session["openingBalance"] + movements,
+        "openingBalance": session["openingBalance"],
+        "openedAt": to_iso(session["openedAt"])
+    }
+
+def billing_stats(conn, restaurant_id, period="day", now=None):
+    start, end = cafepoint_db.period_range(period, now)
+
+    (paid_count, total_revenue), (pending_count, pending_revenue) = _order_totals(conn, restaurant_id, start, end)
+    order_count = conn.execute(f"""
+        SELECT COUNT(*) FROM "Order"
+        WHERE restaurantId = ? AND status IN ({",".join("?" * len(SOLD_STATUSES))}) AND createdAt BETWEEN ? AND ?
+    """, (restaurant_id, *SOLD_STATUSES, start, end)).fetchone()[0]
+
+    items = _sold_items(conn, restaurant_id, start, end)
+    total_cost = float(items["cost"].sum())
+    gross_profit = total_revenue - total_cost
+    purchases = _purchases_by_supplier(conn, restaurant_id, start, end)
+
+    return {
+        "totalRevenue": float(total_revenue),
+        "totalCost": total_cost,
+        "totalPurchases": float(sum(purchases.values())),
+        "grossProfit": float(gross_profit),
+        "profitMargin": (gross_profit / total_revenue) * 100 if total_revenue > 0 else 0,
+        "orderCount": order_count,
+        "pendingRevenue": float(pending_revenue),
+        "pendingCount": pending_count,
+        "period": period,
+        "salesByCategory": _group_sum(items["category"], items["revenue"]),
+        "costByCategory": _group_sum(items["category"], items["cost"]),
+        "purchasesBySupplier": purchases,
+        "topConsumedDish": _top_dish(items),
+        "cashSummary": _cash_summary(conn, restaurant_id)
+    }
+
+# ==========================================
+# ANALYTICS (analyticsController.getAdvancedAnalytics)
+# ==========================================
+
+def _order_cube(conn, restaurant_id, start, end):
+    # Uma só passagem pelos pedidos: contagem e receita por (mesa, empregado, hora).
+    # As três vistas (mesas, empregados, fluxo horário) saem deste cubo.
+    rows = conn.execute(f"""
+        SELECT tableId, userId, {local_hour_sql("createdAt")} AS hour,
+               COUNT(*) AS n, COALESCE(SUM(totalAmount), 0) AS total
+        FROM "Order"
+        WHERE restaurantId = ? AND createdAt BETWEEN ? AND ?
+        GROUP BY 1, 2, 3
+    """, (restaurant_id, start, end)).fetchall()
+    return {
+        "table": np.array([r["tableId"] for r in rows], dtype=np.int64),
+        "user": np.array([r["userId"] for r in rows], dtype=np.int64),
+        "hour": np.array([r["hour"] for r in rows], dtype=np.int64),
+        "count": np.array([r["n"] for r in rows], dtype=np.float64),
+        "total": np.array([r["total"] for r in rows], dtype=np.float64),
+    }
+
+def _by_label(labels, cube, count_key, total_key):
+    counts = _group_sum(labels, cube["count"])
+    totals = _group_sum(labels, cube["total"])
+    return {label: {count_key: int(counts[label]), total_key: totals[label]} for label in counts}
+
+def _month_before(day):
+    # Como setMonth(getMonth() - 1) no backend (o dia é limitado ao fim do mês)
+    year, month = (day.year, day.month - 1) if day.month > 1 else (day.year - 1, 12)
+    last_day = ((date(year + month // 12, month % 12 + 1, 1)) - date.resolution).day
+    return day.replace(year=year, month=month, day=min(day.day, last_day))
+
+def advanced_analytics(conn, restaurant_id, start=None, end=None):
+    # Por omissão: do mesmo momento há um mês até ao fim de hoje
+    now = datetime.now()
+    start = cafepoint_db.to_ms(start if start is not None else _month_before(now))
+    end = cafepoint_db.to_ms(end) if end is not None else cafepoint_db.day_range(now.date(), now.date())[1]
+
+    cube = _order_cube(conn, restaurant_id, start, end)
+    tables = dict(conn.execute('SELECT id, number FROM "Table" WHERE restaurantId = ?', (restaurant_id,)).fetchall())
+    waiters = dict(conn.execute('SELECT id, name FROM "User" WHERE restaurantId = ? OR restaurantId IS NULL', (restaurant_id,)).fetchall())
+
+    table_labels = [str(tables.get(t, "Balcão/Outro")) for t in cube["table"]]
+    waiter_labels = [waiters.get(u) or "Desconhecido" for u in cube["user"]]
+    hourly = np.bincount(cube["hour"], weights=cube["count"], minlength=24) if len(cube["hour"]) else np.zeros(24)
+
+    order_count = int(cube["count"].sum())
+    total_revenue = float(cube["total"].sum())
+
+    top_products = [
+        {"name": r["name"], "qty": r["qty"], "revenue": r["revenue"]}
+        for r in conn.execute("""
+            SELECT COALESCE(m.name, 'Item Removido') AS name, SUM(oi.quantity) AS qty,
+                   SUM(oi.price * oi.quantity) AS revenue
+            FROM "Order" o
+            JOIN "OrderItem" oi ON oi.orderId = o.id
+            LEFT JOIN "MenuItem" m ON m.id = oi.menuItemId
+            WHERE o.restaurantId = ? AND o.createdAt BETWEEN ? AND ?
+            GROUP BY 1 ORDER BY revenue DESC LIMIT ?
+        """, (restaurant_id, start, end, TOP_PRODUCTS))
+    ]
+
+    avg_prep = conn.execute("""
+        SELECT AVG(prepEndTime - prepStartTime) / 60000.0 FROM "Order"
+        WHERE restaurantId = ? AND createdAt BETWEEN ? AND ?
+          AND prepStartTime IS NOT NULL AND prepEndTime IS NOT NULL
+    """, (restaurant_id, start, end)).fetchone()[0]
+
+    total_expenses = conn.execute('SELECT COALESCE(SUM(amount), 0) FROM "Expense" WHERE restaurantId = ? AND date BETWEEN ? AND ?', (restaurant_id, start, end)).fetchone()[0]
+    reservations = conn.execute("""
+        SELECT COUNT(*) AS total, COALESCE(SUM(status = 'NO_SHOW'), 0) AS noShow FROM "Reservation"
+        WHERE restaurantId = ? AND date BETWEEN ? AND ?
+    """, (restaurant_id, start, end)).fetchone()
+    maintenance = conn.execute('SELECT COALESCE(SUM(cost), 0) FROM "MaintenanceRecord" WHERE restaurantId = ? AND date BETWEEN ? AND ?', (restaurant_id, start, end)).fetchone()[0]
+    avg_rating = conn.execute('SELECT COALESCE(AVG(rating), 0) FROM "Feedback" WHERE restaurantId = ? AND createdAt BETWEEN ? AND ?', (restaurant_id, start, end)).fetchone()[0]
+
+    return {
+        "operational": {
+            "tableOccupancy": _by_label(table_labels, cube, "count", "revenue"),
+            "waiterPerformance": _by_label(waiter_labels, cube, "count", "total"),
+            "hourlyTraffic": [int(v) for v in hourly],
+            "avgPrepTime": round(avg_prep, 1) if avg_prep is not None else AVG_PREP_PLACEHOLDER
+        },
+        "financial": {
+            "totalRevenue": total_revenue,
+            "totalExpenses": float(total_expenses),
+            "netProfit": total_revenue - total_expenses,
+            # Simulado (igual ao backend) até existir o método de pagamento no pedido
+            "paymentMethods": {"Dinheiro": total_revenue * 0.7, "M-Pesa": total_revenue * 0.3},
+            "averageTicket": total_revenue / order_count if order_count > 0 else 0
+        },
+        "products": {"topProducts": top_products},
+        "reservations": {"total": reservations["total"], "noShow": reservations["noShow"]},
+        "maintenance": {"totalCost": float(maintenance)},
+        "satisfaction": {"avgRating": float(avg_rating), "nps": 100}
+    }
+
+# ==========================================
+# CLI
+# ==========================================
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def _pop_option(args, name):
+    if name in args:
+        i = args.index(name)
+        value = args[i + 1]
+        del args[i:i + 2]
+        return value
+    return None
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    db_path = _pop_option(args, "--db")
+
+    if len(args) < 2 or args[0] not in ("billing", "analytics"):
+        print("Usage: python report_engine.py billing <restaurantId> [day|week|month|year] [--db FILE]")
+        print("       python report_engine.py analytics <restaurantId> [AAAA-MM-DD AAAA-MM-DD] [--db FILE]")
+        sys.exit(1)
+
+    conn = cafepoint_db.connect(db_path, readonly=True)
+    start_time = time.perf_counter()
+    if args[0] == "billing":
+        data = billing_stats(conn, int(args[1]), args[2] if len(args) > 2 else "day")
+    else:
+        start, end = (args[2], args[3]) if len(args) > 3 else (None, None)
+        if end is not None:
+            end = cafepoint_db.day_range(cafepoint_db.parse_date(end).date(), cafepoint_db.parse_date(end).date())[1]
+        data = advanced_analytics(conn, int(args[1]), start, end)
+    elapsed_ms = (time.perf_counter() - start_time) * 1000
+
+    print(json.dumps({"success": True, "data": data}, indent=2, ensure_ascii=False))
+    peak = _peak_rss_mb()
+    print(f"⏱️  {elapsed_ms:.1f} ms" + (f" | pico de memória {peak:.1f} MB" if peak else ""), file=sys.stderr)
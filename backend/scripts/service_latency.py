@@ -0,0 +1,384 @@
+import json
+import math
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+import cafepoint_db
+import report_engine
+from cafepoint_db import local_day_sql, local_hour_sql
+
+# ==========================================
+# LATÊNCIA DA COZINHA E DO SERVIÇO (PERCENTIS)
+# ==========================================
+# Lê os tempos dos pedidos (createdAt, prepStartTime, prepEndTime, servedAt)
+# e mantém sketches de quantis por restaurante, dia, hora, posto e métrica:
+#
+#   queueWait    createdAt    -> prepStartTime   (espera na fila)
+#   prepTime     prepStartTime -> prepEndTime    (preparação)
+#   timeToServe  createdAt    -> servedAt        (do pedido à mesa)
+#
+# O sketch é um DDSketch: contagens em baldes logarítmicos com erro relativo
+# máximo de RELATIVE_ACCURACY. Juntar dois sketches é somar as contagens, por
+# isso os percentis de qualquer intervalo de datas saem dos sketches
+# guardados (tabela latency_sketch), sem voltar a ler os pedidos.
+#
+# Posto: como as páginas Cozinha/Bar do frontend, "Bebidas" vai para o bar e
+# o resto (exceto "Inventário") para a cozinha. Um pedido com itens da
+# cozinha conta como cozinha; só com bebidas, como bar.
+#
+# Cada execução só lê pedidos novos ou alterados (marca de id/updatedAt) e
+# latency_order_state guarda que métricas de cada pedido já foram contadas.
+#
+# As tabelas latency_* não fazem parte do schema.prisma: ficam num ficheiro à
+# parte ao lado da base (dev.db -> dev.latency.db), ligado por ATTACH como
+# "latency", onde o "prisma db push" do arranque não as apaga. Os sketches de
+# dias já passados para o arquivo (cold_archive) só existem aí: esse ficheiro
+# não deve ser apagado. O índice Order.updatedAt vem das migrações.
+#
+# API:
+#   conn = cafepoint_db.connect()
+#   service_latency.refresh(conn)              (faz o ATTACH do ficheiro dos sketches)
+#   service_latency.latency_report(conn, restaurant_id, start_day, end_day)
+#
+# CLI:
+#   python service_latency.py [--rebuild] [--db F]
+#   python service_latency.py report <restaurantId> [AAAA-MM-DD AAAA-MM-DD] [--by-hour] [--db F]
+
+RELATIVE_ACCURACY = 0.01
+GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+LOG_GAMMA = math.log(GAMMA)
+MIN_MS = 1000                   # abaixo de 1 s (ou negativo, relógios) conta como zero
+ZERO_KEY = -1
+MAX_KEY = 4000                  # ~ 10^17 ms: nunca atingido
+KEY_SPAN = 4096
+CHUNK_ORDERS = 50000
+OVERLAP_MS = 10 * 60 * 1000
+QUANTILES = {"p50": 0.5, "p90": 0.9, "p99": 0.99}
+
+METRICS = ["queueWait", "prepTime", "timeToServe"]
+STATIONS = ["kitchen", "bar", "other"]
+BAR_CATEGORIES = ("Bebidas",)
+NON_KITCHEN_CATEGORIES = ("Bebidas", "Inventário")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS latency.latency_state (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS latency.latency_order_state (
+    orderId INTEGER PRIMARY KEY,
+    station INTEGER NOT NULL,
+    counted INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS latency.latency_sketch (
+    restaurantId INTEGER NOT NULL,
+    day TEXT NOT NULL,
+    station TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    hour INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    sumMs REAL NOT NULL,
+    minMs INTEGER NOT NULL,
+    maxMs INTEGER NOT NULL,
+    buckets BLOB NOT NULL,
+    PRIMARY KEY (restaurantId, day, station, metric, hour)
+) WITHOUT ROWID;
+"""
+
+LATENCY_TABLES = ["latency_state", "latency_order_state", "latency_sketch"]
+
+# ==========================================
+# SKETCH (DDSketch em NumPy)
+# ==========================================
+
+def bucket_keys(values_ms):
+    values = np.asarray(values_ms, dtype=np.float64)
+    keys = np.full(len(values), ZERO_KEY, dtype=np.int64)
+    positive = values >= MIN_MS
+    keys[positive] = np.minimum(np.ceil(np.log(values[positive]) / LOG_GAMMA), MAX_KEY).astype(np.int64)
+    return keys
+
+def bucket_values(keys):
+    # Valor representativo do balde (erro relativo <= RELATIVE_ACCURACY)
+    keys = np.asarray(keys)
+    return np.where(keys == ZERO_KEY, 0.0, 2 * np.power(GAMMA, keys.astype(np.float64)) / (GAMMA + 1))
+
+def encode_buckets(keys, counts):
+    return np.concatenate([keys, counts]).astype("<i4").tobytes()
+
+def decode_buckets(blob):
+    values = np.frombuffer(blob, dtype="<i4").astype(np.int64)
+    half = len(values) // 2
+    return values[:half], values[half:]
+
+def merge_buckets(parts):
+    # parts: lista de (keys, counts); devolve baldes ordenados e somados
+    parts = [p for p in parts if len(p[0])]
+    if not parts:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    keys = np.concatenate([p[0] for p in parts])
+    counts = np.concatenate([p[1] for p in parts])
+    unique, inverse = np.unique(keys, return_inverse=True)
+    return unique, np.bincount(inverse, weights=counts, minlength=len(unique)).astype(np.int64)
+
+def quantiles(keys, counts, min_ms, max_ms):
+    total = int(counts.sum())
+    if total == 0:
+        return {name: None for name in QUANTILES}
+    cumulative = np.cumsum(counts)
+    result = {}
+    for name, q in QUANTILES.items():
+        i = int(np.searchsorted(cumulative, q * (total - 1), side="right"))
+        value = float(np.clip(bucket_values(keys[min(i, len(keys) - 1)]), min_ms, max_ms))
+        result[name] = value
+    return result
+
+# ==========================================
+# ATUALIZAÇÃO INCREMENTAL
+# ==========================================
+
+def attach(conn):
+    cafepoint_db.attach_side_file(conn, "latency", SCHEMA, LATENCY_TABLES)
+
+def create_tables(conn):
+    attach(conn)
+    conn.executescript(SCHEMA)
+
+def drop_tables(conn):
+    attach(conn)
+    conn.executescript("".join(f"DROP TABLE IF EXISTS latency.{table};\n" for table in LATENCY_TABLES))
+
+def _max(conn, table, column):
+    return conn.execute(f'SELECT MAX("{column}") FROM "{table}"').fetchone()[0]
+
+def _load_sketch(conn, key):
+    row = conn.execute("""
+        SELECT count, sumMs, minMs, maxMs, buckets FROM latency_sketch
+        WHERE restaurantId = ? AND day = ? AND station = ? AND metric = ? AND hour = ?
+    """, key).fetchone()
+    if row is None:
+        return None
+    return row["count"], row["sumMs"], row["minMs"], row["maxMs"], decode_buckets(row["buckets"])
+
+def _fold_chunk(conn, rows, existing):
+    # rows: (orderId, restaurantId, day, hour, station, counted, createdAt, prepStart, prepEnd, servedAt)
+    order_id = np.array([r[0] for r in rows], dtype=np.int64)
+    restaurant = np.array([r[1] for r in rows], dtype=np.int64)
+    day_labels, day = np.unique(np.array([r[2] for r in rows], dtype=object), return_inverse=True)
+    hour = np.array([r[3] for r in rows], dtype=np.int64)
+    station = np.array([r[4] for r in rows], dtype=np.int64)
+    counted = np.array([r[5] for r in rows], dtype=np.int64)
+    created, prep_start, prep_end, served = (
+        np.array([np.nan if r[i] is None else r[i] for r in rows], dtype=np.float64) for i in range(6, 10))
+
+    values = [prep_start - created, prep_end - prep_start, served - created]
+    new_counted = counted.copy()
+    parts = []
+    for m, value in enumerate(values):
+        bit = 1 << m
+        add = ~np.isnan(value) & ((counted & bit) == 0)
+        new_counted[add] |= bit
+        if add.any():
+            parts.append((np.flatnonzero(add), np.full(int(add.sum()), m), value[add]))
+
+    if parts:
+        index = np.concatenate([p[0] for p in parts])
+        metric = np.concatenate([p[1] for p in parts])
+        value = np.concatenate([p[2] for p in parts])
+        keys = bucket_keys(value)
+
+        # Um código por sketch (restaurante, dia, posto, métrica, hora) e por balde
+        sketch_code = (((restaurant[index] * len(day_labels) + day[index]) * len(STATIONS) + station[index])
+                       * len(METRICS) + metric) * 24 + hour[index]
+        sketches, sketch_of = np.unique(sketch_code, return_inverse=True)
+        cells, cell_of = np.unique(sketch_of * KEY_SPAN + (keys - ZERO_KEY), return_inverse=True)
+        cell_counts = np.bincount(cell_of)
+        n = np.bincount(sketch_of)
+        sums = np.bincount(sketch_of, weights=np.maximum(value, 0))
+        mins = np.full(len(sketches), np.inf)
+        maxs = np.full(len(sketches), -np.inf)
+        np.minimum.at(mins, sketch_of, np.maximum(value, 0))
+        np.maximum.at(maxs, sketch_of, np.maximum(value, 0))
+        first = np.zeros(len(sketches), dtype=np.int64)
+        first[sketch_of] = np.arange(len(sketch_of))
+        cell_sketch = cells // KEY_SPAN
+        cell_key = cells % KEY_SPAN + ZERO_KEY
+        bounds = np.searchsorted(cell_sketch, np.arange(len(sketches) + 1))
+
+        writes = []
+        for s in range(len(sketches)):
+            i = index[first[s]]
+            key = (int(restaurant[i]), str(day_labels[day[i]]), STATIONS[station[i]], METRICS[metric[first[s]]], int(hour[i]))
+            buckets = (cell_key[bounds[s]:bounds[s + 1]], cell_counts[bounds[s]:bounds[s + 1]])
+            count, total, low, high = int(n[s]), float(sums[s]), mins[s], maxs[s]
+            previous = _load_sketch(conn, key) if existing is None or key in existing else None
+            if previous:
+                count += previous[0]
+                total += previous[1]
+                low, high = min(low, previous[2]), max(high, previous[3])
+                buckets = merge_buckets([previous[4], buckets])
+            if existing is not None:
+                existing.add(key)
+            writes.append((*key, count, total, int(low), int(high), encode_buckets(*buckets)))
+        conn.executemany("INSERT OR REPLACE INTO latency_sketch VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", writes)
+
+    conn.executemany("INSERT OR REPLACE INTO latency_order_state (orderId, station, counted) VALUES (?, ?, ?)",
+                     zip(order_id.tolist(), station.tolist(), new_counted.tolist()))
+    return int((new_counted != counted).sum())
+
+def refresh(conn, rebuild=False):
+    start = time.perf_counter()
+    if rebuild:
+        drop_tables(conn)
+    create_tables(conn)
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        state = {name: value for name, value in conn.execute("SELECT name, value FROM latency_state")}
+        last_order = state.get("order_id", 0)
+        last_item = state.get("order_item_id", 0)
+        since = state.get("order_updated_at", 0) - OVERLAP_MS
+        # Primeira execução: os sketches ainda não existem, só é preciso reler os
+        # que esta execução já escreveu (pedidos do mesmo sketch em blocos diferentes)
+        existing = set() if not state else None
+
+        # Posto dos pedidos novos, a partir dos itens ainda não vistos
+        station_sql = f"""CASE
+            WHEN MAX(COALESCE(m.category, '') NOT IN ({",".join("?" * len(NON_KITCHEN_CATEGORIES))})) THEN 0
+            WHEN MAX(m.category IN ({",".join("?" * len(BAR_CATEGORIES))})) THEN 1
+            ELSE 2 END"""
+        conn.execute("CREATE TEMP TABLE latency_new_station (orderId INTEGER PRIMARY KEY, station INTEGER)")
+        conn.execute(f"""
+            INSERT INTO temp.latency_new_station
+            SELECT oi.orderId, {station_sql}
+            FROM "OrderItem" oi LEFT JOIN "MenuItem" m ON m.id = oi.menuItemId
+            WHERE oi.id > ? GROUP BY oi.orderId
+        """, (*NON_KITCHEN_CATEGORIES, *BAR_CATEGORIES, last_item))
+
+        conn.execute(f"""
+            CREATE TEMP TABLE latency_new AS
+            SELECT o.id, o.restaurantId, {local_day_sql("o.createdAt")} AS day, {local_hour_sql("o.createdAt")} AS hour,
+                   COALESCE(s.station, n.station, 2) AS station, COALESCE(s.counted, 0) AS counted,
+                   o.createdAt, o.prepStartTime, o.prepEndTime, o.servedAt
+            FROM "Order" o
+            LEFT JOIN latency_order_state s ON s.orderId = o.id
+            LEFT JOIN temp.latency_new_station n ON n.orderId = o.id
+            WHERE (o.id > ? OR o.updatedAt >= ?)
+              AND COALESCE(s.counted, 0) != 7
+        """, (last_order, since))
+
+        # Em blocos: a memória não depende do número de pedidos
+        orders = measurements = 0
+        cursor = conn.execute("SELECT * FROM temp.latency_new")
+        while True:
+            rows = cursor.fetchmany(CHUNK_ORDERS)
+            if not rows:
+                break
+            measurements += _fold_chunk(conn, rows, existing)
+            orders += len(rows)
+
+        state["order_id"] = _max(conn, "Order", "id") or last_order
+        state["order_updated_at"] = _max(conn, "Order", "updatedAt") or state.get("order_updated_at", 0)
+        state["order_item_id"] = _max(conn, "OrderItem", "id") or last_item
+        conn.executemany("INSERT OR REPLACE INTO latency_state (name, value) VALUES (?, ?)", state.items())
+        conn.execute("DROP TABLE temp.latency_new_station")
+        conn.execute("DROP TABLE temp.latency_new")
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return {"orders": orders, "updatedOrders": measurements, "seconds": round(time.perf_counter() - start, 3)}
+
+# ==========================================
+# LEITURA
+# ==========================================
+
+def _summary(group):
+    keys, counts = merge_buckets([g[4] for g in group])
+    count = sum(g[0] for g in group)
+    low, high = min(g[2] for g in group), max(g[3] for g in group)
+    values = quantiles(keys, counts, low, high)
+    to_min = lambda ms: None if ms is None else round(ms / 60000, 1)
+    return {"count": count, "mean": to_min(sum(g[1] for g in group) / count),
+            **{name: to_min(v) for name, v in values.items()}, "max": to_min(high)}
+
+def latency_report(conn, restaurant_id, start_day=None, end_day=None, by_hour=False):
+    attach(conn)
+    # Minutos, como o avgPrepTime do backend
+    today = datetime.now().date()
+    end_day = end_day or today
+    start_day = start_day or report_engine._month_before(end_day)
+
+    groups = {}
+    for row in conn.execute("""
+        SELECT station, metric, hour, count, sumMs, minMs, maxMs, buckets FROM latency_sketch
+        WHERE restaurantId = ? AND day BETWEEN ? AND ?
+    """, (restaurant_id, start_day.isoformat(), end_day.isoformat())):
+        sketch = (row["count"], row["sumMs"], row["minMs"], row["maxMs"], decode_buckets(row["buckets"]))
+        groups.setdefault((row["station"], row["metric"]), []).append((row["hour"], sketch))
+
+    stations = {}
+    for (station, metric), entries in sorted(groups.items(), key=lambda g: (STATIONS.index(g[0][0]), METRICS.index(g[0][1]))):
+        result = stations.setdefault(station, {})
+        result[metric] = _summary([sketch for _, sketch in entries])
+        if by_hour:
+            hours = {}
+            for hour, sketch in entries:
+                hours.setdefault(hour, []).append(sketch)
+            result.setdefault("byHour", {})[metric] = {str(h): _summary(hours[h]) for h in sorted(hours)}
+
+    return {"period": {"from": start_day.isoformat(), "to": end_day.isoformat()},
+            "unit": "minutes", "relativeAccuracy": RELATIVE_ACCURACY, "stations": stations}
+
+# ==========================================
+# CLI
+# ==========================================
+
+def _pop_option(args, name):
+    if name in args:
+        i = args.index(name)
+        value = args[i + 1]
+        del args[i:i + 2]
+        return value
+    return None
+
+def print_report(report):
+    period = report["period"]
+    print(f"⏱️  Latência de {period['from']} a {period['to']} (minutos)")
+    print(f"{'Posto':<10}{'Métrica':<14}{'pedidos':>9}{'média':>8}{'p50':>8}{'p90':>8}{'p99':>8}")
+    for station, metrics in report["stations"].items():
+        for metric in METRICS:
+            if metric in metrics:
+                s = metrics[metric]
+                print(f"{station:<10}{metric:<14}{s['count']:>9}{s['mean']:>8.1f}{s['p50']:>8.1f}{s['p90']:>8.1f}{s['p99']:>8.1f}")
+    if not report["stations"]:
+        print("⚠️  Sem dados no período (execute a atualização primeiro).")
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    db_path = _pop_option(args, "--db")
+    rebuild = "--rebuild" in args
+    by_hour = "--by-hour" in args
+    args = [a for a in args if a not in ("--rebuild", "--by-hour")]
+
+    if args and (args[0] != "report" or len(args) not in (2, 4)):
+        print("Usage: python service_latency.py [--rebuild] [--db FILE]")
+        print("       python service_latency.py report <restaurantId> [AAAA-MM-DD AAAA-MM-DD] [--by-hour] [--db FILE]")
+        sys.exit(1)
+
+    if not args:
+        result = refresh(cafepoint_db.connect(db_path), rebuild)
+        print(f"✅ Sketches atualizados: {result['orders']} pedidos lidos, {result['updatedOrders']} com tempos novos "
+              f"em {result['seconds'] * 1000:.1f} ms")
+        sys.exit(0)
+
+    conn = cafepoint_db.connect(db_path, readonly=True)
+    days = [cafepoint_db.parse_date(a).date() for a in args[2:4]] if len(args) == 4 else [None, None]
+    report = latency_report(conn, int(args[1]), *days, by_hour=by_hour)
+    if by_hour:
+        print(json.dumps({"success": True, "data": report}, indent=2, ensure_ascii=False))
+    else:
+        print_report(report)
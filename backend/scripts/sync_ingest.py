@@ -0,0 +1,625 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cafepoint_db
+
+# ==========================================
+# INGESTÃO EM LOTE DAS FILAS OFFLINE (SYNC UPLOAD)
+# ==========================================
+# O syncUp do frontend (services/offlineSync.ts) repete a fila do IndexedDB
+# um pedido HTTP de cada vez: um tablet que passou o turno offline faz
+# centenas de idas e voltas e centenas de transações SQLite. Aqui a fila
+# inteira chega num só payload (POST /api/sync/upload do roadmap):
+#
+#   {"deviceId": "tablet-3", "items": [{"id": 17, "url": "/orders", "method": "post",
+#                                       "body": {...}, "timestamp": 1760000000000}, ...]}
+#
+# 1. Cada item é identificado por (restaurante, deviceId, id da fila): o que
+#    já tiver recibo em SyncReceipt sai como "duplicate" com o resultado
+#    original (um reenvio depois de uma falha de rede não repete nada). Só
+#    os itens aplicados (ou juntos num aplicado) ficam com recibo: um
+#    rejeitado (caixa fechado, stock) pode ser reenviado mais tarde.
+# 2. Operações sobre o mesmo pedido/mesa juntam-se: de várias mudanças de
+#    estado do mesmo pedido só a última é escrita (o pagamento, com o
+#    movimento de caixa, acontece se alguma delas era PAID, como na
+#    repetição item a item); de várias mudanças de estado da mesma mesa fica
+#    a última. O resultado é o da repetição item a item: sem caixa aberto os
+#    PAID da cadeia saem rejeitados e fica a última mudança que não é PAID;
+#    se a operação juntada falha, os itens que absorveu saem rejeitados com
+#    ela. Um estado inválido não se junta a nada. A mesa é escrita uma vez
+#    por lote, com o estado final (conta também o OCCUPIED de um pedido novo
+#    e o AVAILABLE de um pagamento).
+# 3. As operações aplicam-se por ordem da fila, BATCH_ITEMS por transação,
+#    cada uma num SAVEPOINT: uma rejeitada (stock, mesa de outro restaurante,
+#    caixa fechado) não desfaz as outras. As validações são as dos
+#    controllers (orderController.createOrder/updateOrderStatus,
+#    tableController.updateTableStatus); o pedido fica com a data em que foi
+#    feito offline (timestamp da fila).
+#    Com --dry-run todos os lotes correm numa só transação, desfeita no fim.
+# 4. No fim, uma linha no SyncLog (type UPLOAD, recordsCount = operações
+#    aceites) e um resultado por item, pela ordem recebida.
+#
+# Tipos suportados: POST /orders, PATCH /orders/:id/status e
+# PATCH /tables/:id/status; o resto sai como "unsupported" (o cliente
+# repete-o pela API normal). Não há eventos Socket.IO: os ecrãs apanham as
+# alterações no syncDown/refresh seguinte.
+#
+# API:
+#   sync_ingest.ingest(conn, user, items, device_id)
+#
+# CLI:
+#   python sync_ingest.py apply <fila.json> --user ID [--device NOME] [--dry-run] [--json] [--db F]
+#   python sync_ingest.py serve [--host 0.0.0.0] [--port 5055] [--db F]
+
+BATCH_ITEMS = 200
+DEFAULT_PORT = 5055
+MAX_PAYLOAD_BYTES = 10 * 1024 * 1024
+JWT_SECRET = os.environ.get("JWT_SECRET") or "cafe-point-offline-secret-key-2026"
+
+ROUTES = [
+    ("createOrder", ("POST",), re.compile(r"^/orders/?$")),
+    ("orderStatus", ("PATCH", "PUT"), re.compile(r"^/orders/(\d+)/status/?$")),
+    ("tableStatus", ("PATCH", "PUT"), re.compile(r"^/tables/(\d+)/status/?$")),
+]
+# Mesmos papéis das rotas (orderRoutes.ts / tableRoutes.ts)
+ROLES = {
+    "createOrder": ("ADMIN", "SUPER_ADMIN", "WAITER"),
+    "orderStatus": ("ADMIN", "SUPER_ADMIN", "KITCHEN", "WAITER"),
+    "tableStatus": ("ADMIN", "SUPER_ADMIN", "WAITER"),
+}
+ORDER_STATUSES = ("PENDING", "PREPARING", "READY", "SERVED", "PAID", "CANCELLED")
+TABLE_STATUSES = ("AVAILABLE", "OCCUPIED", "RESERVED")
+
+# Igual ao que o "prisma db push" cria a partir do model SyncReceipt
+RECEIPT_SCHEMA = """
+CREATE TABLE IF NOT EXISTS "SyncReceipt" (
+    "id" INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
+    "restaurantId" INTEGER NOT NULL,
+    "deviceId" TEXT NOT NULL,
+    "clientItemId" INTEGER NOT NULL,
+    "status" TEXT NOT NULL,
+    "orderId" INTEGER,
+    "message" TEXT,
+    "createdAt" DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT "SyncReceipt_restaurantId_fkey" FOREIGN KEY ("restaurantId") REFERENCES "Restaurant" ("id") ON DELETE RESTRICT ON UPDATE CASCADE
+);
+CREATE UNIQUE INDEX IF NOT EXISTS "SyncReceipt_restaurantId_deviceId_clientItemId_key"
+    ON "SyncReceipt"("restaurantId", "deviceId", "clientItemId");
+"""
+
+class SyncRejected(Exception):
+    pass
+
+# ==========================================
+# LEITURA E JUNÇÃO DA FILA
+# ==========================================
+
+def parse_item(raw):
+    # Item da fila -> operação (kind, alvo, corpo) ou mensagem de erro
+    if not isinstance(raw, dict) or not isinstance(raw.get("id"), int):
+        return None, "Item sem id numérico da fila"
+    path = re.sub(r"^(https?://[^/]+)?(/api)?", "", str(raw.get("url") or "").split("?")[0])
+    method = str(raw.get("method") or "").upper()
+    body = raw.get("body")
+    if isinstance(body, str):
+        # O axios guarda o corpo já serializado
+        try:
+            body = json.loads(body)
+        except ValueError:
+            body = None
+    for kind, methods, pattern in ROUTES:
+        match = pattern.match(path)
+        if match and method in methods:
+            if not isinstance(body, dict):
+                return None, "Corpo do pedido inválido"
+            return {
+                "id": raw["id"],
+                "kind": kind,
+                "target": int(match.group(1)) if match.groups() else None,
+                "body": body,
+                "timestamp": raw.get("timestamp") if isinstance(raw.get("timestamp"), (int, float)) else None,
+                "absorbed": [],
+            }, None
+    return None, f"Operação não suportada em lote: {method} {path}"
+
+def plan(items):
+    # Devolve (operações a aplicar por ordem da fila, resultados já decididos)
+    results = {}
+    ops = []
+    seen = set()
+    for raw in sorted((r for r in items if isinstance(r, dict)), key=lambda r: (not isinstance(r.get("id"), int), r.get("id") or 0)):
+        op, error = parse_item(raw)
+        if op is None:
+            if isinstance(raw.get("id"), int):
+                results[raw["id"]] = {"id": raw["id"], "status": "unsupported", "message": error}
+            continue
+        if op["id"] in seen:
+            continue
+        seen.add(op["id"])
+        ops.append(op)
+
+    # Só a última mudança de estado de cada pedido/mesa é escrita; um estado
+    # inválido não se junta a nada (item a item seria rejeitado sozinho)
+    latest = {}
+    for op in ops:
+        if op["kind"] == "createOrder":
+            continue
+        status = op["body"].get("status")
+        op["paid"] = op["kind"] == "orderStatus" and status == "PAID"
+        op["chain"] = [(op["id"], status)]
+        if status not in (ORDER_STATUSES if op["kind"] == "orderStatus" else TABLE_STATUSES):
+            continue
+        key = (op["kind"], op["target"])
+        previous = latest.get(key)
+        if previous is not None:
+            previous["coalesced"] = True
+            op["absorbed"] += previous["absorbed"] + [previous["id"]]
+            op["chain"] = previous["chain"] + op["chain"]
+            op["paid"] = op["paid"] or previous["paid"]
+            previous["absorbed"] = []
+        latest[key] = op
+    return [op for op in ops if not op.get("coalesced")], results
+
+# ==========================================
+# APLICAÇÃO (mesmas regras dos controllers)
+# ==========================================
+
+class Context:
+    def __init__(self, conn, user, now):
+        self.conn = conn
+        self.restaurant_id = user["restaurantId"]
+        self.user_id = user["id"]
+        self.role = user["role"]
+        self.now = now
+        self.license_error = None
+        self.cash_session = None
+        self.tables = {}            # mesa -> estado final neste lote
+
+        license_row = conn.execute('SELECT status FROM "License" WHERE restaurantId = ?', (self.restaurant_id,)).fetchone()
+        if license_row is not None and license_row[0] != "ACTIVE":
+            self.license_error = "Licença inativa ou expirada. Contate o suporte."
+
+    def open_cash_session(self):
+        if self.cash_session is None:
+            row = self.conn.execute("""
+                SELECT id FROM "CashSession"
+                WHERE restaurantId = ? AND status = 'OPEN' AND closedAt IS NULL
+                ORDER BY openedAt DESC LIMIT 1
+            """, (self.restaurant_id,)).fetchone()
+            if row is None:
+                raise SyncRejected("Caixa fechado. Abra o caixa para continuar.")
+            self.cash_session = row[0]
+        return self.cash_session
+
+def _create_order(ctx, op):
+    conn, body = ctx.conn, op["body"]
+    if ctx.license_error:
+        raise SyncRejected(ctx.license_error)
+    table_id = body.get("tableId")
+    items = body.get("items")
+    if not isinstance(items, list) or not items:
+        raise SyncRejected("Pedido sem itens")
+    table = conn.execute('SELECT id FROM "Table" WHERE id = ? AND restaurantId = ?', (table_id, ctx.restaurant_id)).fetchone()
+    if table is None:
+        raise SyncRejected("Mesa não encontrada ou acesso negado")
+
+    ids = sorted({item.get("menuItemId") for item in items if isinstance(item, dict) and isinstance(item.get("menuItemId"), int)})
+    marks = ", ".join("?" * len(ids))
+    menu = {r[0]: r for r in conn.execute(f"""
+        SELECT id, name, price, itemType, stockQuantity FROM "MenuItem"
+        WHERE restaurantId = ? AND isAvailable = 1 AND id IN ({marks})
+    """, [ctx.restaurant_id] + ids)}
+    if any(not isinstance(item, dict) or item.get("menuItemId") not in menu
+           or not isinstance(item.get("quantity"), int) or item["quantity"] <= 0 for item in items):
+        raise SyncRejected("Alguns itens não existem ou não são deste restaurante")
+    recipes = {}
+    for parent_id, quantity, ingredient_id, name, stock in conn.execute(f"""
+        SELECT r.parentItemId, r.quantity, i.id, i.name, i.stockQuantity
+        FROM "RecipeItem" r JOIN "MenuItem" i ON i.id = r.ingredientId
+        WHERE r.parentItemId IN ({marks})
+    """, ids):
+        recipes.setdefault(parent_id, []).append((quantity, ingredient_id, name, stock))
+
+    # Stock: soma de todas as linhas do pedido (o controller verifica linha a linha)
+    needed = {}
+    for item in items:
+        menu_id, name, _, item_type, stock = menu[item["menuItemId"]]
+        if item_type == "PRODUCT" and stock is not None:
+            needed[menu_id] = (needed.get(menu_id, (0, name, stock, None))[0] + item["quantity"], name, stock, None)
+        if item_type == "DISH":
+            for quantity, ingredient_id, ingredient_name, ingredient_stock in recipes.get(menu_id, []):
+                if ingredient_stock is not None:
+                    total = needed.get(ingredient_id, (0, ingredient_name, ingredient_stock, name))[0] + quantity * item["quantity"]
+                    needed[ingredient_id] = (total, ingredient_name, ingredient_stock, name)
+    for total, name, stock, dish in needed.values():
+        if stock < total:
+            raise SyncRejected(f"Estoque insuficiente de ingrediente ({name}) para: {dish}" if dish
+                               else f"Estoque insuficiente para: {name}")
+
+    created_at = int(op["timestamp"]) if op["timestamp"] else ctx.now
+    total_amount = sum(menu[item["menuItemId"]][2] * item["quantity"] for item in items)
+    order_id = conn.execute("""
+        INSERT INTO "Order" (restaurantId, tableId, userId, status, totalAmount, createdAt, updatedAt)
+        VALUES (?, ?, ?, 'PENDING', ?, ?, ?)
+    """, (ctx.restaurant_id, table_id, ctx.user_id, total_amount, created_at, ctx.now)).lastrowid
+    conn.executemany("""
+        INSERT INTO "OrderItem" (orderId, menuItemId, quantity, notes, price, course) VALUES (?, ?, ?, ?, ?, ?)
+    """, [(order_id, item["menuItemId"], item["quantity"], item.get("notes") or "", menu[item["menuItemId"]][2],
+           item.get("course") or "MAIN") for item in items])
+
+    movements = []
+    for item in items:
+        menu_id, name, _, item_type, stock = menu[item["menuItemId"]]
+        if item_type == "PRODUCT" and stock is not None:
+            movements.append((menu_id, item["quantity"], f"Venda Pedido #{order_id}"))
+        if item_type == "DISH":
+            for quantity, ingredient_id, _, ingredient_stock in recipes.get(menu_id, []):
+                if ingredient_stock is not None:
+                    movements.append((ingredient_id, quantity * item["quantity"], f"Receita: {name} (#{order_id})"))
+    conn.executemany('UPDATE "MenuItem" SET stockQuantity = stockQuantity - ? WHERE id = ?',
+                     [(quantity, menu_id) for menu_id, quantity, _ in movements])
+    conn.executemany("""
+        INSERT INTO "StockMovement" (restaurantId, menuItemId, quantity, type, reason, createdAt, userId)
+        VALUES (?, ?, ?, 'EXIT_SALE', ?, ?, ?)
+    """, [(ctx.restaurant_id, menu_id, -quantity, reason, created_at, ctx.user_id) for menu_id, quantity, reason in movements])
+
+    ctx.tables[table_id] = "OCCUPIED"
+    return order_id
+
+def _order_status(ctx, op):
+    conn = ctx.conn
+    status = op["body"].get("status")
+    if status not in ORDER_STATUSES:
+        raise SyncRejected(f"Estado de pedido inválido: {status}")
+    order = conn.execute('SELECT id, status, totalAmount, tableId FROM "Order" WHERE id = ? AND restaurantId = ?',
+                         (op["target"], ctx.restaurant_id)).fetchone()
+    if order is None:
+        raise SyncRejected("Pedido não encontrado")
+    paid = op["paid"] and order[1] != "PAID"
+    if paid:
+        try:
+            session_id = ctx.open_cash_session()
+        except SyncRejected as e:
+            # Item a item, cada PAID era rejeitado e as outras mudanças entravam:
+            # fica a última que não é PAID, e os PAID da cadeia saem rejeitados
+            others = [(item_id, s) for item_id, s in op["chain"] if s != "PAID"]
+            if not others:
+                raise
+            op["failed"] = {item_id: str(e) for item_id, s in op["chain"] if s == "PAID"}
+            op["appliedAs"], status = others[-1]
+            paid = False
+    if paid:
+        # Como no updateOrderStatus: a entrada no caixa acompanha o pagamento
+        conn.execute("""
+            INSERT INTO "CashMovement" (restaurantId, cashSessionId, userId, type, amount, description, createdAt)
+            VALUES (?, ?, ?, 'ENTRY', ?, ?, ?)
+        """, (ctx.restaurant_id, session_id, ctx.user_id, float(order[2] or 0),
+              f"Pagamento Pedido #{order[0]}", ctx.now))
+    conn.execute('UPDATE "Order" SET status = ?, updatedAt = ? WHERE id = ?', (status, ctx.now, order[0]))
+    if status == "PAID" or paid:
+        ctx.tables[order[3]] = "AVAILABLE"
+    return order[0]
+
+def _table_status(ctx, op):
+    status = op["body"].get("status")
+    if status not in TABLE_STATUSES:
+        raise SyncRejected(f"Estado de mesa inválido: {status}")
+    if ctx.conn.execute('SELECT 1 FROM "Table" WHERE id = ? AND restaurantId = ?',
+                        (op["target"], ctx.restaurant_id)).fetchone() is None:
+        raise SyncRejected("Mesa não encontrada")
+    ctx.tables[op["target"]] = status
+    return None
+
+APPLY = {"createOrder": _create_order, "orderStatus": _order_status, "tableStatus": _table_status}
+
+def ensure_schema(conn):
+    if not cafepoint_db.table_exists(conn, "SyncReceipt"):
+        conn.executescript(RECEIPT_SCHEMA)
+
+def _previous_receipts(conn, restaurant_id, device_id, ids):
+    receipts = {}
+    for start in range(0, len(ids), 500):
+        chunk = ids[start:start + 500]
+        for item_id, status, order_id, message in conn.execute(f"""
+            SELECT clientItemId, status, orderId, message FROM "SyncReceipt"
+            WHERE restaurantId = ? AND deviceId = ? AND clientItemId IN ({", ".join("?" * len(chunk))})
+        """, [restaurant_id, device_id] + chunk):
+            receipts[item_id] = {"id": item_id, "status": "duplicate", "original": status, "orderId": order_id,
+                                 "message": message}
+    return receipts
+
+def _result(op, status, order_id=None, message=None):
+    result = {"id": op["id"], "status": status}
+    if order_id is not None:
+        result["orderId"] = order_id
+    if message:
+        result["message"] = message
+    return result
+
+def _chain_results(op, result):
+    # Resultado de cada item da fila que entrou nesta operação (ela e os que absorveu)
+    if result["status"] != "applied":
+        return [result] + [{"id": item_id, "status": "rejected", "message": result.get("message"),
+                            "into": op["id"]} for item_id in op["absorbed"]]
+    failed = op.get("failed", {})
+    winner = op.get("appliedAs", op["id"])
+    results = []
+    for item_id in op["absorbed"] + [op["id"]]:
+        if item_id in failed:
+            results.append({"id": item_id, "status": "rejected", "message": failed[item_id]})
+        elif item_id == winner:
+            results.append(dict(result, id=item_id))
+        else:
+            results.append({"id": item_id, "status": "coalesced", "into": winner})
+    return results
+
+def ingest(conn, user, items, device_id, batch=BATCH_ITEMS, dry_run=False):
+    start_time = time.perf_counter()
+    if not user.get("restaurantId"):
+        raise ValueError("Utilizador sem restaurante (Tenant ID missing)")
+    device_id = str(device_id or "default")
+    ensure_schema(conn)
+
+    ops, results = plan(items)
+    previous = _previous_receipts(conn, user["restaurantId"], device_id, [op["id"] for op in ops]
+                                  + [op_id for op in ops for op_id in op["absorbed"]])
+    results.update(previous)
+    for op in ops:
+        if op["id"] in previous:
+            for absorbed in op["absorbed"]:
+                results.setdefault(absorbed, {"id": absorbed, "status": "coalesced", "into": op["id"]})
+    ops = [op for op in ops if op["id"] not in previous]
+    for op in ops:
+        op["absorbed"] = [i for i in op["absorbed"] if i not in previous]
+        op["chain"] = [(i, s) for i, s in op.get("chain", []) if i not in previous]
+
+    # --dry-run: uma só transação desfeita no fim, para os lotes seguintes verem
+    # o efeito dos anteriores (como na execução real)
+    transactions = 0
+    if dry_run:
+        conn.execute("BEGIN IMMEDIATE")
+        transactions = 1
+    try:
+        for start in range(0, len(ops), batch):
+            chunk = ops[start:start + batch]
+            if not dry_run:
+                conn.execute("BEGIN IMMEDIATE")
+                transactions += 1
+            ctx = Context(conn, user, cafepoint_db.now_ms())
+            receipts = []
+            for op in chunk:
+                if user["role"] not in ROLES[op["kind"]]:
+                    result = _result(op, "rejected", message=f"Acesso negado para o papel {user['role']}")
+                else:
+                    conn.execute("SAVEPOINT sync_item")
+                    try:
+                        result = _result(op, "applied", APPLY[op["kind"]](ctx, op))
+                        conn.execute("RELEASE sync_item")
+                    except SyncRejected as e:
+                        conn.execute("ROLLBACK TO sync_item")
+                        conn.execute("RELEASE sync_item")
+                        result = _result(op, "rejected", message=str(e))
+                winner = op.get("appliedAs", op["id"])
+                for item in _chain_results(op, result):
+                    results[item["id"]] = item
+                    if item["status"] == "applied":
+                        receipts.append((item["id"], "applied", item.get("orderId"), None))
+                    elif item["status"] == "coalesced":
+                        receipts.append((item["id"], "coalesced", result.get("orderId"), f"Junto com o item {winner}"))
+
+            # Uma escrita por mesa com o estado final do lote
+            conn.executemany('UPDATE "Table" SET status = ? WHERE id = ?', [(s, t) for t, s in ctx.tables.items()])
+            conn.executemany("""
+                INSERT INTO "SyncReceipt" (restaurantId, deviceId, clientItemId, status, orderId, message, createdAt)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, [(user["restaurantId"], device_id) + r + (ctx.now,) for r in receipts])
+            if not dry_run:
+                conn.commit()
+        if dry_run:
+            conn.rollback()
+    except BaseException:
+        conn.rollback()
+        raise
+
+    ordered = []
+    emitted = set()
+    for raw in items:
+        item_id = raw.get("id") if isinstance(raw, dict) else None
+        if item_id in emitted:
+            ordered.append({"id": item_id, "status": "duplicate", "message": "Repetido no mesmo envio"})
+            continue
+        emitted.add(item_id)
+        ordered.append(results.get(item_id) or {"id": item_id, "status": "unsupported", "message": "Item sem id numérico da fila"})
+    counts = {}
+    for r in ordered:
+        counts[r["status"]] = counts.get(r["status"], 0) + 1
+    summary = {
+        "deviceId": device_id,
+        "received": len(items),
+        "applied": counts.get("applied", 0),
+        "coalesced": counts.get("coalesced", 0),
+        "duplicates": counts.get("duplicate", 0),
+        "rejected": counts.get("rejected", 0),
+        "unsupported": counts.get("unsupported", 0),
+        "transactions": transactions,
+        "durationMs": int((time.perf_counter() - start_time) * 1000),
+        "dryRun": dry_run,
+        "results": ordered,
+    }
+    if not dry_run:
+        problems = [f"#{r['id']}: {r.get('message')}" for r in ordered if r["status"] in ("rejected", "unsupported")]
+        with conn:
+            cafepoint_db.log_sync(conn, [user["restaurantId"]], "UPLOAD", "PARTIAL" if problems else "SUCCESS",
+                                  summary["applied"] + summary["coalesced"], summary["durationMs"],
+                                  "; ".join(problems)[:500] or None)
+    return summary
+
+def load_user(conn, user_id):
+    row = conn.execute('SELECT id, username, role, restaurantId, name FROM "User" WHERE id = ?', (user_id,)).fetchone()
+    if row is None:
+        raise ValueError(f"Utilizador {user_id} não encontrado")
+    return {"id": row[0], "username": row[1], "role": row[2], "restaurantId": row[3], "name": row[4]}
+
+def print_summary(summary):
+    for r in summary["results"]:
+        if r["status"] in ("rejected", "unsupported"):
+            print(f"❌ #{r['id']} {r['status']}: {r.get('message')}")
+    prefix = "📝 (simulação) " if summary["dryRun"] else "✅ "
+    print(f"{prefix}{summary['received']} itens: {summary['applied']} aplicados, {summary['coalesced']} juntos, "
+          f"{summary['duplicates']} repetidos, {summary['rejected']} rejeitados, {summary['unsupported']} não suportados "
+          f"em {summary['transactions']} transações ({summary['durationMs']} ms)")
+
+# ==========================================
+# SERVIÇO HTTP (POST /api/sync/upload)
+# ==========================================
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+def verify_token(token, secret=JWT_SECRET):
+    # JWT HS256 emitido pelo authController.login (mesmo segredo)
+    try:
+        header, payload, signature = token.split(".")
+        expected = base64.urlsafe_b64encode(
+            hmac.new(secret.encode(), f"{header}.{payload}".encode(), hashlib.sha256).digest()).rstrip(b"=").decode()
+        if not hmac.compare_digest(expected, signature) or json.loads(_b64decode(header)).get("alg") != "HS256":
+            return None
+        data = json.loads(_b64decode(payload))
+    except (ValueError, TypeError):
+        return None
+    if data.get("exp") and data["exp"] < time.time():
+        return None
+    return data
+
+class SyncRequestHandler(BaseHTTPRequestHandler):
+    db_path = None
+    lock = threading.Lock()         # a SQLite só tem um escritor: um envio de cada vez
+
+    def _send(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self._cors()
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _cors(self):
+        self.send_header("Access-Control-Allow-Origin", self.headers.get("Origin") or "*")
+        self.send_header("Access-Control-Allow-Methods", "GET,POST,OPTIONS")
+        self.send_header("Access-Control-Allow-Headers", "Content-Type, Authorization, X-Requested-With")
+        self.send_header("Access-Control-Allow-Credentials", "true")
+
+    def do_OPTIONS(self):
+        self.send_response(200)
+        self._cors()
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self):
+        if self.path.split("?")[0] == "/api/health":
+            return self._send(200, {"status": "healthy", "time": cafepoint_db.to_iso(cafepoint_db.now_ms())})
+        self._send(404, {"error": "Rota nao encontrada"})
+
+    def do_POST(self):
+        if self.path.split("?")[0] != "/api/sync/upload":
+            return self._send(404, {"error": "Rota nao encontrada"})
+        user = verify_token((self.headers.get("Authorization") or "").replace("Bearer ", ""))
+        if user is None:
+            return self._send(401, {"success": False, "message": "Token inválido."})
+        if not user.get("restaurantId"):
+            return self._send(403, {"success": False, "message": "Acesso negado. Identificação do restaurante inválida ou ausente (Tenant ID missing)."})
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_PAYLOAD_BYTES:
+            return self._send(413, {"success": False, "message": "Fila demasiado grande para um só envio"})
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return self._send(400, {"success": False, "message": "JSON inválido"})
+        items = payload.get("items") if isinstance(payload, dict) else payload
+        if not isinstance(items, list):
+            return self._send(400, {"success": False, "message": "Campo 'items' em falta"})
+        device_id = payload.get("deviceId") if isinstance(payload, dict) else None
+
+        with self.lock:
+            conn = cafepoint_db.connect(self.db_path)
+            try:
+                summary = ingest(conn, user, items, device_id)
+            except Exception as e:
+                try:
+                    with conn:
+                        cafepoint_db.log_sync(conn, [user["restaurantId"]], "UPLOAD", "ERROR", 0, None, str(e)[:500])
+                except Exception:
+                    pass
+                print(f"❌ Erro na sincronização: {e}", file=sys.stderr)
+                return self._send(500, {"success": False, "message": "Erro interno do servidor"})
+            finally:
+                conn.close()
+        self._send(200, {"success": True, "data": summary})
+
+    def log_message(self, fmt, *args):
+        print(f"[SYNC] {self.address_string()} {fmt % args}", file=sys.stderr)
+
+def serve(host="0.0.0.0", port=DEFAULT_PORT, db_path=None):
+    SyncRequestHandler.db_path = db_path or cafepoint_db.default_db_path()
+    server = ThreadingHTTPServer((host, port), SyncRequestHandler)
+    print(f"🚀 Ingestão de filas offline em http://{host}:{port}/api/sync/upload ({SyncRequestHandler.db_path})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+def read_dump(path):
+    # Exportação da fila: lista de itens ou {"deviceId": ..., "items": [...]}
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, list):
+        return data, None
+    return data.get("items") or [], data.get("deviceId")
+
+def _pop_option(args, name):
+    if name in args:
+        i = args.index(name)
+        value = args[i + 1]
+        del args[i:i + 2]
+        return value
+    return None
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    db_path = _pop_option(args, "--db")
+    user_id = _pop_option(args, "--user")
+    device = _pop_option(args, "--device")
+    host = _pop_option(args, "--host") or "0.0.0.0"
+    port = _pop_option(args, "--port")
+    flags = {a for a in args if a in ("--dry-run", "--json")}
+    args = [a for a in args if a not in flags]
+
+    if args == ["serve"]:
+        serve(host, int(port) if port else DEFAULT_PORT, db_path)
+    elif len(args) == 2 and args[0] == "apply" and user_id:
+        items, dump_device = read_dump(args[1])
+        conn = cafepoint_db.connect(db_path)
+        try:
+            summary = ingest(conn, load_user(conn, int(user_id)), items, device or dump_device, dry_run="--dry-run" in flags)
+        except ValueError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        if "--json" in flags:
+            print(json.dumps({"success": True, "data": summary}, indent=2, ensure_ascii=False))
+        else:
+            print_summary(summary)
+    else:
+        print("Usage: python sync_ingest.py apply <queue.json> --user ID [--device NAME] [--dry-run] [--json] [--db FILE]")
+        print("       python sync_ingest.py serve [--host 0.0.0.0] [--port 5055] [--db FILE]")
+        sys.exit(1)
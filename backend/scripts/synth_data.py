@@ -0,0 +1,577 @@
+import os
+import sqlite3
+import sys
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+import cafepoint_db
+
+# ==========================================
+# GERADOR DE DADOS SINTÉTICOS (TESTES DE CARGA)
+# ==========================================
+# Cria um ficheiro SQLite com o mesmo esquema do backend (copiado de
+# prisma/dev.db) e preenche-o com restaurantes realistas: mesas, menu com
+# receitas encadeadas, pedidos com tempos de cozinha, stock, caixa,
+# despesas e avaliações.
+#
+# O mesmo --seed (e a mesma --end) gera sempre o mesmo ficheiro: cada
+# restaurante tem o seu próprio gerador aleatório e todos os ids são
+# atribuídos aqui.
+#
+# Volume de referência (1x) = um restaurante movimentado durante um ano.
+# --scale 10 / --scale 100 multiplica o número de restaurantes.
+#
+# Uso: python synth_data.py <saida.db> [--scale X] [--tenants N] [--days D]
+#        [--orders-per-day K] [--seed S] [--end AAAA-MM-DD] [--template dev.db]
+#        [--stock-per-order] [--force]
+#
+# Todos os utilizadores têm a palavra-passe "admin123"; o código de cada
+# restaurante (slug) é synth-001, synth-002, ...
+
+BASE_VOLUME = {"tenants": 1, "days": 365, "orders_per_day": 150}
+DEFAULT_SEED = 2026
+
+# bcrypt de "admin123" (o mesmo do seed), para os testes de carga poderem fazer login
+PASSWORD_HASH = "$2a$10$qrxKdtBY/PgXt8Gsf1fvj.tnwOkaDdrLCIYwOiTTIC3yjFwocc9me"
+DAY_MS = 86400000
+
+PLANS = [
+    # nome, maxUsers, maxTables, maxItems, preço
+    ("TRIAL", 5, 10, 50, 0.0),
+    ("BASIC", 10, 50, 200, 29.9),
+    ("PRO", 50, 200, 1000, 59.9),
+]
+
+# Ingredientes: nome, unidade, custo por unidade
+INGREDIENTS = [
+    ("Farinha de milho", "kg", 45), ("Feijão", "kg", 90), ("Arroz", "kg", 70),
+    ("Frango", "kg", 280), ("Carne de vaca", "kg", 420), ("Peixe", "kg", 350),
+    ("Camarão", "kg", 900), ("Batata", "kg", 50), ("Cebola", "kg", 60),
+    ("Tomate", "kg", 65), ("Alho", "kg", 200), ("Óleo", "l", 150),
+    ("Leite de coco", "l", 120), ("Amendoim", "kg", 160), ("Folhas de mandioca", "kg", 80),
+    ("Piri-piri", "kg", 300), ("Sal", "kg", 30), ("Limão", "kg", 70),
+    ("Ovos", "un", 10), ("Pão", "un", 8), ("Açúcar", "kg", 80),
+    ("Café moído", "kg", 900), ("Leite", "l", 75), ("Farinha de trigo", "kg", 60),
+    ("Manteiga", "kg", 500), ("Coco ralado", "kg", 180),
+]
+
+# Preparados (sub-receitas não vendidas diretamente); podem usar outros preparados
+PREPARATIONS = {
+    "Molho de tomate": [("Tomate", 0.4), ("Cebola", 0.15), ("Alho", 0.02), ("Óleo", 0.05), ("Sal", 0.01)],
+    "Molho piri-piri": [("Piri-piri", 0.05), ("Limão", 0.1), ("Alho", 0.03), ("Óleo", 0.1)],
+    "Caril base": [("Molho de tomate", 0.5), ("Leite de coco", 0.3), ("Cebola", 0.1)],
+    "Caril de amendoim": [("Caril base", 0.6), ("Amendoim", 0.2)],
+    "Massa de pão": [("Farinha de trigo", 0.5), ("Manteiga", 0.05), ("Ovos", 1), ("Sal", 0.01)],
+}
+
+# Pratos: nome, categoria, preço, receita (ingredientes e preparados, por dose)
+DISHES = [
+    ("Xima com feijão", "Refeições", 100, [("Farinha de milho", 0.2), ("Feijão", 0.15), ("Molho de tomate", 0.1)]),
+    ("Frango à zambeziana", "Refeições", 450, [("Frango", 0.35), ("Leite de coco", 0.15), ("Molho piri-piri", 0.05), ("Arroz", 0.15)]),
+    ("Matapa com arroz", "Refeições", 300, [("Folhas de mandioca", 0.25), ("Caril de amendoim", 0.15), ("Arroz", 0.15)]),
+    ("Caril de camarão", "Refeições", 750, [("Camarão", 0.25), ("Caril base", 0.2), ("Arroz", 0.15)]),
+    ("Peixe grelhado", "Refeições", 550, [("Peixe", 0.4), ("Limão", 0.05), ("Batata", 0.25), ("Óleo", 0.03)]),
+    ("Bife com batata frita", "Refeições", 500, [("Carne de vaca", 0.3), ("Batata", 0.3), ("Óleo", 0.08), ("Ovos", 1)]),
+    ("Frango piri-piri", "Refeições", 480, [("Frango", 0.4), ("Molho piri-piri", 0.08), ("Batata", 0.25)]),
+    ("Sopa de legumes", "Entradas", 75, [("Batata", 0.1), ("Cebola", 0.05), ("Tomate", 0.08), ("Sal", 0.005)]),
+    ("Chamuças", "Entradas", 120, [("Massa de pão", 0.1), ("Carne de vaca", 0.08), ("Cebola", 0.03), ("Óleo", 0.05)]),
+    ("Rissóis de camarão", "Entradas", 150, [("Massa de pão", 0.1), ("Camarão", 0.05), ("Óleo", 0.05)]),
+    ("Pudim", "Sobremesas", 120, [("Ovos", 2), ("Leite", 0.15), ("Açúcar", 0.05)]),
+    ("Bolo de coco", "Sobremesas", 100, [("Farinha de trigo", 0.08), ("Coco ralado", 0.05), ("Açúcar", 0.05), ("Ovos", 1)]),
+    ("Café", "Cafetaria", 50, [("Café moído", 0.01), ("Açúcar", 0.01)]),
+    ("Galão", "Cafetaria", 80, [("Café moído", 0.01), ("Leite", 0.2)]),
+    ("Torrada", "Cafetaria", 60, [("Pão", 1), ("Manteiga", 0.02)]),
+]
+
+# Bebidas (produtos com stock próprio): nome, preço, custo
+DRINKS = [
+    ("2M", 120, 70), ("Laurentina Preta", 130, 75), ("Manica", 120, 70),
+    ("Coca-Cola", 60, 32), ("Fanta", 60, 32), ("Água 500ml", 40, 18),
+    ("Compal", 80, 45), ("Vinho tinto (copo)", 150, 60), ("Sumo natural", 90, 30),
+]
+
+COURSES = {"Entradas": "STARTER", "Sobremesas": "DESSERT", "Bebidas": "DRINK"}
+EXPENSE_CATEGORIES = ["Energia", "Água", "Manutenção", "Marketing", "Transporte", "Outros"]
+PAYMENT_METHODS = ["Dinheiro", "M-Pesa", "Transferência"]
+RESTAURANT_NAMES = ["Café Point", "Sabores do Índico", "Tasca da Baixa", "Marisqueira Costa do Sol",
+                    "Piri-Piri House", "Cantinho da Matola", "Grill Maputo", "Esplanada Polana"]
+WAITER_NAMES = ["Antonio", "Fátima", "Zacarias", "Lurdes", "Celso", "Amélia", "Hélder", "Rosa",
+                "Jaime", "Graça", "Nelson", "Marta", "Octávio", "Sónia", "Dércio", "Isabel"]
+
+# Procura relativa por dia da semana (segunda = 0) e mistura de horas do dia
+WEEKDAY_FACTOR = np.array([0.8, 0.85, 0.9, 1.0, 1.25, 1.35, 1.1])
+HOUR_MIX = [  # (média, desvio, peso) em horas
+    (8.5, 0.7, 0.12), (12.8, 0.9, 0.45), (19.8, 1.2, 0.38), (15.5, 3.5, 0.05),
+]
+
+# ==========================================
+# ESCRITA EM MASSA
+# ==========================================
+
+class Loader:
+    def __init__(self, conn):
+        self.conn = conn
+        self.counts = {}
+        self.next_id = {}
+
+    def ids(self, table, n):
+        # Ids explícitos e sequenciais: o resultado não depende da ordem de escrita do SQLite
+        start = self.next_id.get(table, 1)
+        self.next_id[table] = start + n
+        return np.arange(start, start + n, dtype=np.int64)
+
+    def insert(self, table, columns, rows):
+        column_list = ", ".join('"%s"' % c for c in columns)
+        sql = f'INSERT INTO "{table}" ({column_list}) VALUES ({", ".join("?" * len(columns))})'
+        cur = self.conn.executemany(sql, rows)
+        self.counts[table] = self.counts.get(table, 0) + cur.rowcount
+        return cur.rowcount
+
+def _cols(*arrays):
+    # Colunas NumPy/listas -> linhas para executemany (tipos Python nativos)
+    return zip(*[a.tolist() if isinstance(a, np.ndarray) else a for a in arrays])
+
+def create_schema(conn, template_path):
+    tmpl = sqlite3.connect(f"file:{os.path.abspath(template_path)}?mode=ro", uri=True)
+    rows = tmpl.execute("""
+        SELECT type, sql FROM sqlite_master
+        WHERE sql IS NOT NULL AND name NOT LIKE 'sqlite_%' AND name != '_prisma_migrations'
+        ORDER BY type = 'index', rowid
+    """).fetchall()
+    tmpl.close()
+    for kind, sql in rows:
+        if kind == "table":
+            conn.execute(sql)
+    # Índices só depois da carga (mais rápido do que mantê-los linha a linha)
+    return [sql for kind, sql in rows if kind == "index"]
+
+# ==========================================
+# UM RESTAURANTE
+# ==========================================
+
+def _catalog(rng):
+    # Cada restaurante vende um subconjunto do menu, com preços ligeiramente diferentes
+    dishes = [d for d in DISHES if rng.random() < 0.85] or DISHES[:3]
+    drinks = [d for d in DRINKS if rng.random() < 0.9] or DRINKS[:2]
+    price_factor = rng.uniform(0.85, 1.2)
+
+    items = []  # dicts com name, category, itemType, price, cost, unit, available
+    for name, unit, cost in INGREDIENTS:
+        items.append({"name": name, "category": "Ingredientes", "itemType": "INGREDIENT", "price": 0.0,
+                      "cost": float(cost), "unit": unit, "available": 0, "stocked": True})
+    for name in PREPARATIONS:
+        items.append({"name": name, "category": "Preparados", "itemType": "DISH", "price": 0.0,
+                      "cost": 0.0, "unit": "porção", "available": 0, "stocked": False})
+    for name, category, price, _ in dishes:
+        items.append({"name": name, "category": category, "itemType": "DISH",
+                      "price": float(round(price * price_factor, -1)), "cost": 0.0, "unit": "un",
+                      "available": 1, "stocked": False})
+    for name, price, cost in drinks:
+        items.append({"name": name, "category": "Bebidas", "itemType": "PRODUCT",
+                      "price": float(round(price * price_factor, -1)), "cost": float(cost), "unit": "un",
+                      "available": 1, "stocked": True})
+
+    index = {item["name"]: i for i, item in enumerate(items)}
+    recipes = {**PREPARATIONS, **{name: recipe for name, _, _, recipe in dishes}}
+    bom = np.zeros((len(items), len(items)))
+    for parent, recipe in recipes.items():
+        for component, qty in recipe:
+            bom[index[parent], index[component]] = qty
+
+    # Fecho transitivo (pratos -> preparados -> ingredientes), só colunas com stock:
+    # é o que sai realmente da despensa
+    closure = np.zeros_like(bom)
+    power = bom.copy()
+    while power.any():
+        closure += power
+        power = power @ bom
+    stocked = np.array([item["stocked"] for item in items])
+    stock_bom = closure * stocked
+
+    # Custo de cada prato = custo dos ingredientes que consome
+    base_costs = np.array([item["cost"] for item in items])
+    for i, item in enumerate(items):
+        if bom[i].any():
+            item["cost"] = float(round(stock_bom[i] @ base_costs, 2))
+        # Bebidas descontam o próprio stock ao vender
+        if item["itemType"] == "PRODUCT":
+            stock_bom[i, i] = 1.0
+    return items, recipes, index, stock_bom
+
+def _order_times(rng, day_starts, counts, anchor_ms):
+    n = int(counts.sum())
+    day_of_order = np.repeat(np.arange(len(counts)), counts)
+    component = rng.choice(len(HOUR_MIX), size=n, p=[w for _, _, w in HOUR_MIX])
+    means = np.array([m for m, _, _ in HOUR_MIX])[component]
+    stds = np.array([s for _, s, _ in HOUR_MIX])[component]
+    hours = np.clip(rng.normal(means, stds), 7.0, 23.75)
+    created = day_starts[day_of_order] + (hours * 3600000).astype(np.int64)
+    keep = created < anchor_ms
+    created, day_of_order, hours = created[keep], day_of_order[keep], hours[keep]
+    order = np.argsort(created, kind="stable")
+    return created[order], day_of_order[order], hours[order]
+
+def _lognormal_ms(rng, median_s, sigma, size):
+    return (rng.lognormal(np.log(median_s), sigma, size) * 1000).astype(np.int64)
+
+def generate_tenant(loader, rng, t, days, orders_per_day, end_day, anchor_ms, plan_ids, stock_per_order):
+    first_day = end_day - timedelta(days=days - 1)
+    day_starts = np.array([cafepoint_db.to_ms(first_day + timedelta(days=d)) for d in range(days)], dtype=np.int64)
+    since_ms = int(day_starts[0]) - int(rng.integers(1, 60)) * DAY_MS
+
+    # --- Restaurante, licença, equipa, sala ---
+    rid = int(loader.ids("Restaurant", 1)[0])
+    slug = f"synth-{rid:03d}"
+    name = f"{RESTAURANT_NAMES[t % len(RESTAURANT_NAMES)]} {rid}"
+    loader.insert("Restaurant", ["id", "name", "slug", "ownerName", "email", "status", "createdAt", "updatedAt"],
+                  [(rid, name, slug, f"Dono {rid}", f"{slug}@cafepoint.test", "ACTIVE", since_ms, since_ms)])
+    loader.insert("License", ["id", "restaurantId", "planId", "startDate", "endDate", "status"],
+                  [(int(loader.ids("License", 1)[0]), rid, int(rng.choice(plan_ids)), since_ms, anchor_ms + 365 * DAY_MS, "ACTIVE")])
+
+    n_waiters = int(rng.integers(4, 13))
+    user_ids = loader.ids("User", n_waiters + 2)
+    admin_id, kitchen_id, waiter_ids = int(user_ids[0]), int(user_ids[1]), user_ids[2:]
+    users = [(admin_id, "admin", "Administrador", "ADMIN"), (kitchen_id, "cozinha", "Cozinha", "KITCHEN")]
+    users += [(int(u), f"garcom{i + 1}", WAITER_NAMES[(t + i) % len(WAITER_NAMES)], "WAITER") for i, u in enumerate(waiter_ids)]
+    loader.insert("User", ["id", "username", "password", "name", "role", "restaurantId", "createdAt"],
+                  [(u, un, PASSWORD_HASH, nm, role, rid, since_ms) for u, un, nm, role in users])
+
+    n_devices = int(rng.integers(1, 4))
+    loader.insert("Device", ["id", "restaurantId", "name", "fingerprint", "type", "status", "lastActiveAt"],
+                  [(int(d), rid, f"POS {i + 1}", rng.bytes(8).hex().upper(), "POS", "AUTHORIZED", anchor_ms)
+                   for i, d in enumerate(loader.ids("Device", n_devices))])
+
+    location_ids = loader.ids("Location", 2)
+    loader.insert("Location", ["id", "restaurantId", "name"],
+                  [(int(location_ids[0]), rid, "Sala Principal"), (int(location_ids[1]), rid, "Esplanada")])
+    n_tables = int(rng.integers(10, 41))
+    table_ids = loader.ids("Table", n_tables)
+    capacities = rng.choice([2, 4, 4, 6], size=n_tables)
+    loader.insert("Table", ["id", "restaurantId", "number", "capacity", "status", "type", "locationId"],
+                  _cols(table_ids, [rid] * n_tables, np.arange(1, n_tables + 1), capacities,
+                        ["AVAILABLE"] * n_tables, [f"TABLE_{c}" for c in capacities.tolist()],
+                        location_ids[(np.arange(n_tables) >= n_tables * 0.7).astype(int)]))
+
+    n_suppliers = int(rng.integers(3, 7))
+    supplier_ids = loader.ids("Supplier", n_suppliers)
+    loader.insert("Supplier", ["id", "restaurantId", "name", "createdAt", "updatedAt"],
+                  [(int(s), rid, f"Fornecedor {i + 1}", since_ms, since_ms) for i, s in enumerate(supplier_ids)])
+
+    # --- Pedidos e itens (tudo vetorizado) ---
+    items, recipes, index, stock_bom = _catalog(rng)
+    n_items = len(items)
+    item_ids = loader.ids("MenuItem", n_items)
+    sellable = np.array([i for i, it in enumerate(items) if it["available"]])
+    popularity = 1.0 / np.arange(1, len(sellable) + 1) ** 0.8
+    popularity = rng.permutation(popularity / popularity.sum())
+    prices = np.array([it["price"] for it in items])
+    is_dish = np.array([it["itemType"] == "DISH" for it in items])
+
+    size = 1.0 if t == 0 else float(rng.lognormal(0, 0.35))
+    weekdays = np.array([(first_day + timedelta(days=d)).weekday() for d in range(days)])
+    counts = rng.poisson(orders_per_day * size * WEEKDAY_FACTOR[weekdays] / WEEKDAY_FACTOR.mean())
+    created, order_day, hours = _order_times(rng, day_starts, counts, anchor_ms)
+    n_orders = len(created)
+    order_ids = loader.ids("Order", n_orders)
+
+    lines_per_order = 1 + rng.poisson(1.8, n_orders)
+    n_lines = int(lines_per_order.sum())
+    line_order = np.repeat(np.arange(n_orders), lines_per_order)
+    line_item = sellable[rng.choice(len(sellable), size=n_lines, p=popularity)]
+    line_qty = 1 + rng.poisson(0.3, n_lines)
+    line_amount = line_qty * prices[line_item]
+    totals = np.bincount(line_order, weights=line_amount, minlength=n_orders)
+    has_food = np.bincount(line_order, weights=is_dish[line_item], minlength=n_orders) > 0
+
+    # Linha temporal completa de cada pedido: fila, cozinha (bar mais rápido,
+    # cozinha mais lenta nas horas de ponta), entrega e pagamento
+    peak = np.exp(-((hours - 12.8) / 1.0) ** 2) + np.exp(-((hours - 19.8) / 1.2) ** 2)
+    prep_median_s = np.where(has_food, 480 * (1 + 0.7 * peak), 180)
+    prep_start = created + _lognormal_ms(rng, 90, 0.8, n_orders)
+    prep_end = prep_start + (rng.lognormal(0, 0.45, n_orders) * prep_median_s * 1000).astype(np.int64)
+    served_at = prep_end + _lognormal_ms(rng, 90, 0.6, n_orders)
+    paid_at = served_at + _lognormal_ms(rng, 35 * 60, 0.5, n_orders)
+
+    # Destino final: quase tudo pago; os pedidos ainda a decorrer no momento
+    # "agora" ficam na fase em que estão (PENDING ... SERVED)
+    status = rng.choice(["PAID", "SERVED", "CANCELLED"], size=n_orders, p=[0.9, 0.03, 0.07]).astype(object)
+    stages = np.array(["PENDING", "PREPARING", "READY", "SERVED", "PAID"], dtype=object)
+    reached = ((prep_start <= anchor_ms).astype(int) + (prep_end <= anchor_ms) + (served_at <= anchor_ms)
+               + ((paid_at <= anchor_ms) & (status == "PAID")))
+    live = (status != "CANCELLED") & (reached < np.where(status == "PAID", 4, 3))
+    status[live] = stages[reached[live]]
+
+    cancelled = status == "CANCELLED"
+    started = ~np.isin(status, ["PENDING"]) & ~(cancelled & (rng.random(n_orders) < 0.7))
+    prep_start = np.where(started, prep_start, 0)
+    prep_end = np.where(np.isin(status, ["READY", "SERVED", "PAID"]), prep_end, 0)
+    served_at = np.where(np.isin(status, ["SERVED", "PAID"]), served_at, 0)
+    updated = np.maximum.reduce([created + 1000, prep_start, prep_end, served_at])
+    updated = np.where(status == "PAID", paid_at, updated)
+    updated = np.where(cancelled, np.minimum(created + _lognormal_ms(rng, 600, 0.8, n_orders), anchor_ms), updated)
+
+    def nullable(values):
+        return [v or None for v in values.tolist()]
+
+    waiter_of_order = waiter_ids[rng.integers(0, len(waiter_ids), n_orders)]
+    table_of_order = table_ids[rng.integers(0, n_tables, n_orders)]
+
+    # --- Consumo de stock (por dia e produto) a partir das vendas não canceladas ---
+    sold_line = status[line_order] != "CANCELLED"
+    daily_sold = np.zeros((days, n_items))
+    np.add.at(daily_sold, (order_day[line_order[sold_line]], line_item[sold_line]), line_qty[sold_line])
+    daily_use = daily_sold @ stock_bom
+    avg_use = daily_use.mean(axis=0)
+
+    # --- Limites de stock a partir do consumo médio ---
+    stocked = np.array([it["stocked"] for it in items])
+    min_stock = np.where(stocked, np.ceil(avg_use * 3) + 1, 5).astype(int)
+    max_stock = np.where(stocked, np.ceil(avg_use * 14) + 5, 0).astype(int)
+
+    # --- Movimentos de stock ---
+    stocked_idx = np.flatnonzero(stocked)
+    movements = []  # (menuItem idx, quantidade, tipo, preço compra, fornecedor, lote, motivo, ms)
+    # Stock inicial + compras semanais com ~10-30% de margem
+    for d in range(0, days, 7):
+        week_use = daily_use[d:d + 7].sum(axis=0)
+        for i in stocked_idx.tolist():
+            qty = int(np.ceil(max_stock[i] if d == 0 else week_use[i] * rng.uniform(1.1, 1.3)))
+            if qty > 0:
+                movements.append((i, qty, "ENTRY", round(items[i]["cost"] * rng.uniform(0.95, 1.05), 2),
+                                  int(supplier_ids[i % n_suppliers]), f"L{d:03d}-{i:02d}", None, int(day_starts[d]) + 8 * 3600000))
+        # Quebras/desperdício em alguns ingredientes
+        for i in stocked_idx[rng.random(len(stocked_idx)) < 0.2].tolist():
+            waste = round(float(week_use[i] * rng.uniform(0.01, 0.06)), 3)
+            if waste > 0:
+                movements.append((i, -waste, "ADJUSTMENT", None, None, None, "Quebra/Desperdício", int(day_starts[d]) + 22 * 3600000))
+
+    if stock_per_order:
+        # Como o backend: uma saída por linha de pedido e ingrediente
+        lines = np.flatnonzero(sold_line)
+        comp_counts = (stock_bom[line_item[lines]] > 0).sum(axis=1)
+        rep_line = np.repeat(lines, comp_counts)
+        comp = np.concatenate([np.flatnonzero(stock_bom[i]) for i in line_item[lines].tolist()]) if len(lines) else np.array([], dtype=int)
+        use = np.round(stock_bom[line_item[rep_line], comp] * line_qty[rep_line], 3)
+        exits = _cols(comp, -use, ["EXIT_SALE"] * len(comp), [None] * len(comp), [None] * len(comp), [None] * len(comp),
+                      [f"Venda Pedido #{o}" for o in order_ids[line_order[rep_line]].tolist()], created[line_order[rep_line]])
+    else:
+        # Uma saída agregada por dia e produto (mesmos totais, muito menos linhas)
+        day_idx, comp = np.nonzero(daily_use)
+        use = np.round(daily_use[day_idx, comp], 3)
+        exits = _cols(comp, -use, ["EXIT_SALE"] * len(comp), [None] * len(comp), [None] * len(comp), [None] * len(comp),
+                      [f"Vendas {(first_day + timedelta(days=d)).isoformat()}" for d in day_idx.tolist()], day_starts[day_idx] + 23 * 3600000 + 50 * 60000)
+
+    stock_rows = [(int(item_ids[i]), q, tp, pp, sp, lot, reason, ms) for i, q, tp, pp, sp, lot, reason, ms in movements]
+    stock_rows += [(int(item_ids[i]), q, tp, pp, sp, lot, reason, ms) for i, q, tp, pp, sp, lot, reason, ms in exits]
+    stock_rows.sort(key=lambda r: r[-1])
+    # Stock atual = soma de todos os movimentos de cada produto
+    stock_level = np.round(np.bincount([r[0] - int(item_ids[0]) for r in stock_rows],
+                                       weights=[r[1] for r in stock_rows], minlength=n_items))
+
+    # --- Menu, receitas, pedidos ---
+    loader.insert("MenuItem",
+                  ["id", "restaurantId", "name", "price", "costPrice", "category", "unit", "isAvailable",
+                   "stockQuantity", "minStock", "maxStock", "itemType", "supplierId"],
+                  [(int(item_ids[i]), rid, it["name"], it["price"], it["cost"], it["category"], it["unit"], it["available"],
+                    int(stock_level[i]) if it["stocked"] else 0, int(min_stock[i]), int(max_stock[i]) if it["stocked"] else None, it["itemType"],
+                    int(supplier_ids[i % n_suppliers]) if it["stocked"] else None)
+                   for i, it in enumerate(items)])
+    recipe_rows = [(int(item_ids[index[parent]]), int(item_ids[index[component]]), float(qty), items[index[component]]["unit"])
+                   for parent, recipe in recipes.items() for component, qty in recipe]
+    loader.insert("RecipeItem", ["id", "parentItemId", "ingredientId", "quantity", "unit"],
+                  [(int(r), *row) for r, row in zip(loader.ids("RecipeItem", len(recipe_rows)), recipe_rows)])
+
+    loader.insert("Order", ["id", "restaurantId", "tableId", "userId", "status", "totalAmount",
+                            "prepStartTime", "prepEndTime", "servedAt", "createdAt", "updatedAt"],
+                  _cols(order_ids, [rid] * n_orders, table_of_order, waiter_of_order, status.tolist(), totals,
+                        nullable(prep_start), nullable(prep_end), nullable(served_at), created, updated))
+    categories = [it["category"] for it in items]
+    loader.insert("OrderItem", ["id", "orderId", "menuItemId", "quantity", "price", "course"],
+                  _cols(loader.ids("OrderItem", n_lines), order_ids[line_order], item_ids[line_item], line_qty,
+                        prices[line_item], [COURSES.get(categories[i], "MAIN") for i in line_item.tolist()]))
+
+    loader.insert("StockMovement", ["id", "restaurantId", "menuItemId", "quantity", "type", "purchasePrice",
+                                    "supplierId", "lotNumber", "reason", "createdAt", "userId"],
+                  [(int(s), rid, *row, admin_id) for s, row in zip(loader.ids("StockMovement", len(stock_rows)), stock_rows)])
+    # --- Caixa: uma sessão por dia, entradas por pedido pago, sangrias e depósito no cofre ---
+    box_ids = loader.ids("CashBox", 2)
+    loader.insert("CashBox", ["id", "restaurantId", "name", "type", "createdAt", "updatedAt"],
+                  [(int(box_ids[0]), rid, "Caixa Principal", "DRAWER", since_ms, since_ms),
+                   (int(box_ids[1]), rid, "Cofre", "SAFE", since_ms, since_ms)])
+    session_ids = loader.ids("CashSession", days)
+    opening = np.round(rng.uniform(500, 3000, days), -1)
+    paid = np.flatnonzero(status == "PAID")
+    paid_day = order_day[paid]
+    paid_per_day = np.bincount(paid_day, weights=totals[paid], minlength=days)
+
+    cash_rows = [(int(session_ids[paid_day[k]]), int(waiter_of_order[o]), "ENTRY", float(totals[o]),
+                  f"Pagamento Pedido #{int(order_ids[o])}", None, None, int(updated[o]))
+                 for k, o in enumerate(paid.tolist())]
+    n_withdrawals = rng.poisson(0.7, days)
+    for d in np.flatnonzero(n_withdrawals).tolist():
+        for _ in range(int(n_withdrawals[d])):
+            cash_rows.append((int(session_ids[d]), admin_id, "WITHDRAWAL", -float(round(rng.uniform(200, 2000), -1)),
+                              "Pagamento a fornecedor", None, None, int(day_starts[d]) + int(rng.integers(9, 22)) * 3600000))
+    last_day = days - 1
+    for d in range(days):
+        if d < last_day and paid_per_day[d] > 0:
+            cash_rows.append((int(session_ids[d]), admin_id, "INTERNAL_TRANSFER", float(round(paid_per_day[d] * 0.7, -1)),
+                              "Depósito no cofre", int(box_ids[0]), int(box_ids[1]), int(day_starts[d]) + 23 * 3600000 + 55 * 60000))
+    cash_rows.sort(key=lambda r: r[-1])
+
+    movement_sum = np.zeros(days)
+    session_pos = {int(s): i for i, s in enumerate(session_ids.tolist())}
+    for row in cash_rows:
+        movement_sum[session_pos[row[0]]] += row[3]
+    # ~5% das sessões fecham com diferença (para testar a reconciliação)
+    discrepancy = np.where(rng.random(days) < 0.05, np.round(rng.normal(0, 300, days), -1), 0.0)
+    closing = opening + movement_sum + discrepancy
+    last_paid = np.full(days, 0, dtype=np.int64)
+    np.maximum.at(last_paid, paid_day, updated[paid])
+    closed_at = np.maximum(day_starts + 23 * 3600000 + 58 * 60000, last_paid + 5 * 60000)
+    loader.insert("CashSession", ["id", "restaurantId", "openedByUserId", "closedByUserId", "openingBalance",
+                                  "closingBalance", "status", "openedAt", "closedAt"],
+                  [(int(session_ids[d]), rid, admin_id, admin_id if d < last_day else None, float(opening[d]),
+                    float(round(closing[d], 2)) if d < last_day else None, "CLOSED" if d < last_day else "OPEN",
+                    int(day_starts[d]) + 7 * 3600000, int(closed_at[d]) if d < last_day else None)
+                   for d in range(days)])
+    loader.insert("CashMovement", ["id", "restaurantId", "cashSessionId", "userId", "type", "amount", "description",
+                                   "originCashBoxId", "destinationCashBoxId", "createdAt"],
+                  [(int(m), rid, *row) for m, row in zip(loader.ids("CashMovement", len(cash_rows)), cash_rows)])
+
+    # --- Despesas: renda e salários mensais + pequenas despesas ---
+    expenses = []
+    monthly_rent = float(round(rng.uniform(15000, 60000), -2))
+    payroll = float(n_waiters * 6000 + 15000)
+    for d in range(days):
+        day = first_day + timedelta(days=d)
+        at = int(day_starts[d]) + 10 * 3600000
+        if day.day == 1:
+            expenses.append(("Renda do espaço", monthly_rent, "Renda", "Transferência", at))
+        if day.day == 28:
+            expenses.append(("Salários", payroll, "Salários", "Transferência", at))
+        for _ in range(int(rng.poisson(0.3))):
+            expenses.append((f"Despesa {day.isoformat()}", float(round(rng.uniform(300, 5000), -1)),
+                             str(rng.choice(EXPENSE_CATEGORIES)), str(rng.choice(PAYMENT_METHODS)), at))
+    loader.insert("Expense", ["id", "restaurantId", "description", "amount", "category", "paymentMethod", "date", "createdAt", "updatedAt"],
+                  [(int(e), rid, desc, amount, cat, method, at, at, at) for e, (desc, amount, cat, method, at)
+                   in zip(loader.ids("Expense", len(expenses)), expenses)])
+
+    # --- Avaliações (~6% dos pedidos pagos) ---
+    rated = paid[rng.random(len(paid)) < 0.06]
+    loader.insert("Feedback", ["id", "restaurantId", "orderId", "rating", "nps", "type", "createdAt"],
+                  _cols(loader.ids("Feedback", len(rated)), [rid] * len(rated), order_ids[rated],
+                        rng.choice([1, 2, 3, 4, 5], size=len(rated), p=[0.03, 0.05, 0.12, 0.35, 0.45]),
+                        rng.integers(0, 11, len(rated)), ["GENERAL"] * len(rated), updated[rated] + 5 * 60000))
+    return rid, n_orders
+
+# ==========================================
+# GERAÇÃO COMPLETA
+# ==========================================
+
+def generate(out_path, tenants, days, orders_per_day, seed=DEFAULT_SEED, end_day=None,
+             template_path=None, stock_per_order=False, verbose=True):
+    start = time.perf_counter()
+    template_path = template_path or cafepoint_db.DEFAULT_DB
+    if end_day is None or end_day >= date.today():
+        end_day, anchor_ms = date.today(), cafepoint_db.now_ms()
+    else:
+        anchor_ms = cafepoint_db.day_range(end_day, end_day)[1]
+
+    conn = sqlite3.connect(out_path, isolation_level=None)
+    # Carga em massa: WAL, sem fsync por transação, cache grande
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute("PRAGMA cache_size = -262144")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    loader = Loader(conn)
+
+    conn.execute("BEGIN")
+    index_sql = create_schema(conn, template_path)
+    plan_ids = loader.ids("Plan", len(PLANS))
+    loader.insert("Plan", ["id", "name", "maxUsers", "maxTables", "maxItems", "monthlyPrice", "createdAt"],
+                  [(int(p), *plan, anchor_ms) for p, plan in zip(plan_ids, PLANS)])
+    conn.execute("COMMIT")
+
+    total_orders = 0
+    for t in range(tenants):
+        rng = np.random.default_rng([seed, t])
+        conn.execute("BEGIN")
+        rid, n_orders = generate_tenant(loader, rng, t, days, orders_per_day, end_day, anchor_ms,
+                                        plan_ids.tolist(), stock_per_order)
+        conn.execute("COMMIT")
+        total_orders += n_orders
+        if verbose:
+            rows = sum(loader.counts.values())
+            elapsed = time.perf_counter() - start
+            print(f"🏪 {t + 1}/{tenants} restaurante #{rid}: {n_orders} pedidos | total {rows:,} linhas em {elapsed:.1f}s ({rows / elapsed:,.0f} linhas/s)")
+
+    index_start = time.perf_counter()
+    conn.execute("BEGIN")
+    for sql in index_sql:
+        conn.execute(sql)
+    conn.execute("COMMIT")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute("ANALYZE")
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    conn.close()
+
+    elapsed = time.perf_counter() - start
+    report = {
+        "path": out_path,
+        "tenants": tenants,
+        "days": days,
+        "orders": total_orders,
+        "rows": dict(sorted(loader.counts.items())),
+        "seconds": round(elapsed, 2),
+        "index_seconds": round(time.perf_counter() - index_start, 2),
+        "size_mb": round(os.path.getsize(out_path) / 1048576, 1),
+    }
+    if verbose:
+        total_rows = sum(loader.counts.values())
+        for table, count in report["rows"].items():
+            print(f"   {table:<15}{count:>14,}")
+        print(f"✅ {total_rows:,} linhas em {elapsed:.1f}s ({total_rows / elapsed:,.0f} linhas/s) -> {out_path} ({report['size_mb']} MB)")
+    return report
+
+def _pop_option(args, name, convert=str):
+    if name in args:
+        i = args.index(name)
+        value = convert(args[i + 1])
+        del args[i:i + 2]
+        return value
+    return None
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    try:
+        scale = _pop_option(args, "--scale", float) or 1
+        tenants = _pop_option(args, "--tenants", int) or max(1, int(round(BASE_VOLUME["tenants"] * scale)))
+        days = _pop_option(args, "--days", int) or BASE_VOLUME["days"]
+        orders_per_day = _pop_option(args, "--orders-per-day", float) or BASE_VOLUME["orders_per_day"]
+        seed = _pop_option(args, "--seed", int)
+        end = _pop_option(args, "--end", lambda v: date.fromisoformat(v))
+        template = _pop_option(args, "--template")
+    except (IndexError, ValueError) as e:
+        print(f"❌ Argumento inválido: {e}")
+        sys.exit(1)
+    stock_per_order = "--stock-per-order" in args
+    force = "--force" in args
+    args = [a for a in args if a not in ("--stock-per-order", "--force")]
+
+    if len(args) != 1:
+        print("Usage: python synth_data.py <out.db> [--scale X] [--tenants N] [--days D] [--orders-per-day K]")
+        print("       [--seed S] [--end YYYY-MM-DD] [--template dev.db] [--stock-per-order] [--force]")
+        sys.exit(1)
+    out_path = args[0]
+    if os.path.exists(out_path):
+        if not force:
+            print(f"❌ '{out_path}' já existe (use --force para substituir).")
+            sys.exit(1)
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(out_path + suffix):
+                os.remove(out_path + suffix)
+
+    generate(out_path, tenants, days, orders_per_day, DEFAULT_SEED if seed is None else seed, end, template, stock_per_order)
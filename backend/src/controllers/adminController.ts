@@ -215,6 +215,7 @@ export const getAllRestaurants = async (req: Request, res: Response) => {
         const restaurants = await prisma.restaurant.findMany({
             include: {
                 license: { include: { plan: true } },
+                planUsage: true, // Contadores pré-calculados (scripts/plan_usage.py)
                 _count: { select: { users: true, tables: true } } // Uso Real
             },
             orderBy: { createdAt: 'desc' }
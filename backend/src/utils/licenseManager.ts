@@ -1,4 +1,4 @@
-import { execSync } from 'child_process';
+import { execFileSync } from 'child_process';
 import crypto from 'crypto';
 import fs from 'fs';
 import path from 'path';
@@ -23,16 +23,93 @@ interface LicenseData {
     checksum: string;
 }
 
-export const getMachineId = (): string => {
+// Mesma definição que backend/scripts/hwid.py (probe): as duas mudam juntas.
+// Lê fontes nativas em vez de lançar processos:
+//   Linux:   /etc/machine-id + /sys/class/dmi/id (só os ficheiros que qualquer utilizador lê)
+//   Windows: registo (MachineGuid + fabricante/modelo da board); wmic só como último recurso
+//   Sem nada disto: hostname em maiúsculas
+const LINUX_DMI_DIR = '/sys/class/dmi/id';
+const LINUX_DMI_FILES = ['sys_vendor', 'product_name', 'board_vendor', 'board_name'];
+const LINUX_MACHINE_ID_FILES = ['/etc/machine-id', '/var/lib/dbus/machine-id'];
+// Valores de fábrica que não identificam nada
+const PLACEHOLDERS = new Set(['', 'none', 'default string', 'to be filled by o.e.m.', 'not specified', '0', 'system serial number']);
+
+const fingerprint = (...parts: string[]) =>
+    crypto.createHash('sha256').update(parts.join('-')).digest('hex').substring(0, 16).toUpperCase();
+
+const clean = (value: string) => {
+    const trimmed = (value || '').trim();
+    return PLACEHOLDERS.has(trimmed.toLowerCase()) ? '' : trimmed;
+};
+
+const readTrimmed = (file: string) => {
+    try {
+        return fs.readFileSync(file, 'utf8').trim();
+    } catch (e) {
+        return '';
+    }
+};
+
+const linuxSources = (): string[] | null => {
+    // Sem machine-id, a board sozinha é igual em todas as máquinas do mesmo modelo
+    const machineId = LINUX_MACHINE_ID_FILES.map(file => clean(readTrimmed(file))).find(Boolean) || '';
+    if (!machineId) return null;
+    return [machineId, ...LINUX_DMI_FILES.map(name => clean(readTrimmed(path.join(LINUX_DMI_DIR, name))))];
+};
+
+const windowsRegistrySources = (): string[] | null => {
+    // O Node não lê o registo: reg.exe com /reg:64 equivale a KEY_WOW64_64KEY
+    const query = (key: string) => {
+        const values: Record<string, string> = {};
+        try {
+            const output = execFileSync('reg', ['query', key, '/reg:64'], { stdio: ['ignore', 'pipe', 'ignore'] }).toString();
+            for (const line of output.split(/\r?\n/)) {
+                const match = line.match(/^\s+(\S+)\s+REG_\w+\s+(.*)$/);
+                if (match) values[match[1]] = match[2];
+            }
+        } catch (e) {
+            // chave inexistente
+        }
+        return values;
+    };
+    const machineGuid = clean(query('HKLM\\SOFTWARE\\Microsoft\\Cryptography').MachineGuid);
+    if (!machineGuid) return null;
+    const bios = query('HKLM\\HARDWARE\\DESCRIPTION\\System\\BIOS');
+    return [machineGuid, clean(bios.BaseBoardManufacturer), clean(bios.BaseBoardProduct)];
+};
+
+// O id de antes (wmic cpu/baseboard ou hostname): só para aceitar licenças já
+// emitidas com ele, e só é calculado quando o id atual não bate
+let cachedLegacyMachineId: string | null = null;
+
+export const getLegacyMachineId = (): string => {
+    if (cachedLegacyMachineId) return cachedLegacyMachineId;
     try {
-        // Getting CPU ID and Motherboard Serial for unique fingerprint
-        const cpuId = execSync('wmic cpu get processorid').toString().split('\n')[1]?.trim() || '';
-        const baseboardId = execSync('wmic baseboard get serialnumber').toString().split('\n')[1]?.trim() || '';
-        if (!cpuId && !baseboardId) return os.hostname();
-        return crypto.createHash('sha256').update(`${cpuId}-${baseboardId}`).digest('hex').substring(0, 16).toUpperCase();
+        const wmic = (...args: string[]) =>
+            execFileSync('wmic', args, { stdio: ['ignore', 'pipe', 'ignore'] }).toString().split('\n')[1]?.trim() || '';
+        const cpuId = wmic('cpu', 'get', 'processorid');
+        const baseboardId = wmic('baseboard', 'get', 'serialnumber');
+        if (!cpuId && !baseboardId) return (cachedLegacyMachineId = os.hostname());
+        cachedLegacyMachineId = fingerprint(cpuId, baseboardId);
     } catch (e) {
-        return os.hostname().toUpperCase();
+        cachedLegacyMachineId = os.hostname().toUpperCase();
+    }
+    return cachedLegacyMachineId;
+};
+
+// O hardware não muda com o processo a correr: as fontes só são lidas uma vez
+let cachedMachineId: string | null = null;
+
+export const getMachineId = (): string => {
+    if (cachedMachineId) return cachedMachineId;
+    if (process.platform === 'win32') {
+        const parts = windowsRegistrySources();
+        cachedMachineId = parts ? fingerprint(...parts) : getLegacyMachineId();
+    } else {
+        const parts = process.platform === 'linux' ? linuxSources() : null;
+        cachedMachineId = parts ? fingerprint(...parts) : os.hostname().toUpperCase();
     }
+    return cachedMachineId;
 };
 
 const getLicensePaths = () => {
@@ -156,7 +233,8 @@ export const verifyLicense = (): LicenseResult => {
     if (!validLicense) return { valid: false, error: 'Erro ao processar licença.', machineId: currentMachineId };
 
     // 3. Verify Hardware ID
-    if (validLicense.machineId !== currentMachineId) {
+    // Licenças emitidas antes da mudança de definição continuam válidas
+    if (validLicense.machineId !== currentMachineId && validLicense.machineId !== getLegacyMachineId()) {
         return { valid: false, error: 'Hardware ID não corresponde.', machineId: currentMachineId };
     }
 
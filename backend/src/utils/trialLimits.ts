@@ -1,5 +1,25 @@
 import prisma from '../config/database';
 
+type CountWhere = { restaurantId: number; id?: { gt: number } };
+
+// Contagem para o limite a partir do PlanUsage (scripts/plan_usage.py): valor guardado + linhas
+// criadas depois da última atualização (id > marca). Remoções posteriores só podem aumentar o
+// resultado, por isso perto do limite (ou sem PlanUsage) confirma-se com a contagem completa.
+const usageCount = async (
+    restaurantId: number,
+    limit: number,
+    field: 'tables' | 'menuItems',
+    markField: 'lastTableId' | 'lastMenuItemId',
+    count: (where: CountWhere) => Promise<number>
+) => {
+    const usage = await prisma.planUsage.findUnique({ where: { restaurantId } });
+    if (usage) {
+        const current = usage[field] + await count({ restaurantId, id: { gt: usage[markField] } });
+        if (current < limit) return current;
+    }
+    return count({ restaurantId });
+};
+
 export const checkTrialLimit = async (modelName: 'table' | 'location' | 'order' | 'menuItem' | 'stockMovement', restaurantId: number) => {
     // Buscar Licença Ativa com Plano
     const license = await prisma.license.findUnique({
@@ -22,14 +42,16 @@ export const checkTrialLimit = async (modelName: 'table' | 'location' | 'order'
 
     switch (modelName) {
         case 'table':
-            count = await prisma.table.count({ where: { restaurantId } });
+            count = await usageCount(restaurantId, limits.maxTables, 'tables', 'lastTableId',
+                where => prisma.table.count({ where }));
             if (count >= limits.maxTables) {
                 throw new Error(`Limite do plano atingido: Máximo ${limits.maxTables} mesas.`);
             }
             break;
 
         case 'menuItem':
-            count = await prisma.menuItem.count({ where: { restaurantId } });
+            count = await usageCount(restaurantId, limits.maxItems, 'menuItems', 'lastMenuItemId',
+                where => prisma.menuItem.count({ where }));
             if (count >= limits.maxItems) {
                 throw new Error(`Limite do plano atingido: Máximo ${limits.maxItems} itens no menu.`);
             }
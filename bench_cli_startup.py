@@ -0,0 +1,59 @@
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# ==========================================
+# BENCHMARK DE ARRANQUE DA CAFEPOINT-TOOLS
+# ==========================================
+# Mede o tempo total (processo novo até sair) de comandos curtos da CLI e
+# compara com o script antigo equivalente. Objetivo: --help e "secret read"
+# bem abaixo de 100 ms.
+#
+# Uso: python bench_cli_startup.py [repetições]
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS_DIR = os.path.join(ROOT_DIR, "backend", "scripts")
+CLI = os.path.join(ROOT_DIR, "cafepoint_tools.py")
+BUDGET_MS = 100
+
+def measure(cmd, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, stdin=subprocess.DEVNULL, check=True)
+        times.append((time.perf_counter() - start) * 1000)
+    return min(times), statistics.median(times)
+
+def run(runs=20):
+    sys.path.insert(0, SCRIPTS_DIR)
+    import cafepoint_crypto
+
+    with tempfile.TemporaryDirectory() as tmp:
+        secret_path = os.path.join(tmp, "kernel.dat")
+        with open(secret_path, "w") as f:
+            f.write(cafepoint_crypto.encrypt('{"limit": 5, "id": "bench"}'))
+
+        cases = [
+            ("python -c pass (base)", [sys.executable, "-c", "pass"], False),
+            ("cafepoint-tools --help", [sys.executable, CLI, "--help"], True),
+            ("cafepoint-tools secret read", [sys.executable, CLI, "secret", "read", secret_path], True),
+            ("read_secret.py (antigo)", [sys.executable, os.path.join(SCRIPTS_DIR, "read_secret.py"), secret_path], False),
+        ]
+
+        print(f"{'comando':<32}{'mín ms':>10}{'mediana ms':>12}")
+        failed = False
+        for name, cmd, budgeted in cases:
+            best, median = measure(cmd, runs)
+            flag = ""
+            if budgeted:
+                flag = "  ✅" if median < BUDGET_MS else "  ❌"
+                failed = failed or median >= BUDGET_MS
+            print(f"{name:<32}{best:>10.1f}{median:>12.1f}{flag}")
+    return not failed
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    sys.exit(0 if run(runs) else 1)
@@ -0,0 +1,3 @@
+@echo off
+REM Ponto de entrada unico das ferramentas Python (ver cafepoint_tools.py)
+python "%~dp0cafepoint_tools.py" %*
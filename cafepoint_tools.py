@@ -0,0 +1,872 @@
+import argparse
+import os
+import sys
+
+# ==========================================
+# CAFEPOINT-TOOLS: PONTO DE ENTRADA ÚNICO
+# ==========================================
+# Junta os scripts Python (licenças, Pen Drives, segredos, apresentações) numa
+# só linha de comandos:
+#
+#   python cafepoint_tools.py license issue --days 365 --slots 5 --target E
+#   python cafepoint_tools.py usb prepare /media/*/CAFEPOINT* --slots 5
+#   python cafepoint_tools.py secret read E:\kernel.dat
+#   python cafepoint_tools.py deck render decks/sales.json
+#   python cafepoint_tools.py db synth /tmp/carga.db --scale 10
+#   python cafepoint_tools.py db rollup
+#   python cafepoint_tools.py report export 1 pedidos-2025.csv --from 2025-01-01 --to 2025-12-31
+#   python cafepoint_tools.py db indexes --report indices.md
+#   python cafepoint_tools.py db archive --months 12 --dry-run
+#   python cafepoint_tools.py db backup && python cafepoint_tools.py db verify
+#   python cafepoint_tools.py db columns && python cafepoint_tools.py report query 1 --by hour,table --days 90
+#   python cafepoint_tools.py db load --db /tmp/carga.db --ramp 5,10,25,50 --out carga.json
+#   python cafepoint_tools.py sync apply fila-tablet3.json --user 12 --dry-run
+#   python cafepoint_tools.py report cash --from 2026-09-01 --to 2026-09-30 --report caixa.md
+#   python cafepoint_tools.py db usage && python cafepoint_tools.py report usage --ratio 0.9
+#
+# Cada subcomando só importa o módulo de que precisa, dentro do próprio
+# handler: o --help e os comandos leves não carregam o pycryptodome nem o
+# python-pptx.
+#
+# --non-interactive (ou CAFEPOINT_NONINTERACTIVE=1) nunca chama input(): um
+# valor em falta termina com código 2 e um destino inexistente só é criado
+# com --yes.
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS_DIR = os.path.join(ROOT_DIR, "backend", "scripts")
+
+for path in (SCRIPTS_DIR, ROOT_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+EXIT_OK = 0
+EXIT_FAIL = 1
+EXIT_USAGE = 2
+EXIT_PARTIAL = 2   # lote/várias drives com alguma falha (igual aos scripts originais)
+
+class UsageError(Exception):
+    pass
+
+def ask(args, value, prompt, convert=str):
+    # Usa o argumento se existir; senão pergunta (modo interativo) ou falha (modo estrito)
+    if value is not None:
+        return value
+    if args.non_interactive:
+        raise UsageError(f"Valor em falta para '{prompt.strip(' >:?')}' (modo não interativo)")
+    try:
+        return convert(input(prompt))
+    except ValueError:
+        raise UsageError("Por favor insira números válidos.")
+
+def confirm(args, message):
+    if args.yes:
+        return True
+    if args.non_interactive:
+        return False
+    return input(f"{message} (S/N): ").strip().lower() == "s"
+
+# ==========================================
+# LICENÇAS
+# ==========================================
+
+def cmd_license_issue(args):
+    from gen_license_encrypted import normalize_target, issue_single
+
+    days = ask(args, args.days, ">> Validade em Dias? (Ex: 365): ", int)
+    slots = ask(args, args.slots, ">> Maxima Instalações permitidas? (Ex: 5): ", int)
+    target = normalize_target(ask(args, args.target, ">> Letra da Pen Drive? (Ex: E): "))
+
+    if not os.path.exists(target):
+        print(f"⚠️ Aviso: O caminho '{target}' não existe.")
+        if not confirm(args, "Deseja continuar?"):
+            print("❌ Cancelado (use --yes para criar o destino).")
+            return EXIT_FAIL
+        try:
+            os.makedirs(target, exist_ok=True)
+        except OSError as e:
+            print(f"❌ Erro ao criar '{target}': {e}")
+            return EXIT_FAIL
+
+    return EXIT_OK if issue_single(days, slots, target, args.client) else EXIT_FAIL
+
+def cmd_license_batch(args):
+    from gen_license_encrypted import run_batch
+
+    try:
+        results = run_batch(args.manifest, args.out, args.workers)
+    except (ValueError, OSError) as e:
+        print(f"❌ Erro no modo lote: {e}")
+        return EXIT_FAIL
+    return EXIT_OK if all(r["status"] == "OK" for r in results) else EXIT_PARTIAL
+
+def cmd_license_params(args):
+    from gen_license_params import create_license_config
+
+    create_license_config(args.days, args.client)
+    return EXIT_OK
+
+def cmd_license_check(args):
+    import json
+    import license_daemon
+
+    socket_path = args.socket or license_daemon.default_socket_path()
+    try:
+        result = license_daemon.query(socket_path, "status")
+    except OSError:
+        # Sem serviço a correr: verificação direta neste processo
+        result = license_daemon.LicenseVerifier().check()
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+    return EXIT_OK if result.get("valid") else EXIT_FAIL
+
+def cmd_license_serve(args):
+    import socketserver
+    import license_daemon
+
+    if not hasattr(socketserver, "ThreadingUnixStreamServer"):
+        print("❌ Este sistema não suporta sockets Unix.")
+        return EXIT_FAIL
+    license_daemon.serve(args.socket or license_daemon.default_socket_path(), license_daemon.LicenseVerifier())
+    return EXIT_OK
+
+def cmd_license_ledger(args):
+    import license_ledger
+
+    if args.action == "export":
+        if len(args.values) != 1:
+            raise UsageError("export <ficheiro.csv|ficheiro.json>")
+        print(f"✅ {license_ledger.export(args.values[0])} registos exportados para {args.values[0]}")
+        return EXIT_OK
+    if args.action == "expiring":
+        if len(args.values) != 2:
+            raise UsageError("expiring <AAAA-MM-DD> <AAAA-MM-DD>")
+        rows = license_ledger.expiring_between(args.values[0], args.values[1], installer=args.installer)
+    else:
+        if len(args.values) != 1:
+            raise UsageError(f"{args.action} <valor>")
+        lookup = license_ledger.find_by_tracking_id if args.action == "find" else license_ledger.find_by_client
+        rows = lookup(args.values[0])
+    license_ledger._print_rows(rows)
+    return EXIT_OK
+
+# ==========================================
+# PEN DRIVES / SEGREDOS / HARDWARE
+# ==========================================
+
+def cmd_usb_prepare(args):
+    import prepare_usb
+
+    slots = ask(args, args.slots, ">> Maxima Instalações permitidas? (Ex: 5): ", int)
+    if len(args.drives) == 1 and not any(ch in args.drives[0] for ch in "*?["):
+        report = prepare_usb.create_usb_master_files(prepare_usb.expand_drives(args.drives)[0], slots)
+        return EXIT_OK if report["status"] == "OK" else EXIT_FAIL
+    reports = prepare_usb.provision_drives(args.drives, slots, args.workers)
+    return EXIT_OK if reports and all(r["status"] == "OK" for r in reports) else EXIT_PARTIAL
+
+def cmd_secret_read(args):
+    from read_secret import decrypt_data
+
+    if not os.path.exists(args.file):
+        print("Ficheiro não encontrado.")
+        return EXIT_FAIL
+    with open(args.file, "r") as f:
+        content = f.read()
+    plain = decrypt_data(content)
+    if args.raw:
+        print(plain)
+    else:
+        print("--- Conteúdo Decifrado ---")
+        print(plain)
+        print("--------------------------")
+    return EXIT_FAIL if plain.startswith("Error:") else EXIT_OK
+
+def cmd_secret_scan(args):
+    from read_secret import scan, normalize_root
+
+    scan([normalize_root(r) for r in args.roots], args.workers)
+    return EXIT_OK
+
+def cmd_hwid(args):
+    import hwid
+
+    print(hwid.get_hwid(use_cache=not args.no_cache))
+    return EXIT_OK
+
+# ==========================================
+# RELATÓRIOS (base de dados do backend)
+# ==========================================
+
+def cmd_report(args):
+    import json
+    import cafepoint_db
+
+    if args.rollup:
+        # Atualiza os resumos diários e lê só esses (poucas linhas por dia)
+        import daily_rollup as engine
+        conn = cafepoint_db.connect(args.db)
+        engine.refresh(conn)
+    else:
+        import report_engine as engine
+        conn = cafepoint_db.connect(args.db, readonly=True)
+        if args.archive:
+            import cold_archive
+            if args.action == "billing":
+                start, end = cafepoint_db.period_range(args.period)
+            else:
+                start = cafepoint_db.to_ms(args.start) if args.start else None
+                end = cafepoint_db.day_range(*[cafepoint_db.parse_date(args.end).date()] * 2)[1] if args.end else None
+            cold_archive.attach_archives(conn, start, end, args.restaurant)
+
+    if args.action == "billing":
+        data = engine.billing_stats(conn, args.restaurant, args.period)
+    elif args.rollup:
+        start_day = cafepoint_db.parse_date(args.start).date() if args.start else None
+        end_day = cafepoint_db.parse_date(args.end).date() if args.end else None
+        data = engine.advanced_analytics(conn, args.restaurant, start_day, end_day)
+    else:
+        end = None
+        if args.end:
+            end_day = cafepoint_db.parse_date(args.end).date()
+            end = cafepoint_db.day_range(end_day, end_day)[1]
+        data = engine.advanced_analytics(conn, args.restaurant, args.start, end)
+    print(json.dumps({"success": True, "data": data}, indent=2, ensure_ascii=False))
+    return EXIT_OK
+
+def cmd_report_stock(args):
+    import json
+    import cafepoint_db
+    import recipe_engine
+
+    conn = cafepoint_db.connect(args.db, readonly=True)
+    start_day = cafepoint_db.parse_date(args.start).date() if args.start else None
+    end_day = cafepoint_db.parse_date(args.end).date() if args.end else None
+    if args.archive:
+        import cold_archive
+        start = cafepoint_db.day_range(start_day, start_day)[0] if start_day else None
+        end = cafepoint_db.day_range(end_day, end_day)[1] if end_day else None
+        cold_archive.attach_archives(conn, start, end, args.restaurant)
+    report = recipe_engine.stock_report(conn, args.restaurant, start_day, end_day, args.lead_days)
+    if args.json:
+        print(json.dumps({"success": True, "data": report}, indent=2, ensure_ascii=False))
+    else:
+        recipe_engine.print_report(report)
+    return EXIT_OK
+
+def cmd_report_export(args):
+    import cafepoint_db
+    import order_export
+
+    start = cafepoint_db.to_ms(args.start) if args.start else None
+    end = cafepoint_db.day_range(*[cafepoint_db.parse_date(args.end).date()] * 2)[1] if args.end else None
+    conn = cafepoint_db.connect(args.db, readonly=True)
+    if args.archive:
+        import cold_archive
+        cold_archive.attach_archives(conn, start, end, args.restaurant)
+    try:
+        result = order_export.export(conn, args.restaurant, args.out, args.format, start, end, args.status,
+                                     args.batch, args.delimiter)
+    except (RuntimeError, ValueError) as e:
+        print(f"❌ {e}")
+        return EXIT_FAIL
+    order_export.print_result(result, args.out)
+    return EXIT_OK
+
+def cmd_report_query(args):
+    import json
+    import cafepoint_db
+    import order_columns
+
+    if args.refresh:
+        order_columns.update(cafepoint_db.connect(args.db, readonly=True), order_columns.columns_dir(args.db, args.dir))
+    try:
+        snapshot = order_columns.load(order_columns.columns_dir(args.db, args.dir))
+    except FileNotFoundError as e:
+        print(f"❌ {e}")
+        return EXIT_FAIL
+    by = args.by.split(",")
+    start_day = cafepoint_db.parse_date(args.start).date() if args.start else None
+    end_day = cafepoint_db.parse_date(args.end).date() if args.end else None
+    try:
+        rows = order_columns.query(snapshot, args.restaurant, by, args.metric, start_day, end_day, args.days,
+                                   args.status.split(",") if args.status else None, args.top)
+    except ValueError as e:
+        raise UsageError(str(e))
+    if args.json:
+        print(json.dumps({"success": True, "data": rows}, indent=2, ensure_ascii=False))
+    else:
+        order_columns.print_rows(rows, by, args.metric)
+    return EXIT_OK
+
+def cmd_report_latency(args):
+    import json
+    import cafepoint_db
+    import service_latency
+
+    if args.refresh:
+        conn = cafepoint_db.connect(args.db)
+        service_latency.refresh(conn)
+    else:
+        conn = cafepoint_db.connect(args.db, readonly=True)
+    start_day = cafepoint_db.parse_date(args.start).date() if args.start else None
+    end_day = cafepoint_db.parse_date(args.end).date() if args.end else None
+    report = service_latency.latency_report(conn, args.restaurant, start_day, end_day, args.by_hour)
+    if args.json or args.by_hour:
+        print(json.dumps({"success": True, "data": report}, indent=2, ensure_ascii=False))
+    else:
+        service_latency.print_report(report)
+    return EXIT_OK
+
+def cmd_report_usage(args):
+    import json
+    import cafepoint_db
+    import plan_usage
+
+    if args.refresh:
+        plan_usage.refresh(cafepoint_db.connect(args.db))
+    conn = cafepoint_db.connect(args.db, readonly=True)
+    if not cafepoint_db.table_exists(conn, "PlanUsage"):
+        print("❌ Sem contadores de uso: execute primeiro 'db usage'")
+        return EXIT_FAIL
+    ratio = 0 if args.all else args.ratio
+    rows = plan_usage.near_limits(conn, ratio, args.restaurant)
+    if args.json:
+        print(json.dumps({"success": True, "data": rows}, indent=2, ensure_ascii=False))
+    else:
+        plan_usage.print_near(rows, ratio)
+    return EXIT_OK
+
+def cmd_report_cash(args):
+    import json
+    import cafepoint_db
+    import cash_reconcile
+
+    conn = cafepoint_db.connect(args.db, readonly=True)
+    start_day = cafepoint_db.parse_date(args.start).date() if args.start else None
+    end_day = cafepoint_db.parse_date(args.end).date() if args.end else None
+    report = cash_reconcile.reconcile(conn, start_day, end_day, args.restaurant, args.threshold, archive=args.archive)
+    if args.json:
+        print(json.dumps({"success": True, "data": report}, indent=2, ensure_ascii=False))
+    else:
+        cash_reconcile.print_report(report, args.all)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            f.write(cash_reconcile.render_markdown(report))
+        print(f"📝 Relatório: {args.report}", file=sys.stderr)
+    return EXIT_PARTIAL if cash_reconcile.has_flags(report) else EXIT_OK
+
+def cmd_db_synth(args):
+    import cafepoint_db
+    import synth_data
+
+    end_day = cafepoint_db.parse_date(args.end).date() if args.end else None
+    if os.path.exists(args.out):
+        if not args.force:
+            print(f"❌ '{args.out}' já existe (use --force para substituir).")
+            return EXIT_FAIL
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(args.out + suffix):
+                os.remove(args.out + suffix)
+    base = synth_data.BASE_VOLUME
+    synth_data.generate(
+        args.out,
+        args.tenants or max(1, int(round(base["tenants"] * args.scale))),
+        args.days or base["days"],
+        args.orders_per_day or base["orders_per_day"],
+        args.seed,
+        end_day,
+        args.template,
+        args.stock_per_order
+    )
+    return EXIT_OK
+
+def cmd_db_latency(args):
+    import cafepoint_db
+    import service_latency
+
+    result = service_latency.refresh(cafepoint_db.connect(args.db), args.rebuild)
+    print(f"✅ Sketches atualizados: {result['orders']} pedidos lidos, {result['updatedOrders']} com tempos novos "
+          f"em {result['seconds'] * 1000:.1f} ms")
+    return EXIT_OK
+
+def cmd_db_rollup(args):
+    import cafepoint_db
+    import daily_rollup
+
+    result = daily_rollup.refresh(cafepoint_db.connect(args.db), args.rebuild)
+    print(f"✅ Resumos atualizados: {result['orders']} pedidos ({result['lateChanges']} alterações tardias), "
+          f"{result['expenses']} despesas em {result['seconds'] * 1000:.1f} ms")
+    return EXIT_OK
+
+def cmd_db_usage(args):
+    import cafepoint_db
+    import plan_usage
+
+    plan_usage.print_refresh(plan_usage.refresh(cafepoint_db.connect(args.db), args.rebuild))
+    return EXIT_OK
+
+def cmd_db_archive(args):
+    import cafepoint_db
+    import cold_archive
+
+    result = cold_archive.archive(cafepoint_db.connect(args.db), args.months, args.dir,
+                                  dry_run=args.dry_run, vacuum=args.vacuum)
+    cold_archive.print_result(result)
+    return EXIT_FAIL if result["problems"] else EXIT_OK
+
+def cmd_db_columns(args):
+    import cafepoint_db
+    import order_columns
+
+    conn = cafepoint_db.connect(args.db, readonly=True)
+    result = order_columns.update(conn, order_columns.columns_dir(args.db, args.dir), args.rebuild)
+    print(f"✅ Snapshot colunar: +{result['orders']} pedidos, +{result['items']} itens, {result['changed']} alterados "
+          f"({result['totalOrders']} pedidos no total) em {result['seconds'] * 1000:.0f} ms")
+    return EXIT_OK
+
+def cmd_db_backup(args):
+    import cafepoint_db
+    import db_backup
+
+    snapshot = db_backup.backup(args.db or cafepoint_db.default_db_path(), args.dir, args.step, log=not args.no_log)
+    db_backup.print_snapshot(snapshot)
+    return EXIT_OK
+
+def cmd_db_verify(args):
+    import cafepoint_db
+    import db_backup
+
+    directory = db_backup.backup_dir(args.db or cafepoint_db.default_db_path(), args.dir)
+    result = db_backup.verify(directory, args.snapshot)
+    db_backup.print_verify(result)
+    return EXIT_OK if result["ok"] else EXIT_FAIL
+
+def cmd_db_restore(args):
+    import cafepoint_db
+    import db_backup
+
+    if os.path.exists(args.out):
+        print(f"❌ {args.out} já existe")
+        return EXIT_FAIL
+    directory = db_backup.backup_dir(args.db or cafepoint_db.default_db_path(), args.dir)
+    db_backup.restore(directory, args.snapshot, args.out)
+    print(f"✅ Restaurado para {args.out}")
+    return EXIT_OK
+
+def cmd_db_indexes(args):
+    import cafepoint_db
+    import index_advisor
+
+    result = index_advisor.advise(args.db or cafepoint_db.default_db_path(), args.runs)
+    report = index_advisor.render_report(result)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            f.write(report)
+        print(f"📝 Relatório: {args.report}")
+    else:
+        print(report)
+
+    if result["selected"] and args.migration:
+        path = index_advisor.write_migration(result["selected"], args.migration)
+        print(f"✅ Migração: {path}")
+        for line in index_advisor.schema_lines(result["selected"]):
+            print(f"   {line}")
+    return EXIT_OK
+
+def cmd_db_load(args):
+    import asyncio
+    import json
+    import cafepoint_db
+    import load_test
+
+    accounts = load_test.synthetic_accounts(cafepoint_db.connect(args.db, readonly=True), args.tenants)
+    if not accounts:
+        print("❌ Nenhum restaurante sintético (synth-NNN) com empregados nesta base (ver: db synth)")
+        return EXIT_FAIL
+    try:
+        ramp = [int(n) for n in args.ramp.split(",")]
+        result = asyncio.run(load_test.run_load(accounts, args.url, ramp, args.stage, args.think, args.listeners,
+                                                load_test.parse_mix(args.mix), args.seed))
+    except ValueError as e:
+        raise UsageError(str(e))
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        return EXIT_FAIL
+    load_test.print_report(result)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+        print(f"📝 Resultados gravados em {args.out}")
+    return EXIT_OK
+
+# ==========================================
+# SINCRONIZAÇÃO OFFLINE
+# ==========================================
+
+def cmd_sync_apply(args):
+    import json
+    import cafepoint_db
+    import sync_ingest
+
+    items, dump_device = sync_ingest.read_dump(args.file)
+    conn = cafepoint_db.connect(args.db)
+    try:
+        summary = sync_ingest.ingest(conn, sync_ingest.load_user(conn, args.user), items, args.device or dump_device,
+                                     args.batch, args.dry_run)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return EXIT_FAIL
+    if args.json:
+        print(json.dumps({"success": True, "data": summary}, indent=2, ensure_ascii=False))
+    else:
+        sync_ingest.print_summary(summary)
+    return EXIT_PARTIAL if summary["rejected"] or summary["unsupported"] else EXIT_OK
+
+def cmd_sync_serve(args):
+    import sync_ingest
+
+    sync_ingest.serve(args.host, args.port, args.db)
+    return EXIT_OK
+
+# ==========================================
+# APRESENTAÇÕES
+# ==========================================
+
+def cmd_deck_render(args):
+    from deck_renderer import render
+
+    if args.output and len(args.specs) > 1:
+        raise UsageError("--output só pode ser usado com um único deck")
+    for spec_path in args.specs:
+        render(spec_path, args.output, not args.no_cache)
+    return EXIT_OK
+
+def cmd_deck_campaign(args):
+    from generate_ppt_final_sales import run_campaign
+
+    results = run_campaign(args.prospects, args.out, args.workers)
+    return EXIT_OK if all(r["status"] == "OK" for r in results) else EXIT_PARTIAL
+
+# ==========================================
+# PARSER
+# ==========================================
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cafepoint-tools", description="Ferramentas Python do Cafe Point (licenças, Pen Drives, apresentações).")
+    parser.add_argument("--non-interactive", action="store_true",
+                        default=os.environ.get("CAFEPOINT_NONINTERACTIVE") == "1",
+                        help="nunca pedir dados no terminal; valores em falta terminam com código 2")
+    # A mesma opção também é aceite depois do subcomando (ex: "license issue --non-interactive")
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--non-interactive", action="store_true", default=argparse.SUPPRESS, help=argparse.SUPPRESS)
+    groups = parser.add_subparsers(dest="group", metavar="<grupo>")
+    groups.required = True
+
+    # license
+    license_parser = groups.add_parser("license", help="emitir e verificar licenças")
+    license_cmds = license_parser.add_subparsers(dest="action", metavar="<ação>")
+    license_cmds.required = True
+
+    p = license_cmds.add_parser("issue", help="preparar uma Pen Drive mestre (licença + limite de instalações)", parents=[common])
+    p.add_argument("--days", type=int, help="validade da licença em dias")
+    p.add_argument("--slots", type=int, help="máximo de instalações")
+    p.add_argument("--target", help="letra ou pasta da Pen Drive")
+    p.add_argument("--client", default="Cliente Final", help="nome do cliente")
+    p.add_argument("--yes", "-y", action="store_true", help="criar o destino se não existir, sem perguntar")
+    p.set_defaults(func=cmd_license_issue)
+
+    p = license_cmds.add_parser("batch", help="emitir várias Pen Drives a partir de um manifesto CSV/JSON", parents=[common])
+    p.add_argument("manifest")
+    p.add_argument("--out", help="manifesto de resultados (.json ou .csv)")
+    p.add_argument("--workers", type=int)
+    p.set_defaults(func=cmd_license_batch)
+
+    p = license_cmds.add_parser("params", help="gerar ficheiros de definição para esta máquina", parents=[common])
+    p.add_argument("--days", type=int, default=30)
+    p.add_argument("--client", default="Cliente")
+    p.set_defaults(func=cmd_license_params)
+
+    p = license_cmds.add_parser("check", help="verificar a licença instalada (usa o serviço se estiver ativo)", parents=[common])
+    p.add_argument("--socket")
+    p.set_defaults(func=cmd_license_check)
+
+    p = license_cmds.add_parser("serve", help="arrancar o serviço de verificação de licenças", parents=[common])
+    p.add_argument("--socket")
+    p.set_defaults(func=cmd_license_serve)
+
+    p = license_cmds.add_parser("ledger", help="consultar o livro de emissões", parents=[common])
+    p.add_argument("action", choices=["find", "client", "expiring", "export"])
+    p.add_argument("values", nargs="*")
+    p.add_argument("--installer", action="store_true", help="expiring: usar a validade do instalador")
+    p.set_defaults(func=cmd_license_ledger)
+
+    # usb
+    usb_parser = groups.add_parser("usb", help="Pen Drives")
+    usb_cmds = usb_parser.add_subparsers(dest="action", metavar="<ação>")
+    usb_cmds.required = True
+
+    p = usb_cmds.add_parser("prepare", help="gravar os ficheiros de controlo de instalações", parents=[common])
+    p.add_argument("drives", nargs="+", help="letras, pastas ou padrões (ex: /media/*/CAFEPOINT*)")
+    p.add_argument("--slots", type=int, help="máximo de instalações")
+    p.add_argument("--workers", type=int)
+    p.set_defaults(func=cmd_usb_prepare)
+
+    # secret
+    secret_parser = groups.add_parser("secret", help="ler ficheiros cifrados")
+    secret_cmds = secret_parser.add_subparsers(dest="action", metavar="<ação>")
+    secret_cmds.required = True
+
+    p = secret_cmds.add_parser("read", help="decifrar um ficheiro", parents=[common])
+    p.add_argument("file")
+    p.add_argument("--raw", action="store_true", help="só o texto decifrado (para scripts)")
+    p.set_defaults(func=cmd_secret_read)
+
+    p = secret_cmds.add_parser("scan", help="auditar pastas/Pen Drives (uma linha JSON por ficheiro)", parents=[common])
+    p.add_argument("roots", nargs="+")
+    p.add_argument("--workers", type=int)
+    p.set_defaults(func=cmd_secret_scan)
+
+    # report
+    report_parser = groups.add_parser("report", help="relatórios calculados diretamente na base SQLite")
+    report_cmds = report_parser.add_subparsers(dest="action", metavar="<ação>")
+    report_cmds.required = True
+
+    p = report_cmds.add_parser("billing", help="faturação (igual a /api/reports/billing)", parents=[common])
+    p.add_argument("restaurant", type=int)
+    p.add_argument("--period", choices=["day", "week", "month", "year"], default="day")
+    p.add_argument("--db", help="ficheiro SQLite (por omissão backend/prisma/dev.db)")
+    p.add_argument("--rollup", action="store_true", help="usar os resumos diários (ver: db rollup)")
+    p.add_argument("--archive", action="store_true", help="incluir os anos arquivados (ver: db archive)")
+    p.set_defaults(func=cmd_report)
+
+    p = report_cmds.add_parser("analytics", help="analytics avançado (mesas, empregados, fluxo horário)", parents=[common])
+    p.add_argument("restaurant", type=int)
+    p.add_argument("--from", dest="start", help="AAAA-MM-DD")
+    p.add_argument("--to", dest="end", help="AAAA-MM-DD")
+    p.add_argument("--db")
+    p.add_argument("--rollup", action="store_true", help="usar os resumos diários (dias inteiros)")
+    p.add_argument("--archive", action="store_true", help="incluir os anos arquivados")
+    p.set_defaults(func=cmd_report)
+
+    p = report_cmds.add_parser("stock", help="consumo teórico de ingredientes, variação e encomendas", parents=[common])
+    p.add_argument("restaurant", type=int)
+    p.add_argument("--from", dest="start", help="AAAA-MM-DD (por omissão há um mês)")
+    p.add_argument("--to", dest="end", help="AAAA-MM-DD (por omissão hoje)")
+    p.add_argument("--lead-days", type=float, default=2, help="dias até a encomenda chegar")
+    p.add_argument("--json", action="store_true")
+    p.add_argument("--archive", action="store_true", help="incluir os anos arquivados")
+    p.add_argument("--db")
+    p.set_defaults(func=cmd_report_stock)
+
+    p = report_cmds.add_parser("export", help="histórico de pedidos linha a linha (csv, ndjson, parquet), memória constante", parents=[common])
+    p.add_argument("restaurant", type=int)
+    p.add_argument("out", help="ficheiro de saída ('-' para stdout)")
+    p.add_argument("--format", choices=["csv", "ndjson", "parquet"], default="csv")
+    p.add_argument("--from", dest="start", help="AAAA-MM-DD")
+    p.add_argument("--to", dest="end", help="AAAA-MM-DD")
+    p.add_argument("--status")
+    p.add_argument("--batch", type=int, default=5000, help="linhas por lote")
+    p.add_argument("--delimiter", default=",", help="separador do csv (ex.: ';' para o Excel em português)")
+    p.add_argument("--archive", action="store_true", help="incluir os anos arquivados")
+    p.add_argument("--db")
+    p.set_defaults(func=cmd_report_export)
+
+    p = report_cmds.add_parser("query", help="agregações ad hoc no snapshot colunar (ver: db columns)", parents=[common])
+    p.add_argument("restaurant", type=int)
+    p.add_argument("--by", default="hour", help="chaves separadas por vírgula: hour, weekday, day, month, table, waiter, status, product, category")
+    p.add_argument("--metric", choices=["revenue", "orders", "quantity"], default="revenue")
+    p.add_argument("--days", type=int, help="últimos N dias (em vez de --from/--to)")
+    p.add_argument("--from", dest="start", help="AAAA-MM-DD")
+    p.add_argument("--to", dest="end", help="AAAA-MM-DD")
+    p.add_argument("--status", default="PAID", help="estados separados por vírgula ('' para todos)")
+    p.add_argument("--top", type=int)
+    p.add_argument("--refresh", action="store_true", help="atualizar o snapshot antes")
+    p.add_argument("--json", action="store_true")
+    p.add_argument("--dir", help="pasta do snapshot (por omissão columns/ ao lado da base)")
+    p.add_argument("--db")
+    p.set_defaults(func=cmd_report_query)
+
+    p = report_cmds.add_parser("latency", help="percentis de espera, preparação e serviço (cozinha/bar)", parents=[common])
+    p.add_argument("restaurant", type=int)
+    p.add_argument("--from", dest="start", help="AAAA-MM-DD (por omissão há um mês)")
+    p.add_argument("--to", dest="end", help="AAAA-MM-DD (por omissão hoje)")
+    p.add_argument("--by-hour", action="store_true", help="incluir percentis por hora do dia (JSON)")
+    p.add_argument("--refresh", action="store_true", help="atualizar os sketches antes (ver: db latency)")
+    p.add_argument("--json", action="store_true")
+    p.add_argument("--db")
+    p.set_defaults(func=cmd_report_latency)
+
+    p = report_cmds.add_parser("usage", help="restaurantes perto dos limites do plano (mesas, itens, utilizadores)", parents=[common])
+    p.add_argument("--ratio", type=float, default=0.8, help="fração do limite a partir da qual aparece")
+    p.add_argument("--all", action="store_true", help="listar todos os restaurantes")
+    p.add_argument("--restaurant", type=int, help="só este restaurante")
+    p.add_argument("--refresh", action="store_true", help="atualizar os contadores antes (ver: db usage)")
+    p.add_argument("--json", action="store_true")
+    p.add_argument("--db")
+    p.set_defaults(func=cmd_report_usage)
+
+    p = report_cmds.add_parser("cash", help="reconciliação das sessões de caixa e cofres de todos os restaurantes", parents=[common])
+    p.add_argument("--from", dest="start", help="AAAA-MM-DD (por omissão há 31 dias)")
+    p.add_argument("--to", dest="end", help="AAAA-MM-DD (por omissão hoje)")
+    p.add_argument("--restaurant", type=int, help="só este restaurante")
+    p.add_argument("--threshold", type=float, default=1.0, help="diferença máxima aceite por sessão")
+    p.add_argument("--all", action="store_true", help="listar todas as sessões, não só as sinalizadas")
+    p.add_argument("--report", help="gravar o relatório em Markdown neste ficheiro")
+    p.add_argument("--json", action="store_true")
+    p.add_argument("--archive", action="store_true", help="incluir os movimentos arquivados")
+    p.add_argument("--db")
+    p.set_defaults(func=cmd_report_cash)
+
+    # db
+    db_parser = groups.add_parser("db", help="manutenção e dados de teste da base SQLite")
+    db_cmds = db_parser.add_subparsers(dest="action", metavar="<ação>")
+    db_cmds.required = True
+
+    p = db_cmds.add_parser("synth", help="gerar uma base sintética para testes de carga", parents=[common])
+    p.add_argument("out")
+    p.add_argument("--scale", type=float, default=1, help="múltiplo do volume real (1 restaurante x 1 ano)")
+    p.add_argument("--tenants", type=int)
+    p.add_argument("--days", type=int)
+    p.add_argument("--orders-per-day", type=float)
+    p.add_argument("--seed", type=int, default=2026)
+    p.add_argument("--end", help="último dia (AAAA-MM-DD)")
+    p.add_argument("--template", help="base com o esquema (por omissão prisma/dev.db)")
+    p.add_argument("--stock-per-order", action="store_true", help="uma saída de stock por linha de pedido, como o backend")
+    p.add_argument("--force", action="store_true")
+    p.set_defaults(func=cmd_db_synth)
+
+    p = db_cmds.add_parser("rollup", help="atualizar os resumos diários (só pedidos novos ou alterados)", parents=[common])
+    p.add_argument("--rebuild", action="store_true", help="apagar e recalcular tudo")
+    p.add_argument("--db")
+    p.set_defaults(func=cmd_db_rollup)
+
+    p = db_cmds.add_parser("usage", help="atualizar os contadores de uso do plano (PlanUsage) de todos os restaurantes", parents=[common])
+    p.add_argument("--rebuild", action="store_true", help="recontar tudo")
+    p.add_argument("--db")
+    p.set_defaults(func=cmd_db_usage)
+
+    p = db_cmds.add_parser("latency", help="atualizar os sketches de latência (só pedidos novos ou alterados)", parents=[common])
+    p.add_argument("--rebuild", action="store_true", help="apagar e recalcular tudo")
+    p.add_argument("--db")
+    p.set_defaults(func=cmd_db_latency)
+
+    p = db_cmds.add_parser("archive", help="mover períodos fechados para archive/cafepoint-AAAA.db", parents=[common])
+    p.add_argument("--months", type=int, default=12, help="manter na base os últimos N meses")
+    p.add_argument("--dir", help="pasta do arquivo (por omissão archive/ ao lado da base)")
+    p.add_argument("--dry-run", action="store_true", help="só contar o que sairia")
+    p.add_argument("--vacuum", action="store_true", help="compactar a base no fim (acesso exclusivo)")
+    p.add_argument("--db")
+    p.set_defaults(func=cmd_db_archive)
+
+    p = db_cmds.add_parser("columns", help="atualizar o snapshot colunar de pedidos (numpy/memmap)", parents=[common])
+    p.add_argument("--rebuild", action="store_true", help="apagar e reconstruir tudo")
+    p.add_argument("--dir", help="pasta do snapshot (por omissão columns/ ao lado da base)")
+    p.add_argument("--db")
+    p.set_defaults(func=cmd_db_columns)
+
+    p = db_cmds.add_parser("backup", help="snapshot online, deduplicado e comprimido (regista no SyncLog)", parents=[common])
+    p.add_argument("--dir", help="repositório de backups (por omissão backups/ ao lado da base)")
+    p.add_argument("--step", type=int, default=256, help="páginas copiadas por passo")
+    p.add_argument("--no-log", action="store_true", help="não escrever no SyncLog")
+    p.add_argument("--db")
+    p.set_defaults(func=cmd_db_backup)
+
+    p = db_cmds.add_parser("verify", help="remontar um snapshot e correr integrity_check", parents=[common])
+    p.add_argument("snapshot", nargs="?", help="nome do snapshot (por omissão o último)")
+    p.add_argument("--dir")
+    p.add_argument("--db")
+    p.set_defaults(func=cmd_db_verify)
+
+    p = db_cmds.add_parser("restore", help="remontar um snapshot num ficheiro novo", parents=[common])
+    p.add_argument("snapshot")
+    p.add_argument("out")
+    p.add_argument("--dir")
+    p.add_argument("--db")
+    p.set_defaults(func=cmd_db_restore)
+
+    p = db_cmds.add_parser("indexes", help="medir as consultas do backend e propor índices (numa cópia da base)", parents=[common])
+    p.add_argument("--runs", type=int, default=5, help="repetições por consulta (mediana)")
+    p.add_argument("--report", help="gravar o relatório em Markdown neste ficheiro")
+    p.add_argument("--migration", metavar="NOME", help="escrever prisma/migrations/<data>_NOME/migration.sql")
+    p.add_argument("--db")
+    p.set_defaults(func=cmd_db_indexes)
+
+    p = db_cmds.add_parser("load", help="teste de carga (REST + Socket.IO) contra o backend arrancado sobre esta base", parents=[common])
+    p.add_argument("--url", default="http://localhost:5000")
+    p.add_argument("--ramp", default="5,10,25,50", help="utilizadores simultâneos por patamar")
+    p.add_argument("--stage", type=int, default=30, help="segundos por patamar")
+    p.add_argument("--think", type=float, default=2.0, help="pausa média entre ações (s)")
+    p.add_argument("--listeners", type=int, default=3, help="clientes Socket.IO a medir a entrega dos eventos")
+    p.add_argument("--tenants", type=int, help="usar só os primeiros N restaurantes sintéticos")
+    p.add_argument("--mix", help="pesos das ações, ex.: createOrder=50,reportAdvanced=0")
+    p.add_argument("--seed", type=int)
+    p.add_argument("--out", help="gravar os resultados (curva segundo a segundo) em JSON")
+    p.add_argument("--db")
+    p.set_defaults(func=cmd_db_load)
+
+    # sync
+    sync_parser = groups.add_parser("sync", help="filas offline dos tablets aplicadas em lote")
+    sync_cmds = sync_parser.add_subparsers(dest="action", metavar="<ação>")
+    sync_cmds.required = True
+
+    p = sync_cmds.add_parser("apply", help="aplicar uma fila exportada (JSON) em poucas transações", parents=[common])
+    p.add_argument("file", help="lista de itens da fila ou {\"deviceId\": ..., \"items\": [...]}")
+    p.add_argument("--user", type=int, required=True, help="id do utilizador que fez as operações")
+    p.add_argument("--device", help="id do dispositivo (por omissão o do ficheiro)")
+    p.add_argument("--batch", type=int, default=200, help="operações por transação")
+    p.add_argument("--dry-run", action="store_true", help="validar tudo e desfazer no fim")
+    p.add_argument("--json", action="store_true")
+    p.add_argument("--db")
+    p.set_defaults(func=cmd_sync_apply)
+
+    p = sync_cmds.add_parser("serve", help="servir POST /api/sync/upload (token JWT do backend)", parents=[common])
+    p.add_argument("--host", default="0.0.0.0")
+    p.add_argument("--port", type=int, default=5055)
+    p.add_argument("--db")
+    p.set_defaults(func=cmd_sync_serve)
+
+    # deck
+    deck_parser = groups.add_parser("deck", help="apresentações PowerPoint")
+    deck_cmds = deck_parser.add_subparsers(dest="action", metavar="<ação>")
+    deck_cmds.required = True
+
+    p = deck_cmds.add_parser("render", help="gerar decks a partir de decks/*.json", parents=[common])
+    p.add_argument("specs", nargs="+")
+    p.add_argument("--output", "-o", help="ficheiro .pptx (só com um deck)")
+    p.add_argument("--no-cache", action="store_true")
+    p.set_defaults(func=cmd_deck_render)
+
+    p = deck_cmds.add_parser("campaign", help="uma apresentação personalizada por prospect", parents=[common])
+    p.add_argument("prospects")
+    p.add_argument("--out", default="campanha")
+    p.add_argument("--workers", type=int)
+    p.set_defaults(func=cmd_deck_campaign)
+
+    # hwid
+    p = groups.add_parser("hwid", help="mostrar o HWID desta máquina", parents=[common])
+    p.add_argument("--no-cache", action="store_true")
+    p.set_defaults(func=cmd_hwid)
+
+    return parser
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if not hasattr(args, "yes"):
+        args.yes = False
+    try:
+        return args.func(args)
+    except UsageError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return EXIT_USAGE
+    except FileNotFoundError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return EXIT_FAIL
+    except (EOFError, KeyboardInterrupt):
+        print("\n❌ Cancelado.", file=sys.stderr)
+        return EXIT_FAIL
+    except BrokenPipeError:
+        # Saída ligada a "| head" ou semelhante: terminar em silêncio
+        sys.stdout = open(os.devnull, "w")
+        return EXIT_FAIL
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+import hashlib
+import json
+import os
+import sys
+from functools import lru_cache
+
+# ==========================================
+# MOTOR ÚNICO DE APRESENTAÇÕES
+# ==========================================
+# Cada apresentação é um ficheiro de dados em decks/ (JSON, ou YAML se o
+# PyYAML estiver instalado) com:
+#   theme.colors   -> paleta ("NOME": "#rrggbb")
+#   theme.styles   -> estilos de parágrafo (tamanho, negrito, cor, fonte...)
+#   theme.layouts  -> posição (em polegadas) e estilo de cada papel do slide
+#   slides         -> lista de slides: title, statement, bullets, grid, two_column
+#                     (qualquer slide aceita "logo" se o layout tiver caixa "logo")
+#
+# Uso: python deck_renderer.py decks/sales.json [saida.pptx] [--no-cache]
+#
+# Cache de build (.deck_cache/): cada slide tem um hash do tema, do seu
+# conteúdo, dos ficheiros que usa e do próprio motor. Se nenhum hash mudou e o
+# .pptx não foi mexido, a apresentação não é regravada; caso contrário só os
+# slides alterados são desenhados e os restantes vêm do XML em cache.
+
+CACHE_DIR = os.environ.get("CAFEPOINT_DECK_CACHE") or os.path.join(os.path.dirname(os.path.abspath(__file__)), ".deck_cache")
+
+def load_spec(path):
+    with open(path, "r", encoding="utf-8") as f:
+        if path.lower().endswith((".yaml", ".yml")):
+            import yaml
+            return yaml.safe_load(f)
+        return json.load(f)
+
+# ==========================================
+# CACHE DE BUILD
+# ==========================================
+
+def _digest(obj):
+    return hashlib.sha256(json.dumps(obj, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+RENDERER_FILES = ["deck_renderer.py", "deck_slides.py"]
+
+@lru_cache(maxsize=1)
+def _renderer_hash():
+    # Alterar o motor invalida toda a cache
+    h = hashlib.sha256()
+    for name in RENDERER_FILES:
+        with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), name), "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+_asset_hashes = {}
+
+def _asset_hash(path):
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+    if key not in _asset_hashes:
+        with open(path, "rb") as f:
+            _asset_hashes[key] = hashlib.sha256(f.read()).hexdigest()
+    return _asset_hashes[key]
+
+def slide_hashes(spec):
+    base = _digest({"renderer": _renderer_hash(), "theme": spec.get("theme", {})})
+    hashes = []
+    for slide_spec in spec["slides"]:
+        assets = {"logo": _asset_hash(slide_spec["logo"])} if slide_spec.get("logo") else {}
+        hashes.append(_digest({"base": base, "slide": slide_spec, "assets": assets}))
+    return hashes
+
+class BuildCache:
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.slides_dir = os.path.join(cache_dir, "slides")
+        self.decks_dir = os.path.join(cache_dir, "decks")
+        os.makedirs(self.slides_dir, exist_ok=True)
+        os.makedirs(self.decks_dir, exist_ok=True)
+        self.memory = {}
+
+    def _record_path(self, output):
+        key = hashlib.sha1(os.path.abspath(output).encode("utf-8")).hexdigest()
+        return os.path.join(self.decks_dir, key + ".json")
+
+    def _write(self, path, data):
+        # Escrita atómica: vários processos podem partilhar a cache
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def is_fresh(self, output, deck_hash):
+        try:
+            with open(self._record_path(output), "r") as f:
+                record = json.load(f)
+            st = os.stat(output)
+        except (OSError, ValueError):
+            return False
+        return record.get("deck") == deck_hash and record.get("mtime_ns") == st.st_mtime_ns and record.get("size") == st.st_size
+
+    def save_deck(self, output, deck_hash):
+        st = os.stat(output)
+        record = {"deck": deck_hash, "mtime_ns": st.st_mtime_ns, "size": st.st_size}
+        self._write(self._record_path(output), json.dumps(record).encode("utf-8"))
+
+    def load_slide(self, slide_hash):
+        if slide_hash not in self.memory:
+            try:
+                with open(os.path.join(self.slides_dir, slide_hash + ".xml"), "rb") as f:
+                    self.memory[slide_hash] = f.read()
+            except OSError:
+                return None
+        return self.memory[slide_hash]
+
+    def save_slide(self, slide_hash, xml):
+        self.memory[slide_hash] = xml
+        self._write(os.path.join(self.slides_dir, slide_hash + ".xml"), xml)
+
+# ==========================================
+# BUILD
+# ==========================================
+
+_default_cache = None
+
+def default_cache():
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = BuildCache()
+    return _default_cache
+
+def render_deck(spec, output=None, use_cache=True):
+    output = output or spec["output"]
+    cache = default_cache() if use_cache else None
+    hashes = slide_hashes(spec) if cache else None
+    deck_hash = _digest(hashes) if cache else None
+
+    if cache and cache.is_fresh(output, deck_hash):
+        return {"output": output, "skipped": True, "rendered_slides": 0, "reused_slides": 0}
+
+    from deck_slides import build_presentation
+    prs, stats = build_presentation(spec, cache, hashes)
+    prs.save(output)
+    if cache:
+        cache.save_deck(output, deck_hash)
+    return {"output": output, "skipped": False, **stats}
+
+def render(spec_path, output=None, use_cache=True):
+    spec = load_spec(spec_path)
+    result = render_deck(spec, output, use_cache)
+    if result["skipped"]:
+        print(f"⏭️  {result['output']} sem alterações (cache)")
+    elif spec.get("message"):
+        print(spec["message"])
+    return result["output"]
+
+if __name__ == "__main__":
+    # Vários decks num só processo: python deck_renderer.py decks/*.json
+    args = [a for a in sys.argv[1:] if a != "--no-cache"]
+    use_cache = "--no-cache" not in sys.argv
+    specs = [a for a in args if not a.lower().endswith(".pptx")]
+    outputs = [a for a in args if a.lower().endswith(".pptx")]
+    if not specs or (outputs and len(specs) > 1):
+        print("Usage: python deck_renderer.py <deck.json|deck.yaml> [output.pptx] [--no-cache]")
+        print("       python deck_renderer.py <deck.json> <deck.json> ... [--no-cache]")
+        sys.exit(1)
+    for spec_path in specs:
+        render(spec_path, outputs[0] if outputs else None, use_cache)
@@ -0,0 +1,215 @@
+from lxml import etree
+from pptx import Presentation
+from pptx.util import Inches, Pt
+from pptx.enum.text import PP_ALIGN
+from pptx.dml.color import RGBColor
+from pptx.enum.shapes import MSO_SHAPE
+from pptx.oxml import parse_xml
+
+# ==========================================
+# DESENHO DOS SLIDES (python-pptx)
+# ==========================================
+# Importado só quando há slides para desenhar: verificar a cache de build
+# (deck_renderer.py) não paga o custo de carregar o python-pptx.
+
+BLANK_LAYOUT = 6
+
+ALIGNMENTS = {"left": PP_ALIGN.LEFT, "center": PP_ALIGN.CENTER, "right": PP_ALIGN.RIGHT, "justify": PP_ALIGN.JUSTIFY}
+
+# Papéis de texto de cada tipo de slide, pela ordem em que são desenhados
+SLIDE_ROLES = {
+    "title": ["title", "subtitle", "tagline", "footer"],
+    "statement": ["title", "statement"],
+    "bullets": ["title", "lead", "bullets"],
+    "grid": ["title", "lead", "items"],
+    "two_column": ["title", "columns"],
+}
+
+def _rgb(value, colors):
+    value = colors.get(value, value)
+    return RGBColor.from_string(value.lstrip("#"))
+
+class Theme:
+    # Cores e estilos são convertidos para objetos pptx uma única vez por apresentação
+    def __init__(self, spec):
+        self.colors = {name: _rgb(value, {}) for name, value in spec.get("colors", {}).items()}
+        self.background = spec.get("background")
+        self.use_first_paragraph = spec.get("use_first_paragraph", False)
+        self.layouts = spec.get("layouts", {})
+        self.styles = {name: self._compile_style(style) for name, style in spec.get("styles", {}).items()}
+
+    def color(self, value):
+        if value in self.colors:
+            return self.colors[value]
+        return RGBColor.from_string(value.lstrip("#"))
+
+    def _compile_style(self, style):
+        compiled = {}
+        if "size" in style:
+            compiled["size"] = Pt(style["size"])
+        if "bold" in style:
+            compiled["bold"] = style["bold"]
+        if "color" in style:
+            compiled["color"] = self.color(style["color"])
+        if "font" in style:
+            compiled["font"] = style["font"]
+        if "align" in style:
+            compiled["align"] = ALIGNMENTS[style["align"]]
+        if "space_before" in style:
+            compiled["space_before"] = Pt(style["space_before"])
+        if "space_after" in style:
+            compiled["space_after"] = Pt(style["space_after"])
+        return compiled
+
+class TextBox:
+    def __init__(self, slide, box, theme, wrap=False):
+        shape = slide.shapes.add_textbox(*(Inches(v) for v in box))
+        self.frame = shape.text_frame
+        if wrap:
+            self.frame.word_wrap = True
+        # O parágrafo vazio inicial da caixa só é usado se o tema o pedir
+        self.first_free = theme.use_first_paragraph
+
+    def add(self, text, style):
+        if self.first_free:
+            p = self.frame.paragraphs[0]
+            self.first_free = False
+        else:
+            p = self.frame.add_paragraph()
+        p.text = text
+        font = p.font
+        if "size" in style:
+            font.size = style["size"]
+        if "bold" in style:
+            font.bold = style["bold"]
+        if "color" in style:
+            font.color.rgb = style["color"]
+        if "font" in style:
+            font.name = style["font"]
+        if "align" in style:
+            p.alignment = style["align"]
+        if "space_before" in style:
+            p.space_before = style["space_before"]
+        if "space_after" in style:
+            p.space_after = style["space_after"]
+        return p
+
+class SlideBuilder:
+    def __init__(self, prs, theme, spec):
+        self.theme = theme
+        self.spec = spec
+        self.layout = theme.layouts.get(spec.get("layout", spec["type"]), {})
+        self.slide = prs.slides.add_slide(prs.slide_layouts[BLANK_LAYOUT])
+        self.boxes = {}
+
+        background = spec.get("background", self.layout.get("background", theme.background))
+        if background:
+            fill = self.slide.background.fill
+            fill.solid()
+            fill.fore_color.rgb = theme.color(background)
+
+        self.rects(after=None)
+
+    def rects(self, after):
+        # Retângulos decorativos; "after": "<papel>" desenha-os logo a seguir a esse papel
+        for rect in self.layout.get("rects", []):
+            if rect.get("after") != after:
+                continue
+            shape = self.slide.shapes.add_shape(MSO_SHAPE.RECTANGLE, *(Inches(v) for v in rect["box"]))
+            shape.fill.solid()
+            shape.fill.fore_color.rgb = self.theme.color(rect["color"])
+            shape.line.fill.background()
+
+    def style(self, name):
+        return self.theme.styles.get(name, {})
+
+    def box_for(self, role):
+        # "into": o papel escreve na caixa de outro papel (ex.: título + subtítulo na mesma caixa)
+        conf = self.layout.get(role, {})
+        target = conf.get("into", role)
+        if target not in self.boxes:
+            target_conf = self.layout.get(target, conf)
+            self.boxes[target] = TextBox(self.slide, target_conf["box"], self.theme, target_conf.get("wrap", False))
+        return self.boxes[target]
+
+    def text(self, role, value):
+        conf = self.layout.get(role, {})
+        style = self.style(conf.get("style", role))
+        prefix = conf.get("prefix", "")
+        box = self.box_for(role)
+        for line in value if isinstance(value, list) else [value]:
+            if conf.get("upper"):
+                line = line.upper()
+            box.add(prefix + line, style)
+
+    def items(self, value):
+        # Grelha de (título, descrição) numa única caixa
+        conf = self.layout.get("items", {})
+        heading_style = self.style(conf.get("heading_style", "item_heading"))
+        text_style = self.style(conf.get("text_style", "item_text"))
+        box = self.box_for("items")
+        for item in value:
+            box.add(conf.get("heading_prefix", "") + item["heading"], heading_style)
+            box.add(conf.get("text_prefix", "") + item["text"], text_style)
+
+    def columns(self, value):
+        conf = self.layout.get("columns", {})
+        heading_style = self.style(conf.get("heading_style", "column_heading"))
+        item_style = self.style(conf.get("item_style", "column_item"))
+        for box_coords, column in zip(conf["boxes"], value):
+            box = TextBox(self.slide, box_coords, self.theme, conf.get("wrap", False))
+            box.add(column["heading"], heading_style)
+            for item in column["items"]:
+                box.add(conf.get("prefix", "") + item, item_style)
+
+    def build(self):
+        for role in SLIDE_ROLES[self.spec["type"]]:
+            value = self.spec.get(role)
+            if value:
+                if role == "items":
+                    self.items(value)
+                elif role == "columns":
+                    self.columns(value)
+                else:
+                    self.text(role, value)
+            self.rects(after=role)
+        self.picture()
+        return self.slide
+
+    def picture(self):
+        # Logótipo opcional; largura/altura a null mantém a proporção da imagem
+        conf = self.layout.get("logo")
+        path = self.spec.get("logo")
+        if not conf or not path:
+            return
+        x, y, w, h = (Inches(v) if v is not None else None for v in conf["box"])
+        self.slide.shapes.add_picture(path, x, y, w, h)
+
+def _restore_slide(prs, xml):
+    slide = prs.slides.add_slide(prs.slide_layouts[BLANK_LAYOUT])
+    cached = parse_xml(xml).cSld
+    current = slide._element.cSld
+    current.addprevious(cached)
+    slide._element.remove(current)
+    return slide
+
+def _cacheable(slide_spec):
+    # Slides com imagem dependem de relações do pacote: desenham-se sempre
+    return not slide_spec.get("logo")
+
+def build_presentation(spec, cache=None, hashes=None):
+    theme = Theme(spec.get("theme", {}))
+    prs = Presentation()
+    stats = {"rendered_slides": 0, "reused_slides": 0}
+    for i, slide_spec in enumerate(spec["slides"]):
+        slide_hash = hashes[i] if cache else None
+        xml = cache.load_slide(slide_hash) if cache and _cacheable(slide_spec) else None
+        if xml is not None:
+            _restore_slide(prs, xml)
+            stats["reused_slides"] += 1
+            continue
+        slide = SlideBuilder(prs, theme, slide_spec).build()
+        stats["rendered_slides"] += 1
+        if cache and _cacheable(slide_spec):
+            cache.save_slide(slide_hash, etree.tostring(slide._element))
+    return prs, stats
@@ -1,210 +1,169 @@
-from pptx import Presentation
-from pptx.util import Inches, Pt
-from pptx.enum.text import PP_ALIGN
-from pptx.dml.color import RGBColor
-from pptx.enum.shapes import MSO_SHAPE
+import copy
+import csv
+import json
+import os
+import re
+import sys
+import time
+import unicodedata
+
+from deck_renderer import load_spec, render, render_deck
+
+# Conteúdo, paleta e posições em decks/sales.json (ver deck_renderer.py)
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DECK_SPEC = os.path.join(BASE_DIR, "decks", "sales.json")
+UPLOADS_DIR = os.path.join(BASE_DIR, "backend", "uploads")
+
+# Mesmos ganhos prometidos nas apresentações (V3: "+30% rotação", "-15% desperdícios")
+ROI_ASSUMPTIONS = {"table_turnover": 0.30, "waste_reduction": 0.15}
 
 def create_sales_presentation():
-    prs = Presentation()
-
-    # --- PALETA DE CORES (PREMIUM SAAS) ---
-    BG_DARK = RGBColor(15, 23, 42)      # #0f172a (Slate 900)
-    TEXT_WHITE = RGBColor(248, 250, 252) # Slate 50
-    TEXT_GRAY = RGBColor(148, 163, 184)  # Slate 400
-    ACCENT_INDIGO = RGBColor(99, 102, 241) # Indigo 500
-    ACCENT_RED = RGBColor(239, 68, 68)   # Red 500 (Para problemas)
-    ACCENT_GREEN = RGBColor(34, 197, 94) # Green 500 (Para lucro)
-
-    def set_slide_style(slide):
-        background = slide.background
-        fill = background.fill
-        fill.solid()
-        fill.fore_color.rgb = BG_DARK
-
-    # --- SLIDE 1: CAPA IMPACTANTE ---
-    slide = prs.slides.add_slide(prs.slide_layouts[6])
-    set_slide_style(slide)
-
-    # Título Grande
-    title_box = slide.shapes.add_textbox(Inches(1), Inches(2.5), Inches(8), Inches(2))
-    tf = title_box.text_frame
-    p = tf.add_paragraph()
-    p.text = "CAFÉ POINT"
-    p.font.size = Pt(66)
-    p.font.bold = True
-    p.font.color.rgb = TEXT_WHITE
-    p.font.name = 'Arial'
-    
-    # Subtítulo (Proposta de Valor)
-    sub_box = slide.shapes.add_textbox(Inches(1), Inches(3.8), Inches(8), Inches(1.5))
-    sf = sub_box.text_frame
-    sp = sf.add_paragraph()
-    sp.text = "O Fim do Caos Operacional no Seu Restaurante."
-    sp.font.size = Pt(28)
-    sp.font.color.rgb = ACCENT_INDIGO
-    sp.font.name = 'Arial'
-
-    # --- SLIDE 2: O PROBLEMA (DOR) ---
-    slide = prs.slides.add_slide(prs.slide_layouts[6])
-    set_slide_style(slide)
-
-    # Título
-    tbox = slide.shapes.add_textbox(Inches(0.5), Inches(0.5), Inches(9), Inches(1))
-    tf = tbox.text_frame
-    p = tf.add_paragraph()
-    p.text = "QUANTO DINHEIRO ESTAMOS PERDENDO?"
-    p.font.size = Pt(32)
-    p.font.bold = True
-    p.font.color.rgb = ACCENT_RED
-    p.font.name = 'Arial'
-
-    # Conteúdo (Grid visual simples)
-    cbox = slide.shapes.add_textbox(Inches(0.5), Inches(2), Inches(9), Inches(4))
-    cf = cbox.text_frame
-    cf.word_wrap = True
-
-    points = [
-        ("DESPERDÍCIO DE STOCK (20%)", "Sem controlo rigoroso, ingredientes somem ou estragam. O lucro vai para o lixo antes de chegar ao prato."),
-        ("ERROS DE PEDIDO", "Letra ilegível e falhas de comunicação cozinha-garçom geram pratos devolvidos e clientes insatisfeitos."),
-        ("LENTIDÃO NO ATENDIMENTO", "Cada minuto de atraso é uma mesa que roda menos vezes na noite.")
-    ]
-
-    for title, desc in points:
-        tp = cf.add_paragraph()
-        tp.text = title
-        tp.font.size = Pt(24)
-        tp.font.bold = True
-        tp.font.color.rgb = TEXT_WHITE
-        tp.space_before = Pt(20)
-
-        dp = cf.add_paragraph()
-        dp.text = desc
-        dp.font.size = Pt(18)
-        dp.font.color.rgb = TEXT_GRAY
-        dp.space_after = Pt(10)
-
-    # --- SLIDE 3: A SOLUÇÃO (HERÓI) ---
-    slide = prs.slides.add_slide(prs.slide_layouts[6])
-    set_slide_style(slide)
-
-    tbox = slide.shapes.add_textbox(Inches(0.5), Inches(0.5), Inches(9), Inches(1))
-    tf = tbox.text_frame
-    p = tf.add_paragraph()
-    p.text = "A SOLUÇÃO: CONTROLO TOTAL"
-    p.font.size = Pt(32)
-    p.font.bold = True
-    p.font.color.rgb = ACCENT_INDIGO
-    p.font.name = 'Arial'
-
-    sbox = slide.shapes.add_textbox(Inches(0.5), Inches(1.5), Inches(9), Inches(1))
-    sf = sbox.text_frame
-    sp = sf.add_paragraph()
-    sp.text = "Uma plataforma única que conecta tudo em tempo real."
-    sp.font.size = Pt(24)
-    sp.font.color.rgb = TEXT_WHITE
-
-    # Funcionalidades (Boxed style simulado)
-    fbox = slide.shapes.add_textbox(Inches(0.5), Inches(2.5), Inches(9), Inches(4))
-    ff = fbox.text_frame
-    
-    feats = [
-        ("📱 POS MÓVEL", "O garçom lança o pedido na mesa. Zero erros. Zero deslocações inúteis."),
-        ("👨‍🍳 KDS (COZINHA DIGITAL)", "Ecrãs substituem papel. Fila organizada por ordem de chegada."),
-        ("📉 STOCK AUTOMÁTICO", "Vendeu um prato? O sistema baixa os ingredientes. Instantâneo.")
-    ]
-
-    for title, desc in feats:
-        tp = ff.add_paragraph()
-        tp.text = "• " + title
-        tp.font.size = Pt(24)
-        tp.font.bold = True
-        tp.font.color.rgb = ACCENT_INDIGO
-        tp.space_before = Pt(24)
-        
-        dp = ff.add_paragraph()
-        dp.text = "   " + desc
-        dp.font.size = Pt(20)
-        dp.font.color.rgb = TEXT_GRAY
-
-    # --- SLIDE 4: ROI (DINHEIRO) ---
-    slide = prs.slides.add_slide(prs.slide_layouts[6])
-    set_slide_style(slide)
-
-    tbox = slide.shapes.add_textbox(Inches(0.5), Inches(0.5), Inches(9), Inches(1))
-    tf = tbox.text_frame
-    p = tf.add_paragraph()
-    p.text = "O IMPACTO FINANCEIRO (ROI)"
-    p.font.size = Pt(32)
-    p.font.bold = True
-    p.font.color.rgb = ACCENT_GREEN
-    p.font.name = 'Arial'
-
-    cbox = slide.shapes.add_textbox(Inches(0.5), Inches(2), Inches(4.5), Inches(4))
-    cf = cbox.text_frame
-    
-    # Coluna 1: Aumentar Receita
-    p1 = cf.add_paragraph()
-    p1.text = "🚀 AUMENTO DE RECEITA"
-    p1.font.size = Pt(24)
-    p1.font.bold = True
-    p1.font.color.rgb = TEXT_WHITE
-    p1.space_after = Pt(10)
-
-    items1 = ["+ Rotação de Mesas", "+ Ticket Médio (Upsell)", "+ Fidelização de Clientes"]
-    for i in items1:
-        ip = cf.add_paragraph()
-        ip.text = "• " + i
-        ip.font.size = Pt(20)
-        ip.font.color.rgb = TEXT_GRAY
-
-    # Coluna 2: Reduzir Custos
-    cbox2 = slide.shapes.add_textbox(Inches(5), Inches(2), Inches(4.5), Inches(4))
-    cf2 = cbox2.text_frame
-    
-    p2 = cf2.add_paragraph()
-    p2.text = "💰 REDUÇÃO DE CUSTOS"
-    p2.font.size = Pt(24)
-    p2.font.bold = True
-    p2.font.color.rgb = TEXT_WHITE
-    p2.space_after = Pt(10)
-
-    items2 = ["- Desperdício de Alimentos", "- Roubos e Desvios", "- Erros Operacionais"]
-    for i in items2:
-        ip = cf2.add_paragraph()
-        ip.text = "• " + i
-        ip.font.size = Pt(20)
-        ip.font.color.rgb = TEXT_GRAY
-
-    # --- SLIDE 5: CHAMADA PARA AÇÃO ---
-    slide = prs.slides.add_slide(prs.slide_layouts[6])
-    set_slide_style(slide)
-
-    end_box = slide.shapes.add_textbox(Inches(1), Inches(2.5), Inches(8), Inches(3))
-    ef = end_box.text_frame
-    ep = ef.add_paragraph()
-    ep.text = "VAMOS MODERNIZAR?"
-    ep.font.size = Pt(48)
-    ep.font.bold = True
-    ep.font.color.rgb = ACCENT_INDIGO
-    ep.alignment = PP_ALIGN.CENTER
-    
-    ep2 = ef.add_paragraph()
-    ep2.text = "Implementação completa em 3 semanas."
-    ep2.font.size = Pt(24)
-    ep2.font.color.rgb = TEXT_WHITE
-    ep2.alignment = PP_ALIGN.CENTER
-    ep2.space_before = Pt(20)
-
-    ep3 = ef.add_paragraph()
-    ep3.text = "Agende o 'Go-Live' hoje."
-    ep3.font.size = Pt(20)
-    ep3.font.color.rgb = TEXT_GRAY
-    ep3.alignment = PP_ALIGN.CENTER
-    ep3.space_before = Pt(10)
-
-    # Save
-    prs.save("Apresentacao_Venda_Cafe_Point.pptx")
-    print("PPT de Vendas (ROI Focado) gerado com sucesso!")
+    return render(DECK_SPEC)
+
+# ==========================================
+# CAMPANHA: UMA APRESENTAÇÃO POR PROSPECT
+# ==========================================
+# Uso: python generate_ppt_final_sales.py --batch prospects.csv [--out pasta] [--workers N]
+# Colunas: name, logo (opcional), monthly_revenue (MT/mês), monthly_stock_cost (MT/mês)
+
+def load_prospects(path):
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        if path.lower().endswith(".json"):
+            return json.load(f)
+        return list(csv.DictReader(f))
+
+def _money(value):
+    return f"{value:,.0f}".replace(",", " ") + " MT"
+
+def _number(value):
+    try:
+        return float(value) if value not in (None, "") else None
+    except (TypeError, ValueError):
+        return None
+
+def resolve_logo(logo):
+    # Aceita caminho absoluto, nome do ficheiro ou o valor de Restaurant.logo ("/uploads/logo-...png")
+    if not logo:
+        return None
+    candidates = [logo, os.path.join(UPLOADS_DIR, os.path.basename(logo))]
+    return next((p for p in candidates if os.path.isfile(p)), None)
+
+def slugify(name):
+    # "Café Bom" -> "Cafe_Bom": tira os acentos antes de trocar o resto por "_"
+    ascii_name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode("ascii")
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", ascii_name).strip("_")
+    return slug or "Prospect"
+
+def unique_slugs(names):
+    # Nomes que dão o mesmo slug ficam com sufixo (_2, _3...) para uma apresentação
+    # não escrever por cima de outra (sem distinguir maiúsculas, como no Windows)
+    slugs, used = [], set()
+    for name in names:
+        base = slugify(name.strip())
+        slug, n = base, 1
+        while slug.lower() in used:
+            n += 1
+            slug = f"{base}_{n}"
+        used.add(slug.lower())
+        slugs.append(slug)
+    return slugs
+
+def personalize(spec, prospect, out_dir, slug=None):
+    spec = copy.deepcopy(spec)
+    name = prospect["name"].strip()
+    spec["output"] = os.path.join(out_dir, f"Apresentacao_Venda_{slug or slugify(name)}.pptx")
+    spec.pop("message", None)
+
+    cover = spec["slides"][0]
+    cover["footer"] = f"Proposta preparada para {name}"
+    logo = resolve_logo(prospect.get("logo"))
+    if logo:
+        cover["logo"] = logo
+
+    revenue = _number(prospect.get("monthly_revenue"))
+    stock_cost = _number(prospect.get("monthly_stock_cost"))
+    roi = next(s for s in spec["slides"] if s["type"] == "two_column")
+    if revenue is not None:
+        gain = revenue * ROI_ASSUMPTIONS["table_turnover"]
+        roi["columns"][0]["items"] = [
+            f"Faturação atual: {_money(revenue)}/mês",
+            f"+{ROI_ASSUMPTIONS['table_turnover']:.0%} Rotação de Mesas",
+            f"≈ +{_money(gain)}/mês"
+        ]
+    if stock_cost is not None:
+        saving = stock_cost * ROI_ASSUMPTIONS["waste_reduction"]
+        roi["columns"][1]["items"] = [
+            f"Custo de stock: {_money(stock_cost)}/mês",
+            f"-{ROI_ASSUMPTIONS['waste_reduction']:.0%} Desperdício de Alimentos",
+            f"≈ {_money(saving)}/mês poupados"
+        ]
+    return spec, bool(logo)
+
+def _peak_rss_mb():
+    # Pico de memória do processo trabalhador (indisponível no Windows sem psutil)
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+def render_prospect(job):
+    spec, prospect, out_dir, slug = job
+    start = time.perf_counter()
+    result = {"name": prospect.get("name")}
+    try:
+        deck, has_logo = personalize(spec, prospect, out_dir, slug)
+        result["output"] = render_deck(deck)["output"]
+        result["logo"] = has_logo
+        result["status"] = "OK"
+    except Exception as e:
+        result["status"] = "ERRO"
+        result["error"] = str(e)
+    result["seconds"] = round(time.perf_counter() - start, 3)
+    result["peak_rss_mb"] = _peak_rss_mb()
+    return result
+
+def run_campaign(prospects_path, out_dir="campanha", workers=None):
+    from concurrent.futures import ProcessPoolExecutor
+
+    spec = load_spec(DECK_SPEC)
+    prospects = load_prospects(prospects_path)
+    os.makedirs(out_dir, exist_ok=True)
+
+    start = time.perf_counter()
+    slugs = unique_slugs([p["name"] for p in prospects])
+    jobs = [(spec, p, out_dir, slug) for p, slug in zip(prospects, slugs)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(render_prospect, jobs, chunksize=8))
+    elapsed = time.perf_counter() - start
+
+    report_path = os.path.join(out_dir, "relatorio_campanha.csv")
+    with open(report_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["name", "status", "output", "logo", "seconds", "peak_rss_mb", "error"])
+        writer.writeheader()
+        writer.writerows(results)
+
+    ok = [r for r in results if r["status"] == "OK"]
+    for r in results:
+        if r["status"] != "OK":
+            print(f"❌ {r['name']}: {r['error']}")
+    if ok:
+        times = sorted(r["seconds"] for r in ok)
+        peaks = [r["peak_rss_mb"] for r in ok if r["peak_rss_mb"] is not None]
+        print(f"⏱️  Por apresentação: mediana {times[len(times) // 2]:.3f}s | máx {times[-1]:.3f}s")
+        if peaks:
+            print(f"🧠 Pico de memória por processo: {max(peaks):.1f} MB")
+    print(f"✅ {len(ok)}/{len(results)} apresentações geradas em {elapsed:.1f}s")
+    print(f"📄 Relatório: {report_path}")
+    return results
 
 if __name__ == "__main__":
+    if "--batch" in sys.argv:
+        args = sys.argv
+        prospects_path = args[args.index("--batch") + 1]
+        out_dir = args[args.index("--out") + 1] if "--out" in args else "campanha"
+        workers = int(args[args.index("--workers") + 1]) if "--workers" in args else None
+        results = run_campaign(prospects_path, out_dir, workers)
+        sys.exit(0 if all(r["status"] == "OK" for r in results) else 2)
     create_sales_presentation()